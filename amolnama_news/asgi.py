@@ -2,4 +2,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "amolnama_news.settings.dev")
+# Async JSON APIs and no WhiteNoise (see settings.base SERVE_ASGI)
+os.environ.setdefault("DJANGO_ASGI", "true")
 application = get_asgi_application()
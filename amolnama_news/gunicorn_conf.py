@@ -0,0 +1,99 @@
+"""
+Gunicorn configuration for production (WSGI by default, ASGI with uvicorn).
+
+    gunicorn -c python:amolnama_news.gunicorn_conf
+    SERVER_MODE=asgi gunicorn -c python:amolnama_news.gunicorn_conf
+
+Everything is driven by environment variables so operators tune a deploy
+without editing code:
+
+    SERVER_MODE             wsgi (gthread workers) | asgi (uvicorn workers)
+    WEB_CONCURRENCY         worker processes (default 2 x CPUs + 1; measure
+                            with ``manage.py benchmark_workers``)
+    GUNICORN_THREADS        threads per gthread worker (default 4)
+    GUNICORN_BIND           default 0.0.0.0:8000
+    GUNICORN_PRELOAD        import the app and warm caches once in the master
+                            (default true); see core.prefork
+    WARMUP_ON_BOOT          cache domains the master warms (core.warmup)
+    WARMUP_AFTER_FORK       cache domains every worker warms once loaded
+    GUNICORN_MAX_REQUESTS   recycle a worker after this many requests
+                            (default 2000, +/- GUNICORN_MAX_REQUESTS_JITTER)
+    GUNICORN_TIMEOUT        seconds before a silent worker is killed (30)
+    GUNICORN_GRACEFUL_TIMEOUT  seconds in-flight requests get on reload/stop (30)
+
+Reloads: ``kill -HUP <master>`` starts new workers and retires the old ones
+gracefully. With preloading on, the master holds the imported code, so a
+code deploy needs a new master: ``kill -USR2 <master>`` (starts a second
+master with the new code), then ``kill -QUIT <old master>`` once it is up.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi").lower()
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "amolnama_news.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "amolnama_news.wsgi:application"
+    worker_class = "gthread"
+    threads = _env_int("GUNICORN_THREADS", 4)
+
+raw_env = [
+    "DJANGO_SETTINGS_MODULE=" + os.environ.get("DJANGO_SETTINGS_MODULE", "amolnama_news.settings.prod"),
+]
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = _env_int("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+# Worker recycling bounds slow memory growth; the jitter keeps workers from
+# restarting (and cold-starting) all at once
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 200)
+
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# Heartbeat files on tmpfs, so a slow disk cannot get workers killed
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-") or None  # empty: off
+errorlog = os.environ.get("GUNICORN_ERROR_LOG", "-")
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+# ========== Server Hooks ==========
+
+def when_ready(server):
+    # Master, after the (preloaded) app is imported and before the first fork
+    if preload_app:
+        from amolnama_news.site_apps.core import prefork
+        prefork.prepare_master(server.log)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from amolnama_news.site_apps.core import prefork
+        prefork.after_fork(worker.log)
+
+
+def post_worker_init(worker):
+    # Worker, once the app is loaded (with or without preloading)
+    from amolnama_news.site_apps.core import prefork
+    prefork.after_worker_init(worker.log)
+
+
+def worker_abort(worker):
+    worker.log.warning("Worker %s aborted after %ss without a heartbeat", worker.pid, timeout)
@@ -172,14 +172,22 @@ function loadUnions() {
     });
 }
 
+// Version of the results snapshot currently rendered
+let lastResultsVersion = null;
+
 /**
  * Fetch current vote casting results with vote counts and percentages
  * Called to update party list with latest voting data
+ * Skips re-rendering when the server snapshot version has not changed
  */
 function updatePartyListWithPercentages() {
-  fetch('/evaluation_vote/api/vote-cast-current-results/')
+  const query = lastResultsVersion ? `?since_version=${encodeURIComponent(lastResultsVersion)}` : '';
+  fetch(`/evaluation_vote/api/vote-cast-current-results/${query}`)
     .then(response => response.json())
     .then(data => {
+      if (data.unchanged) return;
+      lastResultsVersion = data.version;
+
       // Update total vote count
       const totalVoteInfo = document.getElementById('total-vote-info');
       if (totalVoteInfo && data.results.length > 0) {
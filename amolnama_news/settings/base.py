@@ -1,5 +1,6 @@
 """Shared Django settings (imported by env-specific modules)."""
 from pathlib import Path
+import sys
 import environ
 
 BASE_DIR = Path(__file__).resolve().parents[2]  # .../project_root
@@ -16,7 +17,9 @@ ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", default=["localhost", "127.0.0.1"])
 
 # Application definition
 DJANGO_APPS = [
-    "django.contrib.admin",
+    # Admin modules are discovered when the URLconf loads (amolnama_news.urls),
+    # so management commands and scripts don't import them
+    "django.contrib.admin.apps.SimpleAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -25,17 +28,18 @@ DJANGO_APPS = [
     "django.contrib.sites",
 ]
 
+# Social providers: each one adds its views and URLs to startup, so only these
+# are loaded. The login and signup pages link Google and Facebook; add e.g.
+# apple or github to enable more.
+SOCIAL_PROVIDERS = env.list("SOCIAL_PROVIDERS", default=["google", "facebook"])
+
 THIRD_PARTY_APPS = [
     "rest_framework",
     "rest_framework_simplejwt",
     "allauth",
     "allauth.account",
     "allauth.socialaccount",
-    # Social providers (enabled as needed)
-    "allauth.socialaccount.providers.google",
-    "allauth.socialaccount.providers.facebook",
-    "allauth.socialaccount.providers.apple",
-    "allauth.socialaccount.providers.github",
+    *(f"allauth.socialaccount.providers.{provider}" for provider in SOCIAL_PROVIDERS),
     "axes",
 ]
 
@@ -58,6 +62,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "amolnama_news.site_apps.core.metrics.RequestMetricsMiddleware",
+    "amolnama_news.site_apps.core.db_router.ReplicaPinMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -68,6 +74,13 @@ MIDDLEWARE = [
     "axes.middleware.AxesMiddleware",
 ]
 
+# ASGI deployment (amolnama_news.asgi sets DJANGO_ASGI): the read-only JSON APIs
+# become async views (core.async_views). WhiteNoise is WSGI-only and would put
+# every request back on a thread, so the reverse proxy serves STATIC_ROOT instead.
+SERVE_ASGI = env.bool("DJANGO_ASGI", default=False)
+if SERVE_ASGI:
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
 ROOT_URLCONF = "amolnama_news.urls"
 
 TEMPLATES = [
@@ -121,6 +134,71 @@ if db_user:
 if PORT:
     DATABASES["default"]["PORT"] = PORT
 
+# Connection reuse. With DB_POOL on, the pooled mssql backend keeps up to
+# DB_POOL_MAX_SIZE open connections per worker (core.db_pool) and Django's
+# per-request close just returns them; size it to at least the worker's
+# thread count. With DB_POOL off, Django keeps one connection per thread for
+# CONN_MAX_AGE seconds and pings it before reuse.
+DB_POOL = env.bool("DB_POOL", default=True)
+DB_POOL_OPTIONS = {
+    "max_size": env.int("DB_POOL_MAX_SIZE", default=10),
+    "timeout": env.int("DB_POOL_TIMEOUT", default=5),  # seconds to wait when exhausted
+    "max_lifetime": env.int("DB_POOL_MAX_LIFETIME", default=30 * 60),  # seconds
+    "max_idle": env.int("DB_POOL_MAX_IDLE", default=5 * 60),  # seconds
+    "health_check_after": env.int("DB_POOL_HEALTH_CHECK_AFTER", default=30),  # idle seconds
+}
+DB_CONN_MAX_AGE = env.int("CONN_MAX_AGE", default=60)  # seconds, when DB_POOL is off
+# Threads running async views' ORM work under ASGI; keep <= DB_POOL_MAX_SIZE
+ASYNC_DB_THREADS = env.int("ASYNC_DB_THREADS", default=DB_POOL_OPTIONS["max_size"])
+
+
+def configure_connection_reuse(database):
+    """Apply the pool / persistent-connection settings to an mssql DATABASES entry."""
+    if DB_POOL:
+        database.update({
+            "ENGINE": "amolnama_news.site_apps.core.db_backends.mssql_pooled",
+            "POOL": DB_POOL_OPTIONS,
+            "CONN_MAX_AGE": 0,
+        })
+    else:
+        database["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+    database["CONN_HEALTH_CHECKS"] = True
+
+
+configure_connection_reuse(DATABASES["default"])
+
+# Read replica (core.db_router). Set DB_REPLICA_HOST and/or DB_REPLICA_NAME to
+# send reference-data and app_vw_* reads to a second SQL Server database, e.g.
+# an availability-group secondary (connected with ApplicationIntent=ReadOnly).
+DATABASE_REPLICA_ALIAS = "replica"
+DATABASE_ROUTERS = ["amolnama_news.site_apps.core.db_router.ReplicaRouter"]
+REPLICA_CHECK_INTERVAL = env.int("REPLICA_CHECK_INTERVAL", default=5)  # seconds
+REPLICA_MAX_LAG = env.int("REPLICA_MAX_LAG", default=5)  # seconds
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)  # read-your-writes window
+
+
+def configure_replica(databases):
+    """Add the "replica" alias, cloned from "default", when one is configured."""
+    host = env("DB_REPLICA_HOST", default="")
+    name = env("DB_REPLICA_NAME", default="")
+    if not (host or name):
+        return
+    replica = {
+        **databases["default"],
+        "HOST": host or databases["default"].get("HOST"),
+        "NAME": name or databases["default"].get("NAME"),
+        "OPTIONS": {
+            **databases["default"].get("OPTIONS", {}),
+            "extra_params": "ApplicationIntent=ReadOnly",
+        },
+        # Tests run against the primary only
+        "TEST": {"MIRROR": "default"},
+    }
+    databases[DATABASE_REPLICA_ALIAS] = replica
+
+
+configure_replica(DATABASES)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -144,6 +222,34 @@ STORAGES = {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     }
 }
+STATICFILES_FINDERS = [
+    "django.contrib.staticfiles.finders.FileSystemFinder",
+    "django.contrib.staticfiles.finders.AppDirectoriesFinder",
+    "amolnama_news.site_apps.core.assets.BundleFinder",
+    "amolnama_news.site_apps.locations.gazetteer.GazetteerFinder",
+]
+
+# Static asset bundles (core.assets): built by BundleFinder, so collectstatic
+# hashes and pre-compresses them like any other static file
+_NEWSHUB_COMPONENT = "newshub/assets/js/components/{}.js"
+ASSET_BUNDLES = {
+    # Same order the page used to load them in
+    "newshub/assets/js/news-collection.bundle.js": ["locations/js/gazetteer.js"] + [_NEWSHUB_COMPONENT.format(name) for name in (
+        "news-searchable-dropdown", "news-org-cascade", "news-contributor-self",
+        "news-location-cascade", "news-location-search", "news-match-client", "news-auto-location",
+        "news-category-tag-cascade", "news-tag-search", "news-auto-tag", "news-geo-collect",
+        "news-map-pinpoint", "news-map-reverse-geocode", "news-map-search",
+        "news-map-location-autofill", "news-occurrence-time", "news-attachment-upload",
+        "news-social-url-check", "news-char-count", "news-form-validate", "news-form-clear",
+        "news-offline-queue", "news-offline-sync", "news-form-persist",
+    )],
+}
+ASSET_BUILD_DIR = BASE_DIR / ".cache" / "assets"
+ASSET_BUNDLES_ENABLED = env.bool("ASSET_BUNDLES_ENABLED", default=True)
+
+# Static location shards for the cascades (locations.gazetteer): written by
+# `manage.py build_gazetteer`, served from here by GazetteerFinder
+GAZETTEER_BUILD_DIR = BASE_DIR / ".cache" / "gazetteer"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "amolnama_news" / "media"
@@ -153,6 +259,10 @@ MEDIA_ROOT = BASE_DIR / "amolnama_news" / "media"
 # Subfolders: audio, files, image, video
 NEWSHUB_UPLOAD_DIR = "upload/newshub"
 
+# Offline reporter mode for the news collection page: service worker caches
+# and a background-synced submission queue (newshub.views.service_worker)
+NEWSHUB_OFFLINE_ENABLED = env.bool("NEWSHUB_OFFLINE_ENABLED", default=True)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Custom user model
@@ -215,6 +325,94 @@ REST_FRAMEWORK = {
 AXES_FAILURE_LIMIT = env.int("AXES_FAILURE_LIMIT", default=10)
 AXES_COOLOFF_TIME = env.int("AXES_COOLOFF_TIME", default=1)  # hours
 
+# Caches: "default" is per-process; "shared" is seen by every worker on the host.
+# Set SHARED_CACHE_URL (e.g. redis://...) when workers span several hosts.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache" / "shared",
+        # One file per entry; past MAX_ENTRIES a write culls 1/CULL_FREQUENCY of
+        # them at random. See WARMUP_ON_BOOT for what the warm-up alone stores.
+        "OPTIONS": {
+            "MAX_ENTRIES": env.int("SHARED_CACHE_MAX_ENTRIES", default=50_000),
+            "CULL_FREQUENCY": 10,
+        },
+    },
+}
+if env("SHARED_CACHE_URL", default=""):
+    CACHES["shared"] = env.cache("SHARED_CACHE_URL")
+
+# Tiered cache (core.cache): per-worker LRU in front of the "shared" cache
+TIERED_CACHE_L1_SIZE = env.int("TIERED_CACHE_L1_SIZE", default=4096)
+TIERED_CACHE_L1_TTL = env.int("TIERED_CACHE_L1_TTL", default=30)  # seconds
+TIERED_CACHE_TAG_CHECK_INTERVAL = env.int("TIERED_CACHE_TAG_CHECK_INTERVAL", default=2)  # seconds
+TIERED_CACHE_REFERENCE_TTL = env.int("TIERED_CACHE_REFERENCE_TTL", default=60 * 60)  # seconds
+
+# Request instrumentation (core.metrics): Server-Timing header + /metrics/ histograms
+REQUEST_METRICS_ENABLED = env.bool("REQUEST_METRICS_ENABLED", default=True)
+SERVER_TIMING_HEADER = env.bool("SERVER_TIMING_HEADER", default=True)
+METRICS_PUBLISH_INTERVAL = env.int("METRICS_PUBLISH_INTERVAL", default=10)  # seconds
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+
+# Query budgets (core.query_budget): strict mode raises instead of logging
+QUERY_BUDGET_STRICT = env.bool("QUERY_BUDGET_STRICT", default=sys.argv[1:2] == ["test"])
+QUERY_BUDGET_MAX_REPEATS = env.int("QUERY_BUDGET_MAX_REPEATS", default=5)
+QUERY_BUDGET_LOG = env("QUERY_BUDGET_LOG", default=str(BASE_DIR / "logs" / "query_budget.jsonl"))
+
+# Slow-query log (core.slow_queries); threshold 0 disables the recorder
+SLOW_QUERY_THRESHOLD_MS = env.int("SLOW_QUERY_THRESHOLD_MS", default=200)
+SLOW_QUERY_LOG = env("SLOW_QUERY_LOG", default=str(BASE_DIR / "logs" / "slow_queries.jsonl"))
+SLOW_QUERY_LOG_MAX_BYTES = env.int("SLOW_QUERY_LOG_MAX_BYTES", default=10 * 1024 * 1024)
+SLOW_QUERY_LOG_BACKUPS = env.int("SLOW_QUERY_LOG_BACKUPS", default=5)
+SLOW_QUERY_LOG_PARAMS = env.bool("SLOW_QUERY_LOG_PARAMS", default=True)
+SLOW_QUERY_CAPTURE_PLANS = env.bool("SLOW_QUERY_CAPTURE_PLANS", default=False)
+
+# API JSON responses (core.json_response): lists at least this long are streamed
+JSON_STREAM_MIN_ROWS = env.int("JSON_STREAM_MIN_ROWS", default=2000)
+JSON_STREAM_CHUNK = env.int("JSON_STREAM_CHUNK", default=500)
+
+# Data-version stamps (core.data_versions): how often each worker checks for bumps
+DATA_VERSION_POLL_INTERVAL = env.int("DATA_VERSION_POLL_INTERVAL", default=5)  # seconds
+
+# Geo source resolution (locations.models.get_or_create_geo_source)
+GEO_SOURCE_SHARED_TTL = env.int("GEO_SOURCE_SHARED_TTL", default=60 * 60 * 24)  # seconds
+
+# Anonymous full-page cache (core.page_cache)
+PAGE_CACHE_FRESH_SECONDS = env.int("PAGE_CACHE_FRESH_SECONDS", default=60)
+PAGE_CACHE_STALE_SECONDS = env.int("PAGE_CACHE_STALE_SECONDS", default=300)
+
+# Party details registry (evaluation_vote.party_registry)
+PARTY_REGISTRY_MAX_AGE = env.int("PARTY_REGISTRY_MAX_AGE", default=60 * 60)  # seconds
+
+# Phonetic search indexes (newshub.search); rebuilt sooner on a data-version bump
+PHONETIC_SEARCH_MAX_AGE = env.int("PHONETIC_SEARCH_MAX_AGE", default=60 * 60 * 24)  # seconds
+
+# Evaluation vote ingest (micro-batched submit_vote writes)
+EVALUATION_VOTE_INGEST_FLUSH_MS = env.int("EVALUATION_VOTE_INGEST_FLUSH_MS", default=5)  # 0 = write inline
+EVALUATION_VOTE_INGEST_MAX_BATCH = env.int("EVALUATION_VOTE_INGEST_MAX_BATCH", default=100)
+EVALUATION_VOTE_INGEST_TIMEOUT = env.int("EVALUATION_VOTE_INGEST_TIMEOUT", default=10)  # seconds
+
+# Evaluation poll results snapshot (evaluation_vote.results_snapshot)
+EVALUATION_RESULTS_MAX_STALENESS = env.int("EVALUATION_RESULTS_MAX_STALENESS", default=5)  # seconds
+EVALUATION_RESULTS_LONG_POLL_MAX = env.int("EVALUATION_RESULTS_LONG_POLL_MAX", default=25)  # seconds, ASGI only
+
+# Election national results aggregation (election_vote.views.api_national_results)
+ELECTION_RESULTS_MAX_STALENESS = env.int("ELECTION_RESULTS_MAX_STALENESS", default=2)  # seconds
+
+# Closed-election drill-through cubes (election_vote.past_results)
+ELECTION_PAST_RESULTS_TTL = env.int("ELECTION_PAST_RESULTS_TTL", default=60 * 60 * 24)  # seconds
+
+# Cache warm-up (core.warmup): domains the gunicorn master warms before forking,
+# and domains every worker re-reads from the shared cache once it has booted.
+# The shared cache must hold them with room for traffic: "locations" stores about
+# two entries per district and upazila (~1,300 responses), "tags" one per
+# category, "past_results" one cube per closed election, plus the page cache and
+# every cascade response requested since. Keep SHARED_CACHE_MAX_ENTRIES (file
+# cache) or the redis/memcached memory limit well above that — tens of thousands.
+WARMUP_ON_BOOT = env.list("WARMUP_ON_BOOT", default=["locations", "tags", "parties", "search", "past_results"])
+WARMUP_AFTER_FORK = env.list("WARMUP_AFTER_FORK", default=["parties", "past_results"])
+
 # Login/logout redirects
 LOGIN_URL = "/account/login/"
 LOGIN_REDIRECT_URL = "/"
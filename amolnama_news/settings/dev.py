@@ -18,6 +18,13 @@ STORAGES = {
     }
 }
 
+# Dev: serve bundle sources as separate scripts (readable stack traces)
+ASSET_BUNDLES_ENABLED = env.bool("ASSET_BUNDLES_ENABLED", default=False)
+
+# Dev: no offline service worker — it serves static files cache-first, and
+# unhashed dev file names would keep serving stale copies
+NEWSHUB_OFFLINE_ENABLED = env.bool("NEWSHUB_OFFLINE_ENABLED", default=False)
+
 # Dev-friendly logging
 LOGGING = {
     "version": 1,
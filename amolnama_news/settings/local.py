@@ -43,54 +43,100 @@ else:
 if PORT:
 	DATABASES["default"]["PORT"] = PORT
 
-# Attempt a lightweight SQL Server connectivity check; if it fails, fall back
-# to a local sqlite DB for developer convenience so `runserver` won't error.
-try:
-	import sys
+configure_connection_reuse(DATABASES["default"])
+configure_replica(DATABASES)
+
+# ========== Backend selection ==========
+# DB_BACKEND picks the database for local development:
+#   mssql   always SQL Server, no probe
+#   sqlite  always the db.sqlite3 fallback, no probe
+#   auto    (default) probe SQL Server and fall back to sqlite if it does not
+#           answer within DB_PROBE_TIMEOUT seconds. The answer is remembered in
+#           .cache/db_probe.json for DB_PROBE_TTL seconds, so management commands,
+#           test runs and autoreload restarts don't each stall on the probe.
+# The remembered answer is keyed on driver/server/database/user, so pointing
+# DB_HOST elsewhere probes again; delete the file to re-probe sooner.
+import hashlib
+import json
+import sys
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+DB_BACKEND = env("DB_BACKEND", default="auto").lower()
+DB_PROBE_FILE = BASE_DIR / ".cache" / "db_probe.json"
+SQLITE_FALLBACK = {
+	"ENGINE": "django.db.backends.sqlite3",
+	"NAME": str(BASE_DIR / "db.sqlite3"),
+}
+
+
+def _mssql_target():
+	"""(connection string, cache key) for the configured SQL Server."""
+	driver = db_options.get("driver", "ODBC Driver 17 for SQL Server")
+	server = DATABASES["default"].get("HOST")
+	dbname = DATABASES["default"].get("NAME")
+	port = DATABASES["default"].get("PORT", "")
+	if port:
+		server = f"{server},{port}"
+	if env.bool("DB_WINDOWS_AUTH", default=True):
+		user = ""
+		conn_str = f"DRIVER={{{driver}}};SERVER={server};DATABASE={dbname};Trusted_Connection=yes"
+	else:
+		user = DATABASES["default"].get("USER") or env("DB_USER", default="sa")
+		pwd = DATABASES["default"].get("PASSWORD") or env("DB_PASSWORD", default="")
+		conn_str = f"DRIVER={{{driver}}};SERVER={server};UID={user};PWD={pwd};DATABASE={dbname}"
+	key = hashlib.sha1(f"{driver}|{server}|{dbname}|{user}".encode("utf-8")).hexdigest()
+	return conn_str, key
+
+
+def _mssql_reachable(pyodbc):
+	"""Probe SQL Server, reusing a recent answer from DB_PROBE_FILE."""
+	conn_str, key = _mssql_target()
 	try:
-		import pyodbc
+		probe = json.loads(DB_PROBE_FILE.read_text())
+		if probe["key"] == key and time.time() - probe["at"] < env.int("DB_PROBE_TTL", default=600):
+			return probe["ok"]
+	except (OSError, ValueError, KeyError, TypeError):
+		pass
 
-		def _mssql_connect_ok():
-			driver = db_options.get("driver", "ODBC Driver 17 for SQL Server")
-			server = DATABASES["default"].get("HOST")
-			dbname = DATABASES["default"].get("NAME")
-			port = DATABASES["default"].get("PORT", "")
-			if port:
-				server = f"{server},{port}"
-			if env.bool("DB_WINDOWS_AUTH", default=True):
-				conn_str = f"DRIVER={{{driver}}};SERVER={server};DATABASE={dbname};Trusted_Connection=yes"
-			else:
-				user = DATABASES["default"].get("USER") or env("DB_USER", default="sa")
-				pwd = DATABASES["default"].get("PASSWORD") or env("DB_PASSWORD", default="")
-				conn_str = f"DRIVER={{{driver}}};SERVER={server};UID={user};PWD={pwd};DATABASE={dbname}"
-			# short timeout
-			cn = pyodbc.connect(conn_str, timeout=3)
-			cn.close()
-
-		try:
-			_mssql_connect_ok()
-		except Exception:
-			DATABASES = {
-				"default": {
-					"ENGINE": "django.db.backends.sqlite3",
-					"NAME": str(BASE_DIR / "db.sqlite3"),
-				}
-			}
-			print("WARNING: SQL Server not reachable; using sqlite fallback (db.sqlite3) for local development.", file=sys.stderr)
+	try:
+		pyodbc.connect(conn_str, timeout=env.int("DB_PROBE_TIMEOUT", default=3)).close()
+		ok = True
+	except Exception:
+		ok = False
+	try:
+		DB_PROBE_FILE.parent.mkdir(parents=True, exist_ok=True)
+		DB_PROBE_FILE.write_text(json.dumps({"key": key, "ok": ok, "at": time.time()}))
+	except OSError:
+		pass
+	return ok
+
+
+if DB_BACKEND == "sqlite":
+	DATABASES = {"default": SQLITE_FALLBACK}
+elif DB_BACKEND == "auto":
+	try:
+		import pyodbc
 	except Exception:
-		# pyodbc import failed
-		DATABASES = {
-			"default": {
-				"ENGINE": "django.db.backends.sqlite3",
-				"NAME": str(BASE_DIR / "db.sqlite3"),
-			}
-		}
+		DATABASES = {"default": SQLITE_FALLBACK}
 		print("WARNING: pyodbc not available; using sqlite fallback (db.sqlite3) for local development.", file=sys.stderr)
-except Exception:
-	# Any unexpected error: ensure we at least have sqlite configured
-	DATABASES = {
-		"default": {
-			"ENGINE": "django.db.backends.sqlite3",
-			"NAME": "db.sqlite3",
-		}
+	else:
+		if not _mssql_reachable(pyodbc):
+			DATABASES = {"default": SQLITE_FALLBACK}
+			print(
+				"WARNING: SQL Server not reachable; using sqlite fallback (db.sqlite3) for local development. "
+				f"Set DB_BACKEND=mssql or delete {DB_PROBE_FILE.relative_to(BASE_DIR)} to probe again.",
+				file=sys.stderr,
+			)
+elif DB_BACKEND != "mssql":
+	raise ImproperlyConfigured(f"DB_BACKEND must be auto, mssql or sqlite, not {DB_BACKEND!r}")
+
+# Exercise the read-replica router on the sqlite fallback with a second file,
+# e.g. DB_REPLICA_SQLITE=db_replica.sqlite3 (copy db.sqlite3 to seed it).
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3" and env("DB_REPLICA_SQLITE", default=""):
+	DATABASES[DATABASE_REPLICA_ALIAS] = {
+		"ENGINE": "django.db.backends.sqlite3",
+		"NAME": str(BASE_DIR / env("DB_REPLICA_SQLITE")),
+		"TEST": {"MIRROR": "default"},
 	}
@@ -1 +1,16 @@
 from django.contrib import admin
+
+from . import data_versions
+from .models import DataVersion
+
+
+@admin.register(DataVersion)
+class DataVersionAdmin(admin.ModelAdmin):
+    list_display = ['domain', 'version', 'updated_at']
+    readonly_fields = ['version', 'updated_at']
+    actions = ['bump_versions']
+
+    @admin.action(description="Bump selected versions (drop cached copies on every worker)")
+    def bump_versions(self, request, queryset):
+        versions = data_versions.bump(*queryset.values_list('domain', flat=True))
+        self.message_user(request, f"Bumped: {', '.join(f'{d} v{v}' for d, v in versions.items())}")
@@ -5,4 +5,6 @@ class CoreConfig(AppConfig):
     name = "amolnama_news.site_apps.core"
     label = 'core'
     verbose_name = "Core Application"
-    
+
+    def ready(self):
+        from . import signals  # noqa
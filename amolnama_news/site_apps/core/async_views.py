@@ -0,0 +1,110 @@
+"""
+Async variants of the read-only JSON APIs for the ASGI deployment.
+
+Under WSGI every request holds a worker thread for its whole life, so a
+slow SQL Server round trip (or a long-poll) on a trivial cascade lookup
+blocks a thread. Served through amolnama_news.asgi (which sets DJANGO_ASGI,
+settings.SERVE_ASGI), the views decorated with ``asgi_view`` become
+``async def`` views instead:
+
+* the request waits on the event loop, so a process can hold thousands of
+  idle keep-alive and long-poll connections;
+* only the view body (cache lookup, ORM queries, JSON encoding) runs, on a
+  bounded pool of ASYNC_DB_THREADS threads (``run_sync``). mssql-django has
+  no async driver, so Django's async ORM would hop threads per query anyway;
+  the pool bounds how many DB connections the process opens, and should not
+  exceed DB_POOL_MAX_SIZE;
+* connections opened on a pool thread are closed (returned to core.db_pool)
+  after every call, as request_finished would for a sync view;
+* the request's contextvars (core.metrics stats, core.db_router pinning)
+  are carried into the pool thread, and the thread's queries are counted in
+  the request's stats.
+
+Under WSGI ``asgi_view`` returns the view unchanged (with the async variant
+on ``view.async_view``), so both modes share one implementation.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .metrics import current_stats
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def serving_asgi():
+    return getattr(settings, "SERVE_ASGI", False)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "ASYNC_DB_THREADS", 10),
+                    thread_name_prefix="async-db",
+                )
+    return _executor
+
+
+def _call(func, args, kwargs):
+    stats = current_stats()
+    try:
+        with ExitStack() as stack:
+            if stats is not None:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run blocking (ORM) code on the bounded pool and await its result."""
+    bridge = sync_to_async(_call, thread_sensitive=False, executor=_get_executor())
+    return await bridge(func, args, kwargs)
+
+
+def async_view(view):
+    """``async def`` wrapper running a sync view on the pool."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_sync(view, request, *args, **kwargs)
+    wrapper.sync_view = view
+    return wrapper
+
+
+def asgi_view(view=None, *, async_variant=None):
+    """Serve a view as an async view under ASGI.
+
+    Bare (``@asgi_view``) the async view just runs the sync one on the pool.
+    ``@asgi_view(async_variant=coro)`` is for views that do more than that,
+    such as long-polls: ``await coro(sync_view, request, *args, **kwargs)``
+    produces the response.
+    """
+    def decorator(view):
+        if async_variant is None:
+            variant = async_view(view)
+        else:
+            @wraps(view)
+            async def variant(request, *args, **kwargs):
+                return await async_variant(view, request, *args, **kwargs)
+            variant.sync_view = view
+        if serving_asgi():
+            return variant
+        view.async_view = variant
+        return view
+
+    if view is None:
+        return decorator
+    return decorator(view)
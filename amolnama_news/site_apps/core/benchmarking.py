@@ -0,0 +1,118 @@
+"""
+Shared helpers for the benchmark / load-test management commands.
+
+The transaction tables are ``managed = False`` and live in SQL Server
+schemas, so on the sqlite dev fallback they do not exist. ``ensure_tables``
+creates throw-away copies there so the benchmarks can run anywhere; it
+refuses to touch a SQL Server database. ``scratch_database`` goes one step
+further and swaps in a throw-away sqlite file for the duration of a run.
+"""
+import math
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+def ensure_tables(models, using="default"):
+    """Create missing tables for unmanaged models on a sqlite database.
+
+    Returns the list of db_table names that were created.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return []
+
+    existing = set(connection.introspection.table_names())
+    created = []
+    with connection.schema_editor() as editor:
+        for model in models:
+            if model._meta.db_table in existing:
+                continue
+            editor.create_model(model)
+            created.append(model._meta.db_table)
+    return created
+
+
+@contextmanager
+def scratch_database(models=(), using="default"):
+    """Run the block against a throw-away sqlite database.
+
+    The file is built straight from the current models (no migrations, so
+    state-only SQL Server migrations cannot leave it out of sync), gets
+    tables for the given unmanaged models, and is deleted afterwards.
+    Worker threads opened inside the block see it too. No-op elsewhere.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        yield
+        return
+
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    saved = dict(test_settings)
+    test_settings.update({
+        "NAME": str(settings.BASE_DIR / f"scratch-{using}.sqlite3"),
+        "MIGRATE": False,
+    })
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False,
+    )
+    try:
+        ensure_tables(models, using=using)
+        yield
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings.clear()
+        test_settings.update(saved)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(durations_ms, wall_seconds):
+    """Latency percentiles (ms) and throughput (ops/s) for a benchmark run."""
+    values = sorted(durations_ms)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1] if values else 0.0,
+        "throughput": (len(values) / wall_seconds) if wall_seconds > 0 else 0.0,
+    }
+
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def parse_importtime(lines):
+    """Parse ``python -X importtime`` output into one dict per module.
+
+    Each dict has the module name, its self and cumulative import time in
+    ms, its nesting depth and the module whose import triggered it.
+    """
+    modules, pending = [], []
+    for line in lines:
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        entry = {
+            "module": match[4],
+            "self_ms": int(match[1]) / 1000,
+            "cumulative_ms": int(match[2]) / 1000,
+            "depth": len(match[3]) // 2,
+            "parent": None,
+        }
+        # The output is post-order: a module's imports are printed just before it
+        while pending and pending[-1]["depth"] > entry["depth"]:
+            pending.pop()["parent"] = entry["module"]
+        pending.append(entry)
+        modules.append(entry)
+    return modules
@@ -0,0 +1,365 @@
+"""
+Tiered cache: a per-worker LRU (L1) in front of the "shared" cache (L2).
+
+Every read-heavy path in the project goes through ``tiered_cache`` or the
+decorators below instead of inventing its own memo:
+
+* L1 is an in-process, thread-safe LRU bounded by TIERED_CACHE_L1_SIZE.
+  Entries live there for at most TIERED_CACHE_L1_TTL seconds, so a value
+  another worker rewrote in L2 is picked up without any messaging.
+* L2 is settings.CACHES["shared"]: a file-based cache on one host by
+  default, or redis/memcached via SHARED_CACHE_URL. No external service is
+  needed to run it.
+* Soft TTLs: an entry past ``soft_ttl`` is still served while exactly one
+  caller recomputes it (stale-while-revalidate). Past ``ttl`` it is gone.
+* Single flight: recomputation is serialized per key inside a worker by an
+  in-flight map (the other threads wait for the first one's result) and
+  across workers by an L2 ``add`` lock, so an expired popular key costs one
+  database query rather than one per request. No lock is held while a
+  producer runs, so producers may read other cached keys (a cached view
+  reading the party registry); a producer that asks for its own key again
+  recomputes it instead of waiting for itself.
+* Tags: entries remember the version of every tag they were stored with.
+  ``invalidate_tags("party")`` bumps the version in L2 and every entry
+  stored under the old version becomes a miss on every worker within
+  TIERED_CACHE_TAG_CHECK_INTERVAL seconds. Tags named after a data domain
+  (location, party, newshub, ...) are driven by core.data_versions, which
+  also catches edits made outside Django. A tag version L2 has evicted is
+  re-pinned to a new one, so an eviction can only retire entries, never
+  revive them.
+
+``None`` is never cached; producers return it to mean "do not store".
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.translation import get_language
+
+from .metrics import note_cache
+
+L1_SIZE = getattr(settings, "TIERED_CACHE_L1_SIZE", 4096)
+L1_TTL = getattr(settings, "TIERED_CACHE_L1_TTL", 30)
+TAG_CHECK_INTERVAL = getattr(settings, "TIERED_CACHE_TAG_CHECK_INTERVAL", 2)
+REFERENCE_TTL = getattr(settings, "TIERED_CACHE_REFERENCE_TTL", 60 * 60)
+LOCK_TIMEOUT = 30
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """Thread-safe LRU whose entries also expire after a deadline."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _Flight:
+    """One recomputation of a key in progress in this worker."""
+
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.done = threading.Event()
+
+
+class TieredCache:
+    """L1 LRU + L2 shared cache with soft TTLs, single flight and tags."""
+
+    def __init__(self, alias="shared", l1_size=L1_SIZE, l1_ttl=L1_TTL,
+                 tag_check_interval=TAG_CHECK_INTERVAL):
+        self.alias = alias
+        self.l1 = LocalLRU(l1_size)
+        self.l1_ttl = l1_ttl
+        self.tag_check_interval = tag_check_interval
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    # ---- Tags ----
+
+    @staticmethod
+    def _tag_key(tag):
+        return f"cache-tag:{tag}"
+
+    def tag_versions(self, tags):
+        """Current version of each tag."""
+        versions, missing = {}, []
+        for tag in tags:
+            version = self.l1.get(self._tag_key(tag), _MISSING)
+            if version is _MISSING:
+                missing.append(tag)
+            else:
+                versions[tag] = version
+        if missing:
+            found = self.l2.get_many([self._tag_key(t) for t in missing])
+            for tag in missing:
+                version = found.get(self._tag_key(tag))
+                if version is None:
+                    version = self._repin(tag)
+                self.l1.set(self._tag_key(tag), version, self.tag_check_interval)
+                versions[tag] = version
+        return versions
+
+    def _repin(self, tag):
+        """Give a tag missing from L2 a new version.
+
+        A tag is missing before its first pin, and again if L2 evicted it
+        (a full file cache culls at random). Whatever was stored under the
+        version it had is unknown, so it is retired: ``add`` makes every
+        worker settle on the first new version written.
+        """
+        key = self._tag_key(tag)
+        version = time.time_ns()
+        if self.l2.add(key, version, None):
+            return version
+        return self.l2.get(key, version)
+
+    def tag_version(self, tag):
+        return self.tag_versions([tag])[tag]
+
+    def invalidate_tags(self, *tags):
+        """Retire every entry stored under the current version of these tags."""
+        self.set_tag_versions(dict.fromkeys(tags, time.time_ns()))
+
+    def set_tag_versions(self, versions):
+        """Pin tags to explicit versions (idempotent, see core.data_versions)."""
+        self.l2.set_many({self._tag_key(t): v for t, v in versions.items()}, None)
+        for tag, version in versions.items():
+            self.l1.set(self._tag_key(tag), version, self.tag_check_interval)
+
+    # ---- Entries ----
+
+    def _valid(self, entry):
+        if entry is None:
+            return False
+        if time.time() >= entry["expires_at"]:
+            return False
+        tags = entry["tags"]
+        return not tags or self.tag_versions(tags) == tags
+
+    def _read(self, key, skip_l1=False):
+        if not skip_l1:
+            entry = self.l1.get(key)
+            if self._valid(entry):
+                return entry
+        entry = self.l2.get(key)
+        if not self._valid(entry):
+            return None
+        self._promote(key, entry)
+        return entry
+
+    def _promote(self, key, entry):
+        self.l1.set(key, entry, max(0.0, min(self.l1_ttl, entry["expires_at"] - time.time())))
+
+    def get(self, key, default=None):
+        entry = self._read(key)
+        note_cache(hit=entry is not None)
+        return default if entry is None else entry["value"]
+
+    def set(self, key, value, ttl, soft_ttl=None, tags=()):
+        """Store value for ttl seconds; it counts as stale after soft_ttl."""
+        if value is None:
+            return
+        now = time.time()
+        entry = {
+            "value": value,
+            "expires_at": now + ttl,
+            "soft_expires_at": now + (ttl if soft_ttl is None else soft_ttl),
+            "tags": self.tag_versions(tags) if tags else {},
+        }
+        self.l2.set(key, entry, ttl)
+        self._promote(key, entry)
+
+    def delete(self, key):
+        self.l1.delete(key)
+        self.l2.delete(key)
+
+    def get_or_set(self, key, producer, ttl, soft_ttl=None, tags=()):
+        """Return the cached value, recomputing it with producer() at most once.
+
+        A stale entry (past soft_ttl) is returned to everyone except the one
+        caller that wins the refresh; with nothing to serve, callers wait for
+        the winner instead of all querying at once.
+        """
+        produced = []
+
+        def counted():
+            produced.append(True)
+            return producer()
+
+        try:
+            return self._get_or_set(key, counted, ttl, soft_ttl, tags)
+        finally:
+            note_cache(hit=not produced)
+
+    def _get_or_set(self, key, producer, ttl, soft_ttl, tags):
+        entry = self._read(key)
+        if entry is not None and time.time() < entry["soft_expires_at"]:
+            return entry["value"]
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if entry is not None:
+                return entry["value"]
+            if flight.owner != threading.get_ident():
+                flight.done.wait(LOCK_TIMEOUT)
+                fresh = self._read(key)
+                if fresh is not None:
+                    return fresh["value"]
+            # Our own producer asked for this key, or the leader stored nothing
+            value = producer()
+            self.set(key, value, ttl, soft_ttl, tags)
+            return value
+
+        try:
+            return self._refresh(key, entry, producer, ttl, soft_ttl, tags)
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _refresh(self, key, entry, producer, ttl, soft_ttl, tags):
+        # Another worker may have refreshed it meanwhile
+        fresh = self._read(key, skip_l1=True)
+        if fresh is not None and time.time() < fresh["soft_expires_at"]:
+            return fresh["value"]
+        entry = fresh or entry
+
+        lock_key = f"{key}:refresh"
+        acquired = self.l2.add(lock_key, 1, LOCK_TIMEOUT)
+        if not acquired:
+            if entry is not None:
+                return entry["value"]
+            waited = self._wait_for(key)
+            if waited is not None:
+                return waited["value"]
+        try:
+            value = producer()
+            self.set(key, value, ttl, soft_ttl, tags)
+            return value
+        finally:
+            if acquired:
+                self.l2.delete(lock_key)
+
+    def _wait_for(self, key, poll=0.05):
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(poll)
+            entry = self._read(key)
+            if entry is not None:
+                return entry
+            if self.l2.get(f"{key}:refresh") is None:
+                return None
+        return None
+
+
+tiered_cache = TieredCache()
+
+
+# ========== Decorators ==========
+
+def _args_key(prefix, args, kwargs):
+    digest = hashlib.sha1(repr((args, sorted(kwargs.items()))).encode("utf-8")).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def cached(key_prefix, ttl, soft_ttl=None, tags=()):
+    """Cache a function's return value per argument tuple.
+
+    Arguments must have a stable repr (ids, strings, numbers).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return tiered_cache.get_or_set(
+                _args_key(key_prefix, args, kwargs),
+                lambda: func(*args, **kwargs),
+                ttl, soft_ttl, tags,
+            )
+        wrapper.invalidate = lambda *args, **kwargs: tiered_cache.delete(
+            _args_key(key_prefix, args, kwargs)
+        )
+        return wrapper
+    return decorator
+
+
+def cache_json_view(key_prefix, ttl, soft_ttl=None, tags=()):
+    """Cache a public GET API view's 200 responses per path and language.
+
+    Only for endpoints whose output does not depend on who is asking.
+    Streamed responses (core.json_response streams long lists) are read
+    into memory once and cached like any other.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            rendered = {}
+
+            def produce():
+                response = view(request, *args, **kwargs)
+                rendered["response"] = response
+                if response.status_code != 200:
+                    return None
+                if response.streaming:
+                    content = b"".join(response.streaming_content)
+                    rendered["response"] = HttpResponse(content, content_type=response["Content-Type"])
+                    return (response["Content-Type"], content)
+                return (response["Content-Type"], response.content)
+
+            path = hashlib.sha1(request.get_full_path().encode("utf-8")).hexdigest()
+            key = f"view:{key_prefix}:{get_language()}:{path}"
+            stored = tiered_cache.get_or_set(key, produce, ttl, soft_ttl, tags)
+            if "response" in rendered:
+                return rendered["response"]
+            content_type, content = stored
+            return HttpResponse(content, content_type=content_type)
+        return wrapper
+    return decorator
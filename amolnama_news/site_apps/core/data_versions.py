@@ -0,0 +1,109 @@
+"""
+Data-version stamps: cross-worker invalidation for reference data.
+
+The reference tables ([location].*, [party].*, [newshub].ref_*) are
+managed in SQL Server and mostly edited outside Django, so model signals
+never see those edits. Instead every domain has a row in core.DataVersion
+whose version is bumped whenever its data changes:
+
+* from Django code:   ``data_versions.bump("party")`` (RefParty signals do this)
+* from the shell:     ``python manage.py bump_data_version location``
+* from the admin:     Core > Data Versions > "Bump selected versions"
+* from SQL Server:    ``UPDATE core_dataversion SET version = version + 1
+                        WHERE domain = 'location'``
+
+Each worker polls the table at most once per DATA_VERSION_POLL_INTERVAL
+seconds (one indexed SELECT of a handful of rows, run from request_started)
+and pins the tiered-cache tag of every changed domain to its version
+(core.cache). Every cached entry stored with that tag then misses on every
+worker. Pinning is idempotent, so N workers noticing the same bump cost one
+invalidation, not N.
+
+Domain names are the cache tags: location, party, newshub, evaluation,
+election, organisation.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = getattr(settings, "DATA_VERSION_POLL_INTERVAL", 5)
+ERROR_BACKOFF = 60
+
+_poll_lock = threading.Lock()
+_seen = {}
+_next_poll = 0.0
+
+
+def _publish(versions):
+    changed = {d: v for d, v in versions.items() if _seen.get(d) != v}
+    if changed:
+        tiered_cache.set_tag_versions(changed)
+        _seen.update(changed)
+        logger.info("Data versions changed: %s", changed)
+    return changed
+
+
+def current():
+    """Version of every registered domain, read straight from the database."""
+    from .models import DataVersion
+    return dict(DataVersion.objects.values_list("domain", "version"))
+
+
+def seen(domain):
+    """Version of ``domain`` this worker last picked up (None before the first poll)."""
+    return _seen.get(domain)
+
+
+def bump(*domains):
+    """Increment the version of each domain; caches drop it after commit.
+
+    Unknown domains are created at version 1. Returns the new versions.
+    """
+    from .models import DataVersion
+    with transaction.atomic():
+        for domain in domains:
+            updated = DataVersion.objects.filter(domain=domain).update(
+                version=F("version") + 1, updated_at=timezone.now(),
+            )
+            if not updated:
+                DataVersion.objects.get_or_create(domain=domain)
+        versions = dict(
+            DataVersion.objects.filter(domain__in=domains).values_list("domain", "version")
+        )
+        transaction.on_commit(lambda: _publish(versions))
+    return versions
+
+
+def poll(force=False):
+    """Pick up bumps made by other workers or outside Django.
+
+    Cheap enough to call on every request: it only queries once per
+    POLL_INTERVAL, and a thread that finds another one polling returns
+    immediately. Returns the domains whose version changed.
+    """
+    global _next_poll
+    if not force and time.monotonic() < _next_poll:
+        return {}
+    if not _poll_lock.acquire(blocking=False):
+        return {}
+    try:
+        try:
+            versions = current()
+        except DatabaseError:
+            # Table not migrated yet or database unavailable: keep serving
+            logger.warning("Could not read data versions", exc_info=True)
+            _next_poll = time.monotonic() + ERROR_BACKOFF
+            return {}
+        _next_poll = time.monotonic() + POLL_INTERVAL
+        return _publish(versions)
+    finally:
+        _poll_lock.release()
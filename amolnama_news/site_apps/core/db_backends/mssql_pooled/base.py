@@ -0,0 +1,42 @@
+"""
+mssql-django backend that reuses connections from a per-worker pool.
+
+Use it as ENGINE "amolnama_news.site_apps.core.db_backends.mssql_pooled"
+with CONN_MAX_AGE = 0: Django still "closes" the connection at the end of
+every request, which now just returns it to core.db_pool. Pool limits come
+from the database's "POOL" settings key (see settings.base).
+"""
+from mssql import base as mssql_base
+from mssql.base import DatabaseWrapper as MSSQLDatabaseWrapper
+
+from amolnama_news.site_apps.core.db_pool import pool_for
+
+# Private helpers of the mssql-python driver support; older mssql-django
+# releases (still allowed by requirements/base.txt) only speak pyodbc.
+_load_mssql_python = getattr(mssql_base, "_load_mssql_python", None)
+
+
+class DatabaseWrapper(MSSQLDatabaseWrapper):
+
+    @property
+    def pool(self):
+        return pool_for(self.alias, self.settings_dict.get("POOL"))
+
+    def get_new_connection(self, conn_params):
+        # get_new_connection also picks the driver module; redo that for
+        # reused connections, which skip the parent implementation (releases
+        # without the helpers always use pyodbc, so there is nothing to redo).
+        uses_mssql_python = getattr(self, "_uses_mssql_python", None)
+        if _load_mssql_python is not None and uses_mssql_python is not None:
+            self._use_python_driver = uses_mssql_python(conn_params)
+            if self._use_python_driver:
+                self.Database = _load_mssql_python()
+        return self.pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Django flags errors_occurred after a database error; only a
+                # failed ping then keeps the connection out of the pool.
+                broken = self.errors_occurred and not self.is_usable()
+                self.pool.release(self.connection, discard=broken)
@@ -0,0 +1,238 @@
+"""
+Per-worker pool of raw DB-API connections.
+
+Django opens a fresh connection per thread and, with CONN_MAX_AGE = 0,
+per request. Against SQL Server that means an ODBC login handshake (TLS,
+authentication, session setup) in front of every cascade dropdown call.
+The pooled mssql backend (core.db_backends.mssql_pooled) keeps Django's
+per-request connection lifecycle but hands out connections from this pool
+and returns them on close, so the handshake is paid once per pool slot:
+
+* one pool per database alias per process (rebuilt after fork, so gunicorn
+  workers never share sockets);
+* at most ``max_size`` connections; a caller that finds the pool exhausted
+  waits up to ``timeout`` seconds and then gets PoolExhausted;
+* connections idle longer than ``health_check_after`` seconds are pinged
+  with SELECT 1 before reuse, and dropped if that fails;
+* connections older than ``max_lifetime`` or idle longer than ``max_idle``
+  are closed instead of reused, so server-side failovers and leaked
+  session state age out;
+* ``stats()`` counters (created, reused, waits, exhausted, ...) are exported
+  on /metrics/ (core.metrics).
+
+Under ASGI the ORM still runs in Django's sync thread, so the same pool and
+lifecycle apply unchanged.
+"""
+import logging
+import os
+import threading
+import time
+
+from .metrics import register_gauges
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhausted(Exception):
+    """No connection became free within the pool timeout."""
+
+
+class _Slot:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """Bounded LIFO pool; connections are created lazily by the caller's factory."""
+
+    def __init__(self, max_size=10, timeout=5, max_lifetime=30 * 60, max_idle=5 * 60,
+                 health_check_after=30, ping=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.ping = ping or _ping
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._idle = []  # LIFO: the most recently used connection is warmest
+        self._slots = {}  # id(conn) -> _Slot for checked-out connections
+        self._size = 0
+        self._stats = dict.fromkeys(
+            ("created", "reused", "closed", "health_check_failures", "waits", "exhausted"), 0
+        )
+        self._wait_seconds = 0.0
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            # Inherited sockets belong to the parent; forget them without closing
+            self._reset()
+
+    def _obsolete(self, slot, now):
+        return (now - slot.created_at > self.max_lifetime
+                or now - slot.last_used > self.max_idle)
+
+    def acquire(self, connect):
+        """Check out a connection, calling connect() if a new one is needed."""
+        self._check_fork()
+        deadline = time.monotonic() + self.timeout
+        waited_from = None
+        while True:
+            with self._cond:
+                slot, create = None, False
+                while slot is None and not create:
+                    now = time.monotonic()
+                    if self._idle:
+                        slot = self._idle.pop()
+                        if self._obsolete(slot, now):
+                            self._discard(slot)
+                            slot = None
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                    else:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._stats["exhausted"] += 1
+                            raise PoolExhausted(
+                                f"All {self.max_size} connections busy for {self.timeout}s"
+                            )
+                        if waited_from is None:
+                            waited_from = now
+                            self._stats["waits"] += 1
+                        self._cond.wait(remaining)
+                if waited_from is not None:
+                    self._wait_seconds += time.monotonic() - waited_from
+                    waited_from = None
+
+            if create:
+                try:
+                    slot = _Slot(connect())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                return self._checked_out(slot, "created")
+
+            if time.monotonic() - slot.last_used > self.health_check_after and not self.ping(slot.conn):
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                    self._discard(slot)
+                continue
+            return self._checked_out(slot, "reused")
+
+    def _checked_out(self, slot, stat):
+        with self._cond:
+            self._stats[stat] += 1
+            self._slots[id(slot.conn)] = slot
+        return slot.conn
+
+    def release(self, conn, discard=False):
+        """Return a connection; rolled back, or closed if broken or too old."""
+        with self._cond:
+            slot = self._slots.pop(id(conn), None)
+        if slot is None or self._pid != os.getpid():
+            # Not from this process's pool (opened before a fork): just close it
+            _close(conn)
+            return
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            slot.last_used = time.monotonic()
+            if discard or self._obsolete(slot, slot.last_used):
+                self._discard(slot)
+            else:
+                self._idle.append(slot)
+                self._cond.notify()
+            # LIFO reuse never reaches the oldest idle connections; age them out here
+            while self._idle and self._obsolete(self._idle[0], slot.last_used):
+                self._discard(self._idle.pop(0))
+
+    def _discard(self, slot):
+        # Caller holds self._cond
+        self._size -= 1
+        self._stats["closed"] += 1
+        _close(slot.conn)
+        self._cond.notify()
+
+    def close_idle(self):
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._stats,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._slots),
+                "max_size": self.max_size,
+                "wait_seconds": round(self._wait_seconds, 3),
+            }
+
+
+def _ping(conn):
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Exception:
+        logger.debug("Error closing pooled connection", exc_info=True)
+
+
+# ========== Registry ==========
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_for(alias, options=None):
+    """The process-wide pool for a database alias (created on first use)."""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = ConnectionPool(**(options or {}))
+    return pool
+
+
+def close_idle_pools():
+    """Close every idle pooled connection in this process.
+
+    Django's close_all() only hands pooled connections back to the pool;
+    core.prefork calls this in the gunicorn master so no worker is forked
+    holding (and on its own cleanup disconnecting) a socket of the master's.
+    """
+    for pool in list(_pools.values()):
+        pool.close_idle()
+
+
+def pool_stats():
+    """{alias: stats} for every pool in this process (core.metrics collector)."""
+    return {alias: pool.stats() for alias, pool in list(_pools.items())}
+
+
+register_gauges("db_pool", pool_stats)
@@ -0,0 +1,237 @@
+"""
+Read/write router with a read-replica path for reference data and results.
+
+Ballot inserts in cast_vote and the read-heavy cascade lookups, results
+views and drill-through reports all share the primary. When a "replica"
+alias is configured (settings.DATABASE_REPLICA_ALIAS, see settings.base
+``configure_replica``), ``ReplicaRouter`` sends reads of
+
+* the [location] and [party] schemas (except address and geo_source,
+  which users and the geo-source procedure write), and
+* every ``app_vw_*`` view, which covers past and current results,
+
+to the replica. Everything else, and every write, stays on ``default``.
+
+Reads fall back to the primary when
+
+* the request already wrote (any project model) or is not a GET/HEAD;
+* the browser wrote within REPLICA_PIN_SECONDS (``ReplicaPinMiddleware``
+  sets a short-lived cookie after a writing request: read-your-writes);
+* the replica is unreachable or lagging. Each worker checks at most every
+  REPLICA_CHECK_INTERVAL seconds: the replica's core.DataVersion rows must
+  match the primary's, and on SQL Server secondary_lag_seconds must not
+  exceed REPLICA_MAX_LAG.
+
+Raw SQL that only reads can use ``read_connection()`` for the same choice.
+
+Without a replica alias the router routes nothing.
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "default"
+REPLICA_SCHEMAS = {"location", "party"}
+PRIMARY_ONLY_TABLES = {"address", "geo_source"}
+PIN_COOKIE = "db_pin"
+_RE_TABLE = re.compile(r"^\[?(?:(?P<schema>[^\].]+)\]?\.\[?)?(?P<table>[^\]]+)\]?$")
+
+# None outside a request; a dict {"pinned": bool, "wrote": bool} inside one
+_request_state = contextvars.ContextVar("replica_request_state", default=None)
+
+
+def replica_alias():
+    alias = getattr(settings, "DATABASE_REPLICA_ALIAS", "replica")
+    return alias if alias in connections.settings else None
+
+
+def replica_eligible(model):
+    """Read-mostly reference data and app_vw_* views."""
+    match = _RE_TABLE.match(model._meta.db_table)
+    if not match:
+        return False
+    schema, table = match.group("schema"), match.group("table")
+    if table.startswith("app_vw_"):
+        return True
+    return schema in REPLICA_SCHEMAS and table not in PRIMARY_ONLY_TABLES
+
+
+def _is_project_model(model):
+    return model.__module__.startswith("amolnama_news.")
+
+
+# ========== Replica Health ==========
+
+class ReplicaHealth:
+    """Per-worker, rate-limited answer to "is the replica fresh enough?"."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._healthy = False
+        self._checked_at = None
+
+    def healthy(self, alias):
+        interval = getattr(settings, "REPLICA_CHECK_INTERVAL", 5)
+        if self._checked_at is not None and time.monotonic() - self._checked_at < interval:
+            return self._healthy
+        # One thread checks; the rest keep the previous answer meanwhile
+        if not self._lock.acquire(blocking=False):
+            return self._healthy
+        try:
+            self._healthy = self._check(alias)
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self._healthy
+
+    def _check(self, alias):
+        from .models import DataVersion
+        try:
+            replica = dict(DataVersion.objects.using(alias).values_list("domain", "version"))
+            primary = dict(DataVersion.objects.using(PRIMARY).values_list("domain", "version"))
+            behind = [d for d, v in primary.items() if replica.get(d, 0) < v]
+            if behind:
+                logger.warning("Replica %s is behind on %s; reading from primary", alias, behind)
+                return False
+            lag = self._lag_seconds(alias)
+        except DatabaseError:
+            logger.warning("Replica %s unavailable; reading from primary", alias, exc_info=True)
+            return False
+        max_lag = getattr(settings, "REPLICA_MAX_LAG", 5)
+        if lag is not None and lag > max_lag:
+            logger.warning("Replica %s lags %ss; reading from primary", alias, lag)
+            return False
+        return True
+
+    @staticmethod
+    def _lag_seconds(alias):
+        connection = connections[alias]
+        if connection.vendor != "microsoft":
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT MAX(secondary_lag_seconds) FROM sys.dm_hadr_database_replica_states "
+                    "WHERE is_local = 1 AND database_id = DB_ID()"
+                )
+                row = cursor.fetchone()
+        except DatabaseError:
+            # Not an availability-group secondary, or no VIEW SERVER STATE
+            return None
+        return row[0] if row else None
+
+    def reset(self):
+        self._checked_at = None
+
+
+replica_health = ReplicaHealth()
+
+
+def _pinned():
+    state = _request_state.get()
+    return state is not None and state["pinned"]
+
+
+def read_alias(model=None):
+    """The alias a read should use right now."""
+    alias = replica_alias()
+    if alias is None or _pinned():
+        return PRIMARY
+    if model is not None and not replica_eligible(model):
+        return PRIMARY
+    return alias if replica_health.healthy(alias) else PRIMARY
+
+
+def read_connection():
+    """Connection for a raw read-only query over replica-eligible tables."""
+    return connections[read_alias()]
+
+
+def pin_to_primary():
+    """Send the rest of this request's reads to the primary."""
+    state = _request_state.get()
+    if state is not None:
+        state["pinned"] = state["wrote"] = True
+
+
+# ========== Router ==========
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if replica_alias() is None:
+            return None
+        return read_alias(model)
+
+    def db_for_write(self, model, **hints):
+        if _is_project_model(model):
+            pin_to_primary()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, replica_alias()}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+# ========== Middleware ==========
+
+class ReplicaPinMiddleware:
+    """Pin reads to the primary for writing requests and right after them."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, state = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._finish(state, response)
+
+    async def __acall__(self, request):
+        token, state = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._finish(state, response)
+
+    @staticmethod
+    def _start(request):
+        pinned = request.method not in ("GET", "HEAD") or PIN_COOKIE in request.COOKIES
+        # A dict, so pins made on core.async_views' pool threads show up here
+        state = {"pinned": pinned, "wrote": False}
+        return _request_state.set(state), state
+
+    @staticmethod
+    def _finish(state, response):
+        if state["wrote"] and replica_alias() is not None:
+            response.set_cookie(
+                PIN_COOKIE, "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 10),
+                httponly=True, samesite="Lax",
+                secure=getattr(settings, "SESSION_COOKIE_SECURE", False),
+            )
+        return response
@@ -0,0 +1,148 @@
+"""
+Fast JSON responses for the API views.
+
+``json_response(request, data)`` is the drop-in replacement for
+``JsonResponse(data)`` used across the cascade, results and vote APIs:
+
+* serializes with orjson when it is installed (several times faster than
+  the stdlib encoder, and it produces bytes directly), otherwise with
+  DjangoJSONEncoder. Values the fast path would encode differently or not at
+  all (Decimal, datetimes, lazy translations, timedelta) go through
+  DjangoJSONEncoder.default, so a payload looks the same with either encoder;
+* with ``?format=columnar`` every list of dicts in the payload's top level
+  is rewritten as ``{"cols": [...], "rows": [[...], ...]}``, which drops the
+  per-row keys that make up most of the location and tag payloads. It is a
+  query parameter rather than an Accept header so cache_json_view, which
+  keys on the full path, caches each format separately;
+* lists longer than JSON_STREAM_MIN_ROWS are streamed in chunks of
+  JSON_STREAM_CHUNK rows instead of being encoded into one large buffer
+  (cache_json_view buffers such responses once before caching them).
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+    _ORJSON_OPTIONS = 0
+else:
+    # Datetimes go through DjangoJSONEncoder too (millisecond precision, "Z")
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+CONTENT_TYPE = "application/json"
+COLUMNAR = "columnar"
+
+_django_default = DjangoJSONEncoder().default
+
+
+# ========== Encoding ==========
+
+def dumps(data):
+    """Encode to UTF-8 JSON bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_django_default, option=_ORJSON_OPTIONS)
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def columnar(records):
+    """[{"id": 1, "name": "x"}, ...] -> {"cols": ["id", "name"], "rows": [[1, "x"], ...]}.
+
+    Columns are the union of the records' keys in first-seen order; missing
+    values become null.
+    """
+    cols = {}
+    for record in records:
+        for key in record:
+            cols.setdefault(key, None)
+    cols = list(cols)
+    return {"cols": cols, "rows": [[record.get(col) for col in cols] for record in records]}
+
+
+def _is_records(value):
+    return isinstance(value, list) and bool(value) and all(isinstance(row, dict) for row in value)
+
+
+def to_columnar(data):
+    """Apply ``columnar`` to the payload, or to each list of dicts directly inside it."""
+    if _is_records(data):
+        return columnar(data)
+    if isinstance(data, dict):
+        return {key: columnar(value) if _is_records(value) else value for key, value in data.items()}
+    return data
+
+
+def wants_columnar(request):
+    return request is not None and request.GET.get("format") == COLUMNAR
+
+
+# ========== Streaming ==========
+
+def _stream_min_rows():
+    return getattr(settings, "JSON_STREAM_MIN_ROWS", 2000)
+
+
+def _needs_stream(data, min_rows, depth=0):
+    if isinstance(data, list):
+        return len(data) >= min_rows
+    if isinstance(data, dict) and depth < 2:
+        return any(_needs_stream(value, min_rows, depth + 1) for value in data.values())
+    return False
+
+
+def iter_json(data, chunk_rows=None, min_rows=None, depth=0):
+    """Yield the JSON encoding of data, encoding long lists chunk by chunk.
+
+    Only the top two levels of dicts are walked, which reaches the rows of a
+    columnar payload; everything else is encoded in one piece.
+    """
+    chunk_rows = chunk_rows or getattr(settings, "JSON_STREAM_CHUNK", 500)
+    min_rows = min_rows or _stream_min_rows()
+    if isinstance(data, list) and len(data) >= min_rows:
+        yield b"["
+        for start in range(0, len(data), chunk_rows):
+            if start:
+                yield b","
+            # "[a,b,c]" -> "a,b,c"
+            yield dumps(data[start:start + chunk_rows])[1:-1]
+        yield b"]"
+    elif isinstance(data, dict) and depth < 2 and _needs_stream(data, min_rows, depth):
+        yield b"{"
+        for i, (key, value) in enumerate(data.items()):
+            yield (b"," if i else b"") + dumps(str(key)) + b":"
+            yield from iter_json(value, chunk_rows, min_rows, depth + 1)
+        yield b"}"
+    else:
+        yield dumps(data)
+
+
+# ========== Responses ==========
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse with the fast encoder; any JSON-serializable value is allowed."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", CONTENT_TYPE)
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", CONTENT_TYPE)
+        super().__init__(streaming_content=iter_json(data), **kwargs)
+
+
+def json_response(request, data, **kwargs):
+    """The JSON response for an API view: columnar on request, streamed when large.
+
+    Extra keyword arguments (status, headers, ...) go to the response class.
+    """
+    if wants_columnar(request):
+        data = to_columnar(data)
+    if _needs_stream(data, _stream_min_rows()):
+        return StreamingJsonResponse(data, **kwargs)
+    return FastJsonResponse(data, **kwargs)
@@ -0,0 +1,43 @@
+"""
+URLconf entries whose view module is imported on the first request.
+
+Loading the URLconf imports every view module it names, and with them
+whatever those modules import. For rarely used subsystems that is a poor
+trade: the DRF token API (user_account.api) pulls in rest_framework's
+serializers, yaml and friends, which adds tens of ms to every cold start
+(``manage.py profile_startup`` shows it) while almost no request uses it.
+
+    path("login/", lazy_view("...api.views.LoginView", csrf_exempt=True), name="api-login")
+
+URL names still reverse without importing anything. Class-based views are
+built with ``as_view(**initkwargs)``. CSRF exemption is decided before the
+view runs, so it must be declared here: pass ``csrf_exempt=True`` for DRF
+views, which enforce CSRF themselves for session-authenticated requests.
+"""
+import threading
+
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt as csrf_exempt_view
+
+
+def lazy_view(dotted_path, *, csrf_exempt=False, **initkwargs):
+    resolved = []
+    lock = threading.Lock()
+
+    def load():
+        with lock:
+            if not resolved:
+                target = import_string(dotted_path)
+                if isinstance(target, type):
+                    target = target.as_view(**initkwargs)
+                resolved.append(target)
+        return resolved[0]
+
+    def view(request, *args, **kwargs):
+        return (resolved[0] if resolved else load())(request, *args, **kwargs)
+
+    view.__name__ = dotted_path.rsplit(".", 1)[-1]
+    view.__qualname__ = view.__name__
+    view.__module__ = dotted_path.rsplit(".", 1)[0]
+    view.lazy_target = dotted_path
+    return csrf_exempt_view(view) if csrf_exempt else view
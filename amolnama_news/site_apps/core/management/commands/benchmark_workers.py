@@ -0,0 +1,188 @@
+"""
+Pick WEB_CONCURRENCY by measurement instead of by guess.
+
+For each worker count, starts gunicorn with amolnama_news.gunicorn_conf on a
+local port, waits for it to answer, drives it with concurrent HTTP clients
+for a fixed time over a mix of read endpoints, stops it, and reports
+throughput and latency percentiles. The recommendation is the count with
+the highest throughput whose p95 stays under --max-p95.
+
+    python manage.py benchmark_workers --workers 2,4,8,12 --duration 20
+    SERVER_MODE=asgi python manage.py benchmark_workers --workers 1,2,4
+    python manage.py benchmark_workers --url http://10.0.0.5:8000   # running server
+
+Run it on the production host shape (same CPUs, same database) with the
+settings the deploy will use; numbers from a laptop do not transfer.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from amolnama_news.site_apps.core.benchmarking import summarize
+
+DEFAULT_VIEWS = (
+    ("evaluation_vote:get_divisions", ()),
+    ("evaluation_vote:get_parties", ()),
+    ("evaluation_vote:vote_cast_current_results", ()),
+    ("newshub:api_locations_all", ()),
+    ("newshub:api_news_category_tags_all", ()),
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _fetch(url, host):
+    request = urllib.request.Request(url, headers={"Host": host})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+        return response.status
+
+
+class Command(BaseCommand):
+    help = "Benchmark gunicorn at several worker counts and recommend WEB_CONCURRENCY."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", default=None,
+                            help="Comma-separated worker counts (default: 1, CPUs, 2 x CPUs + 1)")
+        parser.add_argument("--concurrency", type=int, default=32, help="Concurrent HTTP clients")
+        parser.add_argument("--duration", type=float, default=15, help="Seconds of load per worker count")
+        parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before each run")
+        parser.add_argument("--path", action="append", dest="paths",
+                            help="URL path to request (repeatable; default: reference-data APIs)")
+        parser.add_argument("--max-p95", type=float, default=250, help="p95 budget in ms for the recommendation")
+        parser.add_argument("--url", help="Benchmark an already running server instead of starting gunicorn")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or [reverse(name, args=args) for name, args in DEFAULT_VIEWS]
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ("*", "")), "localhost").lstrip(".")
+
+        if options["url"]:
+            rows = [self._measure(options["url"].rstrip("/"), host, paths, options, workers=None)]
+        else:
+            cpus = os.cpu_count() or 1
+            counts = options["workers"] or f"1,{cpus},{cpus * 2 + 1}"
+            try:
+                counts = sorted({int(n) for n in counts.split(",")})
+            except ValueError:
+                raise CommandError("--workers takes comma-separated integers")
+            rows = []
+            for count in counts:
+                with self._server(count) as base_url:
+                    rows.append(self._measure(base_url, host, paths, options, workers=count))
+
+        within = [r for r in rows if r["p95"] <= options["max_p95"] and not r["errors"]]
+        best = max(within or rows, key=lambda r: r["throughput"])
+        if options["json"]:
+            self.stdout.write(json.dumps({"runs": rows, "recommended_workers": best["workers"]}, indent=2))
+            return
+
+        self.stdout.write(f"{'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+        for r in rows:
+            self.stdout.write(
+                f"{r['workers'] or '-':>7} {r['throughput']:>8.1f} {r['p50']:>8.1f} "
+                f"{r['p95']:>8.1f} {r['p99']:>8.1f} {r['errors']:>6}"
+            )
+        if best["workers"] is not None:
+            note = "" if within else f" (no run met p95 <= {options['max_p95']} ms)"
+            self.stdout.write(self.style.SUCCESS(f"Recommended: WEB_CONCURRENCY={best['workers']}{note}"))
+
+    # ---- Server ----
+
+    @contextmanager
+    def _server(self, workers):
+        port = _free_port()
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE,
+            "WEB_CONCURRENCY": str(workers),
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "GUNICORN_ACCESS_LOG": "",
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "python:amolnama_news.gunicorn_conf"],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            self._wait_until_up(process, port)
+            self.stdout.write(f"Started gunicorn with {workers} workers on port {port}")
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    @staticmethod
+    def _wait_until_up(process, port, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"gunicorn exited with status {process.returncode}; is it installed?")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"gunicorn did not start listening within {timeout}s")
+
+    # ---- Load ----
+
+    def _measure(self, base_url, host, paths, options, workers):
+        lock = threading.Lock()
+        durations, errors = [], [0]
+        measuring = threading.Event()
+        stop = threading.Event()
+
+        def client(offset):
+            i = offset
+            while not stop.is_set():
+                url = base_url + paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    ok = _fetch(url, host) == 200
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                if measuring.is_set():
+                    with lock:
+                        durations.append(elapsed)
+                        errors[0] += not ok
+
+        threads = [threading.Thread(target=client, args=(n,), daemon=True)
+                   for n in range(options["concurrency"])]
+        for t in threads:
+            t.start()
+        time.sleep(options["warmup"])
+        measuring.set()
+        started = time.perf_counter()
+        time.sleep(options["duration"])
+        measuring.clear()
+        wall = time.perf_counter() - started
+        stop.set()
+        for t in threads:
+            t.join()
+
+        stats = summarize(durations, wall)
+        row = {"workers": workers, "errors": errors[0]}
+        row.update({k: round(v, 2) if isinstance(v, float) else v for k, v in stats.items()})
+        return row
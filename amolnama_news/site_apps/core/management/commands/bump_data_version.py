@@ -0,0 +1,32 @@
+"""
+Bump reference-data versions after editing tables outside Django.
+
+Every worker drops its cached copies of the bumped domains within
+DATA_VERSION_POLL_INTERVAL seconds (see core.data_versions).
+
+    python manage.py bump_data_version location party
+    python manage.py bump_data_version --list
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from amolnama_news.site_apps.core import data_versions
+
+
+class Command(BaseCommand):
+    help = "Bump data versions so every worker drops its cached reference data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("domains", nargs="*", help="e.g. location party newshub")
+        parser.add_argument("--list", action="store_true", help="Show current versions and exit")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for domain, version in sorted(data_versions.current().items()):
+                self.stdout.write(f"{domain}: {version}")
+            return
+        if not options["domains"]:
+            raise CommandError("Name at least one domain, or pass --list.")
+
+        versions = data_versions.bump(*options["domains"])
+        for domain in options["domains"]:
+            self.stdout.write(self.style.SUCCESS(f"{domain}: now v{versions[domain]}"))
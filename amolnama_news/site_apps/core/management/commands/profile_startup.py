@@ -0,0 +1,117 @@
+"""
+Show what a cold start spends its time importing.
+
+Starts a fresh interpreter with ``python -X importtime`` that runs
+``django.setup()`` and then loads the URLconf (what a worker does before
+its first response), and reports:
+
+* the wall time of each phase;
+* every package by the import time it added, and which module pulled it in
+  (a third-party package imported from one of our modules is a candidate
+  for core.lazy_views or an in-function import);
+* the slowest of our own modules to import.
+
+    python manage.py profile_startup
+    python manage.py profile_startup --top 30 --no-urls
+    DJANGO_SETTINGS_MODULE=amolnama_news.settings.prod python manage.py profile_startup --json
+
+Import times vary from run to run; compare a few runs before and after.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from amolnama_news.site_apps.core.benchmarking import parse_importtime
+
+PROJECT_PACKAGE = "amolnama_news"
+
+_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+phases = {"setup": time.perf_counter() - started}
+if %(urls)r:
+    from django.urls import get_resolver
+    t0 = time.perf_counter()
+    get_resolver().url_patterns
+    phases["urls"] = time.perf_counter() - t0
+phases["total"] = time.perf_counter() - started
+print(json.dumps({name: round(seconds * 1000, 1) for name, seconds in phases.items()}))
+"""
+
+
+def _package(module):
+    return module.split(".", 1)[0]
+
+
+def summarize_imports(modules, top=15):
+    """Group parsed importtime rows into the command's report."""
+    by_name = {m["module"]: m for m in modules}
+
+    packages = {}
+    for m in modules:
+        row = packages.setdefault(_package(m["module"]), {"ms": 0.0, "modules": 0, "imported_by": None, "entry_ms": -1})
+        row["modules"] += 1
+        row["ms"] += m["self_ms"]
+        parent = by_name.get(m["parent"])
+        # Blame the costliest import that entered the package from outside it
+        if (parent is not None and _package(parent["module"]) != _package(m["module"])
+                and m["cumulative_ms"] > row["entry_ms"]):
+            row["imported_by"], row["entry_ms"] = parent["module"], m["cumulative_ms"]
+
+    own = [m for m in modules if _package(m["module"]) == PROJECT_PACKAGE]
+    return {
+        "total_ms": round(sum(m["self_ms"] for m in modules), 1),
+        "modules": len(modules),
+        "packages": [
+            {"package": name, "ms": round(row["ms"], 1), "modules": row["modules"], "imported_by": row["imported_by"]}
+            for name, row in sorted(packages.items(), key=lambda item: -item[1]["ms"])[:top]
+        ],
+        "own_modules": [
+            {"module": m["module"], "self_ms": round(m["self_ms"], 1), "cumulative_ms": round(m["cumulative_ms"], 1)}
+            for m in sorted(own, key=lambda m: -m["cumulative_ms"])[:top]
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Profile cold-start imports (django.setup and URLconf) per package and module."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Rows per table")
+        parser.add_argument("--no-urls", action="store_true", help="Stop after django.setup()")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _SCRIPT % {"urls": not options["no_urls"]}],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+        report = summarize_imports(parse_importtime(result.stderr.splitlines()), options["top"])
+        report["phases_ms"] = json.loads(result.stdout.strip().splitlines()[-1])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        phases = ", ".join(f"{name} {ms:.0f} ms" for name, ms in report["phases_ms"].items())
+        self.stdout.write(f"Startup: {phases}; {report['modules']} modules, {report['total_ms']:.0f} ms importing")
+
+        self.stdout.write(f"\n{'package':<28} {'ms':>8} {'modules':>8}  imported by")
+        for row in report["packages"]:
+            self.stdout.write(
+                f"{row['package']:<28} {row['ms']:>8.1f} {row['modules']:>8}  {row['imported_by'] or '-'}"
+            )
+
+        self.stdout.write(f"\n{PROJECT_PACKAGE + ' module':<60} {'self ms':>8} {'cum ms':>8}")
+        for row in report["own_modules"]:
+            self.stdout.write(f"{row['module']:<60} {row['self_ms']:>8.1f} {row['cumulative_ms']:>8.1f}")
@@ -0,0 +1,74 @@
+"""
+Rank views by the SQL they waste, from the query budget violation log.
+
+Reads QUERY_BUDGET_LOG (one JSON line per violation, see core.query_budget)
+and prints one row per view: how often it broke its budget, its typical and
+worst query counts, and the statements a batched version would have saved.
+
+    python manage.py query_budget_report
+    python manage.py query_budget_report --limit 5 --log /var/log/amolnama/query_budget.jsonl
+"""
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Rank views by query waste recorded in the query budget log."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=None, help="Defaults to settings.QUERY_BUDGET_LOG")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--json", action="store_true", help="Print the ranking as JSON")
+
+    def handle(self, *args, **options):
+        path = Path(options["log"] or getattr(settings, "QUERY_BUDGET_LOG", "") or "")
+        if not path.is_file():
+            raise CommandError(f"No query budget log at {path}")
+
+        views = defaultdict(lambda: {"violations": 0, "waste": 0, "queries": [], "budget": 0, "shapes": Counter()})
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                view = views[record["view"]]
+                view["violations"] += 1
+                view["waste"] += record.get("waste", 0)
+                view["queries"].append(record["queries"])
+                view["budget"] = record.get("budget", 0)
+                for repeat in record.get("repeated", []):
+                    view["shapes"][repeat["shape"]] += repeat["count"]
+
+        ranking = sorted(views.items(), key=lambda item: item[1]["waste"], reverse=True)[:options["limit"]]
+        rows = [
+            {
+                "view": name,
+                "violations": data["violations"],
+                "budget": data["budget"],
+                "median_queries": sorted(data["queries"])[len(data["queries"]) // 2],
+                "max_queries": max(data["queries"]),
+                "waste": data["waste"],
+                "worst_shape": data["shapes"].most_common(1)[0][0] if data["shapes"] else "",
+            }
+            for name, data in ranking
+        ]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2, ensure_ascii=False))
+            return
+        if not rows:
+            self.stdout.write("No violations recorded.")
+            return
+        self.stdout.write(f"{'waste':>7} {'hits':>5} {'budget':>6} {'median':>6} {'max':>5}  view")
+        for row in rows:
+            self.stdout.write(
+                f"{row['waste']:>7} {row['violations']:>5} {row['budget']:>6} "
+                f"{row['median_queries']:>6} {row['max_queries']:>5}  {row['view']}"
+            )
+            if row["worst_shape"]:
+                self.stdout.write(f"{'':>33}repeats: {row['worst_shape'][:120]}")
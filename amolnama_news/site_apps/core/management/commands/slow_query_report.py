@@ -0,0 +1,92 @@
+"""
+Summarize the slow-query log (core.slow_queries), worst offenders first.
+
+Groups records by SQL shape across the live log and its rotated backups
+and ranks them by total time spent.
+
+    python manage.py slow_query_report
+    python manage.py slow_query_report --limit 5 --view newshub:
+    python manage.py slow_query_report --plan 3f2a9c01b7de > plan.sqlplan
+"""
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from amolnama_news.site_apps.core.benchmarking import percentile
+from amolnama_news.site_apps.core.slow_queries import log_paths
+
+
+def _records():
+    for path in log_paths():
+        if not path.is_file():
+            continue
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class Command(BaseCommand):
+    help = "Rank slow SQL shapes by total time; print a captured plan with --plan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--view", default="", help="Only views whose name starts with this")
+        parser.add_argument("--plan", metavar="SHAPE_HASH", help="Print the latest plan captured for a shape")
+        parser.add_argument("--json", action="store_true", help="Print the ranking as JSON")
+
+    def handle(self, *args, **options):
+        if options["plan"]:
+            return self._print_plan(options["plan"])
+
+        shapes = defaultdict(lambda: {"ms": [], "views": defaultdict(int), "plan": False})
+        for record in _records():
+            if not record.get("view", "").startswith(options["view"]):
+                continue
+            shape = shapes[record["shape_hash"]]
+            shape["shape"] = record["shape"]
+            shape["ms"].append(record["ms"])
+            shape["views"][record["view"]] += 1
+            shape["plan"] = shape["plan"] or bool(record.get("plan"))
+
+        rows = []
+        for digest, data in shapes.items():
+            values = sorted(data["ms"])
+            rows.append({
+                "shape_hash": digest,
+                "count": len(values),
+                "total_ms": round(sum(values), 1),
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "max_ms": values[-1],
+                "top_view": max(data["views"], key=data["views"].get),
+                "has_plan": data["plan"],
+                "shape": data["shape"],
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        rows = rows[:options["limit"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2, ensure_ascii=False))
+            return
+        if not rows:
+            self.stdout.write("No slow queries recorded.")
+            return
+        self.stdout.write(f"{'total ms':>10} {'count':>6} {'p95 ms':>8} {'max ms':>8}  shape / top view")
+        for row in rows:
+            plan = " [plan]" if row["has_plan"] else ""
+            self.stdout.write(
+                f"{row['total_ms']:>10.0f} {row['count']:>6} {row['p95_ms']:>8.0f} {row['max_ms']:>8.0f}  "
+                f"{row['shape_hash']}{plan} {row['top_view']}"
+            )
+            self.stdout.write(f"{'':>36}{row['shape'][:120]}")
+
+    def _print_plan(self, digest):
+        plans = [r for r in _records() if r.get("shape_hash") == digest and r.get("plan")]
+        if not plans:
+            raise CommandError(f"No plan captured for shape {digest}")
+        latest = max(plans, key=lambda r: r["at"])
+        self.stdout.write(latest["plan"])
@@ -0,0 +1,53 @@
+"""
+Fill the shared cache before traffic does (see core.warmup).
+
+    python manage.py warm_caches                      # every domain
+    python manage.py warm_caches locations parties
+    python manage.py warm_caches --list
+    python manage.py warm_caches --json               # for deploy scripts
+
+Run it after a deploy, a cache flush or ``bump_data_version``. It exits
+non-zero when any domain failed, so a deploy step can notice.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from amolnama_news.site_apps.core import warmup
+
+
+class Command(BaseCommand):
+    help = "Preload cached reference data and report how long each domain took."
+
+    def add_arguments(self, parser):
+        parser.add_argument("domains", nargs="*", help="e.g. locations tags parties past_results")
+        parser.add_argument("--list", action="store_true", help="Show the warm-up domains and exit")
+        parser.add_argument("--json", action="store_true", help="Print the timings as JSON")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name in warmup.DOMAINS:
+                self.stdout.write(name)
+            return
+
+        try:
+            rows = warmup.run(options["domains"] or None)
+        except ValueError as exc:
+            raise CommandError(f"{exc}. Known: {', '.join(warmup.DOMAINS)}")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+        else:
+            self.stdout.write(f"{'domain':<14} {'entries':>8} {'ms':>10}")
+            for row in rows:
+                line = f"{row['domain']:<14} {row['entries']:>8} {row['ms']:>10.1f}"
+                if row["error"]:
+                    self.stdout.write(self.style.ERROR(f"{line}  failed: {row['error']}"))
+                else:
+                    self.stdout.write(line)
+            self.stdout.write(f"{'total':<14} {sum(r['entries'] for r in rows):>8} "
+                              f"{sum(r['ms'] for r in rows):>10.1f}")
+
+        failed = [row["domain"] for row in rows if row["error"]]
+        if failed:
+            raise CommandError(f"Warm-up failed for: {', '.join(failed)}")
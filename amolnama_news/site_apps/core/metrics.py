@@ -0,0 +1,354 @@
+"""
+Per-request instrumentation: queries, DB time, cache hits and view time.
+
+``RequestMetricsMiddleware`` wraps every request in a ``RequestStats``:
+
+* every SQL statement on every connection goes through an execute_wrapper
+  that counts it and adds its duration to ``db_time``;
+* core.cache reports each tiered-cache read as a hit or a miss;
+* the total time spent below the middleware is the view time.
+
+The numbers go out two ways:
+
+* a ``Server-Timing`` header on every response (``db``, ``cache`` and
+  ``view`` entries, visible in the browser's network panel);
+* per-URL-name histograms kept in the worker (``registry``). Each worker
+  publishes its totals to the "shared" cache every METRICS_PUBLISH_INTERVAL
+  seconds and the /metrics/ endpoint (core.views.metrics) merges them, so
+  one scrape covers every gunicorn worker on the host.
+
+The overhead is one perf_counter pair per query and a dictionary update per
+request, which is fine to leave on in production. Set
+REQUEST_METRICS_ENABLED = False to skip it entirely, or SERVER_TIMING_HEADER
+= False to keep the histograms but not expose timings to clients.
+"""
+import contextvars
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+ENABLED = getattr(settings, "REQUEST_METRICS_ENABLED", True)
+SERVER_TIMING = getattr(settings, "SERVER_TIMING_HEADER", True)
+PUBLISH_INTERVAL = getattr(settings, "METRICS_PUBLISH_INTERVAL", 10)
+WORKER_TTL = PUBLISH_INTERVAL * 6
+WORKERS_KEY = "metrics:workers"
+UNRESOLVED = "<unresolved>"
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = contextvars.ContextVar("request_stats", default=None)
+_gauge_sources = {}
+
+
+# ========== Per-request Stats ==========
+
+class RequestStats:
+    """Counters for the request being served on this thread/task."""
+
+    __slots__ = ("queries", "db_time", "cache_hits", "cache_misses", "started", "view")
+
+    def __init__(self):
+        self.view = None  # URL name, once resolved
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.started = time.perf_counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as a connection execute_wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+def current_stats():
+    """The RequestStats of the request in progress, or None."""
+    return _current.get()
+
+
+def note_cache(hit):
+    stats = _current.get()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+def server_timing(stats, elapsed):
+    return ", ".join((
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+        f'cache;desc="{stats.cache_hits} hit / {stats.cache_misses} miss"',
+        f"view;dur={elapsed * 1000:.1f}",
+    ))
+
+
+# ========== Histograms ==========
+
+class Histogram:
+    """Fixed-bucket histogram; rendered cumulatively for Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last is +Inf
+        self.sum = 0.0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other["counts"])]
+        self.sum += other["sum"]
+
+    def as_dict(self):
+        return {"counts": list(self.counts), "sum": self.sum}
+
+
+def _new_view():
+    return {
+        "latency_ms": Histogram(LATENCY_BUCKETS_MS),
+        "db_ms": Histogram(LATENCY_BUCKETS_MS),
+        "queries": Histogram(QUERY_BUCKETS),
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "errors": 0,
+    }
+
+
+class MetricsRegistry:
+    """Per-worker aggregates keyed by URL name, merged across workers via L2."""
+
+    def __init__(self, alias="shared"):
+        self.alias = alias
+        self.worker = None  # host:pid unless set
+        self._lock = threading.Lock()
+        self._views = {}
+        self._next_publish = time.monotonic() + PUBLISH_INTERVAL
+
+    def observe(self, view_name, stats, elapsed, status_code):
+        with self._lock:
+            view = self._views.get(view_name)
+            if view is None:
+                view = self._views[view_name] = _new_view()
+            view["latency_ms"].observe(elapsed * 1000)
+            view["db_ms"].observe(stats.db_time * 1000)
+            view["queries"].observe(stats.queries)
+            view["cache_hits"] += stats.cache_hits
+            view["cache_misses"] += stats.cache_misses
+            if status_code >= 500:
+                view["errors"] += 1
+            publish = time.monotonic() >= self._next_publish
+            if publish:
+                self._next_publish = time.monotonic() + PUBLISH_INTERVAL
+        if publish:
+            self.publish()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    key: value.as_dict() if isinstance(value, Histogram) else value
+                    for key, value in view.items()
+                }
+                for name, view in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def publish(self):
+        """Store this worker's totals in the shared cache."""
+        # Computed per call: forked workers must not reuse the parent's pid
+        worker = self.worker or f"{socket.gethostname()}:{os.getpid()}"
+        l2 = caches[self.alias]
+        try:
+            l2.set(f"metrics:worker:{worker}", self.snapshot(), WORKER_TTL)
+            l2.set(f"metrics:gauges:{worker}", read_gauges(), WORKER_TTL)
+            now = time.time()
+            workers = {
+                w: seen for w, seen in (l2.get(WORKERS_KEY) or {}).items()
+                if now - seen < WORKER_TTL
+            }
+            workers[worker] = now
+            l2.set(WORKERS_KEY, workers, None)
+        except Exception:
+            logger.warning("Could not publish request metrics", exc_info=True)
+
+    def collect(self):
+        """Merge the published totals of every live worker on the host."""
+        self.publish()
+        l2 = caches[self.alias]
+        workers = l2.get(WORKERS_KEY) or {}
+        snapshots = l2.get_many([f"metrics:worker:{w}" for w in workers])
+        merged = {}
+        for snapshot in snapshots.values():
+            for name, data in snapshot.items():
+                view = merged.get(name)
+                if view is None:
+                    view = merged[name] = _new_view()
+                for key, value in data.items():
+                    if isinstance(view[key], Histogram):
+                        view[key].merge(value)
+                    else:
+                        view[key] += value
+        return merged, len(snapshots)
+
+    def collect_gauges(self):
+        """Sum every live worker's gauges: {name: {label: {stat: value}}}."""
+        l2 = caches[self.alias]
+        workers = l2.get(WORKERS_KEY) or {}
+        merged = {}
+        for gauges in l2.get_many([f"metrics:gauges:{w}" for w in workers]).values():
+            for name, labels in gauges.items():
+                for label, values in labels.items():
+                    target = merged.setdefault(name, {}).setdefault(label, {})
+                    for stat, value in values.items():
+                        target[stat] = target.get(stat, 0) + value
+        return merged
+
+
+registry = MetricsRegistry()
+
+
+def register_gauges(name, source):
+    """Export source() -> {label: {stat: number}} from every worker.
+
+    Rendered as ``amolnama_<name>_<stat>{name="<label>"}``, summed across
+    workers (e.g. core.db_pool registers its per-alias pool counters).
+    """
+    _gauge_sources[name] = source
+
+
+def read_gauges():
+    gauges = {}
+    for name, source in list(_gauge_sources.items()):
+        try:
+            gauges[name] = source()
+        except Exception:
+            logger.warning("Gauge source %s failed", name, exc_info=True)
+    return gauges
+
+
+def render_prometheus(views, workers, gauges=None):
+    """Prometheus text exposition of merged per-view metrics."""
+    lines = [f"# worker snapshots merged: {workers}"]
+    histograms = (
+        ("latency_ms", "amolnama_view_latency_ms", "View time in milliseconds."),
+        ("db_ms", "amolnama_view_db_ms", "Database time per request in milliseconds."),
+        ("queries", "amolnama_view_queries", "SQL statements per request."),
+    )
+    for key, metric, help_text in histograms:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for name in sorted(views):
+            hist = views[name][key]
+            running = 0
+            for bound, count in zip((*hist.buckets, "+Inf"), hist.counts):
+                running += count
+                lines.append(f'{metric}_bucket{{view="{name}",le="{bound}"}} {running}')
+            lines.append(f'{metric}_sum{{view="{name}"}} {hist.sum:.3f}')
+            lines.append(f'{metric}_count{{view="{name}"}} {hist.count}')
+    counters = (
+        ("cache_hits", "amolnama_view_cache_hits_total", "Tiered cache hits."),
+        ("cache_misses", "amolnama_view_cache_misses_total", "Tiered cache misses."),
+        ("errors", "amolnama_view_errors_total", "Responses with status >= 500."),
+    )
+    for key, metric, help_text in counters:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for name in sorted(views):
+            lines.append(f'{metric}{{view="{name}"}} {views[name][key]}')
+    for name, labels in sorted((gauges or {}).items()):
+        stats = sorted({stat for values in labels.values() for stat in values})
+        for stat in stats:
+            metric = f"amolnama_{name}_{stat}"
+            lines.append(f"# TYPE {metric} gauge")
+            for label, values in sorted(labels.items()):
+                lines.append(f'{metric}{{name="{label}"}} {values.get(stat, 0)}')
+    return "\n".join(lines) + "\n"
+
+
+# ========== Middleware ==========
+
+class RequestMetricsMiddleware:
+    """Record queries, DB time, cache hits and view time for each request.
+
+    Under ASGI the view's queries run on core.async_views' thread pool,
+    which adds its connections' statements to the request's stats.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # A sync process_view would be run in a thread for every request
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not ENABLED:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(stats, response)
+
+    async def __acall__(self, request):
+        if not ENABLED:
+            return await self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(stats, response)
+
+    def _finish(self, stats, response):
+        elapsed = time.perf_counter() - stats.started
+        registry.observe(stats.view or UNRESOLVED, stats, elapsed, response.status_code)
+        if SERVER_TIMING:
+            response["Server-Timing"] = server_timing(stats, elapsed)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Name the view before it runs, so its queries can be attributed
+        stats = _current.get()
+        if stats is not None:
+            stats.view = request.resolver_match.view_name
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.process_view(request, view_func, view_args, view_kwargs)
@@ -18,4 +18,23 @@ class Article(models.Model):
         managed = False  # Changed to True so Django can create the table
         
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+class DataVersion(models.Model):
+    """Version stamp per reference-data domain (location, party, newshub, ...).
+
+    The reference tables are managed in SQL Server, so Django signals never
+    see most edits. Whoever changes them bumps the domain here (admin action,
+    ``manage.py bump_data_version`` or an UPDATE from SQL), and every worker
+    polls this table to retire its cached copies. See core.data_versions.
+    """
+    domain = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Data Version"
+        verbose_name_plural = "Data Versions"
+
+    def __str__(self):
+        return f"{self.domain} v{self.version}"
@@ -0,0 +1,108 @@
+"""
+Full-page cache for anonymous visitors.
+
+Anonymous visitors all get the same HTML for the election and evaluation
+home pages, so ``cache_anonymous_page`` stores the rendered response in the
+tiered cache (core.cache) and serves it to every worker. The key varies on
+the active language and the request path, and entries carry the cache tags
+of the data they show, so invalidating e.g. the "party" tag retires every
+cached copy at once.
+
+Entries are fresh for ``fresh_seconds`` and may then be served stale for
+``stale_seconds`` more; while stale, one request re-renders the page and
+everyone else keeps getting the stale copy, so a popular page never
+stampedes the database.
+
+Cached HTML holds a placeholder instead of the csrfmiddlewaretoken value;
+each hit gets the visitor's own token substituted back in. Authenticated
+users, non-GET requests and visitors with pending flash messages always
+bypass the cache.
+"""
+import hashlib
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.translation import get_language
+
+from .cache import tiered_cache
+
+CSRF_PLACEHOLDER = b"__PAGE_CACHE_CSRF_TOKEN__"
+_RE_CSRF_INPUT = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+MESSAGES_COOKIE_NAME = "messages"  # django.contrib.messages CookieStorage
+FRESH_SECONDS = getattr(settings, "PAGE_CACHE_FRESH_SECONDS", 60)
+STALE_SECONDS = getattr(settings, "PAGE_CACHE_STALE_SECONDS", 300)
+
+
+def _cacheable_request(request):
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # Flash messages are rendered once and must not be cached for others
+    return MESSAGES_COOKIE_NAME not in request.COOKIES
+
+
+def _cacheable_response(response):
+    if response.status_code != 200 or response.streaming:
+        return False
+    # Anything that set a cookie other than csrftoken is per-visitor
+    return all(name == settings.CSRF_COOKIE_NAME for name in response.cookies)
+
+
+def _page_key(prefix, request):
+    path = hashlib.sha1(request.get_full_path().encode("utf-8")).hexdigest()
+    return f"page:{prefix}:{get_language()}:{path}"
+
+
+def _entry(response):
+    return {
+        "content": _RE_CSRF_INPUT.sub(rb"\1" + CSRF_PLACEHOLDER + rb"\2", response.content),
+        "content_type": response["Content-Type"],
+    }
+
+
+def _serve(request, entry):
+    content = entry["content"]
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request).encode("ascii"))
+    response = HttpResponse(content, content_type=entry["content_type"])
+    response["X-Page-Cache"] = "hit"
+    return response
+
+
+def cache_anonymous_page(prefix, tags=(), fresh_seconds=None, stale_seconds=None):
+    """Cache a view's HTML for anonymous visitors with stale-while-revalidate.
+
+    ``tags`` name the data the page depends on (core.cache tags);
+    invalidating any of them retires every cached copy.
+    """
+    fresh_seconds = FRESH_SECONDS if fresh_seconds is None else fresh_seconds
+    stale_seconds = STALE_SECONDS if stale_seconds is None else stale_seconds
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            rendered = {}
+
+            def produce():
+                response = view(request, *args, **kwargs)
+                rendered["response"] = response
+                return _entry(response) if _cacheable_response(response) else None
+
+            entry = tiered_cache.get_or_set(
+                _page_key(prefix, request), produce,
+                ttl=fresh_seconds + stale_seconds, soft_ttl=fresh_seconds, tags=tags,
+            )
+            if "response" in rendered:
+                response = rendered["response"]
+                response["X-Page-Cache"] = "miss"
+                return response
+            return _serve(request, entry)
+        return wrapper
+    return decorator
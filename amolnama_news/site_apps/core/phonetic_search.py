@@ -0,0 +1,144 @@
+"""
+In-memory name search on phonetic keys (core.transliterate).
+
+A ``PhoneticIndex`` holds a list of records (plain dicts) and, sorted, the
+phonetic key of every word of every name of each record, plus the key of
+each whole name with its words run together. A query is keyed the same
+way and resolved by binary search over those keys, so "nirbachon",
+"nirbachan" and "নির্বা" all find নির্বাচন without full-text search or
+hand-written aliases:
+
+* every query word must be the prefix of a word key of the record (typing
+  "dhaka uttar" narrows), or the whole query, run together, the prefix of a
+  whole name ("coxs bazar" finds কক্সবাজার, written as one word);
+* records whose name contains the query as typed rank first, then whole
+  names before longer ones and exact word keys before prefixes; ties keep
+  the record order the loader chose.
+
+``CachedPhoneticIndex`` builds an index through the tiered cache
+(core.cache), tagged with the data domain of its source tables, the way the
+party registry is: every worker reuses one build, and bumping the domain
+(core.data_versions) makes the next search rebuild it.
+"""
+import logging
+from bisect import bisect_left
+
+from .cache import REFERENCE_TTL, tiered_cache
+from .transliterate import word_keys
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every key character, so [key, key + _END) is the prefix range
+_END = "\uffff"
+
+
+def _prefix_range(keys, prefix):
+    return bisect_left(keys, prefix), bisect_left(keys, prefix + _END)
+
+
+class PhoneticIndex:
+    """Records searchable by the phonetic keys of their names."""
+
+    def __init__(self, records, names, substring=False):
+        """``names(record)`` returns the record's searchable names (None/"" skipped).
+
+        With ``substring``, a name containing the query as typed matches
+        too, even inside a word (a scan of every name, as LIKE %q% did).
+        """
+        self.records = list(records)
+        self.substring = substring
+        words, wholes, texts = [], [], []
+        for pos, record in enumerate(self.records):
+            record_names = [name for name in names(record) if name]
+            texts.append("\n".join(name.casefold() for name in record_names))
+            for name in record_names:
+                keys = word_keys(name)
+                words.extend((key, pos) for key in keys)
+                if keys:
+                    wholes.append(("".join(keys), pos))
+        words.sort()
+        wholes.sort()
+        self._word_keys = [key for key, _ in words]
+        self._word_pos = [pos for _, pos in words]
+        self._whole_keys = [key for key, _ in wholes]
+        self._whole_pos = [pos for _, pos in wholes]
+        self._texts = texts
+
+    def __len__(self):
+        return len(self.records)
+
+    def _word_matches(self, key):
+        """{pos: 2 for an exact word key, 1 for a prefix}"""
+        matches = {}
+        lo, hi = _prefix_range(self._word_keys, key)
+        for i in range(lo, hi):
+            pos = self._word_pos[i]
+            matches[pos] = max(matches.get(pos, 0), 2 if self._word_keys[i] == key else 1)
+        return matches
+
+    def search(self, query, limit=20, where=None):
+        """Records matching ``query`` (Bengali or Latin), best first.
+
+        ``where(record)`` filters candidates before the limit is applied.
+        """
+        keys = word_keys(query)
+        if not keys:
+            return []
+
+        scores = None
+        for key in keys:
+            matches = self._word_matches(key)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {pos: score + matches[pos] for pos, score in scores.items() if pos in matches}
+
+        whole = "".join(keys)
+        lo, hi = _prefix_range(self._whole_keys, whole)
+        for i in range(lo, hi):
+            pos = self._whole_pos[i]
+            score = max(scores.get(pos, 0), len(keys))
+            # The whole name, not just its start: "dhaka" before "Dhaka North"
+            scores[pos] = score + 1 if self._whole_keys[i] == whole else score
+
+        needle = query.strip().casefold()
+        if self.substring:
+            for pos, text in enumerate(self._texts):
+                if needle in text:
+                    scores.setdefault(pos, 0)
+        for pos in scores:
+            if needle in self._texts[pos]:
+                scores[pos] += 2 * len(keys) + 1
+
+        ranked = sorted(scores, key=lambda pos: (-scores[pos], pos))
+        results = []
+        for pos in ranked:
+            record = self.records[pos]
+            if where is None or where(record):
+                results.append(record)
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class CachedPhoneticIndex:
+    """A PhoneticIndex of ``load()``'s records, kept in the tiered cache."""
+
+    def __init__(self, cache_key, load, names, domain, ttl=REFERENCE_TTL, substring=False):
+        self.cache_key = cache_key
+        self.load = load
+        self.names = names
+        self.domain = domain
+        self.ttl = ttl
+        self.substring = substring
+
+    def _build(self):
+        index = PhoneticIndex(self.load(), self.names, substring=self.substring)
+        logger.debug("Built phonetic index %s: %d records", self.cache_key, len(index))
+        return index
+
+    def index(self):
+        return tiered_cache.get_or_set(self.cache_key, self._build, ttl=self.ttl, tags=(self.domain,))
+
+    def search(self, query, limit=20, where=None):
+        return self.index().search(query, limit=limit, where=where)
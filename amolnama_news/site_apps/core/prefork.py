@@ -0,0 +1,76 @@
+"""
+Master/worker lifecycle hooks for the preloading gunicorn setup.
+
+With ``preload_app`` (amolnama_news.gunicorn_conf) the app is imported once
+in the gunicorn master and every worker is forked from it. ``prepare_master``
+runs in the master just before the first fork:
+
+* resolves the URLconf, which imports every view module, so workers start
+  with all code already loaded;
+* warms the WARMUP_ON_BOOT domains (core.warmup): the tiered cache's L1
+  entries are inherited by every worker, and the "shared" L2 entries are
+  there for the workers' first misses;
+* closes the master's database and cache connections, including the idle
+  connections Django's close_all() hands back to core.db_pool, so no worker
+  inherits (and later corrupts) a socket it shares with its siblings;
+* ``gc.freeze()``s everything allocated so far. The collector then never
+  touches those objects, so the pages holding them stay shared between the
+  master and the workers instead of being copied on the first collection.
+
+``after_fork`` runs in each worker: it reseeds ``random`` (a fork copies the
+generator's state) and logs the boot. core.db_pool and core.metrics already
+key their per-process state on the pid. ``after_worker_init`` runs once the
+worker has loaded the app (preloaded or not) and warms WARMUP_AFTER_FORK.
+"""
+import gc
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.urls import get_resolver
+
+from . import db_pool
+
+logger = logging.getLogger(__name__)
+
+
+def warm(log=logger):
+    from . import warmup
+
+    started = time.perf_counter()
+    _ = get_resolver().url_patterns  # imports every urls/views module
+    warmup.run(getattr(settings, "WARMUP_ON_BOOT", None), log)
+    log.info("Pre-fork warm-up done in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+def prepare_master(log=logger):
+    """Load and warm once in the master, then make its memory fork-friendly."""
+    try:
+        warm(log)
+    finally:
+        connections.close_all()
+        # close_all() returned pooled connections to the pool; really close them
+        db_pool.close_idle_pools()
+        caches.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork(log=logger):
+    random.seed()
+    log.info("Worker booted with %d objects shared from the master", gc.get_freeze_count())
+
+
+def after_worker_init(log=logger):
+    from . import warmup
+
+    started = time.perf_counter()
+    try:
+        warmup.run(getattr(settings, "WARMUP_AFTER_FORK", ()), log)
+    finally:
+        # Requests run on other threads; don't keep the boot thread's connections
+        connections.close_all()
+    log.info("Worker warm-up done in %.0f ms", (time.perf_counter() - started) * 1000)
@@ -0,0 +1,152 @@
+"""
+Query budgets: per-view SQL limits with N+1 detection.
+
+Views declare how many statements they may run:
+
+    @query_budget(12)
+    def news_collection(request): ...
+
+While the view runs, every statement is counted and reduced to its "shape"
+(literals and IN-lists stripped). The budget is violated when
+
+* the view runs more than ``max_queries`` statements, or
+* one shape runs more than ``max_repeats`` times (QUERY_BUDGET_MAX_REPEATS
+  by default) - the signature of a per-row ``get()`` inside a loop.
+
+A violation is logged and appended as one JSON line to QUERY_BUDGET_LOG;
+``manage.py query_budget_report`` ranks views by the queries they waste.
+With QUERY_BUDGET_STRICT on (the default under ``manage.py test``) it
+raises QueryBudgetExceeded instead, so a regression fails the test suite
+rather than reaching production.
+
+``QueryBudget`` is also a context manager for tests:
+
+    with QueryBudget(3, name="party registry reload"):
+        party_registry.all()
+"""
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_RE_IN_LIST = re.compile(r"\bIN\s*\(\s*%s(?:\s*,\s*%s)*\s*\)", re.IGNORECASE)
+_RE_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_log_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more (or more repetitive) SQL than its budget allows."""
+
+
+def sql_shape(sql):
+    """SQL with literals and IN-lists collapsed, so loop iterations match."""
+    sql = _RE_IN_LIST.sub("IN (...)", sql)
+    sql = _RE_LITERAL.sub("?", sql)
+    return " ".join(sql.split())
+
+
+def _max_repeats_default():
+    return getattr(settings, "QUERY_BUDGET_MAX_REPEATS", 5)
+
+
+class QueryBudget:
+    """Count statements on every connection while active; check on exit."""
+
+    def __init__(self, max_queries, max_repeats=None, name=None):
+        self.max_queries = max_queries
+        self.max_repeats = _max_repeats_default() if max_repeats is None else max_repeats
+        self.name = name or "<block>"
+        self.shapes = Counter()
+        self._stack = None
+
+    @property
+    def queries(self):
+        return sum(self.shapes.values())
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as a connection execute_wrapper
+        self.shapes[sql_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for conn in connections.all():
+            self._stack.enter_context(conn.execute_wrapper(self))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+        if exc_type is None:
+            self.check()
+        return False
+
+    def repeated(self):
+        """Shapes run more than max_repeats times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > self.max_repeats]
+
+    def waste(self):
+        """Statements a batched version of the view would not need."""
+        over = max(0, self.queries - self.max_queries)
+        loops = sum(n - 1 for _, n in self.repeated())
+        return max(over, loops)
+
+    def violations(self):
+        problems = []
+        if self.queries > self.max_queries:
+            problems.append(f"{self.queries} queries (budget {self.max_queries})")
+        for shape, n in self.repeated():
+            problems.append(f"{n}x same query: {shape[:200]}")
+        return problems
+
+    def check(self):
+        problems = self.violations()
+        if not problems:
+            return
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(f"{self.name}: " + "; ".join(problems))
+        logger.warning("Query budget exceeded in %s: %s", self.name, "; ".join(problems))
+        self._record()
+
+    def _record(self):
+        path = getattr(settings, "QUERY_BUDGET_LOG", None)
+        if not path:
+            return
+        record = {
+            "at": timezone.now().isoformat(),
+            "view": self.name,
+            "queries": self.queries,
+            "budget": self.max_queries,
+            "waste": self.waste(),
+            "repeated": [{"shape": shape, "count": n} for shape, n in self.repeated()[:5]],
+        }
+        try:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with _log_lock, path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            logger.warning("Could not write query budget log %s", path, exc_info=True)
+
+
+def query_budget(max_queries, max_repeats=None):
+    """Declare a view's SQL budget (see module docstring)."""
+    def decorator(view):
+        name = f"{view.__module__}.{view.__qualname__}"
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with QueryBudget(max_queries, max_repeats, name=name):
+                return view(request, *args, **kwargs)
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
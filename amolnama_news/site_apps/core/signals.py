@@ -0,0 +1,16 @@
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import data_versions, slow_queries
+
+
+@receiver(request_started)
+def poll_data_versions(sender, **kwargs):
+    """Drop cached reference data another worker or SQL Server changed."""
+    data_versions.poll()
+
+
+@receiver(connection_created)
+def install_slow_query_recorder(sender, connection, **kwargs):
+    slow_queries.install(connection)
@@ -0,0 +1,199 @@
+"""
+Slow-query recorder for the mssql backend (and the sqlite fallback).
+
+Every database connection gets an execute_wrapper (installed from the
+connection_created signal, see core.signals) that times each statement.
+Statements slower than SLOW_QUERY_THRESHOLD_MS are written as one JSON line
+to a rotating local file (SLOW_QUERY_LOG, SLOW_QUERY_LOG_MAX_BYTES x
+SLOW_QUERY_LOG_BACKUPS) with:
+
+* the SQL, its shape (core.query_budget.sql_shape) and a short shape hash,
+* the parameters (SLOW_QUERY_LOG_PARAMS = False to leave them out),
+* the duration and the calling view (core.metrics) or thread name,
+* optionally the execution plan (SLOW_QUERY_CAPTURE_PLANS): the estimated
+  showplan XML on SQL Server (SET SHOWPLAN_XML ON, which compiles but does
+  not run the statement) or EXPLAIN QUERY PLAN on sqlite. A plan is captured
+  at most once per shape per PLAN_INTERVAL seconds per worker.
+
+Plans are read on raw DB-API cursors, so they never show up in query
+counts or budgets; SQL Server plans use a connection of their own, since
+the slow statement may still have results pending on its connection. ``manage.py slow_query_report`` summarizes the log.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .metrics import current_stats
+from .query_budget import sql_shape
+
+logger = logging.getLogger(__name__)
+
+PLAN_INTERVAL = 10 * 60
+MAX_SQL_LENGTH = 4000
+MAX_PARAMS_LENGTH = 1000
+
+_store = None
+_store_lock = threading.Lock()
+_plan_lock = threading.Lock()
+_last_plan = {}
+
+
+def threshold_ms():
+    return getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 200)
+
+
+def shape_hash(shape):
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:12]
+
+
+def log_paths():
+    """The live log file followed by its rotated backups, newest first."""
+    path = Path(settings.SLOW_QUERY_LOG)
+    backups = getattr(settings, "SLOW_QUERY_LOG_BACKUPS", 5)
+    return [path] + [path.with_name(f"{path.name}.{i}") for i in range(1, backups + 1)]
+
+
+def _get_store():
+    """Dedicated logger writing bare JSON lines to a rotating file."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = Path(settings.SLOW_QUERY_LOG)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(
+                    path,
+                    maxBytes=getattr(settings, "SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024),
+                    backupCount=getattr(settings, "SLOW_QUERY_LOG_BACKUPS", 5),
+                    encoding="utf-8",
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                store = logging.getLogger("amolnama_news.slow_queries.store")
+                store.handlers[:] = [handler]
+                store.setLevel(logging.INFO)
+                store.propagate = False
+                _store = store
+    return _store
+
+
+# ========== Plans ==========
+
+def _qmark(sql, params):
+    # Both pyodbc and sqlite3 take "?" placeholders on the raw cursor
+    return sql % tuple("?" * len(params)) if params else sql
+
+
+def _showplan(raw, sql, params):
+    cursor = raw.cursor()
+    try:
+        cursor.execute("SET SHOWPLAN_XML ON")
+        try:
+            cursor.execute(sql, *params)
+            plans = []
+            while True:
+                plans.extend(row[0] for row in cursor.fetchall())
+                if not cursor.nextset():
+                    break
+            return "\n".join(plans)
+        finally:
+            cursor.execute("SET SHOWPLAN_XML OFF")
+    finally:
+        cursor.close()
+
+
+def capture_plan(connection, sql, params):
+    """Estimated plan of a statement, without running it (None if unavailable)."""
+    if connection.connection is None:
+        return None
+    params = params or ()
+    sql = _qmark(sql, params)
+    if connection.vendor == "microsoft":
+        # The recorded statement's results may still be pending on its
+        # connection, and without MARS a second cursor there fails: ask for
+        # the plan on a short-lived connection of its own.
+        raw = connection.get_new_connection(connection.get_connection_params())
+        try:
+            return _showplan(raw, sql, params)
+        finally:
+            pool = getattr(connection, "pool", None)  # core.db_backends.mssql_pooled
+            if pool is not None:
+                pool.release(raw)
+            else:
+                raw.close()
+    if connection.vendor == "sqlite":
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params))
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    return None
+
+
+def _plan_due(digest):
+    now = time.monotonic()
+    with _plan_lock:
+        if now - _last_plan.get(digest, -PLAN_INTERVAL) < PLAN_INTERVAL:
+            return False
+        _last_plan[digest] = now
+        return True
+
+
+# ========== Recorder ==========
+
+class SlowQueryRecorder:
+    """execute_wrapper that records statements slower than the threshold."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            threshold = threshold_ms()
+            if threshold and elapsed_ms >= threshold:
+                self.record(sql, params, many, elapsed_ms)
+
+    def record(self, sql, params, many, elapsed_ms):
+        try:
+            shape = sql_shape(sql)
+            digest = shape_hash(shape)
+            stats = current_stats()
+            entry = {
+                "at": timezone.now().isoformat(),
+                "ms": round(elapsed_ms, 1),
+                "alias": self.connection.alias,
+                "vendor": self.connection.vendor,
+                "view": (stats and stats.view) or threading.current_thread().name,
+                "shape_hash": digest,
+                "shape": shape[:MAX_SQL_LENGTH],
+                "sql": sql[:MAX_SQL_LENGTH],
+                "many": bool(many),
+            }
+            if getattr(settings, "SLOW_QUERY_LOG_PARAMS", True) and not many:
+                entry["params"] = repr(params)[:MAX_PARAMS_LENGTH]
+            if (getattr(settings, "SLOW_QUERY_CAPTURE_PLANS", False)
+                    and not many and _plan_due(digest)):
+                entry["plan"] = capture_plan(self.connection, sql, params)
+            _get_store().info(json.dumps(entry, ensure_ascii=False, default=str))
+        except Exception:
+            # Never let the recorder break the query it is watching
+            logger.warning("Could not record slow query", exc_info=True)
+
+
+def install(connection):
+    """Attach the recorder once per connection wrapper (it survives reconnects)."""
+    if not threshold_ms():
+        return
+    if not any(isinstance(w, SlowQueryRecorder) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryRecorder(connection))
@@ -0,0 +1,34 @@
+"""
+Template tags for core.assets bundles.
+
+    {% load assets %}
+    {% block extra_css %}{% bundle_preload "newshub/assets/js/news-collection.bundle.js" %}{% endblock %}
+    {% block extra_js %}{% bundle_scripts "newshub/assets/js/news-collection.bundle.js" %}{% endblock %}
+"""
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from amolnama_news.site_apps.core.assets import bundles
+
+register = template.Library()
+
+
+def _enabled():
+    return getattr(settings, "ASSET_BUNDLES_ENABLED", True)
+
+
+@register.simple_tag
+def bundle_scripts(bundle_path):
+    """<script> for the bundle, or for each of its sources when bundling is off."""
+    paths = [bundle_path] if _enabled() else bundles()[bundle_path]
+    return format_html_join("\n", '<script src="{}"></script>', ((static(path),) for path in paths))
+
+
+@register.simple_tag
+def bundle_preload(bundle_path):
+    """Let the browser fetch the bundle while it is still parsing the head."""
+    if not _enabled():
+        return ""
+    return format_html('<link rel="preload" href="{}" as="script">', static(bundle_path))
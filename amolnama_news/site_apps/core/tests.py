@@ -0,0 +1,884 @@
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.template import Context, Template
+from django.test import LiveServerTestCase, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from . import (
+    assets, async_views, cache as cache_module, data_versions, db_pool, db_router, json_response, metrics, page_cache,
+    prefork, slow_queries, transliterate, warmup,
+)
+from .query_budget import QueryBudget, QueryBudgetExceeded, query_budget, sql_shape
+from .benchmarking import parse_importtime
+from .cache import LocalLRU, TieredCache, cache_json_view, cached, tiered_cache
+from .db_pool import ConnectionPool, PoolExhausted
+from .lazy_views import lazy_view
+from .phonetic_search import PhoneticIndex
+from .management.commands.profile_startup import summarize_imports
+from .models import DataVersion
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "core-test"},
+}
+
+
+def later(seconds):
+    """Patch core.cache's clock forward."""
+    return mock.patch.object(cache_module.time, "time", return_value=time.time() + seconds)
+
+
+class LocalLRUTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LocalLRU(2)
+        lru.set("a", 1, 60)
+        lru.set("b", 2, 60)
+        lru.get("a")
+        lru.set("c", 3, 60)
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, None, 3))
+
+    def test_entries_expire(self):
+        lru = LocalLRU(2)
+        lru.set("a", 1, -1)
+        self.assertIsNone(lru.get("a"))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.cache = TieredCache()
+        self.calls = 0
+
+    def produce(self, value="v"):
+        def producer():
+            self.calls += 1
+            return f"{value}{self.calls}"
+        return producer
+
+    def test_l2_serves_other_workers(self):
+        self.cache.set("k", "value", 60)
+        other_worker = TieredCache()
+        self.assertEqual(other_worker.get("k"), "value")
+
+    def test_soft_expired_entry_is_served_while_another_worker_refreshes(self):
+        self.cache.get_or_set("k", self.produce(), ttl=60, soft_ttl=1)
+        caches["shared"].add("k:refresh", 1)
+        with later(5):
+            self.assertEqual(self.cache.get_or_set("k", self.produce(), ttl=60, soft_ttl=1), "v1")
+        self.assertEqual(self.calls, 1)
+
+    def test_soft_expired_entry_is_refreshed_once(self):
+        self.cache.get_or_set("k", self.produce(), ttl=60, soft_ttl=1)
+        with later(5):
+            self.assertEqual(self.cache.get_or_set("k", self.produce(), ttl=60, soft_ttl=1), "v2")
+        self.assertEqual(self.calls, 2)
+        self.assertIsNone(caches["shared"].get("k:refresh"))
+
+    def test_concurrent_misses_share_one_computation(self):
+        start = threading.Barrier(8)
+        results = []
+
+        def slow():
+            self.calls += 1
+            time.sleep(0.05)
+            return "computed"
+
+        def reader():
+            start.wait()
+            results.append(self.cache.get_or_set("k", slow, ttl=60))
+
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ["computed"] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_producers_may_read_other_keys_and_their_own(self):
+        # Under the old 64-way striped lock these two keys shared a stripe
+        inner = next(f"inner{i}" for i in range(10_000) if hash(f"inner{i}") % 64 == hash("outer") % 64)
+
+        def outer():
+            registry = self.cache.get_or_set(inner, lambda: "registry", ttl=60)
+            again = self.cache.get_or_set("outer", lambda: "recursed", ttl=60)
+            return f"{registry}+{again}"
+
+        results = []
+        worker = threading.Thread(
+            target=lambda: results.append(self.cache.get_or_set("outer", outer, ttl=60)), daemon=True,
+        )
+        worker.start()
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive(), "get_or_set deadlocked on a nested call")
+        self.assertEqual(results, ["registry+recursed"])
+        self.assertEqual(self.cache.get(inner), "registry")
+
+    def test_tag_invalidation_reaches_other_workers(self):
+        self.cache.set("k", "old", 60, tags=("party",))
+        other_worker = TieredCache(tag_check_interval=0)
+        self.assertEqual(other_worker.get("k"), "old")
+        self.cache.invalidate_tags("party")
+        self.assertIsNone(self.cache.get("k"))
+        self.assertIsNone(other_worker.get("k"))
+
+    def test_evicted_tag_version_retires_its_entries(self):
+        self.cache.set("k", "old", 60, tags=("location",))
+        caches["shared"].delete("cache-tag:location")  # culled by a full L2
+        self.cache.l1.clear()
+        other_worker = TieredCache()
+        self.assertIsNone(self.cache.get("k"))
+        self.assertIsNone(other_worker.get("k"))
+        self.assertEqual(self.cache.tag_version("location"), other_worker.tag_version("location"))
+
+    def test_none_is_not_cached(self):
+        self.cache.get_or_set("k", lambda: None, ttl=60)
+        self.assertEqual(self.cache.get("k", "missing"), "missing")
+
+    def test_cached_decorator_keys_on_arguments(self):
+        @cached("square", ttl=60)
+        def square(n):
+            self.calls += 1
+            return n * n
+
+        with mock.patch.object(cache_module, "tiered_cache", self.cache):
+            self.assertEqual([square(3), square(3), square(4)], [9, 9, 16])
+        self.assertEqual(self.calls, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheJsonViewTest(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        tiered_cache.l1.clear()
+        self.calls = 0
+
+        @cache_json_view("test", ttl=60)
+        def view(request, pk):
+            self.calls += 1
+            return JsonResponse({"pk": pk, "call": self.calls})
+
+        self.view = view
+
+    def test_repeat_requests_hit_the_cache(self):
+        first = self.view(RequestFactory().get("/api/1/"), 1)
+        second = self.view(RequestFactory().get("/api/1/"), 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second["Content-Type"], "application/json")
+        self.view(RequestFactory().get("/api/2/"), 2)
+        self.assertEqual(self.calls, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnonymousPageCacheTest(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        tiered_cache.l1.clear()
+        self.renders = 0
+
+        @page_cache.cache_anonymous_page(
+            "test", tags=("party",), fresh_seconds=60, stale_seconds=300,
+        )
+        def view(request):
+            self.renders += 1
+            return HttpResponse(
+                f'<form><input type="hidden" name="csrfmiddlewaretoken" value="tok{self.renders}">'
+                f'render {self.renders}</form>'
+            )
+
+        self.view = view
+
+    def get(self, user=None, cookies=None):
+        request = RequestFactory().get("/home/")
+        request.user = user or AnonymousUser()
+        request.COOKIES.update(cookies or {})
+        return self.view(request)
+
+    def test_anonymous_hits_share_one_render(self):
+        self.assertEqual(self.get()["X-Page-Cache"], "miss")
+        hit = self.get()
+        self.assertEqual(hit["X-Page-Cache"], "hit")
+        self.assertIn(b"render 1", hit.content)
+        self.assertEqual(self.renders, 1)
+
+    def test_hits_get_their_own_csrf_token(self):
+        self.get()
+        hit = self.get()
+        self.assertNotIn(b"tok1", hit.content)
+        self.assertNotIn(page_cache.CSRF_PLACEHOLDER, hit.content)
+        self.assertIn(b'name="csrfmiddlewaretoken" value="', hit.content)
+
+    def test_invalidated_tag_misses(self):
+        self.get()
+        tiered_cache.invalidate_tags("party")
+        self.assertEqual(self.get()["X-Page-Cache"], "miss")
+        self.assertEqual(self.renders, 2)
+
+    def test_stale_page_is_served_while_another_worker_renders(self):
+        self.get()
+        lock = page_cache._page_key("test", RequestFactory().get("/home/")) + ":refresh"
+        caches["shared"].add(lock, 1)
+        with later(120):
+            self.assertEqual(self.get()["X-Page-Cache"], "hit")
+        self.assertEqual(self.renders, 1)
+
+    def test_authenticated_and_flash_message_requests_bypass(self):
+        user = mock.Mock(is_authenticated=True)
+        self.get(user=user)
+        self.get(cookies={"messages": "x"})
+        self.assertEqual(self.renders, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DataVersionTest(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        tiered_cache.l1.clear()
+        data_versions._seen.clear()
+        tiered_cache.set("k", "cached", 60, tags=("location",))
+
+    def other_worker(self):
+        """Forget this worker's view of the versions, as a fresh process would."""
+        data_versions._seen.clear()
+        tiered_cache.l1.clear()
+
+    def test_bump_retires_tagged_entries_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            versions = data_versions.bump("location")
+        self.assertEqual(versions, {"location": 1})
+        self.assertIsNone(tiered_cache.get("k"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(data_versions.bump("location"), {"location": 2})
+
+    def test_poll_picks_up_updates_made_outside_django(self):
+        DataVersion.objects.create(domain="location", version=7)
+        self.assertEqual(data_versions.poll(force=True), {"location": 7})
+        self.assertIsNone(tiered_cache.get("k"))
+
+    def test_poll_is_idempotent_across_workers(self):
+        DataVersion.objects.create(domain="location", version=3)
+        data_versions.poll(force=True)
+        tiered_cache.set("k", "recomputed", 60, tags=("location",))
+        self.other_worker()
+        data_versions.poll(force=True)
+        self.assertEqual(tiered_cache.get("k"), "recomputed")
+
+    def test_poll_is_throttled(self):
+        data_versions.poll(force=True)
+        DataVersion.objects.create(domain="location", version=2)
+        self.assertEqual(data_versions.poll(), {})
+        self.assertEqual(tiered_cache.get("k"), "cached")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        tiered_cache.l1.clear()
+        metrics.registry.reset()
+
+    def view(self, request):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.execute("SELECT 2")
+        tiered_cache.get_or_set("k", lambda: "v", 60)
+        tiered_cache.get_or_set("k", lambda: "v", 60)
+        metrics.current_stats().view = "test:view"  # as process_view does
+        return HttpResponse("ok")
+
+    def test_server_timing_reports_queries_and_cache(self):
+        response = metrics.RequestMetricsMiddleware(self.view)(RequestFactory().get("/"))
+        timing = response["Server-Timing"]
+        self.assertIn('desc="2 queries"', timing)
+        self.assertIn('desc="1 hit / 1 miss"', timing)
+        self.assertIn("view;dur=", timing)
+
+    def test_histograms_merge_across_workers(self):
+        middleware = metrics.RequestMetricsMiddleware(self.view)
+        middleware(RequestFactory().get("/"))
+        metrics.registry.publish()
+        other_worker = metrics.MetricsRegistry()
+        other_worker.worker = "other:1"
+        other_worker.observe("test:view", metrics.RequestStats(), 0.002, 500)
+        views, workers = other_worker.collect()
+        self.assertEqual(workers, 2)
+        self.assertEqual(views["test:view"]["latency_ms"].count, 2)
+        self.assertEqual(views["test:view"]["queries"].sum, 2)
+        self.assertEqual(views["test:view"]["errors"], 1)
+        text = metrics.render_prometheus(views, workers)
+        self.assertIn('amolnama_view_queries_count{view="test:view"} 2', text)
+
+
+class QueryBudgetTest(TestCase):
+    def run_queries(self, *values):
+        with connection.cursor() as cursor:
+            for value in values:
+                cursor.execute("SELECT %s WHERE 1 IN (%s, %s)", [value, value, value])
+
+    def test_sql_shape_ignores_literals_and_in_lists(self):
+        self.assertEqual(
+            sql_shape("SELECT * FROM t WHERE id = 42 AND name = 'x' AND k IN (%s, %s)"),
+            sql_shape("SELECT * FROM t WHERE id = 7 AND name = 'y' AND k IN (%s)"),
+        )
+
+    def test_within_budget(self):
+        with QueryBudget(3) as budget:
+            self.run_queries(1, 2)
+        self.assertEqual(budget.queries, 2)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_raises_on_loops_and_overruns(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, "6x same query"):
+            with QueryBudget(10, max_repeats=5):
+                self.run_queries(*range(6))
+        with self.assertRaisesMessage(QueryBudgetExceeded, "3 queries (budget 2)"):
+            with QueryBudget(2, max_repeats=10):
+                self.run_queries(1, 2, 3)
+
+    def test_violations_are_logged_and_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = Path(tmp) / "budget.jsonl"
+            with override_settings(QUERY_BUDGET_STRICT=False, QUERY_BUDGET_LOG=str(log)):
+                @query_budget(2, max_repeats=3)
+                def view(request):
+                    self.run_queries(*range(5))
+                    return HttpResponse()
+
+                with self.assertLogs("amolnama_news.site_apps.core.query_budget", "WARNING"):
+                    view(RequestFactory().get("/"))
+            record = json.loads(log.read_text())
+            self.assertEqual((record["queries"], record["waste"]), (5, 4))
+            self.assertTrue(record["view"].endswith("view"))
+
+            out = StringIO()
+            call_command("query_budget_report", log=str(log), json=True, stdout=out)
+            self.assertEqual(json.loads(out.getvalue())[0]["waste"], 4)
+
+
+class SlowQueryTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.log = Path(tmp.name) / "slow.jsonl"
+        settings_override = override_settings(
+            SLOW_QUERY_THRESHOLD_MS=0.000001, SLOW_QUERY_LOG=str(self.log),
+            SLOW_QUERY_CAPTURE_PLANS=True,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(self.reset_store)
+        self.reset_store()
+        slow_queries._last_plan.clear()
+        slow_queries.install(connection)
+
+    def reset_store(self):
+        if slow_queries._store is not None:
+            for handler in slow_queries._store.handlers:
+                handler.close()
+        slow_queries._store = None
+
+    def test_slow_statements_are_logged_with_plan(self):
+        DataVersion.objects.filter(domain="party").count()
+        record = json.loads(self.log.read_text().splitlines()[-1])
+        self.assertIn("core_dataversion", record["sql"])
+        self.assertIn("'party'", record["params"])
+        self.assertIn("core_dataversion", record["plan"])
+
+    def test_install_is_idempotent(self):
+        slow_queries.install(connection)
+        recorders = [w for w in connection.execute_wrappers if isinstance(w, slow_queries.SlowQueryRecorder)]
+        self.assertEqual(len(recorders), 1)
+
+    def test_report_ranks_shapes(self):
+        for domain in ("a", "b", "c"):
+            DataVersion.objects.filter(domain=domain).exists()
+        out = StringIO()
+        call_command("slow_query_report", json=True, stdout=out)
+        row, = [r for r in json.loads(out.getvalue()) if "core_dataversion" in r["shape"]]
+        self.assertEqual(row["count"], 3)
+        self.assertTrue(row["has_plan"])
+
+
+class FakeOdbcConnection:
+    """pyodbc without MARS: no second cursor while a result set is pending."""
+
+    def __init__(self, pending=False):
+        self.pending = pending
+        self.closed = False
+        self.executed = []
+
+    def cursor(self):
+        if self.pending:
+            raise RuntimeError("Connection is busy with results for another hstmt")
+        return FakeOdbcCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOdbcCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, *params):
+        self.conn.executed.append((sql, params))
+
+    def fetchall(self):
+        return [("<ShowPlanXML/>",)]
+
+    def nextset(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class CapturePlanTest(SimpleTestCase):
+    def mssql(self, side, **extra):
+        busy = FakeOdbcConnection(pending=True)
+        return busy, mock.Mock(
+            spec=["vendor", "connection", "get_new_connection", "get_connection_params", *extra],
+            vendor="microsoft", connection=busy, get_new_connection=mock.Mock(return_value=side),
+            get_connection_params=mock.Mock(return_value={}), **extra,
+        )
+
+    def test_plan_is_read_on_its_own_connection_while_results_are_pending(self):
+        side = FakeOdbcConnection()
+        busy, wrapper = self.mssql(side)
+        plan = slow_queries.capture_plan(wrapper, "SELECT * FROM t WHERE id = %s", [7])
+        self.assertEqual(plan, "<ShowPlanXML/>")
+        self.assertEqual(side.executed, [
+            ("SET SHOWPLAN_XML ON", ()), ("SELECT * FROM t WHERE id = ?", (7,)), ("SET SHOWPLAN_XML OFF", ()),
+        ])
+        self.assertTrue(side.closed)
+        self.assertEqual(busy.executed, [])
+
+    def test_pooled_backend_gets_its_plan_connection_back(self):
+        pool = ConnectionPool(max_size=2)
+        side = pool.acquire(FakeOdbcConnection)
+        _, wrapper = self.mssql(side, pool=pool)
+        slow_queries.capture_plan(wrapper, "SELECT 1", None)
+        self.assertFalse(side.closed)
+        self.assertEqual((pool.stats()["in_use"], pool.stats()["idle"]), (0, 1))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(max_size=2, timeout=0.05, health_check_after=60)
+
+    def test_released_connections_are_reused_after_rollback(self):
+        conn = self.pool.acquire(FakeConnection)
+        self.pool.release(conn)
+        self.assertIs(self.pool.acquire(FakeConnection), conn)
+        self.assertEqual(conn.rollbacks, 1)
+        stats = self.pool.stats()
+        self.assertEqual((stats["created"], stats["reused"], stats["in_use"]), (1, 1, 1))
+
+    def test_exhausted_pool_waits_then_raises(self):
+        self.pool.acquire(FakeConnection)
+        held = self.pool.acquire(FakeConnection)
+        threading.Timer(0.01, self.pool.release, [held]).start()
+        self.assertIs(self.pool.acquire(FakeConnection), held)
+        with self.assertRaises(PoolExhausted):
+            self.pool.acquire(FakeConnection)
+        self.assertEqual(self.pool.stats()["exhausted"], 1)
+        self.assertEqual(self.pool.stats()["waits"], 2)
+
+    def test_failed_health_check_replaces_connection(self):
+        pool = ConnectionPool(max_size=1, health_check_after=0, ping=lambda conn: False)
+        stale = pool.acquire(FakeConnection)
+        pool.release(stale)
+        fresh = pool.acquire(FakeConnection)
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.closed)
+        self.assertEqual(pool.stats()["health_check_failures"], 1)
+
+    def test_old_and_broken_connections_are_closed_on_release(self):
+        pool = ConnectionPool(max_size=2, max_lifetime=0)
+        old = pool.acquire(FakeConnection)
+        pool.release(old)
+        self.assertTrue(old.closed)
+        broken = self.pool.acquire(FakeConnection)
+        self.pool.release(broken, discard=True)
+        self.assertTrue(broken.closed)
+        self.assertEqual(self.pool.stats()["size"], 0)
+
+
+@mock.patch.object(db_router, "replica_alias", return_value="replica")
+@mock.patch.object(db_router.replica_health, "healthy", return_value=True)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        from amolnama_news.site_apps.evaluation_vote.models import AppGetPartyDetails, EvaluationResponse
+        from amolnama_news.site_apps.locations.models import Address, District
+        self.router = db_router.ReplicaRouter()
+        self.District, self.Address = District, Address
+        self.PartyView, self.Response = AppGetPartyDetails, EvaluationResponse
+
+    def serve(self, view, method="get", cookies=None):
+        request = getattr(RequestFactory(), method)("/")
+        request.COOKIES.update(cookies or {})
+        return db_router.ReplicaPinMiddleware(view)(request)
+
+    def test_reference_data_and_views_read_from_replica(self, *mocks):
+        self.assertEqual(self.router.db_for_read(self.District), "replica")
+        self.assertEqual(self.router.db_for_read(self.PartyView), "replica")
+        self.assertEqual(self.router.db_for_read(self.Address), "default")
+        self.assertEqual(self.router.db_for_read(self.Response), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "locations"))
+
+    def test_write_pins_rest_of_request_and_sets_cookie(self, *mocks):
+        reads = []
+
+        def view(request):
+            reads.append(self.router.db_for_read(self.District))
+            self.router.db_for_write(self.Response)
+            reads.append(self.router.db_for_read(self.District))
+            return HttpResponse()
+
+        response = self.serve(view)
+        self.assertEqual(reads, ["replica", "default"])
+        self.assertIn(db_router.PIN_COOKIE, response.cookies)
+
+    def test_pinned_browser_and_posts_read_from_primary(self, *mocks):
+        def view(request):
+            return HttpResponse(self.router.db_for_read(self.District))
+
+        self.assertEqual(self.serve(view, cookies={db_router.PIN_COOKIE: "1"}).content, b"default")
+        self.assertEqual(self.serve(view, method="post").content, b"default")
+        self.assertNotIn(db_router.PIN_COOKIE, self.serve(view).cookies)
+
+    def test_unhealthy_replica_falls_back_to_primary(self, healthy, alias):
+        healthy.return_value = False
+        self.assertEqual(self.router.db_for_read(self.District), "default")
+
+
+class ReplicaHealthTest(TestCase):
+    def test_replica_behind_on_data_versions_is_unhealthy(self):
+        DataVersion.objects.create(domain="location", version=2)
+        health = db_router.ReplicaHealth()
+        self.assertTrue(health._check("default"))  # same database: in sync
+
+        stale = mock.Mock(**{"values_list.return_value": [("location", 1)]})
+        using = DataVersion.objects.using
+        with mock.patch.object(
+            DataVersion.objects, "using", side_effect=lambda alias: stale if alias == "replica" else using(alias),
+        ), self.assertLogs("amolnama_news.site_apps.core.db_router", "WARNING"):
+            self.assertFalse(health._check("replica"))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, JSON_STREAM_MIN_ROWS=3, JSON_STREAM_CHUNK=2)
+class JsonResponseTest(SimpleTestCase):
+    rows = [{"id": i, "name_bn": f"নাম {i}", "lat": Decimal("23.5")} for i in range(5)]
+
+    def test_payload_matches_the_stdlib_encoder(self):
+        data = {"tags": self.rows[:2], "when": datetime(2026, 1, 2, tzinfo=dt_timezone.utc)}
+        response = json_response.json_response(RequestFactory().get("/api/"), data)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(response.content), json.loads(JsonResponse(data).content))
+
+    @override_settings(JSON_STREAM_MIN_ROWS=10)
+    def test_columnar_on_request(self):
+        request = RequestFactory().get("/api/", {"format": "columnar"})
+        response = json_response.json_response(request, {"tags": self.rows[:2], "total": 2})
+        self.assertEqual(json.loads(response.content), {
+            "tags": {"cols": ["id", "name_bn", "lat"], "rows": [[0, "নাম 0", "23.5"], [1, "নাম 1", "23.5"]]},
+            "total": 2,
+        })
+        self.assertEqual(json_response.columnar([{"a": 1}, {"b": 2}]),
+                         {"cols": ["a", "b"], "rows": [[1, None], [None, 2]]})
+
+    def test_long_lists_are_streamed(self):
+        for params in ({}, {"format": "columnar"}):
+            response = json_response.json_response(RequestFactory().get("/api/", params), {"tags": self.rows})
+            self.assertTrue(response.streaming)
+            content = json.loads(b"".join(response.streaming_content))
+            tags = content["tags"]["rows"] if params else content["tags"]
+            self.assertEqual(len(tags), 5)
+
+    def test_cache_json_view_caches_streamed_responses(self):
+        tiered_cache.l1.clear()
+        caches["shared"].clear()
+        calls = []
+
+        @cache_json_view("test_stream", ttl=60)
+        def view(request):
+            calls.append(1)
+            return json_response.json_response(request, {"tags": self.rows})
+
+        first = view(RequestFactory().get("/api/stream/"))
+        second = view(RequestFactory().get("/api/stream/"))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(len(json.loads(second.content)["tags"]), 5)
+        self.assertEqual(len(calls), 1)
+
+
+class AsyncViewsTest(SimpleTestCase):
+    def test_async_view_runs_on_the_pool_inside_the_request(self):
+        def view(request):
+            stats = metrics.current_stats()
+            return HttpResponse(f"{threading.current_thread().name} {stats is not None}")
+
+        middleware = db_router.ReplicaPinMiddleware(
+            metrics.RequestMetricsMiddleware(async_views.async_view(view))
+        )
+        response = asyncio.run(middleware(RequestFactory().get("/api/")))
+        thread, saw_stats = response.content.decode().split()
+        self.assertTrue(thread.startswith("async-db"))
+        self.assertEqual(saw_stats, "True")
+        self.assertIn("Server-Timing", response)
+
+    def test_asgi_view_picks_the_variant_by_deployment(self):
+        def view(request):
+            return HttpResponse("sync")
+
+        wrapped = async_views.asgi_view(view)
+        self.assertIs(wrapped, view)
+        self.assertTrue(asyncio.iscoroutinefunction(view.async_view))
+        with override_settings(SERVE_ASGI=True):
+            served = async_views.asgi_view(lambda request: HttpResponse("sync"))
+        self.assertTrue(asyncio.iscoroutinefunction(served))
+        self.assertEqual(asyncio.run(served(RequestFactory().get("/"))).content, b"sync")
+
+
+class PreforkTest(SimpleTestCase):
+    def test_failed_warmer_does_not_stop_the_master(self):
+        def broken():
+            raise RuntimeError("database down")
+
+        domains = {"broken": broken, "ok": lambda: 3}
+        with mock.patch.dict(warmup.DOMAINS, domains, clear=True), \
+                override_settings(WARMUP_ON_BOOT=["broken", "ok"]), \
+                mock.patch.object(prefork.gc, "freeze") as freeze, \
+                self.assertLogs("amolnama_news.site_apps.core.prefork", "INFO") as logs:
+            prefork.prepare_master()
+        output = "\n".join(logs.output)
+        self.assertIn("warm-up of broken failed", output)
+        self.assertIn("Warmed ok: 3 entries", output)
+        freeze.assert_called_once()
+
+    def test_master_forks_with_no_pooled_connection_open(self):
+        pool = db_pool.pool_for("prefork-test")
+        self.addCleanup(db_pool._pools.pop, "prefork-test", None)
+        conn = FakeConnection()
+        pool.release(pool.acquire(lambda: conn))  # what close_all() does with a pooled connection
+
+        def freeze():
+            self.assertEqual(pool.stats()["idle"], 0)
+            self.assertTrue(conn.closed)
+
+        with override_settings(WARMUP_ON_BOOT=[]), \
+                mock.patch.object(prefork.gc, "freeze", side_effect=freeze) as frozen, \
+                self.assertLogs("amolnama_news.site_apps.core.prefork", "INFO"):
+            prefork.prepare_master()
+        frozen.assert_called_once()
+
+
+class WarmCachesCommandTest(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        tiered_cache.l1.clear()
+
+    def test_reports_timing_per_domain(self):
+        domains = {"locations": lambda: 12, "parties": lambda: 4}
+        out = StringIO()
+        with mock.patch.dict(warmup.DOMAINS, domains, clear=True):
+            call_command("warm_caches", "parties", json=True, stdout=out)
+        rows = json.loads(out.getvalue())
+        self.assertEqual([(r["domain"], r["entries"], r["error"]) for r in rows], [("parties", 4, None)])
+        self.assertGreaterEqual(rows[0]["ms"], 0)
+
+    def test_failures_and_unknown_domains_are_errors(self):
+        def broken():
+            raise RuntimeError("database down")
+
+        with mock.patch.dict(warmup.DOMAINS, {"broken": broken, "ok": lambda: 1}, clear=True):
+            with self.assertRaisesMessage(CommandError, "Warm-up failed for: broken"), \
+                    self.assertLogs("amolnama_news.site_apps.core.warmup", "WARNING"):
+                call_command("warm_caches", stdout=StringIO())
+            with self.assertRaisesMessage(CommandError, "Unknown warm-up domain(s): nope"):
+                call_command("warm_caches", "nope", stdout=StringIO())
+
+    def test_views_are_warmed_through_their_cache(self):
+        with mock.patch("amolnama_news.site_apps.evaluation_vote.views.party_registry") as registry:
+            registry.all.return_value = []
+            self.assertTrue(warmup._get("evaluation_vote:get_parties"))
+            response = self.client.get(reverse("evaluation_vote:get_parties"))
+        self.assertEqual(response.json(), {"parties": []})
+        registry.all.assert_called_once()  # the real request was a cache hit
+
+
+class PhoneticSearchTest(SimpleTestCase):
+    NAMES = [
+        ("নির্বাচন", "Election"),
+        ("বরিশাল", "Barisal"),
+        ("কক্সবাজার", "Cox's Bazar"),
+        ("সন্ত্রাসী হামলা", "Terrorist Attack"),
+        ("ঢাকা উত্তর সিটি কর্পোরেশন", "Dhaka North City Corporation"),
+        ("ঢাকা", "Dhaka"),
+    ]
+
+    def setUp(self):
+        records = [{"id": i, "name_bn": bn, "name_en": en} for i, (bn, en) in enumerate(self.NAMES)]
+        self.index = PhoneticIndex(records, lambda r: [r["name_bn"], r["name_en"]])
+
+    def ids(self, query, **kwargs):
+        return [r["id"] for r in self.index.search(query, **kwargs)]
+
+    def test_bengali_and_latin_spellings_share_a_key(self):
+        for spellings in (
+            ("নির্বাচন", "nirbachon", "nirbachan"),
+            ("বরিশাল", "borishal", "Barisal"),
+            ("ঢাকা", "dhaka"),
+            ("সন্ত্রাসী হামলা", "sontrasi hamla"),
+            ("বিশ্ববিদ্যালয়", "bishwobiddaloy"),
+            ("শিক্ষা", "shikkha"),
+            ("সিলেট", "Sylhet"),
+        ):
+            keys = {transliterate.phonetic_key(s) for s in spellings}
+            self.assertEqual(len(keys), 1, spellings)
+        self.assertEqual(transliterate.phonetic_key("নির্বাচন"), "nrbcn")
+
+    def test_search_matches_prefixes_of_every_word(self):
+        self.assertEqual(self.ids("nirbach"), [0])
+        self.assertEqual(self.ids("sontras"), [3])
+        self.assertEqual(self.ids("dhaka uttor"), [4])
+        self.assertEqual(self.ids("coxs bazar"), [2])  # one word in Bengali
+        self.assertEqual(self.ids("xyz"), [])
+        self.assertEqual(self.ids(""), [])
+
+    def test_exact_and_literal_matches_rank_first(self):
+        self.assertEqual(self.ids("dhaka"), [5, 4])
+        self.assertEqual(self.ids("ঢাকা", limit=1), [5])
+        self.assertEqual(self.ids("dhaka", where=lambda r: r["id"] != 5), [4])
+
+    def test_substring_option_matches_inside_words(self):
+        self.assertEqual(self.ids("azar"), [])
+        index = PhoneticIndex(self.index.records, lambda r: [r["name_en"]], substring=True)
+        self.assertEqual([r["id"] for r in index.search("azar")], [2])
+
+
+class StartupProfileTest(SimpleTestCase):
+    IMPORTTIME = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       200 |        200 |     urllib3",
+        "import time:       100 |        300 |   requests",
+        "import time:        50 |        350 | amolnama_news.site_apps.demo",
+        "import time:        10 |         10 | rest_framework",
+    ]
+
+    def test_parse_importtime_links_each_module_to_its_importer(self):
+        modules = {m["module"]: m for m in parse_importtime(self.IMPORTTIME)}
+        self.assertEqual(modules["urllib3"]["parent"], "requests")
+        self.assertEqual(modules["requests"]["parent"], "amolnama_news.site_apps.demo")
+        self.assertIsNone(modules["rest_framework"]["parent"])
+        self.assertEqual(modules["amolnama_news.site_apps.demo"]["cumulative_ms"], 0.35)
+
+        report = summarize_imports(parse_importtime(self.IMPORTTIME))
+        packages = {row["package"]: row for row in report["packages"]}
+        self.assertEqual(packages["requests"]["imported_by"], "amolnama_news.site_apps.demo")
+        self.assertEqual(report["packages"][0]["package"], "urllib3")
+        self.assertEqual(report["own_modules"][0]["module"], "amolnama_news.site_apps.demo")
+
+    def test_command_profiles_a_fresh_interpreter(self):
+        out = StringIO()
+        call_command("profile_startup", no_urls=True, json=True, top=5, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertIn("setup", report["phases_ms"])
+        self.assertIn("django", [row["package"] for row in report["packages"]])
+
+    def test_lazy_view_imports_its_target_on_first_request(self):
+        view = lazy_view("django.views.generic.base.RedirectView", csrf_exempt=True, url="/elsewhere/")
+        self.assertTrue(view.csrf_exempt)
+        response = view(RequestFactory().get("/"))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], "/elsewhere/")
+
+    def test_token_api_routes_are_lazy(self):
+        match = resolve(reverse("api-login"))
+        self.assertEqual(match.func.lazy_target, "amolnama_news.site_apps.user_account.api.views.LoginView")
+        self.assertTrue(match.func.csrf_exempt)
+
+
+class AssetBundleTest(SimpleTestCase):
+    BUNDLE = "newshub/assets/js/news-collection.bundle.js"
+
+    def setUp(self):
+        build_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(build_dir.cleanup)
+        self.settings_override = override_settings(ASSET_BUILD_DIR=Path(build_dir.name))
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_finder_builds_the_bundle_from_its_sources_in_order(self):
+        finder = assets.BundleFinder()
+        built = finder.find(self.BUNDLE)
+        self.assertEqual([path for path, _ in finder.list([])], [self.BUNDLE])
+        content = Path(built).read_text(encoding="utf-8")
+        parts = [
+            assets.minify_js(Path(assets.find_source(path)).read_text(encoding="utf-8"))
+            for path in settings.ASSET_BUNDLES[self.BUNDLE]
+        ]
+        self.assertEqual(content, ";\n".join(parts) + ";\n")
+        self.assertFalse(content.startswith("/*"))  # header comments are dropped
+        self.assertIsNone(finder.find("newshub/assets/js/components/news-auto-tag.js"))
+
+    def test_missing_source_fails_the_system_check(self):
+        with override_settings(ASSET_BUNDLES={"x.bundle.js": ["nowhere/missing.js"]}):
+            errors = assets.BundleFinder().check()
+        self.assertEqual([e.id for e in errors], ["core.E001"])
+
+    def test_template_tags_switch_between_bundle_and_sources(self):
+        page = Template('{% load assets %}{% bundle_preload b %}{% bundle_scripts b %}')
+        with override_settings(ASSET_BUNDLES_ENABLED=True):
+            html = page.render(Context({"b": self.BUNDLE}))
+        self.assertIn('<link rel="preload" href="/static/%s" as="script">' % self.BUNDLE, html)
+        self.assertEqual(html.count("<script"), 1)
+        with override_settings(ASSET_BUNDLES_ENABLED=False):
+            html = page.render(Context({"b": self.BUNDLE}))
+        self.assertNotIn("preload", html)
+        self.assertEqual(html.count("<script"), len(settings.ASSET_BUNDLES[self.BUNDLE]))
+
+
+class BenchmarkWorkersTest(LiveServerTestCase):
+    def test_benchmarks_a_running_server(self):
+        out = StringIO()
+        call_command(
+            "benchmark_workers", url=self.live_server_url, paths=["/metrics/?format=json"],
+            duration=0.3, warmup=0, concurrency=2, json=True, stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertGreater(report["runs"][0]["count"], 0)
+        self.assertIsNone(report["recommended_workers"])
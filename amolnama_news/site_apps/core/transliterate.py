@@ -0,0 +1,146 @@
+"""
+Bengali <-> Latin phonetic keys for search.
+
+Reporters type Bengali words in Latin letters the way they sound, with no
+agreed spelling: "nirbachon" or "nirbachan" for নির্বাচন, "borishal" or
+"Barisal" for বরিশাল. ``phonetic_key`` maps text in either script onto one
+deliberately coarse Latin skeleton, so all of those meet on one key:
+
+    phonetic_key("নির্বাচন") == phonetic_key("nirbachon") == "nrbcn"
+    phonetic_key("ঢাকা")     == phonetic_key("Dhaka")     == "dk"
+
+Two steps:
+
+1. ``romanize`` spells Bengali letters in Latin: consonants by sound, vowel
+   signs as vowels. The unwritten inherent vowel is not added, ক্ষ reads
+   "kh", and a ব-/য-ফলা becomes "w"/"y" (it doubles the consonant before
+   it rather than sounding as b/j).
+2. The Latin spelling is folded per word: aspirates and sound-alikes merge
+   (kh->k, bh/v->b, sh->s, ph->f, z->j, c->k, ...), an "h" straight after
+   a consonant goes, every vowel (and y/w) is dropped except that a word
+   starting with one keeps a single "a", and doubled letters collapse.
+
+Keys only find candidates; core.phonetic_search ranks them. Latin ->
+Bengali spelling for the profile form stays in the browser
+(user_account/assets/js/transliterate.js).
+"""
+import re
+import unicodedata
+
+# ========== Bengali -> Latin ==========
+
+_VIRAMA = "\u09cd"
+
+# Checked before single letters; ড়/ঢ়/য় also arrive as letter + nukta
+_BENGALI_SEQUENCES = (
+    ("ক্ষ", "kh"),
+    ("জ্ঞ", "gg"),
+    ("\u09a1\u09bc", "r"),
+    ("\u09a2\u09bc", "rh"),
+    ("\u09af\u09bc", "y"),
+)
+
+# ব-/য-ফলা: virama + ব/য after any consonant but র (that is a reph: র্ব, র্য
+# are b, j) and, for ব, ম (ম্ব is mb)
+_PHALA = {"ব": ("w", "রম"), "য": ("y", "র")}
+
+_BENGALI_LETTERS = {
+    # independent vowels
+    "অ": "o", "আ": "a", "ই": "i", "ঈ": "i", "উ": "u", "ঊ": "u", "ঋ": "ri",
+    "এ": "e", "ঐ": "oi", "ও": "o", "ঔ": "ou",
+    # vowel signs
+    "া": "a", "ি": "i", "ী": "i", "ু": "u", "ূ": "u", "ৃ": "ri",
+    "ে": "e", "ৈ": "oi", "ো": "o", "ৌ": "ou",
+    # consonants
+    "ক": "k", "খ": "kh", "গ": "g", "ঘ": "gh", "ঙ": "ng",
+    "চ": "ch", "ছ": "chh", "জ": "j", "ঝ": "jh", "ঞ": "n",
+    "ট": "t", "ঠ": "th", "ড": "d", "ঢ": "dh", "ণ": "n",
+    "ত": "t", "থ": "th", "দ": "d", "ধ": "dh", "ন": "n",
+    "প": "p", "ফ": "ph", "ব": "b", "ভ": "bh", "ম": "m",
+    "য": "j", "র": "r", "ল": "l", "শ": "sh", "ষ": "sh", "স": "s", "হ": "h",
+    "ড়": "r", "ঢ়": "rh", "য়": "y", "ৎ": "t",
+    # anusvara, visarga; chandrabindu, virama, nukta, ZWNJ, ZWJ are silent
+    "ং": "ng", "ঃ": "h",
+    "\u0981": "", _VIRAMA: "", "\u09bc": "", "\u200c": "", "\u200d": "",
+    # digits
+    "০": "0", "১": "1", "২": "2", "৩": "3", "৪": "4",
+    "৫": "5", "৬": "6", "৭": "7", "৮": "8", "৯": "9",
+}
+
+
+def _is_bengali(ch):
+    return "\u0980" <= ch <= "\u09ff"
+
+
+def romanize(text):
+    """Bengali letters in ``text`` spelled in Latin; anything else is kept."""
+    out = []
+    i = 0
+    while i < len(text):
+        phala = _PHALA.get(text[i + 1]) if text[i] == _VIRAMA and i + 1 < len(text) else None
+        if phala and i and text[i - 1] not in phala[1]:
+            out.append(phala[0])
+            i += 2
+            continue
+        for sequence, latin in _BENGALI_SEQUENCES:
+            if text.startswith(sequence, i):
+                out.append(latin)
+                i += len(sequence)
+                break
+        else:
+            ch = text[i]
+            out.append(_BENGALI_LETTERS.get(ch, ch) if _is_bengali(ch) else ch)
+            i += 1
+    return "".join(out)
+
+
+# ========== Latin -> key ==========
+
+# Longest first; applied left to right over each word
+_FOLDS = (
+    ("chh", "c"), ("ch", "c"), ("kh", "k"), ("gh", "g"), ("jh", "j"),
+    ("th", "t"), ("dh", "d"), ("ph", "f"), ("bh", "b"), ("sh", "s"),
+    ("rh", "r"), ("ck", "k"),
+    ("q", "k"), ("z", "j"), ("v", "b"), ("x", "ks"), ("c", "k"),
+)
+_FOLD_RE = re.compile("|".join(re.escape(src) for src, _ in _FOLDS))
+_FOLD_MAP = dict(_FOLDS)
+
+_VOWELS = frozenset("aeiouyw")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _latin_words(text):
+    # Accents off (é -> e), apostrophes joined ("cox's" -> "coxs")
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD_RE.findall(text.replace("'", "").replace("’", ""))
+
+
+def _word_key(word):
+    word = _FOLD_RE.sub(lambda m: _FOLD_MAP[m.group()], word)
+    key = []
+    for i, ch in enumerate(word):
+        if ch in _VOWELS:
+            if i == 0:
+                key.append("a")
+            continue
+        # Aspiration a fold did not catch: "Sylhet" -> s, l, t
+        if ch == "h" and i and word[i - 1] not in _VOWELS and not word[i - 1].isdigit():
+            continue
+        if not key or key[-1] != ch:
+            key.append(ch)
+    return "".join(key)
+
+
+def word_keys(text):
+    """Phonetic key of every word in ``text`` (Bengali or Latin), in order."""
+    if not text:
+        return []
+    keys = (_word_key(word) for word in _latin_words(romanize(text)))
+    return [key for key in keys if key]
+
+
+def phonetic_key(text):
+    """One key for the whole of ``text``: its word keys joined by spaces."""
+    return " ".join(word_keys(text))
@@ -17,4 +17,7 @@ urlpatterns = [
     path("about/", views.about, name="about"),
     path("contact/", views.contact, name="contact"),
     path("communityvoice/", views.communityvoice, name="communityvoice"),
+
+    # Request metrics (Prometheus text, or ?format=json)
+    path("metrics/", views.metrics, name="metrics"),
 ]
@@ -1,4 +1,8 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render
+
+from . import metrics as request_metrics
 from .models import Article
 
 
@@ -37,3 +41,27 @@ def communityvoice(request):
     return render(request, "core/communityvoice.html")
 
 
+def metrics(request):
+    """Per-view request metrics merged across this host's workers."""
+    allowed_ips = getattr(settings, "METRICS_ALLOWED_IPS", ["127.0.0.1", "::1"])
+    if request.META.get("REMOTE_ADDR") not in allowed_ips and not request.user.is_staff:
+        return HttpResponseForbidden()
+
+    views, workers = request_metrics.registry.collect()
+    gauges = request_metrics.registry.collect_gauges()
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "workers": workers,
+            "gauges": gauges,
+            "views": {
+                name: {
+                    key: value.as_dict() if isinstance(value, request_metrics.Histogram) else value
+                    for key, value in data.items()
+                }
+                for name, data in views.items()
+            },
+        })
+    return HttpResponse(
+        request_metrics.render_prometheus(views, workers, gauges),
+        content_type="text/plain; version=0.0.4",
+    )
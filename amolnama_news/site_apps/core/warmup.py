@@ -0,0 +1,158 @@
+"""
+Cache warm-up: fill the tiered cache (core.cache) before traffic does.
+
+After a deploy or a cache flush, the first visitors to every cascade
+dropdown, tag picker and results page pay for the SQL Server round trips
+that fill the cache. ``run`` pays them up front, one domain at a time:
+
+    locations      every cached location-cascade API response (divisions,
+                   districts, constituencies, upazilas, unions; both the
+                   evaluation_vote and newshub flavours)
+    tags           the news category/tag registries and the content-matching
+                   index (tags plus locations)
+    parties        the party details registry and its API
+    search         the phonetic search indexes of categories, tags,
+                   locations and organisations (newshub.search)
+    past_results   the drill-through cubes of every closed election
+
+API responses are warmed by calling the views themselves, so the cache
+keys, payloads and tags are exactly the ones real requests use.
+
+Entry points:
+
+* ``manage.py warm_caches [domain ...]`` fills the shared L2 cache from a
+  deploy step or cron, and prints what each domain cost;
+* the gunicorn master warms WARMUP_ON_BOOT before forking, so workers
+  inherit L1 and find L2 full (core.prefork);
+* every worker warms WARMUP_AFTER_FORK once it has loaded the app. Those
+  are read from L2, so they only cost a cache round trip each.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+# name -> callable returning the number of entries warmed, in run order
+DOMAINS = {}
+
+
+def domain(name):
+    def decorator(func):
+        DOMAINS[name] = func
+        return func
+    return decorator
+
+
+def _get(view_name, *args):
+    """GET a cached API view in-process; True when it answered 200."""
+    path = reverse(view_name, args=args)
+    match = resolve(path)
+    # Under ASGI the URLconf holds the async variant; warm through the sync view
+    view = getattr(match.func, "sync_view", match.func)
+    response = view(RequestFactory().get(path), *match.args, **match.kwargs)
+    return response.status_code == 200
+
+
+def _get_all(calls):
+    return sum(_get(view_name, *args) for view_name, *args in calls)
+
+
+# ========== Domains ==========
+
+@domain("locations")
+def warm_locations():
+    from amolnama_news.site_apps.locations.models import District, Division, Upazila
+
+    division_ids = list(Division.objects.filter(is_active=True).values_list("division_id", flat=True))
+    district_ids = list(District.objects.filter(is_active=True).values_list("district_id", flat=True))
+    upazila_ids = list(Upazila.objects.filter(is_active=True).values_list("upazila_id", flat=True))
+
+    calls = [("evaluation_vote:get_divisions",), ("newshub:api_locations_all",)]
+    calls += [("evaluation_vote:get_districts", pk) for pk in division_ids]
+    for pk in district_ids:
+        calls += [
+            ("evaluation_vote:get_constituencies", pk),
+            ("evaluation_vote:get_upazilas", pk),
+            ("newshub:api_constituencies_by_district", pk),
+            ("newshub:api_upazilas_by_district", pk),
+            ("newshub:api_subdistricts_by_district", pk),
+        ]
+    for pk in upazila_ids:
+        calls += [
+            ("evaluation_vote:get_union_parishads", pk),
+            ("newshub:api_union_parishads_by_upazila", pk),
+        ]
+    return _get_all(calls)
+
+
+@domain("tags")
+def warm_tags():
+    from amolnama_news.site_apps.newshub.models import VwAppNewsCategoryTag
+
+    category_ids = (
+        VwAppNewsCategoryTag.objects.values_list("news_category_id", flat=True)
+        .distinct().order_by("news_category_id")
+    )
+    calls = [("newshub:api_news_category_tags_all",), ("newshub:api_match_index",)]
+    calls += [("newshub:api_news_category_tags_by_category", pk) for pk in category_ids]
+    return _get_all(calls)
+
+
+@domain("parties")
+def warm_parties():
+    from amolnama_news.site_apps.evaluation_vote.party_registry import party_registry
+
+    return len(party_registry.all()) + _get("evaluation_vote:get_parties")
+
+
+@domain("search")
+def warm_search():
+    from amolnama_news.site_apps.newshub.search import INDEXES
+
+    return sum(len(index.index()) for index in INDEXES)
+
+
+@domain("past_results")
+def warm_past_results():
+    from amolnama_news.site_apps.election_vote.past_results import past_elections, past_results_cube
+
+    elections = past_elections()
+    for election in elections:
+        past_results_cube(election["election_evaluation_id"])
+    return len(elections)
+
+
+# ========== Runner ==========
+
+def run(names=None, log=logger):
+    """Warm the named domains (default: all) and return one timing row each.
+
+    A failing domain is logged and reported, never raised: a cold cache
+    only costs latency, so it must not keep a worker from starting.
+    """
+    names = list(DOMAINS) if names is None else list(names)
+    unknown = [name for name in names if name not in DOMAINS]
+    if unknown:
+        raise ValueError(f"Unknown warm-up domain(s): {', '.join(unknown)}")
+
+    rows = []
+    # Cached API responses are keyed per language; warm the default one
+    with translation.override(settings.LANGUAGE_CODE):
+        for name in names:
+            started = time.perf_counter()
+            row = {"domain": name, "entries": 0, "error": None}
+            try:
+                row["entries"] = DOMAINS[name]()
+            except Exception as exc:
+                log.warning("Cache warm-up of %s failed", name, exc_info=True)
+                row["error"] = str(exc) or exc.__class__.__name__
+            row["ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if row["error"] is None:
+                log.info("Warmed %s: %d entries in %.0f ms", name, row["entries"], row["ms"])
+            rows.append(row)
+    return rows
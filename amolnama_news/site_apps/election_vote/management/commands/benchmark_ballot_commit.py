@@ -0,0 +1,212 @@
+"""
+Throughput benchmark for the cast_vote ballot write.
+
+Compares the original four-statement write (INSERT registry book, INSERT
+ballot with NULL timestamp, INSERT vote entry, UPDATE to harden the ballot)
+with ``services.commit_ballot``. The time spent inside ``transaction.atomic()``
+is what each voter holds locks on ``digital_ballot`` for, so that is what
+the latency columns measure.
+
+By default every ballot is rolled back, so the command is safe to point at
+a shared database. On the sqlite fallback pass ``--create-tables``.
+
+    python manage.py benchmark_ballot_commit --ballots 500 --concurrency 8
+"""
+import os
+import random
+import string
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections, transaction
+from django.utils import timezone
+
+from amolnama_news.site_apps.core.benchmarking import ensure_tables, summarize
+from amolnama_news.site_apps.election_vote.models import (
+    DigitalBallot,
+    DigitalBallotRegistryBook,
+    DigitalBallotVoteEntry,
+)
+from amolnama_news.site_apps.election_vote.services import commit_ballot
+
+
+class _Rollback(Exception):
+    """Raised inside atomic() to discard a benchmark ballot."""
+
+
+def _legacy_commit(kwargs):
+    """The pre-batch write path: three INSERTs plus a hardening UPDATE."""
+    now = kwargs["now"]
+    bot = kwargs["bot_detection"]
+    registry = DigitalBallotRegistryBook.objects.create(
+        link_election_evaluation_id=kwargs["election_evaluation_id"],
+        link_user_profile_id=kwargs["user_profile_id"],
+        hash_identity_anchor_binary=kwargs["identity_hash"],
+        mobile_sim_slot_number=0,
+        created_at=now,
+        modified_at=now,
+    )
+    ballot = DigitalBallot.objects.create(
+        link_digital_ballot_registry_book_id=registry.digital_ballot_registry_book_id,
+        link_election_id=kwargs["election_id"],
+        link_election_evaluation_id=kwargs["election_evaluation_id"],
+        ballot_voter_audit_receipt_code=kwargs["receipt_code"],
+        ballot_cast_timestamp=None,
+        geofencing_ip_address=kwargs["ip_address"],
+        is_active=True,
+        created_at=now,
+        modified_at=now,
+    )
+    DigitalBallotVoteEntry.objects.create(
+        link_digital_ballot_id=ballot.digital_ballot_id,
+        link_constituency_id=kwargs["constituency_id"],
+        link_party_id=kwargs["party_id"],
+        is_active=True,
+        created_at=now,
+        modified_at=now,
+    )
+    ballot.ballot_cast_timestamp = now
+    ballot.botdetection_vote_duration_ms = bot.get("vote_duration_ms")
+    ballot.botdetection_interaction_count = bot.get("interaction_count")
+    ballot.botdetection_question_avg = bot.get("question_avg")
+    ballot.modified_at = now
+    ballot.save(update_fields=[
+        "ballot_cast_timestamp",
+        "botdetection_vote_duration_ms",
+        "botdetection_interaction_count",
+        "botdetection_question_avg",
+        "modified_at",
+    ])
+
+
+def _batch_commit(kwargs):
+    commit_ballot(**kwargs)
+
+
+STRATEGIES = {
+    "legacy": _legacy_commit,
+    "batch": _batch_commit,
+}
+
+
+def _synthetic_ballot(options, seq):
+    letters = "".join(random.choices(string.ascii_uppercase, k=5))
+    return {
+        "election_evaluation_id": options["election_evaluation_id"],
+        "election_id": options["election_id"],
+        "user_profile_id": 900000000 + seq,
+        "identity_hash": os.urandom(32),
+        "receipt_code": f"{letters}-{seq % 100000:05d}",
+        "ip_address": "127.0.0.1",
+        "constituency_id": random.randint(1, 300),
+        "party_id": random.randint(1, 12),
+        "bot_detection": {
+            "vote_duration_ms": random.randint(4000, 60000),
+            "interaction_count": random.randint(3, 40),
+            "question_avg": round(random.uniform(0.5, 9.5), 2),
+        },
+        "now": timezone.now(),
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark ballot-commit throughput and lock hold time for cast_vote."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ballots", type=int, default=200,
+                            help="Ballots per strategy (default 200).")
+        parser.add_argument("--concurrency", type=int, default=1,
+                            help="Concurrent writer threads (default 1).")
+        parser.add_argument("--strategy", choices=["legacy", "batch", "both"], default="both")
+        parser.add_argument("--election-evaluation-id", type=int, default=1)
+        parser.add_argument("--election-id", type=int, default=1)
+        parser.add_argument("--keep", action="store_true",
+                            help="Commit the synthetic ballots instead of rolling them back.")
+        parser.add_argument("--create-tables", action="store_true",
+                            help="Create the ballot tables first (sqlite fallback only).")
+
+    def handle(self, *args, **options):
+        if options["ballots"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--ballots and --concurrency must be positive.")
+
+        if options["create_tables"]:
+            created = ensure_tables(
+                [DigitalBallotRegistryBook, DigitalBallot, DigitalBallotVoteEntry]
+            )
+            for table in created:
+                self.stdout.write(f"Created scratch table {table}")
+
+        names = ["legacy", "batch"] if options["strategy"] == "both" else [options["strategy"]]
+        self.stdout.write(
+            f"Backend: {connection.vendor} | ballots: {options['ballots']} "
+            f"| concurrency: {options['concurrency']} "
+            f"| {'commit' if options['keep'] else 'rollback'}"
+        )
+        self.stdout.write(
+            f"{'strategy':<8} {'ballots/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'max ms':>8} {'errors':>7}"
+        )
+        for name in names:
+            stats = self._run(STRATEGIES[name], options)
+            self.stdout.write(
+                f"{name:<8} {stats['throughput']:>10.1f} {stats['p50']:>8.2f} "
+                f"{stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f} "
+                f"{stats['errors']:>7}"
+            )
+
+    def _run(self, write, options):
+        keep = options["keep"]
+        durations = []
+        errors = []
+        lock = threading.Lock()
+        counter = iter(range(options["ballots"]))
+
+        def write_one(seq):
+            kwargs = _synthetic_ballot(options, seq)
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    write(kwargs)
+                    if not keep:
+                        raise _Rollback
+            except _Rollback:
+                pass
+            except DatabaseError as exc:
+                with lock:
+                    errors.append(exc)
+                return
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                durations.append(elapsed)
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        seq = next(counter, None)
+                    if seq is None:
+                        return
+                    write_one(seq)
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        if options["concurrency"] == 1:
+            # Stay on the main thread's connection so sqlite scratch tables
+            # created above are visible.
+            for seq in counter:
+                write_one(seq)
+        else:
+            threads = [threading.Thread(target=worker) for _ in range(options["concurrency"])]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        wall = time.perf_counter() - started
+
+        if errors:
+            self.stderr.write(f"  {len(errors)} failed writes, first: {errors[0]}")
+        stats = summarize(durations, wall)
+        stats["errors"] = len(errors)
+        return stats
@@ -0,0 +1,309 @@
+"""
+Load-test harness for the election vote path.
+
+Creates synthetic voters, then drives each one through
+
+    check_eligibility -> cast_vote -> api_national_results
+
+from a pool of concurrent worker threads using Django's test client
+in-process. Reports p50/p95/p99 latency, throughput and DB query counts
+per endpoint.
+
+Runs against whatever DATABASES["default"] points at. On a local SQL
+Server container the real tables are used and the synthetic voters and
+their ballots are deleted afterwards unless ``--keep`` is given. On the
+sqlite fallback from settings/local.py the run happens in a throw-away
+scratch database built from the models, so nothing needs to be migrated.
+
+    python manage.py loadtest_vote_path --voters 200 --concurrency 8
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from amolnama_news.site_apps.core.benchmarking import scratch_database, summarize
+from amolnama_news.site_apps.election_vote.models import (
+    DigitalBallot,
+    DigitalBallotRegistryBook,
+    DigitalBallotVoteEntry,
+)
+from amolnama_news.site_apps.evaluation_vote.models import AppGetPartyDetails
+from amolnama_news.site_apps.user_account.models import User, UserProfile, UserSession
+
+ENDPOINTS = ("check_eligibility", "cast_vote", "api_national_results")
+
+SCRATCH_MODELS = [
+    UserProfile,
+    UserSession,
+    DigitalBallotRegistryBook,
+    DigitalBallot,
+    DigitalBallotVoteEntry,
+    AppGetPartyDetails,
+]
+
+
+class _QueryCounter:
+    """connection.execute_wrapper that counts statements on one thread."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _seed_parties(count):
+    """Give api_national_results something to join against on sqlite."""
+    if AppGetPartyDetails.objects.exists():
+        return list(AppGetPartyDetails.objects.values_list("party_id", flat=True))
+    AppGetPartyDetails.objects.bulk_create([
+        AppGetPartyDetails(
+            party_id=i,
+            party_name_en=f"Load Test Party {i}",
+            party_name_bn=f"লোড টেস্ট দল {i}",
+            party_short_name_bn=f"দল{i}",
+            party_symbol_name_bn=f"প্রতীক {i}",
+            file_path="party_logo/",
+            file_name=f"party_{i}.png",
+        )
+        for i in range(1, count + 1)
+    ])
+    return list(range(1, count + 1))
+
+
+def _login(client, user):
+    """Attach an authenticated session to the client.
+
+    Bypasses login() on purpose: the user_logged_in tracking writes are not
+    part of the vote path and would skew the numbers.
+    """
+    engine = import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+
+class Command(BaseCommand):
+    help = "Drive check_eligibility -> cast_vote -> api_national_results concurrently."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--voters", type=int, default=100,
+                            help="Synthetic voters to create (default 100).")
+        parser.add_argument("--concurrency", type=int, default=4,
+                            help="Concurrent client threads (default 4).")
+        parser.add_argument("--result-polls", type=int, default=3,
+                            help="api_national_results calls per voter (default 3).")
+        parser.add_argument("--election-evaluation-id", type=int, default=1)
+        parser.add_argument("--election-id", type=int, default=1)
+        parser.add_argument("--parties", type=int, default=12,
+                            help="Parties to seed on an empty party view (sqlite).")
+        parser.add_argument("--seed", type=int, default=2026,
+                            help="Random seed for reproducible vote choices.")
+        parser.add_argument("--keep", action="store_true",
+                            help="Keep synthetic voters and ballots afterwards.")
+        parser.add_argument("--json", action="store_true",
+                            help="Print the report as JSON instead of a table.")
+
+    def handle(self, *args, **options):
+        if options["voters"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--voters and --concurrency must be positive.")
+
+        with scratch_database(SCRATCH_MODELS):
+            report = self._run(options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report)
+
+    def _run(self, options):
+        party_ids = _seed_parties(options["parties"]) if connection.vendor == "sqlite" else (
+            list(AppGetPartyDetails.objects.values_list("party_id", flat=True))
+        )
+        if not party_ids:
+            raise CommandError("No parties found in [party].[app_vw_get_party_details].")
+
+        run_id = uuid.uuid4().hex[:8]
+        rng = random.Random(options["seed"])
+        voters = self._create_voters(run_id, options["voters"])
+        try:
+            return self._drive(voters, party_ids, rng, options)
+        finally:
+            if not options["keep"]:
+                self._cleanup(voters)
+
+    # ---- Setup / teardown ----
+
+    def _create_voters(self, run_id, count):
+        now = timezone.now()
+        users = User.objects.bulk_create([
+            User(
+                email=f"loadtest-{run_id}-{i}@loadtest.invalid",
+                link_user_auth_method_type_id=1,
+                user_auth_provider_key=f"loadtest-{run_id}-{i}",
+                password="!",
+                is_active=True,
+            )
+            for i in range(count)
+        ])
+        if not users or users[0].pk is None:
+            users = list(User.objects.filter(email__startswith=f"loadtest-{run_id}-"))
+        # bulk_create skips the post_save signal that normally creates the profile
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                link_user_account_user_id=u.pk,
+                display_name=u.email,
+                created_at=now,
+                updated_at=now,
+            )
+            for u in users
+        ])
+        self.stdout.write(f"Created {len(users)} synthetic voters (run {run_id})")
+        return users
+
+    def _cleanup(self, voters):
+        user_ids = [u.pk for u in voters]
+        profile_ids = list(UserProfile.objects.filter(
+            link_user_account_user_id__in=user_ids,
+        ).values_list("user_profile_id", flat=True))
+        registry_ids = list(DigitalBallotRegistryBook.objects.filter(
+            link_user_profile_id__in=profile_ids,
+        ).values_list("digital_ballot_registry_book_id", flat=True))
+        ballot_ids = list(DigitalBallot.objects.filter(
+            link_digital_ballot_registry_book_id__in=registry_ids,
+        ).values_list("digital_ballot_id", flat=True))
+
+        DigitalBallotVoteEntry.objects.filter(link_digital_ballot_id__in=ballot_ids).delete()
+        DigitalBallot.objects.filter(digital_ballot_id__in=ballot_ids).delete()
+        DigitalBallotRegistryBook.objects.filter(
+            digital_ballot_registry_book_id__in=registry_ids,
+        ).delete()
+        UserProfile.objects.filter(user_profile_id__in=profile_ids).delete()
+        User.objects.filter(pk__in=user_ids).delete()
+        self.stdout.write(f"Removed {len(user_ids)} synthetic voters and {len(ballot_ids)} ballots")
+
+    # ---- Load generation ----
+
+    def _drive(self, voters, party_ids, rng, options):
+        host = (settings.ALLOWED_HOSTS or ["localhost"])[0]
+        evaluation_id = options["election_evaluation_id"]
+        urls = {
+            "check_eligibility": reverse("election_vote:check_eligibility", args=[evaluation_id]),
+            "cast_vote": reverse("election_vote:cast_vote"),
+            "api_national_results": reverse(
+                "election_vote:api_national_results", args=[evaluation_id],
+            ),
+        }
+        # Pre-draw every choice so runs are reproducible regardless of thread timing
+        plans = [
+            (voter, {
+                "election_evaluation_id": evaluation_id,
+                "election_id": options["election_id"],
+                "constituency_id": rng.randint(1, 300),
+                "party_id": rng.choice(party_ids),
+                "bot_detection": {
+                    "vote_duration_ms": rng.randint(4000, 60000),
+                    "interaction_count": rng.randint(3, 40),
+                    "question_avg": round(rng.uniform(0.5, 9.5), 2),
+                },
+            })
+            for voter in voters
+        ]
+
+        lock = threading.Lock()
+        queue = iter(plans)
+        samples = defaultdict(list)     # endpoint -> [(ms, queries)]
+        errors = defaultdict(int)
+
+        def call(client, endpoint, method, **kwargs):
+            counter = _QueryCounter()
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = getattr(client, method)(urls[endpoint], **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+            ok = response.status_code == 200 and response.json().get("success", True)
+            with lock:
+                samples[endpoint].append((elapsed, counter.count))
+                if not ok:
+                    errors[endpoint] += 1
+
+        def worker():
+            client = Client(HTTP_HOST=host)
+            try:
+                while True:
+                    with lock:
+                        plan = next(queue, None)
+                    if plan is None:
+                        return
+                    voter, payload = plan
+                    _login(client, voter)
+                    call(client, "check_eligibility", "get")
+                    call(client, "cast_vote", "post",
+                         data=json.dumps(payload), content_type="application/json")
+                    for _ in range(options["result_polls"]):
+                        call(client, "api_national_results", "get")
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(options["concurrency"])]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+
+        report = {
+            "backend": connection.vendor,
+            "voters": len(voters),
+            "concurrency": options["concurrency"],
+            "wall_seconds": round(wall, 3),
+            "voters_per_second": round(len(voters) / wall, 2) if wall else 0.0,
+            "endpoints": {},
+        }
+        for endpoint in ENDPOINTS:
+            rows = samples.get(endpoint, [])
+            stats = summarize([ms for ms, _ in rows], wall)
+            queries = [q for _, q in rows]
+            stats.update({
+                "errors": errors.get(endpoint, 0),
+                "queries_avg": (sum(queries) / len(queries)) if queries else 0.0,
+                "queries_max": max(queries) if queries else 0,
+            })
+            report["endpoints"][endpoint] = {
+                k: round(v, 2) if isinstance(v, float) else v for k, v in stats.items()
+            }
+        return report
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"Backend: {report['backend']} | voters: {report['voters']} "
+            f"| concurrency: {report['concurrency']} | wall: {report['wall_seconds']}s "
+            f"| {report['voters_per_second']} voters/s"
+        )
+        self.stdout.write(
+            f"{'endpoint':<22} {'reqs':>6} {'err':>5} {'req/s':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'q avg':>6} {'q max':>6}"
+        )
+        for endpoint, s in report["endpoints"].items():
+            self.stdout.write(
+                f"{endpoint:<22} {s['count']:>6} {s['errors']:>5} {s['throughput']:>8.1f} "
+                f"{s['p50']:>8.2f} {s['p95']:>8.2f} {s['p99']:>8.2f} "
+                f"{s['queries_avg']:>6.1f} {s['queries_max']:>6}"
+            )
@@ -0,0 +1,67 @@
+"""
+Cached drill-through cubes for closed elections.
+
+app_vw_get_past_results has one row per party per union parishad, with
+the national, division, district and seat totals repeated on every row.
+The drill-through report used to aggregate it with a handful of GROUP BY
+queries per page view. Past results never change, so ``past_results_cube``
+reads the rows of one election once (at constituency grain, which is all
+the report shows), together with the English location names the
+breadcrumbs need, and keeps them in the tiered cache (core.cache); every
+drill level is then computed in memory.
+
+Cubes carry the "election" cache tag, so
+``manage.py bump_data_version election`` rebuilds them after a correction.
+``manage.py warm_caches past_results`` builds every cube ahead of traffic.
+"""
+from django.conf import settings
+
+from amolnama_news.site_apps.core.cache import cached
+from amolnama_news.site_apps.locations.models import District, Division
+
+from .models import AppGetPastResults
+
+CUBE_TTL = getattr(settings, "ELECTION_PAST_RESULTS_TTL", 24 * 60 * 60)
+CACHE_TAG = "election"
+
+CUBE_FIELDS = (
+    'division_id', 'division_name_bn', 'district_id', 'district_name_bn',
+    'constituency_id', 'constituency_name_bn', 'seat_number_bn',
+    'party_id', 'party_name_bn', 'party_symbol_name_bn', 'file_path', 'file_name',
+    'national_party_vote', 'division_party_vote', 'district_party_vote', 'seat_party_vote',
+)
+
+
+@cached('election_vote:past_results_cube', ttl=CUBE_TTL, tags=(CACHE_TAG,))
+def past_results_cube(election_evaluation_id):
+    """Constituency-grain rows of one election plus the names its report needs."""
+    queryset = AppGetPastResults.objects.filter(election_evaluation_id=election_evaluation_id)
+    first_record = queryset.values('evaluation_name_bn').first()
+    # Ordered so that grouping in first-seen order keeps SQL Server's name collation
+    rows = list(
+        queryset.values(*CUBE_FIELDS).distinct()
+        .order_by('division_name_bn', 'district_name_bn', 'constituency_name_bn', 'party_id')
+    )
+    division_ids = {row['division_id'] for row in rows}
+    district_ids = {row['district_id'] for row in rows}
+    return {
+        'evaluation_name': (
+            first_record['evaluation_name_bn'] if first_record else f"Election {election_evaluation_id}"
+        ),
+        'rows': rows,
+        'division_names_en': dict(
+            Division.objects.filter(division_id__in=division_ids).values_list('division_id', 'division_name_en')
+        ),
+        'district_names_en': dict(
+            District.objects.filter(district_id__in=district_ids).values_list('district_id', 'district_name_en')
+        ),
+    }
+
+
+@cached('election_vote:past_elections', ttl=CUBE_TTL, tags=(CACHE_TAG,))
+def past_elections():
+    """Elections with published results, for the report's sidebar."""
+    return list(
+        AppGetPastResults.objects.values('election_evaluation_id', 'evaluation_name_bn')
+        .distinct().order_by('evaluation_name_bn')
+    )
@@ -2,7 +2,9 @@ import hashlib
 import random
 import string
 
-from .models import DigitalBallot, DigitalBallotRegistryBook
+from django.db import connection
+
+from .models import DigitalBallot, DigitalBallotRegistryBook, DigitalBallotVoteEntry
 
 
 def generate_receipt_code():
@@ -72,3 +74,172 @@ def validate_pre_cast(request, election_evaluation_id):
         errors.append("You have already voted in this election.")
 
     return profile, errors
+
+
+# ========== Ballot Commit ==========
+
+def _prep(model, field_name, value):
+    """Adapt a Python value exactly as the ORM would on save()."""
+    return model._meta.get_field(field_name).get_db_prep_save(value, connection)
+
+
+def _column_list(model, field_names):
+    qn = connection.ops.quote_name
+    return ", ".join(qn(model._meta.get_field(f).column) for f in field_names)
+
+
+_REGISTRY_FIELDS = [
+    "link_election_evaluation_id",
+    "link_user_profile_id",
+    "hash_identity_anchor_binary",
+    "mobile_sim_slot_number",
+    "created_at",
+    "modified_at",
+]
+
+_BALLOT_FIELDS = [
+    "link_election_id",
+    "link_election_evaluation_id",
+    "ballot_voter_audit_receipt_code",
+    "ballot_cast_timestamp",
+    "geofencing_ip_address",
+    "botdetection_vote_duration_ms",
+    "botdetection_interaction_count",
+    "botdetection_question_avg",
+    "is_active",
+    "created_at",
+    "modified_at",
+]
+
+_VOTE_ENTRY_FIELDS = [
+    "link_constituency_id",
+    "link_union_parishad_id",
+    "link_party_id",
+    "link_candidate_id",
+    "is_active",
+    "created_at",
+    "modified_at",
+]
+
+
+def _build_ballot_batch_sql():
+    """T-SQL batch inserting registry book, ballot and vote entry in one round-trip.
+
+    Generated IDs flow between the INSERTs through OUTPUT ... INTO table
+    variables, so no intermediate result has to travel back to Django.
+    """
+    qn = connection.ops.quote_name
+    registry_table = qn(DigitalBallotRegistryBook._meta.db_table)
+    ballot_table = qn(DigitalBallot._meta.db_table)
+    entry_table = qn(DigitalBallotVoteEntry._meta.db_table)
+    registry_pk = qn(DigitalBallotRegistryBook._meta.pk.column)
+    ballot_pk = qn(DigitalBallot._meta.pk.column)
+    ballot_link = qn(DigitalBallot._meta.get_field("link_digital_ballot_registry_book_id").column)
+    entry_link = qn(DigitalBallotVoteEntry._meta.get_field("link_digital_ballot_id").column)
+
+    def placeholders(fields):
+        return ", ".join(["%s"] * len(fields))
+
+    return f"""
+        SET NOCOUNT ON;
+        DECLARE @registry TABLE (id BIGINT);
+        DECLARE @ballot TABLE (id BIGINT);
+
+        INSERT INTO {registry_table} ({_column_list(DigitalBallotRegistryBook, _REGISTRY_FIELDS)})
+        OUTPUT INSERTED.{registry_pk} INTO @registry
+        VALUES ({placeholders(_REGISTRY_FIELDS)});
+
+        INSERT INTO {ballot_table} ({ballot_link}, {_column_list(DigitalBallot, _BALLOT_FIELDS)})
+        OUTPUT INSERTED.{ballot_pk} INTO @ballot
+        SELECT id, {placeholders(_BALLOT_FIELDS)} FROM @registry;
+
+        INSERT INTO {entry_table} ({entry_link}, {_column_list(DigitalBallotVoteEntry, _VOTE_ENTRY_FIELDS)})
+        SELECT id, {placeholders(_VOTE_ENTRY_FIELDS)} FROM @ballot;
+
+        SELECT (SELECT id FROM @registry), (SELECT id FROM @ballot);
+    """
+
+
+def commit_ballot(
+    *,
+    election_evaluation_id,
+    election_id,
+    user_profile_id,
+    identity_hash,
+    receipt_code,
+    ip_address,
+    constituency_id,
+    party_id,
+    union_parishad_id=None,
+    candidate_id=None,
+    bot_detection=None,
+    now,
+):
+    """Write registry book, hardened ballot and vote entry for one voter.
+
+    Must be called inside ``transaction.atomic()``. The ballot is inserted
+    already hardened (cast timestamp + bot-detection metrics) instead of
+    being inserted with a NULL timestamp and updated afterwards: the three
+    INSERTs commit together, so no reader can observe a hardened ballot
+    without its vote entry — the same guarantee the old INSERT-then-UPDATE
+    sequence gave, with one statement less holding locks on digital_ballot.
+
+    On SQL Server all three INSERTs travel in a single batch. Other
+    backends (the sqlite dev fallback) use three ORM INSERTs.
+
+    Returns (registry_book_id, digital_ballot_id).
+    """
+    bot_detection = bot_detection or {}
+
+    registry_values = {
+        "link_election_evaluation_id": election_evaluation_id,
+        "link_user_profile_id": user_profile_id,
+        "hash_identity_anchor_binary": identity_hash,
+        "mobile_sim_slot_number": 0,
+        "created_at": now,
+        "modified_at": now,
+    }
+    ballot_values = {
+        "link_election_id": election_id,
+        "link_election_evaluation_id": election_evaluation_id,
+        "ballot_voter_audit_receipt_code": receipt_code,
+        "ballot_cast_timestamp": now,
+        "geofencing_ip_address": ip_address,
+        "botdetection_vote_duration_ms": bot_detection.get("vote_duration_ms"),
+        "botdetection_interaction_count": bot_detection.get("interaction_count"),
+        "botdetection_question_avg": bot_detection.get("question_avg"),
+        "is_active": True,
+        "created_at": now,
+        "modified_at": now,
+    }
+    entry_values = {
+        "link_constituency_id": constituency_id,
+        "link_union_parishad_id": union_parishad_id,
+        "link_party_id": party_id,
+        "link_candidate_id": candidate_id,
+        "is_active": True,
+        "created_at": now,
+        "modified_at": now,
+    }
+
+    if connection.vendor != "microsoft":
+        registry = DigitalBallotRegistryBook.objects.create(**registry_values)
+        ballot = DigitalBallot.objects.create(
+            link_digital_ballot_registry_book_id=registry.digital_ballot_registry_book_id,
+            **ballot_values,
+        )
+        DigitalBallotVoteEntry.objects.create(
+            link_digital_ballot_id=ballot.digital_ballot_id,
+            **entry_values,
+        )
+        return registry.digital_ballot_registry_book_id, ballot.digital_ballot_id
+
+    params = (
+        [_prep(DigitalBallotRegistryBook, f, registry_values[f]) for f in _REGISTRY_FIELDS]
+        + [_prep(DigitalBallot, f, ballot_values[f]) for f in _BALLOT_FIELDS]
+        + [_prep(DigitalBallotVoteEntry, f, entry_values[f]) for f in _VOTE_ENTRY_FIELDS]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(_build_ballot_batch_sql(), params)
+        row = cursor.fetchone()
+    return row[0], row[1]
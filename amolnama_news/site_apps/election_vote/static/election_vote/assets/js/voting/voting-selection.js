@@ -1,5 +1,29 @@
 /* ========== Election Vote – Cascading Location Selection ========== */
 
+/**
+ * Location rows from the static gazetteer (locations/js/gazetteer.js),
+ * or from the location API when it is unavailable. Sorted the way the API
+ * sorts them: districts by English name, constituencies by seat number.
+ */
+function gazetteerOrApi(fromGazetteer, url, fromApi) {
+  var lookup = window.gazetteer
+    ? fromGazetteer(window.gazetteer)
+    : Promise.reject(new Error('gazetteer.js not loaded'));
+  return lookup.catch(function () {
+    return fetch(url)
+      .then(function (response) { return response.json(); })
+      .then(fromApi);
+  });
+}
+
+function byEnglishName(a, b) {
+  return (a.name_en || '').localeCompare(b.name_en || '');
+}
+
+function bySeatNumber(a, b) {
+  return (parseInt(a.seat_en, 10) || 0) - (parseInt(b.seat_en, 10) || 0);
+}
+
 /**
  * Step 0: Handle election selection.
  * Checks voter eligibility before proceeding to division step.
@@ -58,7 +82,7 @@ function handleElectionSelection(electionEvaluationId, electionId, nameEn, nameB
 
 /**
  * Step 1: Handle division selection.
- * Fetches districts for the chosen division via API.
+ * Fetches districts for the chosen division (static gazetteer, else API).
  */
 function handleDivisionSelection(id, nameEn, nameBn) {
   selectedDivision = { id: id, nameEn: nameEn, nameBn: nameBn };
@@ -70,19 +94,24 @@ function handleDivisionSelection(id, nameEn, nameBn) {
   updateBreadcrumbTrail(selectedElection, selectedDivision, null, null);
   showVotingStep('district-view');
 
-  fetch('/evaluation_vote/api/districts/' + id + '/')
-    .then(function (response) { return response.json(); })
-    .then(function (data) {
+  gazetteerOrApi(
+    function (gazetteer) {
+      return gazetteer.districts(id).then(function (districts) { return districts.slice().sort(byEnglishName); });
+    },
+    '/evaluation_vote/api/districts/' + id + '/',
+    function (data) { return data.districts; }
+  )
+    .then(function (districts) {
       var districtList = document.getElementById('district-list');
       if (!districtList) return;
       districtList.innerHTML = '';
 
-      if (data.districts.length === 0) {
+      if (districts.length === 0) {
         districtList.innerHTML = '<li>No districts found / \u0995\u09CB\u09A8\u09CB \u099C\u09C7\u09B2\u09BE \u09AA\u09BE\u0993\u09AF\u09BC\u09BE \u09AF\u09BE\u09AF\u09BC\u09A8\u09BF</li>';
         return;
       }
 
-      data.districts.forEach(function (district) {
+      districts.forEach(function (district) {
         var li = document.createElement('li');
         li.onclick = function () {
           handleDistrictSelection(district.id, district.name_en, district.name_bn);
@@ -98,7 +127,7 @@ function handleDivisionSelection(id, nameEn, nameBn) {
 
 /**
  * Step 2: Handle district selection.
- * Fetches constituencies for the chosen district via API.
+ * Fetches constituencies for the chosen district (static gazetteer, else API).
  */
 function handleDistrictSelection(id, nameEn, nameBn) {
   selectedDistrict = { id: id, nameEn: nameEn, nameBn: nameBn };
@@ -109,19 +138,24 @@ function handleDistrictSelection(id, nameEn, nameBn) {
   updateBreadcrumbTrail(selectedElection, selectedDivision, selectedDistrict, null);
   showVotingStep('constituency-view');
 
-  fetch('/evaluation_vote/api/constituencies/' + id + '/')
-    .then(function (response) { return response.json(); })
-    .then(function (data) {
+  gazetteerOrApi(
+    function (gazetteer) {
+      return gazetteer.district(id).then(function (shard) { return shard.constituencies.slice().sort(bySeatNumber); });
+    },
+    '/evaluation_vote/api/constituencies/' + id + '/',
+    function (data) { return data.constituencies; }
+  )
+    .then(function (constituencies) {
       var constituencyList = document.getElementById('constituency-list');
       if (!constituencyList) return;
       constituencyList.innerHTML = '';
 
-      if (data.constituencies.length === 0) {
+      if (constituencies.length === 0) {
         constituencyList.innerHTML = '<li>No constituencies found</li>';
         return;
       }
 
-      data.constituencies.forEach(function (constituency) {
+      constituencies.forEach(function (constituency) {
         var li = document.createElement('li');
         li.onclick = function () {
           handleConstituencySelection(constituency.id, constituency.name_en, constituency.name_bn);
@@ -0,0 +1,112 @@
+import re
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase
+
+from amolnama_news.site_apps.core.benchmarking import ensure_tables
+
+from . import services
+from .models import DigitalBallot, DigitalBallotRegistryBook, DigitalBallotVoteEntry
+
+NOW = datetime(2026, 2, 12, 9, 30, tzinfo=dt_timezone.utc)
+
+
+def ballot_kwargs(**overrides):
+    return {
+        'election_evaluation_id': 4,
+        'election_id': 2,
+        'user_profile_id': 17,
+        'identity_hash': b'\x01' * 32,
+        'receipt_code': 'ABCDE-12345',
+        'ip_address': '10.0.0.1',
+        'constituency_id': 101,
+        'party_id': 3,
+        'union_parishad_id': 900,
+        'bot_detection': {'vote_duration_ms': 5400, 'interaction_count': 12, 'question_avg': Decimal('1.25')},
+        'now': NOW,
+        **overrides,
+    }
+
+
+class CommitBallotTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Unmanaged [election] tables; created before the class transaction
+        ensure_tables([DigitalBallotRegistryBook, DigitalBallot, DigitalBallotVoteEntry])
+        super().setUpClass()
+
+    def test_one_call_writes_the_hardened_ballot_with_its_rows(self):
+        with transaction.atomic():
+            registry_id, ballot_id = services.commit_ballot(**ballot_kwargs())
+
+        registry = DigitalBallotRegistryBook.objects.get()
+        self.assertEqual(registry.digital_ballot_registry_book_id, registry_id)
+        self.assertEqual((registry.link_election_evaluation_id, registry.link_user_profile_id), (4, 17))
+        self.assertEqual(bytes(registry.hash_identity_anchor_binary), b'\x01' * 32)
+        self.assertEqual((registry.created_at, registry.modified_at), (NOW, NOW))
+
+        # Inserted hardened: the fields the old follow-up UPDATE used to set
+        ballot = DigitalBallot.objects.get()
+        self.assertEqual(ballot.digital_ballot_id, ballot_id)
+        self.assertEqual(ballot.link_digital_ballot_registry_book_id, registry_id)
+        self.assertEqual(ballot.ballot_cast_timestamp, NOW)
+        self.assertEqual(ballot.botdetection_vote_duration_ms, 5400)
+        self.assertEqual(ballot.botdetection_interaction_count, 12)
+        self.assertEqual(ballot.botdetection_question_avg, Decimal('1.25'))
+        self.assertEqual((ballot.ballot_voter_audit_receipt_code, ballot.geofencing_ip_address),
+                         ('ABCDE-12345', '10.0.0.1'))
+
+        entry = DigitalBallotVoteEntry.objects.get()
+        self.assertEqual(entry.link_digital_ballot_id, ballot_id)
+        self.assertEqual((entry.link_constituency_id, entry.link_union_parishad_id, entry.link_party_id),
+                         (101, 900, 3))
+        self.assertEqual(entry.created_at, NOW)
+
+    def test_failing_insert_rolls_back_the_whole_ballot(self):
+        # receipt code is NOT NULL: the ballot INSERT fails after the registry row
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            services.commit_ballot(**ballot_kwargs(receipt_code=None))
+
+        self.assertFalse(DigitalBallotRegistryBook.objects.exists())
+        self.assertFalse(DigitalBallot.objects.exists())
+        self.assertFalse(DigitalBallotVoteEntry.objects.exists())
+
+
+class BallotBatchSqlTest(SimpleTestCase):
+    def mssql_connection(self):
+        connection = mock.MagicMock(vendor='microsoft')
+        connection.ops.quote_name = lambda name: name if name.startswith('[') else f'[{name}]'
+        connection.cursor.return_value.__enter__.return_value.fetchone.return_value = (11, 22)
+        return connection
+
+    def test_batch_chains_generated_ids_through_table_variables(self):
+        with mock.patch.object(services, 'connection', self.mssql_connection()):
+            sql = services._build_ballot_batch_sql()
+
+        self.assertIn('DECLARE @registry TABLE (id BIGINT);', sql)
+        self.assertIn('DECLARE @ballot TABLE (id BIGINT);', sql)
+        self.assertRegex(sql, r'INSERT INTO \[election\]\.\[digital_ballot_registry_book\] \(.*\)\s+'
+                              r'OUTPUT INSERTED\.\[digital_ballot_registry_book_id\] INTO @registry')
+        self.assertRegex(sql, r'INSERT INTO \[election\]\.\[digital_ballot\] '
+                              r'\(\[link_digital_ballot_registry_book_id\], .*\)\s+'
+                              r'OUTPUT INSERTED\.\[digital_ballot_id\] INTO @ballot\s+SELECT id, .* FROM @registry;')
+        self.assertRegex(sql, r'INSERT INTO \[election\]\.\[digital_ballot_vote_entry\] '
+                              r'\(\[link_digital_ballot_id\], .*\)\s+SELECT id, .* FROM @ballot;')
+        self.assertIn('[ballot_cast_timestamp]', sql)
+        self.assertIn('[botdetection_question_avg]', sql)
+
+    def test_one_round_trip_with_a_parameter_per_placeholder(self):
+        connection = self.mssql_connection()
+        with mock.patch.object(services, 'connection', connection):
+            ids = services.commit_ballot(**ballot_kwargs())
+
+        self.assertEqual(ids, (11, 22))
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once()
+        sql, params = cursor.execute.call_args.args
+        expected = len(services._REGISTRY_FIELDS) + len(services._BALLOT_FIELDS) + len(services._VOTE_ENTRY_FIELDS)
+        self.assertEqual(len(params), expected)
+        self.assertEqual(len(re.findall('%s', sql)), expected)
@@ -1,27 +1,30 @@
 import json
 import logging
-from collections import defaultdict
 from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
-from django.db.models import Count, Max
-from django.http import JsonResponse
+from django.db.models import Count
 from django.shortcuts import render
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
-from amolnama_news.site_apps.evaluation_vote.models import AppGetPartyDetails  # used by home()
-from amolnama_news.site_apps.locations.models import District, Division
+from amolnama_news.site_apps.core.cache import cached
+from amolnama_news.site_apps.core.json_response import json_response
+from amolnama_news.site_apps.core.page_cache import cache_anonymous_page
+from amolnama_news.site_apps.core.query_budget import query_budget
+from amolnama_news.site_apps.evaluation_vote.party_registry import party_registry
+from amolnama_news.site_apps.locations.models import Division
 
 from .models import (
     AppGetCurrentElection,
-    AppGetPastResults,
     DigitalBallot,
-    DigitalBallotRegistryBook,
     DigitalBallotVoteEntry,
 )
+from .past_results import past_elections, past_results_cube
 from .services import (
+    commit_ballot,
     compute_identity_anchor_hash,
     generate_receipt_code,
     get_client_ip,
@@ -30,23 +33,22 @@ from .services import (
 
 logger = logging.getLogger(__name__)
 
+RESULTS_MAX_STALENESS = getattr(settings, 'ELECTION_RESULTS_MAX_STALENESS', 2)
+
 
 # ========== Pages ==========
 
+@cache_anonymous_page('election_vote:home', tags=('party', 'location', 'election'))
 def home(request):
     current_elections = AppGetCurrentElection.objects.all()
     divisions = Division.objects.filter(is_active=True).order_by('division_name_en')
-    parties = AppGetPartyDetails.objects.all().order_by('party_name_bn')
-
-    past_elections = AppGetPastResults.objects.values(
-        'election_evaluation_id', 'evaluation_name_bn'
-    ).distinct().order_by('evaluation_name_bn')
+    parties = party_registry.all()
 
     return render(request, 'election_vote/pages/home.html', {
         'current_elections': current_elections,
         'divisions': divisions,
         'parties': parties,
-        'past_elections': past_elections,
+        'past_elections': past_elections(),
     })
 
 
@@ -58,22 +60,19 @@ def check_eligibility(request, election_evaluation_id):
     _, errors = validate_pre_cast(request, election_evaluation_id)
 
     if errors:
-        return JsonResponse({"eligible": False, "error": " ".join(errors)})
-    return JsonResponse({"eligible": True})
+        return json_response(request, {"eligible": False, "error": " ".join(errors)})
+    return json_response(request, {"eligible": True})
 
 
-def api_national_results(request, election_evaluation_id):
-    """GET: Return national-level party results as JSON for progress bars.
-    Real-time aggregation from transaction tables so results appear immediately.
-    """
-    # Get ballot IDs for this election
+@cached('election_vote:national_vote_counts', ttl=60, soft_ttl=RESULTS_MAX_STALENESS)
+def _national_vote_counts(election_evaluation_id):
+    """Votes per party for an election, newest within RESULTS_MAX_STALENESS seconds."""
     ballot_ids = DigitalBallot.objects.filter(
         link_election_evaluation_id=election_evaluation_id,
         is_active=True,
     ).values_list('digital_ballot_id', flat=True)
 
-    # Count votes per party
-    vote_counts = list(
+    return list(
         DigitalBallotVoteEntry.objects.filter(
             link_digital_ballot_id__in=ballot_ids,
             is_active=True,
@@ -82,34 +81,32 @@ def api_national_results(request, election_evaluation_id):
         ).order_by('-votes')
     )
 
+
+def api_national_results(request, election_evaluation_id):
+    """GET: Return national-level party results as JSON for progress bars.
+    Aggregated from the transaction tables; every results poll within
+    ELECTION_RESULTS_MAX_STALENESS seconds shares one aggregation.
+    """
+    vote_counts = _national_vote_counts(election_evaluation_id)
+
     if not vote_counts:
-        return JsonResponse({'results': [], 'total_votes': 0})
-
-    # Get party details (names + logos)
-    party_ids = [vc['link_party_id'] for vc in vote_counts]
-    party_map = {}
-    for p in AppGetPartyDetails.objects.filter(party_id__in=party_ids):
-        party_map[p.party_id] = {
-            'party_name': p.party_name_bn or '',
-            'party_short_name': p.party_symbol_name_bn or '',
-            'file_path': p.file_path or '',
-            'file_name': p.file_name or '',
-        }
+        return json_response(request, {'results': [], 'total_votes': 0})
 
+    # Join party details (names + logos) from the in-memory registry
     results = []
     for vc in vote_counts:
-        info = party_map.get(vc['link_party_id'], {})
+        party = party_registry.get(vc['link_party_id'])
         results.append({
-            'party_name': info.get('party_name', ''),
-            'party_short_name': info.get('party_short_name', ''),
-            'file_path': info.get('file_path', ''),
-            'file_name': info.get('file_name', ''),
+            'party_name': (party and party.party_name_bn) or '',
+            'party_short_name': (party and party.party_symbol_name_bn) or '',
+            'file_path': (party and party.file_path) or '',
+            'file_name': (party and party.file_name) or '',
             'votes': vc['votes'],
         })
 
     total_votes = _calculate_percentages(results)
 
-    return JsonResponse({
+    return json_response(request, {
         'results': results,
         'total_votes': total_votes,
     })
@@ -122,8 +119,8 @@ def cast_vote(request):
     try:
         data = json.loads(request.body)
     except (json.JSONDecodeError, ValueError):
-        return JsonResponse(
-            {"success": False, "error": "Invalid JSON."}, status=400
+        return json_response(
+            request, {"success": False, "error": "Invalid JSON."}, status=400
         )
 
     election_evaluation_id = data.get("election_evaluation_id")
@@ -135,16 +132,16 @@ def cast_vote(request):
     bot_detection = data.get("bot_detection", {})
 
     if not all([election_evaluation_id, election_id, constituency_id, party_id]):
-        return JsonResponse(
-            {"success": False, "error": "Missing required fields."},
+        return json_response(
+            request, {"success": False, "error": "Missing required fields."},
             status=400,
         )
 
     # Step 1: Pre-cast validation
     profile, errors = validate_pre_cast(request, election_evaluation_id)
     if errors:
-        return JsonResponse(
-            {"success": False, "error": " ".join(errors)},
+        return json_response(
+            request, {"success": False, "error": " ".join(errors)},
             status=403,
         )
 
@@ -159,65 +156,33 @@ def cast_vote(request):
         )
 
         with transaction.atomic():
-            # Insert registry book entry (burns the voter's token)
-            registry = DigitalBallotRegistryBook.objects.create(
-                link_election_evaluation_id=election_evaluation_id,
-                link_user_profile_id=profile.user_profile_id,
-                hash_identity_anchor_binary=identity_hash,
-                mobile_sim_slot_number=0,
-                created_at=now,
-                modified_at=now,
+            # Registry book (burns the voter's token), hardened ballot and
+            # vote entry — one round-trip on SQL Server
+            commit_ballot(
+                election_evaluation_id=election_evaluation_id,
+                election_id=election_id,
+                user_profile_id=profile.user_profile_id,
+                identity_hash=identity_hash,
+                receipt_code=receipt_code,
+                ip_address=ip_address,
+                constituency_id=constituency_id,
+                party_id=party_id,
+                union_parishad_id=union_parishad_id,
+                candidate_id=candidate_id,
+                bot_detection=bot_detection,
+                now=now,
             )
 
-            # Insert ballot (timestamp NULL initially)
-            ballot = DigitalBallot.objects.create(
-                link_digital_ballot_registry_book_id=registry.digital_ballot_registry_book_id,
-                link_election_id=election_id,
-                link_election_evaluation_id=election_evaluation_id,
-                ballot_voter_audit_receipt_code=receipt_code,
-                ballot_cast_timestamp=None,
-                geofencing_ip_address=ip_address,
-                is_active=True,
-                created_at=now,
-                modified_at=now,
-            )
-
-            # Insert vote entry
-            DigitalBallotVoteEntry.objects.create(
-                link_digital_ballot_id=ballot.digital_ballot_id,
-                link_constituency_id=constituency_id,
-                link_union_parishad_id=union_parishad_id,
-                link_party_id=party_id,
-                link_candidate_id=candidate_id,
-                is_active=True,
-                created_at=now,
-                modified_at=now,
-            )
-
-            # Harden ballot — set cast timestamp and bot-detection metrics
-            ballot.ballot_cast_timestamp = now
-            ballot.botdetection_vote_duration_ms = bot_detection.get("vote_duration_ms")
-            ballot.botdetection_interaction_count = bot_detection.get("interaction_count")
-            ballot.botdetection_question_avg = bot_detection.get("question_avg")
-            ballot.modified_at = now
-            ballot.save(update_fields=[
-                "ballot_cast_timestamp",
-                "botdetection_vote_duration_ms",
-                "botdetection_interaction_count",
-                "botdetection_question_avg",
-                "modified_at",
-            ])
-
         # Step 4: Return receipt
-        return JsonResponse({
+        return json_response(request, {
             "success": True,
             "receipt_code": receipt_code,
         })
 
     except Exception as e:
         logger.exception("cast_vote: transaction failed")
-        return JsonResponse(
-            {"success": False, "error": "Vote submission failed. Please try again."},
+        return json_response(
+            request, {"success": False, "error": "Vote submission failed. Please try again."},
             status=500,
         )
 
@@ -243,37 +208,45 @@ def _calculate_percentages(parties_list):
     return total
 
 
-def _group_by_location(queryset, group_id, group_name, vote_field, extra_fields=None):
-    """Group pre-aggregated view rows by a location level using Max()."""
-    values_fields = [group_id, group_name, 'party_id', 'party_name_bn', 'party_symbol_name_bn', 'file_path', 'file_name']
-    if extra_fields:
-        values_fields += extra_fields
+_PARTY_KEY = ('party_id', 'party_name_bn', 'party_symbol_name_bn', 'file_path', 'file_name')
+
 
-    rows = queryset.values(*values_fields).annotate(
-        votes=Max(vote_field)
-    ).order_by(group_name, '-votes')
+def _party_votes(rows, key_fields, vote_field):
+    """Max(vote_field) per distinct key_fields tuple, in first-seen order.
 
-    location_data = defaultdict(lambda: {'parties': []})
+    The view repeats each level's total on every row below it, so Max()
+    recovers the level total (what the GROUP BY queries used to do).
+    """
+    votes = {}
     for row in rows:
+        key = tuple(row[f] for f in key_fields)
+        votes[key] = max(votes.get(key, 0), row[vote_field] or 0)
+    return [dict(zip(key_fields, key), votes=total) for key, total in votes.items()]
+
+
+def _group_by_location(rows, group_id, group_name, vote_field, extra_fields=None):
+    """Group cube rows by a location level; groups keep the cube's name order."""
+    extra_fields = extra_fields or []
+    location_data = {}
+    for row in _party_votes(rows, (group_id, group_name) + _PARTY_KEY + tuple(extra_fields), vote_field):
         name = row[group_name]
-        location_data[name][group_name] = name
-        location_data[name][group_id] = row[group_id]
-        if extra_fields:
-            for f in extra_fields:
-                location_data[name][f] = row.get(f, '') or ''
-        location_data[name]['parties'].append(_build_party_entry(row))
+        data = location_data.setdefault(name, {'parties': []})
+        data[group_name] = name
+        data[group_id] = row[group_id]
+        for f in extra_fields:
+            data[f] = row.get(f, '') or ''
+        data['parties'].append(_build_party_entry(row))
 
     for data in location_data.values():
+        data['parties'].sort(key=lambda p: -p['votes'])
         data['total_votes'] = _calculate_percentages(data['parties'])
 
     return list(location_data.values())
 
 
-def _build_national_results(queryset, evaluation_name, request_path):
+def _build_national_results(cube, evaluation_name, request_path):
     """Level 1: National party totals."""
-    rows = queryset.values(
-        'party_id', 'party_name_bn', 'party_symbol_name_bn', 'file_path', 'file_name'
-    ).annotate(votes=Max('national_party_vote')).order_by('-votes')
+    rows = sorted(_party_votes(cube['rows'], _PARTY_KEY, 'national_party_vote'), key=lambda r: -r['votes'])
 
     results = [_build_party_entry(r) for r in rows]
     total_votes = _calculate_percentages(results)
@@ -282,9 +255,9 @@ def _build_national_results(queryset, evaluation_name, request_path):
     return results, 'national', breadcrumb, total_votes
 
 
-def _build_division_results(queryset, evaluation_name, request_path):
+def _build_division_results(cube, evaluation_name, request_path):
     """Level 2: Results grouped by division."""
-    groups = _group_by_location(queryset, 'division_id', 'division_name_bn', 'division_party_vote')
+    groups = _group_by_location(cube['rows'], 'division_id', 'division_name_bn', 'division_party_vote')
     results = []
     for g in groups:
         results.append({
@@ -302,14 +275,14 @@ def _build_division_results(queryset, evaluation_name, request_path):
     return results, 'division', breadcrumb
 
 
-def _build_district_results(queryset, evaluation_name, request_path, division_id):
+def _build_district_results(cube, evaluation_name, request_path, division_id):
     """Level 3: Results grouped by district within a division."""
-    qs = queryset.filter(division_id=division_id)
-    division_name_bn = qs.values_list('division_name_bn', flat=True).first() or ''
-    division_name_en = Division.objects.filter(division_id=division_id).values_list('division_name_en', flat=True).first() or ''
+    rows = [r for r in cube['rows'] if r['division_id'] == division_id]
+    division_name_bn = rows[0]['division_name_bn'] if rows else ''
+    division_name_en = cube['division_names_en'].get(division_id) or ''
     division_label = f"{division_name_bn} ({division_name_en})" if division_name_en else division_name_bn
 
-    groups = _group_by_location(qs, 'district_id', 'district_name_bn', 'district_party_vote')
+    groups = _group_by_location(rows, 'district_id', 'district_name_bn', 'district_party_vote')
     results = []
     for g in groups:
         results.append({
@@ -328,18 +301,18 @@ def _build_district_results(queryset, evaluation_name, request_path, division_id
     return results, 'district', breadcrumb
 
 
-def _build_constituency_results(queryset, evaluation_name, request_path, division_id, district_id):
+def _build_constituency_results(cube, evaluation_name, request_path, division_id, district_id):
     """Level 4: Results grouped by constituency within a district."""
-    qs = queryset.filter(division_id=division_id, district_id=district_id)
-    division_name_bn = qs.values_list('division_name_bn', flat=True).first() or ''
-    district_name_bn = qs.values_list('district_name_bn', flat=True).first() or ''
-    division_name_en = Division.objects.filter(division_id=division_id).values_list('division_name_en', flat=True).first() or ''
-    district_name_en = District.objects.filter(district_id=district_id).values_list('district_name_en', flat=True).first() or ''
+    rows = [r for r in cube['rows'] if r['division_id'] == division_id and r['district_id'] == district_id]
+    division_name_bn = rows[0]['division_name_bn'] if rows else ''
+    district_name_bn = rows[0]['district_name_bn'] if rows else ''
+    division_name_en = cube['division_names_en'].get(division_id) or ''
+    district_name_en = cube['district_names_en'].get(district_id) or ''
     division_label = f"{division_name_bn} ({division_name_en})" if division_name_en else division_name_bn
     district_label = f"{district_name_bn} ({district_name_en})" if district_name_en else district_name_bn
 
     groups = _group_by_location(
-        qs, 'constituency_id', 'constituency_name_bn', 'seat_party_vote',
+        rows, 'constituency_id', 'constituency_name_bn', 'seat_party_vote',
         extra_fields=['seat_number_bn']
     )
     results = []
@@ -373,6 +346,7 @@ def _determine_back_url(request_path, drill_level, division_id=None):
     return None
 
 
+@query_budget(10)
 def past_results_drillthrough(request, election_evaluation_id):
     """Dispatcher: location-based drill-through report for election results."""
     view_level = request.GET.get('view')
@@ -384,33 +358,27 @@ def past_results_drillthrough(request, election_evaluation_id):
     if district_id:
         district_id = int(district_id)
 
-    queryset = AppGetPastResults.objects.filter(
-        election_evaluation_id=election_evaluation_id
-    )
-    first_record = queryset.values('evaluation_name_bn').first()
-    evaluation_name = first_record['evaluation_name_bn'] if first_record else f"Election {election_evaluation_id}"
+    # Closed elections never change: every level is computed from the cached cube
+    cube = past_results_cube(election_evaluation_id)
+    evaluation_name = cube['evaluation_name']
 
     total_votes = None
 
     if view_level == 'divisions':
         results, drill_level, breadcrumb = _build_division_results(
-            queryset, evaluation_name, request.path)
+            cube, evaluation_name, request.path)
     elif division_id and district_id:
         results, drill_level, breadcrumb = _build_constituency_results(
-            queryset, evaluation_name, request.path, division_id, district_id)
+            cube, evaluation_name, request.path, division_id, district_id)
     elif division_id:
         results, drill_level, breadcrumb = _build_district_results(
-            queryset, evaluation_name, request.path, division_id)
+            cube, evaluation_name, request.path, division_id)
     else:
         results, drill_level, breadcrumb, total_votes = _build_national_results(
-            queryset, evaluation_name, request.path)
+            cube, evaluation_name, request.path)
 
     back_url = _determine_back_url(request.path, drill_level, division_id)
 
-    past_elections = AppGetPastResults.objects.values(
-        'election_evaluation_id', 'evaluation_name_bn'
-    ).distinct().order_by('evaluation_name_bn')
-
     context = {
         'evaluation_name': evaluation_name,
         'results': results,
@@ -418,6 +386,6 @@ def past_results_drillthrough(request, election_evaluation_id):
         'breadcrumb': breadcrumb,
         'back_url': back_url,
         'total_votes': total_votes,
-        'past_elections': past_elections,
+        'past_elections': past_elections(),
     }
     return render(request, 'election_vote/pages/past-results-drillthrough.html', context)
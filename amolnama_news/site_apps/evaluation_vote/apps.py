@@ -6,3 +6,6 @@ class EvaluationVoteConfig(AppConfig):
     name = 'amolnama_news.site_apps.evaluation_vote'
     label = 'evaluation_vote'  
     verbose_name = 'Evaluation Vote'
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,235 @@
+"""
+Micro-batching writer for anonymous evaluation (opinion-poll) votes.
+
+submit_vote used to open its own transaction per vote: a UserDevice, the
+GetOrCreateGeoSource procedure, a UserProfile, a UserSession and the
+EvaluationResponse, each with its own timezone.now(). After a TV segment
+thousands of those arrive at once and every one pays for its own commit.
+
+Here the request thread only enqueues the vote and waits. A per-process
+flusher thread collects whatever arrived within EVALUATION_VOTE_INGEST_FLUSH_MS
+(up to EVALUATION_VOTE_INGEST_MAX_BATCH votes) and writes the whole batch
+in one transaction: one commit per batch, one geo-source lookup per
+distinct location, one timestamp per vote. Each vote sits in its own
+savepoint, so a bad payload fails only that vote. The caller gets the real
+evaluation_response_id back once the batch has committed, so update_vote
+keeps working unchanged and an acknowledged vote is always durable.
+
+A caller that gives up waiting cancels its Future. The flusher claims every
+Future with ``set_running_or_notify_cancel()`` before writing and skips the
+cancelled ones, so a vote the client was told to retry is never written
+behind its back. A vote already claimed can no longer be cancelled; the
+caller then waits for that write instead.
+
+Set EVALUATION_VOTE_INGEST_FLUSH_MS = 0 to write synchronously on the
+request thread instead.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from amolnama_news.site_apps.locations.models import get_or_create_geo_source
+
+from .models import EvaluationResponse, UserDevice, UserProfile, UserSession
+
+logger = logging.getLogger(__name__)
+
+
+# ========== Batch Writer ==========
+
+def _geo_key(geo_info):
+    return (
+        geo_info.get('country_name_en'),
+        geo_info.get('region_name_en'),
+        geo_info.get('city_name_en'),
+        geo_info.get('network_isp_name'),
+        geo_info.get('network_type'),
+        geo_info.get('latitude'),
+        geo_info.get('longitude'),
+    )
+
+
+def _write_vote(vote, geo_source_id):
+    """Insert device, profile, session and response rows for one vote."""
+    now = vote['received_at']
+    device_info = vote['device_info']
+
+    device = UserDevice.objects.create(
+        hash_device_fingerprint=b'',
+        app_instance_id=device_info.get('app_instance_id'),
+        app_platform_name=device_info.get('app_platform_name'),
+        browser_name=device_info.get('browser_name'),
+        first_seen_at=now,
+        is_blocked=False,
+        created_at=now,
+    )
+    profile = UserProfile.objects.create(
+        otp_attempt_count=0,
+        is_blocked=False,
+        created_at=now,
+    )
+    session = UserSession.objects.create(
+        link_evaluation_id=vote['evaluation_id'],
+        link_user_profile_id=profile.user_profile_id,
+        link_user_device_id=device.user_device_id,
+        link_geo_source_id=geo_source_id,
+        ip_address=vote['ip_address'],
+        is_vpn_suspected=False,
+        started_at=now,
+        total_questions_answered=1,
+        risk_score=0,
+        is_blocked=False,
+        created_at=now,
+    )
+    response = EvaluationResponse.objects.create(
+        link_evaluation_id=vote['evaluation_id'],
+        link_constituency_id=vote['constituency_id'],
+        link_party_id=vote['party_id'],
+        link_user_session_id=session.user_session_id,
+        is_active=True,
+        created_at=now,
+    )
+    return response.evaluation_response_id
+
+
+def write_votes(votes):
+    """Write a batch of votes in a single transaction.
+
+    Returns one entry per vote, in order: the new evaluation_response_id, or
+    the exception that rolled back that vote's savepoint.
+    """
+    outcomes = [None] * len(votes)
+    with transaction.atomic():
+        # Resolve each distinct location once, before any per-vote savepoint,
+        # so a rolled-back vote can never leave a dangling cached geo id.
+        geo_ids = {}
+        for vote in votes:
+            key = _geo_key(vote['geo_info'])
+            if key in geo_ids:
+                continue
+            try:
+                with transaction.atomic():
+                    geo_ids[key] = get_or_create_geo_source(*key)
+            except Exception as exc:
+                geo_ids[key] = exc
+
+        for i, vote in enumerate(votes):
+            geo = geo_ids[_geo_key(vote['geo_info'])]
+            if isinstance(geo, Exception):
+                outcomes[i] = geo
+                continue
+            try:
+                with transaction.atomic():
+                    outcomes[i] = _write_vote(vote, geo)
+            except Exception as exc:
+                outcomes[i] = exc
+    return outcomes
+
+
+# ========== Ingest Queue ==========
+
+class VoteIngestQueue:
+    """Per-process queue that group-commits votes from a flusher thread."""
+
+    def __init__(self, writer=write_votes, flush_ms=5, max_batch=100):
+        self.writer = writer
+        self.flush_ms = flush_ms
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def submit(self, vote):
+        """Enqueue a vote; the returned Future resolves to its response id."""
+        future = Future()
+        if self.flush_ms <= 0:
+            try:
+                outcomes = self.writer([vote])
+            except Exception as exc:
+                outcomes = [exc]
+            self._deliver([(vote, future)], outcomes)
+            return future
+        self._ensure_worker().put((vote, future))
+        return future
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so each gunicorn worker starts its own.
+        pid = os.getpid()
+        if self._pid == pid and self._thread.is_alive():
+            return self._queue
+        with self._lock:
+            if self._pid != pid or not self._thread.is_alive():
+                self._queue = queue.SimpleQueue()
+                self._thread = threading.Thread(
+                    target=self._run, name='evaluation-vote-ingest', daemon=True,
+                )
+                self._pid = pid
+                self._thread.start()
+        return self._queue
+
+    def _collect(self, q):
+        """Block for the first vote, then gather more until the window closes."""
+        batch = [q.get()]
+        deadline = time.monotonic() + self.flush_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        q = self._queue
+        while True:
+            # Votes whose caller timed out and cancelled are dropped here
+            batch = [
+                (vote, future) for vote, future in self._collect(q)
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            close_old_connections()
+            try:
+                outcomes = self.writer([vote for vote, _ in batch])
+            except Exception as exc:
+                logger.exception("Evaluation vote batch of %d failed", len(batch))
+                outcomes = [exc] * len(batch)
+            self._deliver(batch, outcomes)
+
+    @staticmethod
+    def _deliver(batch, outcomes):
+        for (_, future), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+vote_ingest = VoteIngestQueue(
+    flush_ms=getattr(settings, 'EVALUATION_VOTE_INGEST_FLUSH_MS', 5),
+    max_batch=getattr(settings, 'EVALUATION_VOTE_INGEST_MAX_BATCH', 100),
+)
+
+
+def build_vote(request, evaluation_id, data):
+    """Capture everything the writer needs from the request up front."""
+    return {
+        'evaluation_id': evaluation_id,
+        'device_info': data.get('device_info') or {},
+        'geo_info': data.get('geo_info') or {},
+        'constituency_id': data.get('constituency_id'),
+        'party_id': data.get('party_id'),
+        'ip_address': request.META.get('REMOTE_ADDR'),
+        'received_at': timezone.now(),
+    }
@@ -0,0 +1,60 @@
+"""
+Per-worker registry of party details ([party].[app_vw_get_party_details]).
+
+Party names, symbols and logo paths change a few times a year but are read
+on every home page and every results poll in both election_vote and
+evaluation_vote. The registry loads the view once, keeps it keyed by
+party_id in the tiered cache (core.cache), and lets views join against it
+in memory.
+
+Invalidation goes through the "party" data version (core.data_versions):
+saving or deleting a RefParty bumps it, and so does
+``manage.py bump_data_version party`` after an edit made straight in SQL
+Server; every worker reloads on its next poll. Unbumped edits are picked
+up after PARTY_REGISTRY_MAX_AGE seconds regardless.
+"""
+import logging
+
+from django.conf import settings
+
+from amolnama_news.site_apps.core.cache import tiered_cache
+
+from .models import AppGetPartyDetails
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "party_registry:parties"
+CACHE_TAG = "party"
+MAX_AGE = getattr(settings, "PARTY_REGISTRY_MAX_AGE", 60 * 60)
+
+
+def _load():
+    parties = list(AppGetPartyDetails.objects.all().order_by('party_name_bn'))
+    logger.debug("Loaded %d parties into the party registry", len(parties))
+    return parties, {p.party_id: p for p in parties}
+
+
+class PartyRegistry:
+    """Party details keyed by party_id, shared by every view in the worker."""
+
+    def _data(self):
+        return tiered_cache.get_or_set(CACHE_KEY, _load, ttl=MAX_AGE, tags=(CACHE_TAG,))
+
+    def all(self):
+        """All parties ordered by party_name_bn (same order as the old queries)."""
+        return self._data()[0]
+
+    def get(self, party_id):
+        return self._data()[1].get(party_id)
+
+    @staticmethod
+    def current_version():
+        return tiered_cache.tag_version(CACHE_TAG)
+
+    @staticmethod
+    def invalidate():
+        """Make every worker reload party details on its next read."""
+        tiered_cache.invalidate_tags(CACHE_TAG)
+
+
+party_registry = PartyRegistry()
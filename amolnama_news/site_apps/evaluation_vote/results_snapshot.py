@@ -0,0 +1,88 @@
+"""
+Materialized snapshot of the current evaluation poll results.
+
+app_vw_vote_cast_current_results aggregates every EvaluationResponse row,
+so querying it per request costs O(votes). The snapshot holds the
+O(parties) result rows in the tiered cache (core.cache) and is refreshed
+at most once per EVALUATION_RESULTS_MAX_STALENESS seconds across all
+workers, so during a spike only one refresh per window reaches the
+database.
+
+Every snapshot carries ``snapshot_at`` and a content ``version``; the
+version only changes when the numbers do, so clients can skip unchanged
+payloads (see views.vote_cast_current_results).
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from amolnama_news.site_apps.core.cache import tiered_cache
+from amolnama_news.site_apps.core.db_router import read_connection
+
+from .party_registry import party_registry
+
+SNAPSHOT_CACHE_KEY = "evaluation_vote:current_results"
+MAX_STALENESS = getattr(settings, "EVALUATION_RESULTS_MAX_STALENESS", 5)
+
+
+def _query_current_results():
+    # app_vw_* views are replica-eligible (core.db_router)
+    with read_connection().cursor() as cursor:
+        cursor.execute("""
+        SELECT [party_id],
+               [party_name_bn],
+               [party_short_name_bn],
+               [party_symbol_name_bn],
+               [party_vote_count],
+               [total_vote_count],
+               [vote_percentage]
+        FROM [news_magazine].[evaluation].[app_vw_vote_cast_current_results]
+        ORDER BY [party_id]
+        """)
+        rows = cursor.fetchall()
+    results = []
+    for row in rows:
+        # Logo paths come from the in-memory party registry, not a SQL join
+        party = party_registry.get(row[0])
+        results.append({
+            "party_id": row[0],
+            "party_name_bn": row[1],
+            "party_short_name_bn": row[2],
+            "party_symbol_name_bn": row[3],
+            "party_vote_count": row[4],
+            "total_vote_count": row[5],
+            "vote_percentage": row[6],
+            "file_path": (party and party.file_path) or "",
+            "file_name": (party and party.file_name) or "",
+        })
+    return results
+
+
+def build_snapshot(results):
+    """Wrap result rows with a content version and a timestamp."""
+    encoded = json.dumps(results, cls=DjangoJSONEncoder, sort_keys=True)
+    return {
+        "version": hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16],
+        "snapshot_at": time.time(),
+        "results": results,
+        "total_vote_count": results[0]["total_vote_count"] if results else 0,
+    }
+
+
+def get_current_results(max_staleness=None):
+    """Return a results snapshot no older than max_staleness seconds.
+
+    Past that age one caller refreshes it while everyone else keeps
+    serving the previous snapshot (core.cache soft TTL + single flight).
+    """
+    if max_staleness is None:
+        max_staleness = MAX_STALENESS
+    return tiered_cache.get_or_set(
+        SNAPSHOT_CACHE_KEY,
+        lambda: build_snapshot(_query_current_results()),
+        ttl=max(60, max_staleness * 10),
+        soft_ttl=max_staleness,
+        tags=("party",),
+    )
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from amolnama_news.site_apps.core import data_versions
+
+from .models import RefParty
+from .party_registry import CACHE_TAG
+
+
+@receiver(post_save, sender=RefParty)
+@receiver(post_delete, sender=RefParty)
+def bump_party_version(sender, **kwargs):
+    """Party edited in Django: make every worker reload party details."""
+    data_versions.bump(CACHE_TAG)
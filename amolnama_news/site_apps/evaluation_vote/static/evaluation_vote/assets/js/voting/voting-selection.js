@@ -1,5 +1,24 @@
 /* ========== VOTING SELECTION - API Calls & Data Fetching ========== */
 
+/**
+ * Load location rows from the static gazetteer (locations/js/gazetteer.js),
+ * falling back to the location API when it is unavailable
+ * @param {function} fromGazetteer - Gets the rows from window.gazetteer (returns a Promise)
+ * @param {string} url - API endpoint
+ * @param {function} fromApi - Picks the rows out of the API response
+ * @returns {Promise<Array>}
+ */
+function gazetteerOrApi(fromGazetteer, url, fromApi) {
+  const lookup = window.gazetteer
+    ? fromGazetteer(window.gazetteer)
+    : Promise.reject(new Error('gazetteer.js not loaded'));
+  return lookup.catch(() => fetch(url).then(response => response.json()).then(fromApi));
+}
+
+// The API orders these lists by English name, constituencies by seat number
+const byEnglishName = (a, b) => (a.name_en || '').localeCompare(b.name_en || '');
+const bySeatNumber = (a, b) => (parseInt(a.seat_en, 10) || 0) - (parseInt(b.seat_en, 10) || 0);
+
 /**
  * Handle division selection
  * Fetches districts for the selected division
@@ -13,21 +32,24 @@ function selectDivision(id, nameEn, nameBn) {
   updateBreadcrumb(nameEn, nameBn);
   showView('district-view');
   
-  // Fetch districts from API
-  fetch(`/evaluation_vote/api/districts/${id}/`)
-    .then(response => response.json())
-    .then(data => {
+  // Fetch districts (static gazetteer, else API)
+  gazetteerOrApi(
+    gazetteer => gazetteer.districts(id).then(districts => districts.slice().sort(byEnglishName)),
+    `/evaluation_vote/api/districts/${id}/`,
+    data => data.districts
+  )
+    .then(districts => {
       const list = document.getElementById('district-list');
       if (!list) return;
       
       list.innerHTML = '';
       
-      if (data.districts.length === 0) {
+      if (districts.length === 0) {
         list.innerHTML = '<li>No districts found / কোনো জেলা পাওয়া যায়নি</li>';
         return;
       }
       
-      data.districts.forEach(district => {
+      districts.forEach(district => {
         const li = document.createElement('li');
         li.onclick = () => selectDistrict(district.id, district.name_en, district.name_bn);
         li.innerHTML = `
@@ -60,21 +82,24 @@ function selectDistrict(id, nameEn, nameBn) {
   );
   showView('constituency-view');
   
-  // Fetch constituencies from API
-  fetch(`/evaluation_vote/api/constituencies/${id}/`)
-    .then(response => response.json())
-    .then(data => {
+  // Fetch constituencies (static gazetteer, else API)
+  gazetteerOrApi(
+    gazetteer => gazetteer.district(id).then(shard => shard.constituencies.slice().sort(bySeatNumber)),
+    `/evaluation_vote/api/constituencies/${id}/`,
+    data => data.constituencies
+  )
+    .then(constituencies => {
       const list = document.getElementById('constituency-list');
       if (!list) return;
       
       list.innerHTML = '';
       
-      if (data.constituencies.length === 0) {
+      if (constituencies.length === 0) {
         list.innerHTML = '<li>No constituencies found / কোনো নির্বাচনী এলাকা পাওয়া যায়নি</li>';
         return;
       }
       
-      data.constituencies.forEach(constituency => {
+      constituencies.forEach(constituency => {
         const li = document.createElement('li');
         li.onclick = () => selectConstituency(constituency.id, constituency.name_en, constituency.name_bn);
         li.innerHTML = `
@@ -126,10 +151,14 @@ function loadUpazilas() {
   unionSelect.innerHTML = '<option value="">-- নির্বাচন করুন / Select --</option>';
   unionSelect.disabled = true;
   
-  fetch(`/evaluation_vote/api/upazilas/${selectedDistrict.id}/`)
-    .then(response => response.json())
-    .then(data => {
-      data.upazilas.forEach(upazila => {
+  gazetteerOrApi(
+    gazetteer => gazetteer.district(selectedDistrict.id).then(shard =>
+      shard.subdistricts.filter(s => s.type === 'upazila').sort(byEnglishName)),
+    `/evaluation_vote/api/upazilas/${selectedDistrict.id}/`,
+    data => data.upazilas
+  )
+    .then(upazilas => {
+      upazilas.forEach(upazila => {
         const option = document.createElement('option');
         option.value = upazila.id;
         option.textContent = `${upazila.name_en} (${upazila.name_bn})`;
@@ -156,10 +185,14 @@ function loadUnions() {
   
   if (!upazilaId) return;
   
-  fetch(`/evaluation_vote/api/unions/${upazilaId}/`)
-    .then(response => response.json())
-    .then(data => {
-      data.unions.forEach(union => {
+  gazetteerOrApi(
+    gazetteer => gazetteer.district(selectedDistrict.id).then(shard =>
+      (shard.union_parishads[upazilaId] || []).slice().sort(byEnglishName)),
+    `/evaluation_vote/api/unions/${upazilaId}/`,
+    data => data.unions
+  )
+    .then(unions => {
+      unions.forEach(union => {
         const option = document.createElement('option');
         option.value = union.id;
         option.textContent = `${union.name_en} (${union.name_bn})`;
@@ -172,14 +205,22 @@ function loadUnions() {
     });
 }
 
+// Version of the results snapshot currently rendered
+let lastResultsVersion = null;
+
 /**
  * Fetch current vote casting results with vote counts and percentages
  * Called to update party list with latest voting data
+ * Skips re-rendering when the server snapshot version has not changed
  */
 function updatePartyListWithPercentages() {
-  fetch('/evaluation_vote/api/vote-cast-current-results/')
+  const query = lastResultsVersion ? `?since_version=${encodeURIComponent(lastResultsVersion)}` : '';
+  fetch(`/evaluation_vote/api/vote-cast-current-results/${query}`)
     .then(response => response.json())
     .then(data => {
+      if (data.unchanged) return;
+      lastResultsVersion = data.version;
+
       // Update total vote count
       const totalVoteInfo = document.getElementById('total-vote-info');
       if (totalVoteInfo && data.results.length > 0) {
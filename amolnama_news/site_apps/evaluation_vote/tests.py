@@ -1,6 +1,236 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from amolnama_news.site_apps.core.cache import tiered_cache
+
+from amolnama_news.site_apps.core.benchmarking import ensure_tables
+
+from . import ingest as ingest_module, party_registry as party_registry_module, results_snapshot, views
+from .ingest import VoteIngestQueue
+from .models import EvaluationResponse, UserDevice, UserProfile, UserSession
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "eval-test"},
+}
 
 
 class SimpleTest(TestCase):
     def test_sample(self):
         self.assertEqual(1 + 1, 2)
+
+
+class VoteIngestQueueTest(SimpleTestCase):
+    def make_queue(self, **kwargs):
+        self.batches = []
+
+        def writer(votes):
+            self.batches.append(list(votes))
+            return [ValueError('bad vote') if v == 'bad' else v * 10 for v in votes]
+
+        return VoteIngestQueue(writer=writer, **kwargs)
+
+    def test_concurrent_votes_share_a_batch(self):
+        ingest = self.make_queue(flush_ms=200, max_batch=50)
+        start = threading.Barrier(5)
+        futures = {}
+
+        def vote(n):
+            start.wait()
+            futures[n] = ingest.submit(n)
+
+        threads = [threading.Thread(target=vote, args=(n,)) for n in range(1, 6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual({n: f.result(timeout=5) for n, f in futures.items()},
+                         {1: 10, 2: 20, 3: 30, 4: 40, 5: 50})
+        self.assertEqual(len(self.batches), 1)
+
+    def test_failed_vote_does_not_fail_the_batch(self):
+        ingest = self.make_queue(flush_ms=100)
+        good, bad = ingest.submit(7), ingest.submit('bad')
+        self.assertEqual(good.result(timeout=5), 70)
+        with self.assertRaises(ValueError):
+            bad.result(timeout=5)
+
+    def test_max_batch_caps_each_flush(self):
+        ingest = self.make_queue(flush_ms=200, max_batch=2)
+        futures = [ingest.submit(n) for n in range(5)]
+        self.assertEqual([f.result(timeout=5) for f in futures], [0, 10, 20, 30, 40])
+        self.assertTrue(all(len(b) <= 2 for b in self.batches))
+
+    def test_zero_flush_interval_writes_inline(self):
+        ingest = self.make_queue(flush_ms=0)
+        self.assertEqual(ingest.submit(3).result(timeout=0), 30)
+        self.assertIsNone(ingest._thread)
+
+    def test_cancelled_vote_is_never_written(self):
+        ingest = self.make_queue(flush_ms=200)
+        abandoned = ingest.submit(1)
+        self.assertTrue(abandoned.cancel())
+        self.assertEqual(ingest.submit(2).result(timeout=5), 20)
+        self.assertEqual(self.batches, [[2]])
+
+
+class SubmitVoteTimeoutTest(SimpleTestCase):
+    def post(self, ingest):
+        request = RequestFactory().post(
+            '/evaluation_vote/api/submit-vote/', json.dumps({'party_id': 3}), content_type='application/json',
+        )
+        evaluation = SimpleNamespace(evaluation_id=1)
+        with mock.patch.object(views, 'vote_ingest', ingest), \
+                mock.patch.object(views, 'VOTE_INGEST_TIMEOUT', 0.05), \
+                mock.patch.object(views.AppGetEvaluation.objects, 'first', return_value=evaluation):
+            return views.submit_vote(request)
+
+    def test_timed_out_vote_is_withdrawn_before_asking_for_a_retry(self):
+        written = []
+        ingest = VoteIngestQueue(writer=lambda votes: written.extend(votes) or [1] * len(votes), flush_ms=300)
+        response = self.post(ingest)
+        self.assertEqual(response.status_code, 503)
+        ingest.submit({'party_id': 4}).result(timeout=5)  # the batch the first vote would have joined
+        self.assertEqual([v['party_id'] for v in written], [4])
+
+    def test_vote_being_written_is_reported_pending_not_retried(self):
+        release = threading.Event()
+
+        def slow_writer(votes):
+            release.wait(5)
+            return [7] * len(votes)
+
+        ingest = VoteIngestQueue(writer=slow_writer, flush_ms=1)
+        response = self.post(ingest)
+        release.set()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(json.loads(response.content)['pending'], True)
+
+
+class WriteVotesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Unmanaged [evaluator]/[evaluation] tables; created before the class transaction
+        ensure_tables([UserDevice, UserProfile, UserSession, EvaluationResponse])
+        super().setUpClass()
+
+    def vote(self, **overrides):
+        return {
+            'evaluation_id': 1,
+            'device_info': {'app_instance_id': 'abc', 'browser_name': 'Firefox'},
+            'geo_info': {'city_name_en': 'Dhaka'},
+            'constituency_id': 10,
+            'party_id': 3,
+            'ip_address': '10.0.0.1',
+            'received_at': timezone.now(),
+            **overrides,
+        }
+
+    @mock.patch.object(ingest_module, 'get_or_create_geo_source', return_value=55)
+    def test_batch_writes_every_row_and_isolates_a_bad_vote(self, geo):
+        votes = [self.vote(), self.vote(evaluation_id=None), self.vote(party_id=4)]
+        outcomes = ingest_module.write_votes(votes)
+
+        self.assertIsInstance(outcomes[1], Exception)
+        responses = EvaluationResponse.objects.order_by('evaluation_response_id')
+        self.assertEqual([r.evaluation_response_id for r in responses], [outcomes[0], outcomes[2]])
+        self.assertEqual([r.link_party_id for r in responses], [3, 4])
+        geo.assert_called_once()  # one lookup per distinct location
+
+        # The failed vote's device and profile rolled back with its savepoint
+        self.assertEqual(UserDevice.objects.count(), 2)
+        self.assertEqual(UserProfile.objects.count(), 2)
+        for response, vote in zip(responses, (votes[0], votes[2])):
+            session = UserSession.objects.get(user_session_id=response.link_user_session_id)
+            self.assertEqual(session.link_geo_source_id, 55)
+            self.assertEqual(session.created_at, vote['received_at'])
+            self.assertEqual(response.created_at, vote['received_at'])
+            device = UserDevice.objects.get(user_device_id=session.link_user_device_id)
+            self.assertEqual(device.browser_name, 'Firefox')
+            self.assertTrue(UserProfile.objects.filter(user_profile_id=session.link_user_profile_id).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ResultsSnapshotTest(SimpleTestCase):
+    ROWS = [{"party_id": 1, "party_vote_count": 3, "total_vote_count": 5},
+            {"party_id": 2, "party_vote_count": 2, "total_vote_count": 5}]
+
+    def setUp(self):
+        tiered_cache.l1.clear()
+        caches["shared"].clear()
+        patcher = mock.patch.object(results_snapshot, "_query_current_results",
+                                    return_value=list(self.ROWS))
+        self.query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fresh_snapshot_is_reused(self):
+        first = results_snapshot.get_current_results(max_staleness=60)
+        second = results_snapshot.get_current_results(max_staleness=60)
+        self.assertIs(first, second)
+        self.assertEqual(self.query.call_count, 1)
+        self.assertEqual(first["total_vote_count"], 5)
+
+    def test_other_workers_pick_up_the_shared_snapshot(self):
+        first = results_snapshot.get_current_results(max_staleness=60)
+        tiered_cache.l1.clear()  # a different worker process
+        self.assertEqual(results_snapshot.get_current_results(max_staleness=60), first)
+        self.assertEqual(self.query.call_count, 1)
+
+    def test_long_poll_returns_when_the_results_change(self):
+        first = results_snapshot.get_current_results()
+        changed = dict(first, version="next")
+        request = RequestFactory().get("/", {"since_version": first["version"], "wait": 5})
+        with mock.patch.object(views, "get_current_results", side_effect=[first, changed, changed]), \
+                mock.patch.object(views, "RESULTS_MAX_STALENESS", 0.01):
+            response = asyncio.run(views.vote_cast_current_results.async_view(request))
+        self.assertEqual(json.loads(response.content)["version"], "next")
+
+    def test_version_tracks_content_only(self):
+        first = results_snapshot.build_snapshot(list(self.ROWS))
+        same = results_snapshot.build_snapshot(list(self.ROWS))
+        changed = results_snapshot.build_snapshot([dict(self.ROWS[0], party_vote_count=4)])
+        self.assertEqual(first["version"], same["version"])
+        self.assertNotEqual(first["version"], changed["version"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PartyRegistryTest(SimpleTestCase):
+    def setUp(self):
+        tiered_cache.l1.clear()
+        caches["shared"].clear()
+        self.rows = [SimpleNamespace(party_id=1, party_name_bn="ক"),
+                     SimpleNamespace(party_id=2, party_name_bn="খ")]
+        patcher = mock.patch.object(party_registry_module, "AppGetPartyDetails")
+        self.model = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.model.objects.all.return_value.order_by.side_effect = lambda *a: list(self.rows)
+        self.registry = party_registry_module.party_registry
+
+    def loads(self):
+        return self.model.objects.all.call_count
+
+    def test_loads_once_and_joins_by_id(self):
+        self.assertEqual([p.party_id for p in self.registry.all()], [1, 2])
+        self.assertEqual(self.registry.get(2).party_name_bn, "খ")
+        self.assertIsNone(self.registry.get(99))
+        self.assertEqual(self.loads(), 1)
+
+    def test_invalidate_reloads_every_worker(self):
+        self.registry.all()
+        self.rows.append(SimpleNamespace(party_id=3, party_name_bn="গ"))
+
+        self.registry.invalidate()
+        self.assertIsNotNone(self.registry.get(3))
+        self.assertEqual(self.loads(), 2)
+        # Another worker's copy was stored under the old tag version too
+        tiered_cache.l1.clear()
+        self.assertIsNotNone(self.registry.get(3))
+        self.assertEqual(self.loads(), 2)
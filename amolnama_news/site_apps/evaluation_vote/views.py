@@ -1,26 +1,37 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified
 from django.db.models.functions import Cast
-from django.db.models import IntegerField, Q
+from django.db.models import IntegerField
 from django.views.decorators.http import require_POST
-from django.utils import timezone
 import json
 from amolnama_news.site_apps.locations.models import Division, District, Constituency, Upazila, UnionParishad
-from .models import RefEvaluation, RefParty, EvaluationResponse, UserDevice, UserProfile, UserSession
-from amolnama_news.site_apps.locations.models import get_or_create_geo_source
-from django.db import connection
-from amolnama_news.site_apps.multimedia.models import AppAsset
-from .models import AppGetEvaluation, AppGetPartyDetails, AppSidebarPastResults
+from .models import EvaluationResponse
+from .models import AppGetEvaluation, AppSidebarPastResults
+from .party_registry import party_registry
+from amolnama_news.site_apps.core.async_views import asgi_view, run_sync
+from amolnama_news.site_apps.core.page_cache import cache_anonymous_page
+from amolnama_news.site_apps.core.cache import REFERENCE_TTL, cache_json_view
+from amolnama_news.site_apps.core.json_response import json_response
+from .ingest import build_vote, vote_ingest
+from .results_snapshot import MAX_STALENESS as RESULTS_MAX_STALENESS, get_current_results
+from datetime import datetime, timezone as dt_timezone
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import asyncio
+from django.conf import settings
 
+VOTE_INGEST_TIMEOUT = getattr(settings, 'EVALUATION_VOTE_INGEST_TIMEOUT', 10)
+RESULTS_LONG_POLL_MAX = getattr(settings, 'EVALUATION_RESULTS_LONG_POLL_MAX', 25)
 
 
 
+
+@cache_anonymous_page('evaluation_vote:home', tags=('party', 'location', 'evaluation'))
 def home(request):
     # Get current active evaluation (view returns only the active one)
     evaluation = AppGetEvaluation.objects.first()
 
     # Get all active parties with their details
-    parties = AppGetPartyDetails.objects.all().order_by('party_name_bn')
+    parties = party_registry.all()
 
     # Get divisions for the dropdown
     divisions = Division.objects.filter(is_active=True).order_by('division_name_en')
@@ -36,6 +47,8 @@ def home(request):
     })
 
 
+@asgi_view
+@cache_json_view('evaluation_vote:divisions', REFERENCE_TTL, tags=('location',))
 def get_divisions(request):
     """API: Get all divisions"""
     divisions = Division.objects.filter(is_active=True).order_by('division_name_en')
@@ -50,9 +63,11 @@ def get_divisions(request):
             for d in divisions
         ]
     }
-    return JsonResponse(data)
+    return json_response(request, data)
 
 
+@asgi_view
+@cache_json_view('evaluation_vote:districts', REFERENCE_TTL, tags=('location',))
 def get_districts(request, division_id):
     """API: Get districts by division"""
     districts = District.objects.filter(
@@ -70,9 +85,11 @@ def get_districts(request, division_id):
             for d in districts
         ]
     }
-    return JsonResponse(data)
+    return json_response(request, data)
 
 
+@asgi_view
+@cache_json_view('evaluation_vote:constituencies', REFERENCE_TTL, tags=('location',))
 def get_constituencies(request, district_id):
     """API: Get constituencies by district"""
     constituencies = Constituency.objects.filter(
@@ -95,9 +112,11 @@ def get_constituencies(request, district_id):
             for c in constituencies
         ]
     }
-    return JsonResponse(data)
+    return json_response(request, data)
 
 
+@asgi_view
+@cache_json_view('evaluation_vote:upazilas', REFERENCE_TTL, tags=('location',))
 def get_upazilas(request, district_id):
     """API: Get upazilas by district"""
     upazilas = Upazila.objects.filter(
@@ -115,9 +134,11 @@ def get_upazilas(request, district_id):
             for u in upazilas
         ]
     }
-    return JsonResponse(data)
+    return json_response(request, data)
 
 
+@asgi_view
+@cache_json_view('evaluation_vote:union_parishads', REFERENCE_TTL, tags=('location',))
 def get_union_parishads(request, upazila_id):
     """API: Get union parishads by upazila"""
     unions = UnionParishad.objects.filter(
@@ -135,12 +156,14 @@ def get_union_parishads(request, upazila_id):
             for u in unions
         ]
     }
-    return JsonResponse(data)
+    return json_response(request, data)
 
 
+@asgi_view
+@cache_json_view('evaluation_vote:parties', REFERENCE_TTL, tags=('party',))
 def get_parties(request):
     """API: Get all active parties with their details"""
-    parties = AppGetPartyDetails.objects.all().order_by('party_name_bn')
+    parties = party_registry.all()
 
     data = {
         'parties': [
@@ -157,9 +180,11 @@ def get_parties(request):
             for p in parties
         ]
     }
-    return JsonResponse(data)
+    return json_response(request, data)
 
 
+@asgi_view
+@cache_json_view('evaluation_vote:evaluation', 60, tags=('evaluation',))
 def get_evaluation(request):
     """API: Get active evaluation"""
     evaluation = AppGetEvaluation.objects.first()
@@ -177,7 +202,7 @@ def get_evaluation(request):
     else:
         data = {'evaluation': None}
 
-    return JsonResponse(data)
+    return json_response(request, data)
 
 
 
@@ -188,77 +213,43 @@ def submit_vote(request):
         # Get current active evaluation from the DB view
         evaluation = AppGetEvaluation.objects.first()
         if not evaluation:
-            return JsonResponse({
+            return json_response(request, {
                 'success': False,
                 'error': 'No active evaluation found'
             }, status=400)
 
         data = json.loads(request.body)
-        device_info = data.get('device_info', {})
-
-        # Insert UserDevice
-        device = UserDevice.objects.create(
-            hash_device_fingerprint=b'',  # or set as needed
-            app_instance_id=device_info.get('app_instance_id'),
-            app_platform_name=device_info.get('app_platform_name'),
-            browser_name=device_info.get('browser_name'),
-            first_seen_at=timezone.now(),
-            is_blocked=False,
-            created_at=timezone.now(),
-        )
-
-        # Extract geo info from request
-        geo_info = data.get('geo_info', {})
-        geo_source_id = get_or_create_geo_source(
-            country_name_en=geo_info.get('country_name_en'),
-            region_name_en=geo_info.get('region_name_en'),
-            city_name_en=geo_info.get('city_name_en'),
-            network_isp_name=geo_info.get('network_isp_name'),
-            network_type=geo_info.get('network_type'),
-            latitude=geo_info.get('latitude'),
-            longitude=geo_info.get('longitude')
-        )
-
-        # Insert UserProfile
-        profile = UserProfile.objects.create(
-            otp_attempt_count=0,
-            is_blocked=False,
-            created_at=timezone.now(),
-        )
-
-        # Insert UserSession (now with geo_source_id)
-        session = UserSession.objects.create(
-            link_evaluation_id=evaluation.evaluation_id,
-            link_user_profile_id=profile.user_profile_id,
-            link_user_device_id=device.user_device_id,
-            link_geo_source_id=geo_source_id,  # <-- add this line
-            ip_address=request.META.get('REMOTE_ADDR'),
-            is_vpn_suspected=False,
-            started_at=timezone.now(),
-            total_questions_answered=1,
-            risk_score=0,
-            is_blocked=False,
-            created_at=timezone.now(),
-        )
-
-        # Insert EvaluationResponse
-        vote = EvaluationResponse.objects.create(
-            link_evaluation_id=evaluation.evaluation_id,
-            link_constituency_id=data.get('constituency_id'),
-            link_party_id=data.get('party_id'),
-            link_user_session_id=session.user_session_id,
-            is_active=True,
-            created_at=timezone.now(),
-        )
-
-        return JsonResponse({
+
+        # Queued and group-committed with other votes; see ingest.py
+        future = vote_ingest.submit(build_vote(request, evaluation.evaluation_id, data))
+        try:
+            vote_id = future.result(timeout=VOTE_INGEST_TIMEOUT)
+        except FutureTimeoutError:
+            if future.cancel():
+                # Still queued, now never written: a retry cannot double-count
+                return json_response(request, {
+                    'success': False,
+                    'error': 'Vote queue is busy, please try again'
+                }, status=503)
+            # Already being written; it commits or fails shortly
+            try:
+                vote_id = future.result(timeout=VOTE_INGEST_TIMEOUT)
+            except FutureTimeoutError:
+                return json_response(request, {
+                    'success': True,
+                    'pending': True,
+                    'vote_id': None,
+                    'message': 'Vote received and is being saved'
+                }, status=202)
+
+        return json_response(request, {
             'success': True,
-            'vote_id': vote.evaluation_response_id,
+            'vote_id': vote_id,
             'message': 'Vote submitted successfully'
         })
 
     except Exception as e:
-        return JsonResponse({
+        return json_response(request, {
             'success': False,
             'error': str(e)
         }, status=400)
@@ -271,7 +262,7 @@ def update_vote(request):
         vote_id = data.get('vote_id')
         
         if not vote_id:
-            return JsonResponse({
+            return json_response(request, {
                 'success': False,
                 'error': 'Vote ID required'
             }, status=400)
@@ -290,19 +281,19 @@ def update_vote(request):
         
         vote.save()
         
-        return JsonResponse({
+        return json_response(request, {
             'success': True,
             'message': 'Vote updated successfully'
         })
         
     except EvaluationResponse.DoesNotExist:
-        return JsonResponse({
+        return json_response(request, {
             'success': False,
             'error': 'Vote not found'
         }, status=404)
         
     except Exception as e:
-        return JsonResponse({
+        return json_response(request, {
             'success': False,
             'error': str(e)
         }, status=400)
@@ -311,65 +302,61 @@ def update_vote(request):
 
 
 def vote_results(request):
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT [party_id], [party_name_bn], [party_short_name_bn], [party_symbol_name_bn],
-                [party_vote_count], [total_vote_count], [vote_percentage]
-            FROM [news_magazine].[evaluation].[app_vw_vote_cast_current_results]
-            ORDER BY [party_id]
-        """)
-        rows = cursor.fetchall()
-        results = [
-            {
-                "party_id": row[0],
-                "party_name_bn": row[1],
-                "party_short_name_bn": row[2],
-                "party_symbol_name_bn": row[3],
-                "party_vote_count": row[4],
-                "total_vote_count": row[5],
-                "vote_percentage": row[6],
-            }
-            for row in rows
-        ]
-    total_votes = results[0]["total_vote_count"] if results else 0
-    return render(request, "evaluation_vote/vote_results.html", {"results": results, "total": total_votes})
+    snapshot = get_current_results()
+    return render(request, "evaluation_vote/vote_results.html", {
+        "results": snapshot["results"],
+        "total": snapshot["total_vote_count"],
+    })
+
+
+async def _long_poll_current_results(view, request):
+    """ASGI: with ?since_version=<v>&wait=<seconds>, hold the request until
+    the results change or the wait (at most RESULTS_LONG_POLL_MAX) runs out."""
+    since_version = request.GET.get("since_version")
+    try:
+        wait = min(float(request.GET.get("wait", 0)), RESULTS_LONG_POLL_MAX)
+    except ValueError:
+        wait = 0
+    if since_version and wait > 0:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while (await run_sync(get_current_results))["version"] == since_version:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            # The snapshot cannot change faster than it is refreshed
+            await asyncio.sleep(min(RESULTS_MAX_STALENESS, remaining))
+    return await run_sync(view, request)
 
 
 # In your get_party_results view
+@asgi_view(async_variant=_long_poll_current_results)
 def vote_cast_current_results(request):
-    """API endpoint for current vote casting results - real-time party vote counts"""
-    with connection.cursor() as cursor:
-        cursor.execute("""
-        SELECT v.[party_id],
-               v.[party_name_bn],
-               v.[party_short_name_bn],
-               v.[party_symbol_name_bn],
-               v.[party_vote_count],
-               v.[total_vote_count],
-               v.[vote_percentage],
-               p.[file_path],
-               p.[file_name]
-        FROM [news_magazine].[evaluation].[app_vw_vote_cast_current_results] v
-        LEFT JOIN [news_magazine].[party].[app_vw_get_party_details] p
-            ON v.party_id = p.party_id
-        ORDER BY v.[party_id]
-        """)
-        rows = cursor.fetchall()
-        results = [
-            {
-                "party_id": row[0],
-                "party_name_bn": row[1],
-                "party_short_name_bn": row[2],
-                "party_symbol_name_bn": row[3],
-                "party_vote_count": row[4],
-                "total_vote_count": row[5],
-                "vote_percentage": row[6],
-                "file_path": row[7] or "",
-                "file_name": row[8] or "",
-            }
-            for row in rows
-        ]
-    return JsonResponse({"results": results})
+    """API endpoint for current vote casting results - party vote counts.
+
+    Served from a snapshot at most EVALUATION_RESULTS_MAX_STALENESS seconds
+    old. Clients that pass ?since_version=<version> (or If-None-Match) get
+    a tiny "unchanged" reply while the numbers stay the same. Under ASGI
+    they can also pass ?wait=<seconds> to long-poll for the next change.
+    """
+    snapshot = get_current_results()
+    version = snapshot["version"]
+    etag = f'"{version}"'
+    snapshot_at = datetime.fromtimestamp(snapshot["snapshot_at"], tz=dt_timezone.utc).isoformat()
+
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    elif request.GET.get("since_version") == version:
+        response = json_response(request, {"unchanged": True, "version": version, "snapshot_at": snapshot_at})
+    else:
+        response = json_response(request, {
+            "results": snapshot["results"],
+            "version": version,
+            "snapshot_at": snapshot_at,
+        })
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
 
 
 def sidebar_past_vote_results(request):
@@ -0,0 +1,341 @@
+"""
+Static gazetteer: the location cascades as content-hashed JSON files.
+
+The cascading dropdowns (news collection, evaluation/election vote, profile
+address) ask the server for the same lists on every district and upazila
+change. ``python manage.py build_gazetteer`` writes them out once instead,
+into GAZETTEER_BUILD_DIR:
+
+    index.json           divisions, and every active district with the
+                         file name of its shard
+    district-<id>.json   one per district: constituencies, subdistricts
+                         (upazilas, metropolitan thanas, city corporations,
+                         municipalities) and the union parishads of each
+                         upazila — names and lat/lng
+
+``GazetteerFinder`` (in STATICFILES_FINDERS) exposes the directory as
+``locations/gazetteer/``, so ``collectstatic`` copies it into STATIC_ROOT
+like any other static file. The index lists each shard under the name the
+staticfiles storage gives it — with the manifest storage that is
+``district-<id>.<md5>.json``, the name collectstatic writes — so WhiteNoise
+and any CDN in front of it cache shards forever. Run the command with the
+settings collectstatic runs with, before it.
+
+The index records the ``location`` data version it was built from
+(core.data_versions). ``index_url()`` returns None when the files are
+missing or older than the data, and locations/js/gazetteer.js then makes
+the cascades use the dynamic APIs, which stay as the fallback.
+
+The item builders below are also what the newshub cascade APIs return, so
+a shard and its fallback always hold the same rows.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import BaseFinder
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.contrib.staticfiles.utils import get_files
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.templatetags.static import static
+
+from amolnama_news.site_apps.core import data_versions
+from amolnama_news.site_apps.core.json_response import dumps
+
+from .models import (
+    CityCorporation, Constituency, District, Division, MetropolitanThana,
+    Municipality, UnionParishad, Upazila,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 1
+STATIC_PREFIX = "locations/gazetteer"
+INDEX_NAME = "index.json"
+
+_index_meta = {}
+
+
+def build_dir():
+    return Path(getattr(settings, "GAZETTEER_BUILD_DIR", Path(settings.BASE_DIR) / ".cache" / "gazetteer"))
+
+
+# ========== Items ==========
+
+def _coord(value):
+    return float(value) if value else None
+
+
+def constituency_item(c):
+    return {
+        'id': c.constituency_id,
+        'name_bn': c.constituency_name_bn or '',
+        'name_en': c.constituency_name_en or '',
+        'seat_bn': c.seat_number_bn or '',
+        'seat_en': c.seat_number_en or '',
+        'area_bn': c.constituency_area_list_bn or '',
+    }
+
+
+def upazila_item(u):
+    return {
+        'id': u.upazila_id,
+        'name_bn': u.upazila_name_bn or '',
+        'name_en': u.upazila_name_en or '',
+        'type': 'upazila',
+        'lat': _coord(u.upazila_latitude),
+        'lng': _coord(u.upazila_longitude),
+    }
+
+
+def metropolitan_thana_item(t):
+    return {
+        'id': t.metropolitan_thana_id,
+        'name_bn': t.metropolitan_thana_name_bn or '',
+        'name_en': t.metropolitan_thana_name_en or '',
+        'type': 'metropolitan_thana',
+        'lat': _coord(t.metropolitan_thana_latitude),
+        'lng': _coord(t.metropolitan_thana_longitude),
+    }
+
+
+def city_corporation_item(cc):
+    return {
+        'id': cc.city_corporation_id,
+        'name_bn': cc.city_corporation_name_bn or '',
+        'name_en': cc.city_corporation_name_en or '',
+        'type': 'city_corporation',
+        'lat': _coord(cc.city_corporation_geo_latitude),
+        'lng': _coord(cc.city_corporation_geo_longitude),
+    }
+
+
+def municipality_item(m):
+    return {
+        'id': m.municipality_id,
+        'name_bn': m.municipality_name_bn or '',
+        'name_en': m.municipality_name_en or '',
+        'type': 'municipality',
+        'lat': _coord(m.municipality_geo_latitude),
+        'lng': _coord(m.municipality_geo_longitude),
+    }
+
+
+def union_parishad_item(up):
+    return {
+        'id': up.union_parishad_id,
+        'name_bn': up.union_parishad_name_bn or '',
+        'name_en': up.union_parishad_name_en or '',
+        'type': 'union_parishad',
+        'lat': _coord(up.union_parishad_latitude),
+        'lng': _coord(up.union_parishad_longitude),
+    }
+
+
+# ========== Lists ==========
+
+def divisions():
+    """Active divisions, by English name."""
+    return [
+        {
+            'id': d.division_id,
+            'name_bn': d.division_name_bn or '',
+            'name_en': d.division_name_en or '',
+            'lat': _coord(d.division_latitude),
+            'lng': _coord(d.division_longitude),
+        }
+        for d in Division.objects.filter(is_active=True).order_by('division_name_en')
+    ]
+
+
+def districts():
+    """Active districts with their division, by Bengali name."""
+    return [
+        {
+            'id': d.district_id,
+            'division_id': d.link_division_id,
+            'name_bn': d.district_name_bn or '',
+            'name_en': d.district_name_en or '',
+            'lat': _coord(d.district_latitude),
+            'lng': _coord(d.district_longitude),
+        }
+        for d in District.objects.filter(is_active=True).order_by('district_name_bn')
+    ]
+
+
+def _grouped(queryset, key, item, groups=None):
+    groups = {} if groups is None else groups
+    for obj in queryset:
+        groups.setdefault(getattr(obj, key), []).append(item(obj))
+    return groups
+
+
+def constituencies_by_district(district_ids=None):
+    """{district_id: [constituency, ...]} of active constituencies, by Bengali name."""
+    qs = Constituency.objects.filter(is_active=True).order_by('constituency_name_bn')
+    if district_ids is not None:
+        qs = qs.filter(link_district_id__in=district_ids)
+    return _grouped(qs, 'link_district_id', constituency_item)
+
+
+def subdistricts_by_district(district_ids=None):
+    """{district_id: [subdistrict, ...]}: upazilas, then metropolitan thanas,
+    city corporations and municipalities, each by Bengali name and tagged
+    with its type."""
+    groups = {}
+    for model, name_field, item in (
+        (Upazila, 'upazila_name_bn', upazila_item),
+        (MetropolitanThana, 'metropolitan_thana_name_bn', metropolitan_thana_item),
+        (CityCorporation, 'city_corporation_name_bn', city_corporation_item),
+        (Municipality, 'municipality_name_bn', municipality_item),
+    ):
+        qs = model.objects.filter(is_active=True).order_by(name_field)
+        if district_ids is not None:
+            qs = qs.filter(link_district_id__in=district_ids)
+        _grouped(qs, 'link_district_id', item, groups)
+    return groups
+
+
+def union_parishads_by_upazila(upazila_ids=None):
+    """{upazila_id: [union parishad, ...]} of active union parishads, by Bengali name."""
+    qs = UnionParishad.objects.filter(is_active=True).order_by('union_parishad_name_bn')
+    if upazila_ids is not None:
+        qs = qs.filter(link_upazila_id__in=upazila_ids)
+    return _grouped(qs, 'link_upazila_id', union_parishad_item)
+
+
+# ========== Build ==========
+
+def shard_name(district_id):
+    return f"district-{district_id}.json"
+
+
+def _published_name(name, content):
+    """``name`` as the staticfiles storage will publish ``content`` under it."""
+    if hasattr(staticfiles_storage, "hashed_name"):
+        hashed = staticfiles_storage.hashed_name(f"{STATIC_PREFIX}/{name}", ContentFile(content))
+        return hashed.rsplit("/", 1)[-1]
+    return name
+
+
+def build():
+    """Write the index and every district shard into build_dir().
+
+    The files are written to a new directory that then replaces the old
+    one, so the finder never lists a half-written gazetteer and shards of
+    removed districts disappear. Returns the index.
+    """
+    data_version = data_versions.current().get("location")
+    constituencies = constituencies_by_district()
+    subdistricts = subdistricts_by_district()
+    unions = union_parishads_by_upazila()
+
+    target = build_dir()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=".gazetteer-"))
+    try:
+        entries = []
+        for district in districts():
+            children = subdistricts.get(district['id'], [])
+            content = dumps({
+                'format': FORMAT,
+                'district': district,
+                'constituencies': constituencies.get(district['id'], []),
+                'subdistricts': children,
+                'union_parishads': {
+                    str(s['id']): unions.get(s['id'], [])
+                    for s in children if s['type'] == 'upazila'
+                },
+            })
+            name = shard_name(district['id'])
+            (staging / name).write_bytes(content)
+            entries.append({**district, 'shard': _published_name(name, content)})
+
+        index = {
+            'format': FORMAT,
+            'data_version': data_version,
+            'divisions': divisions(),
+            'districts': entries,
+        }
+        (staging / INDEX_NAME).write_bytes(dumps(index))
+
+        previous = None
+        if target.exists():
+            previous = target.with_name(f"{staging.name}-old")
+            os.replace(target, previous)
+        os.replace(staging, target)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _index_meta.clear()
+    logger.info("Built gazetteer: %d districts, location data v%s", len(entries), data_version)
+    return index
+
+
+# ========== Lookup ==========
+
+def built_version():
+    """(built, data_version) of the gazetteer in build_dir()."""
+    path = build_dir() / INDEX_NAME
+    try:
+        stamp = (str(path), path.stat().st_mtime_ns)
+    except OSError:
+        return False, None
+    if _index_meta.get("stamp") != stamp:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+        _index_meta.update(stamp=stamp, data_version=index.get("data_version"))
+    return True, _index_meta["data_version"]
+
+
+def index_url():
+    """URL of the gazetteer index, or None when it is missing or stale."""
+    built, version = built_version()
+    if not built:
+        return None
+    seen = data_versions.seen("location")
+    if seen is not None and seen != version:
+        return None
+    try:
+        return static(f"{STATIC_PREFIX}/{INDEX_NAME}")
+    except ValueError:
+        # Built, but collectstatic has not put it in the manifest yet
+        return None
+
+
+class GazetteerFinder(BaseFinder):
+    """Staticfiles finder that serves build_dir() as ``locations/gazetteer/``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(location=build_dir())
+        self.storage.prefix = STATIC_PREFIX
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, find_all=False, **kwargs):
+        find_all = find_all or kwargs.get("all", False)
+        prefix = STATIC_PREFIX + "/"
+        found = None
+        if path.startswith(prefix):
+            candidate = build_dir() / path[len(prefix):]
+            if candidate.is_file():
+                found = str(candidate)
+        if find_all:
+            return [found] if found else []
+        return found
+
+    def list(self, ignore_patterns):
+        if not build_dir().is_dir():
+            return
+        for path in get_files(self.storage, ignore_patterns):
+            yield path, self.storage
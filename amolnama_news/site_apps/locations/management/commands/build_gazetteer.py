@@ -0,0 +1,25 @@
+"""
+Write the static gazetteer: the location cascades as per-district JSON files
+(see locations.gazetteer).
+
+    python manage.py build_gazetteer
+    python manage.py collectstatic --noinput
+
+Run it on every deploy, with the same settings as collectstatic and before
+it, and again after ``bump_data_version location`` — until then the pages
+fall back to the location APIs.
+"""
+from django.core.management.base import BaseCommand
+
+from amolnama_news.site_apps.locations import gazetteer
+
+
+class Command(BaseCommand):
+    help = "Build the per-district location JSON files the cascades load from static storage."
+
+    def handle(self, *args, **options):
+        index = gazetteer.build()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(index['districts'])} district shards "
+            f"(location data v{index['data_version']}) in {gazetteer.build_dir()}"
+        ))
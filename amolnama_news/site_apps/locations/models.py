@@ -1,4 +1,12 @@
-from django.db import connection, models
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db import connection, models, transaction
+
+from amolnama_news.site_apps.core.cache import tiered_cache
+
+logger = logging.getLogger(__name__)
 
 
 class Division(models.Model):
@@ -493,6 +501,30 @@ class GeoSource(models.Model):
         
         
 
+# ========== Geo Source Resolution ==========
+# The (country, region, city, ISP, network type, lat, lon) tuples that arrive
+# with evaluation votes repeat heavily, and a geo_source row never changes once
+# created. Resolved ids go through the tiered cache (per-worker LRU + shared),
+# so app_usp_GetOrCreateGeoSource only runs for tuples no worker has seen yet.
+
+GEO_SOURCE_SHARED_TTL = getattr(settings, "GEO_SOURCE_SHARED_TTL", 60 * 60 * 24)
+
+
+def _normalize_geo_part(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # Case-insensitive, like the default SQL Server collation the proc matches with
+        return value.strip().casefold() or None
+    return str(round(float(value), 6))
+
+
+def _geo_source_key(*parts):
+    normalized = tuple(_normalize_geo_part(p) for p in parts)
+    digest = hashlib.sha1(repr(normalized).encode("utf-8")).hexdigest()
+    return f"geo_source:{digest}"
+
+
 def get_or_create_geo_source(
     country_name_en,
     region_name_en,
@@ -502,7 +534,26 @@ def get_or_create_geo_source(
     latitude=None,
     longitude=None
 ):
-    print("Geo proc params:", country_name_en, region_name_en, city_name_en, network_isp_name, network_type, latitude, longitude)
+    key = _geo_source_key(
+        country_name_en, region_name_en, city_name_en,
+        network_isp_name, network_type, latitude, longitude,
+    )
+    geo_source_id = tiered_cache.get(key)
+    if geo_source_id is not None:
+        return geo_source_id
+
+    logger.debug(
+        "Resolving geo source via app_usp_GetOrCreateGeoSource",
+        extra={
+            "country_name_en": country_name_en,
+            "region_name_en": region_name_en,
+            "city_name_en": city_name_en,
+            "network_isp_name": network_isp_name,
+            "network_type": network_type,
+            "latitude": latitude,
+            "longitude": longitude,
+        },
+    )
     with connection.cursor() as cursor:
         cursor.execute("""
             DECLARE @geo_source_id INT;
@@ -526,4 +577,11 @@ def get_or_create_geo_source(
             longitude
         ])
         row = cursor.fetchone()
-        return row[0] if row else None
\ No newline at end of file
+    geo_source_id = row[0] if row else None
+    if geo_source_id is not None:
+        # A row created inside a transaction that later rolls back must not
+        # be cached; on_commit runs immediately in autocommit mode.
+        transaction.on_commit(
+            lambda: tiered_cache.set(key, geo_source_id, GEO_SOURCE_SHARED_TTL)
+        )
+    return geo_source_id
\ No newline at end of file
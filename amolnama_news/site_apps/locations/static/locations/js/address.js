@@ -10,6 +10,9 @@
  * Handles:
  *   1. Bangladesh / international address field toggle based on country select
  *   2. Cascading dropdowns: district → upazila → union parishad
+ *
+ * Upazilas and union parishads come from the district's static gazetteer
+ * shard (gazetteer.js, loaded first); the two API endpoints are the fallback.
  */
 (function () {
   var module = document.getElementById("address-module");
@@ -51,13 +54,31 @@
     sel.innerHTML = '<option value="">' + placeholder + "</option>";
   }
 
+  function byEnglishName(a, b) {
+    return (a.name_en || "").localeCompare(b.name_en || "");
+  }
+
+  // Rows from the district's gazetteer shard, else from the API
+  function fromDistrict(districtId, fromShard, url) {
+    var shard = window.gazetteer
+      ? window.gazetteer.district(districtId)
+      : Promise.reject(new Error("gazetteer.js not loaded"));
+    return shard.then(fromShard).catch(function () {
+      return fetch(url).then(function (r) { return r.json(); });
+    });
+  }
+
   function loadUpazilas(districtId, preselect) {
     resetSelect(upazilaSelect, "-- Select upazila --");
     resetSelect(unionSelect, "-- Select union parishad --");
     if (!districtId) return;
 
-    fetch(apiUpazilasUrl + "?district_id=" + districtId)
-      .then(function (r) { return r.json(); })
+    fromDistrict(districtId, function (shard) {
+      return shard.subdistricts
+        .filter(function (s) { return s.type === "upazila"; })
+        .sort(byEnglishName)
+        .map(function (u) { return { upazila_id: u.id, upazila_name_en: u.name_en }; });
+    }, apiUpazilasUrl + "?district_id=" + districtId)
       .then(function (data) {
         data.forEach(function (u) {
           var opt = document.createElement("option");
@@ -76,8 +97,12 @@
     resetSelect(unionSelect, "-- Select union parishad --");
     if (!upazilaId) return;
 
-    fetch(apiUnionsUrl + "?upazila_id=" + upazilaId)
-      .then(function (r) { return r.json(); })
+    fromDistrict(districtSelect.value, function (shard) {
+      return (shard.union_parishads[upazilaId] || [])
+        .slice()
+        .sort(byEnglishName)
+        .map(function (u) { return { union_parishad_id: u.id, union_parishad_name_en: u.name_en }; });
+    }, apiUnionsUrl + "?upazila_id=" + upazilaId)
       .then(function (data) {
         data.forEach(function (u) {
           var opt = document.createElement("option");
@@ -0,0 +1,88 @@
+/**
+ * gazetteer.js
+ *
+ * Location lists for the cascading dropdowns from the static gazetteer:
+ * files written by `manage.py build_gazetteer` (locations.gazetteer) under
+ * content-hashed names, so the browser and any CDN cache them for good and
+ * a cascade step needs no server round trip.
+ *
+ *   index.json            divisions, and every district with its shard name
+ *   district-<id>.json    { district, constituencies, subdistricts,
+ *                           union_parishads: { <upazila id>: [...] } }
+ *                         — the same rows as the newshub cascade APIs
+ *
+ * Exposes window.gazetteer. Each method returns a Promise that rejects when
+ * the gazetteer is unavailable (not built, older than the location data,
+ * or a file fails to load); callers then use their location API instead:
+ *
+ *   gazetteer.districts(divisionId)  → [{ id, division_id, name_bn, name_en, lat, lng }, ...]
+ *   gazetteer.district(districtId)   → the district's shard
+ *
+ * DOM dependencies:
+ *   #gazetteer-config — JSON { index_url } ({% gazetteer_config %}); index_url is null when unavailable
+ */
+(function () {
+  if (window.gazetteer) return;
+
+  var indexPromise = null;
+  var shards = {};   /* district id → Promise of its shard */
+
+  function getJson(url) {
+    return fetch(url).then(function (r) {
+      if (!r.ok) throw new Error('HTTP ' + r.status);
+      return r.json();
+    });
+  }
+
+  /* ---- indexUrl() — absolute, so shard names resolve against it ---- */
+  function indexUrl() {
+    var el = document.getElementById('gazetteer-config');
+    if (!el) return null;
+    try {
+      var config = JSON.parse(el.textContent);
+      return config.index_url ? new URL(config.index_url, location.href).href : null;
+    } catch (e) {
+      return null;
+    }
+  }
+
+  /* ---- index() — loaded once; districts keyed by id ---- */
+  function index() {
+    if (indexPromise) return indexPromise;
+    var url = indexUrl();
+    if (!url) {
+      indexPromise = Promise.reject(new Error('gazetteer unavailable'));
+    } else {
+      indexPromise = getJson(url).then(function (data) {
+        var byId = {};
+        (data.districts || []).forEach(function (d) { byId[d.id] = d; });
+        return { url: url, divisions: data.divisions || [], districts: data.districts || [], byId: byId };
+      });
+    }
+    /* callers handle the rejection; keep it out of the console */
+    indexPromise.catch(function () {});
+    return indexPromise;
+  }
+
+  window.gazetteer = {
+    districts: function (divisionId) {
+      return index().then(function (idx) {
+        return idx.districts.filter(function (d) { return String(d.division_id) === String(divisionId); });
+      });
+    },
+
+    district: function (districtId) {
+      var key = String(districtId);
+      if (!shards[key]) {
+        shards[key] = index().then(function (idx) {
+          var entry = idx.byId[key];
+          if (!entry) throw new Error('district ' + key + ' not in gazetteer');
+          return getJson(new URL(entry.shard, idx.url).href);
+        });
+        /* a failed shard is retried next time rather than cached */
+        shards[key].catch(function () { delete shards[key]; });
+      }
+      return shards[key];
+    }
+  };
+})();
@@ -0,0 +1,20 @@
+"""
+Template tag for the static gazetteer (locations.gazetteer).
+
+    {% load gazetteer %}
+    {% gazetteer_config %}
+    <script src="{% static 'locations/js/gazetteer.js' %}"></script>
+"""
+from django import template
+from django.utils.html import json_script
+
+from amolnama_news.site_apps.locations import gazetteer
+
+register = template.Library()
+
+
+@register.simple_tag
+def gazetteer_config():
+    """#gazetteer-config for locations/js/gazetteer.js; index_url is null when
+    the gazetteer is not built or older than the location data."""
+    return json_script({"index_url": gazetteer.index_url()}, "gazetteer-config")
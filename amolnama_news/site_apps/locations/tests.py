@@ -1,3 +1,108 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from amolnama_news.site_apps.core import data_versions
+from amolnama_news.site_apps.core.cache import tiered_cache
+
+from . import gazetteer, models
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "geo-test"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GeoSourceMemoTest(SimpleTestCase):
+    def setUp(self):
+        tiered_cache.l1.clear()
+        caches["shared"].clear()
+
+    def test_key_ignores_case_and_whitespace(self):
+        self.assertEqual(
+            models._geo_source_key("Bangladesh", " Dhaka ", "Dhaka", "GP", "mobile", 23.8103, 90.4125),
+            models._geo_source_key("bangladesh", "DHAKA", "dhaka", "gp", "Mobile", 23.81030, 90.4125),
+        )
+        self.assertNotEqual(
+            models._geo_source_key("Bangladesh", "Dhaka", "Dhaka", "GP", "mobile"),
+            models._geo_source_key("Bangladesh", "Dhaka", "Dhaka", "Robi", "mobile"),
+        )
+
+    def test_known_tuple_skips_the_procedure(self):
+        key = models._geo_source_key("Bangladesh", "Dhaka", "Dhaka", "GP", "mobile", None, None)
+        tiered_cache.set(key, 42, 60)
+        tiered_cache.l1.clear()  # resolved by another worker
+        with mock.patch.object(models, "connection") as connection:
+            self.assertEqual(
+                models.get_or_create_geo_source("Bangladesh", "Dhaka", "Dhaka", "GP", "mobile"), 42,
+            )
+            connection.cursor.assert_not_called()
+
+
+MANIFEST_STORAGES = {
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+}
+
+
+class GazetteerTest(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings = override_settings(GAZETTEER_BUILD_DIR=self.root / "gazetteer")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def build(self):
+        upazila = {"id": 7, "name_bn": "সাভার", "name_en": "Savar", "type": "upazila", "lat": 23.85, "lng": 90.26}
+        thana = {"id": 3, "name_bn": "মিরপুর", "name_en": "Mirpur", "type": "metropolitan_thana", "lat": None, "lng": None}
+        with mock.patch.object(data_versions, "current", return_value={"location": 4}), \
+                mock.patch.object(gazetteer, "divisions", return_value=[{"id": 1, "name_bn": "ঢাকা", "name_en": "Dhaka"}]), \
+                mock.patch.object(gazetteer, "districts", return_value=[{"id": 12, "division_id": 1, "name_bn": "ঢাকা", "name_en": "Dhaka"}]), \
+                mock.patch.object(gazetteer, "constituencies_by_district", return_value={12: [{"id": 180}]}), \
+                mock.patch.object(gazetteer, "subdistricts_by_district", return_value={12: [upazila, thana]}), \
+                mock.patch.object(gazetteer, "union_parishads_by_upazila", return_value={7: [{"id": 70}]}):
+            return gazetteer.build()
+
+    def test_build_writes_index_and_district_shards(self):
+        index = self.build()
+        self.assertEqual(index["data_version"], 4)
+        self.assertEqual(index["districts"][0]["shard"], "district-12.json")
+
+        shard = json.loads((gazetteer.build_dir() / "district-12.json").read_text(encoding="utf-8"))
+        self.assertEqual(shard["constituencies"], [{"id": 180}])
+        self.assertEqual([s["type"] for s in shard["subdistricts"]], ["upazila", "metropolitan_thana"])
+        self.assertEqual(shard["union_parishads"], {"7": [{"id": 70}]})
+
+        finder = gazetteer.GazetteerFinder()
+        self.assertEqual(finder.find("locations/gazetteer/index.json"), str(gazetteer.build_dir() / "index.json"))
+        self.assertIsNone(finder.find("locations/index.json"))
+        listed = sorted(path for path, storage in finder.list([]))
+        self.assertEqual(listed, ["district-12.json", "index.json"])
+
+    @override_settings(STORAGES=MANIFEST_STORAGES)
+    def test_index_names_shards_as_the_manifest_storage_will(self):
+        index = self.build()
+        content = (gazetteer.build_dir() / "district-12.json").read_bytes()
+        expected = staticfiles_storage.hashed_name("locations/gazetteer/district-12.json", ContentFile(content))
+        self.assertRegex(index["districts"][0]["shard"], r"^district-12\.[0-9a-f]{12}\.json$")
+        self.assertEqual(index["districts"][0]["shard"], expected.rsplit("/", 1)[-1])
+
+    def test_index_url_only_while_current(self):
+        self.assertIsNone(gazetteer.index_url())
+        self.build()
+        with mock.patch.object(data_versions, "seen", return_value=4):
+            self.assertEqual(gazetteer.index_url(), "/static/locations/gazetteer/index.json")
+            rendered = Template("{% load gazetteer %}{% gazetteer_config %}").render(Context())
+        self.assertIn('id="gazetteer-config"', rendered)
+        self.assertIn("/static/locations/gazetteer/index.json", rendered)
+        with mock.patch.object(data_versions, "seen", return_value=5):
+            self.assertIsNone(gazetteer.index_url())
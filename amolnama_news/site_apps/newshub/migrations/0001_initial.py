@@ -0,0 +1,390 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="AdsCampaign",
+            fields=[
+                ("ads_campaign_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_ad_placement_id", models.IntegerField()),
+                ("ads_campaign_title_en", models.CharField(blank=True, max_length=500, null=True)),
+                ("ads_campaign_script_code", models.TextField(blank=True, null=True)),
+                (
+                    "ads_campaign_image_url",
+                    models.CharField(blank=True, max_length=1000, null=True),
+                ),
+                (
+                    "ads_campaign_redirect_url",
+                    models.CharField(blank=True, max_length=1000, null=True),
+                ),
+                ("is_active", models.BooleanField()),
+                ("start_at", models.DateTimeField()),
+                ("end_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[ads_campaign]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="AdsPerformanceLog",
+            fields=[
+                ("ads_performance_log_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_ads_campaign_id", models.BigIntegerField()),
+                ("impression_count", models.IntegerField()),
+                ("click_count", models.IntegerField()),
+                ("log_date", models.DateField()),
+            ],
+            options={
+                "db_table": "[newshub].[ads_performance_log]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CollContributor",
+            fields=[
+                ("coll_contributor_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_user_profile_id", models.BigIntegerField(blank=True, null=True)),
+                ("link_contributor_type_id", models.IntegerField()),
+                ("coll_contributor_full_name_bn", models.CharField(max_length=100)),
+                (
+                    "coll_contributor_organization_bn",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                (
+                    "coll_contributor_contact_email",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "coll_contributor_contact_phone",
+                    models.CharField(blank=True, max_length=50, null=True),
+                ),
+                ("professional_bio_bn", models.CharField(blank=True, max_length=1000, null=True)),
+                ("is_verified", models.BooleanField()),
+                ("verification_date", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[coll_contributor]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CollNewsAsset",
+            fields=[
+                (
+                    "link_coll_news_entry_id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("link_asset_id", models.BigIntegerField()),
+                (
+                    "coll_news_asset_caption_bn",
+                    models.CharField(blank=True, max_length=1000, null=True),
+                ),
+                ("is_featured", models.BooleanField()),
+                ("sort_order", models.IntegerField()),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[coll_news_asset]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CollNewsEntry",
+            fields=[
+                ("coll_news_entry_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("coll_news_entry_headline_bn", models.CharField(max_length=100)),
+                (
+                    "coll_news_entry_summary_bn",
+                    models.CharField(blank=True, max_length=400, null=True),
+                ),
+                ("coll_news_entry_content_body_bn", models.TextField()),
+                (
+                    "coll_news_entry_headline_en",
+                    models.CharField(blank=True, max_length=1000, null=True),
+                ),
+                (
+                    "coll_news_entry_summary_en",
+                    models.CharField(blank=True, max_length=2000, null=True),
+                ),
+                ("coll_news_entry_content_body_en", models.TextField(blank=True, null=True)),
+                ("link_news_category_id", models.IntegerField()),
+                ("link_contributor_id", models.BigIntegerField()),
+                ("link_constituency_id", models.IntegerField(blank=True, null=True)),
+                ("link_union_parishad_id", models.IntegerField(blank=True, null=True)),
+                (
+                    "coll_news_entry_latitude",
+                    models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+                ),
+                (
+                    "coll_news_entry_longitude",
+                    models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+                ),
+                (
+                    "coll_news_entry_formatted_address_bn",
+                    models.CharField(blank=True, max_length=500, null=True),
+                ),
+                ("coll_news_entry_verification_notes", models.TextField(blank=True, null=True)),
+                ("coll_news_entry_is_breaking", models.BooleanField()),
+                (
+                    "coll_news_entry_external_source_url",
+                    models.CharField(blank=True, max_length=1000, null=True),
+                ),
+                ("occurrence_at", models.DateTimeField()),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "[newshub].[coll_news_entry]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CollNewsEntryTag",
+            fields=[
+                (
+                    "link_coll_news_entry_id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("link_news_category_tag_id", models.IntegerField()),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[coll_news_entry_tag]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CollSocialSource",
+            fields=[
+                ("coll_social_source_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_news_entry_id", models.BigIntegerField()),
+                ("link_platform_type_id", models.IntegerField()),
+                ("coll_social_source_url", models.CharField(max_length=1000)),
+                ("coll_social_source_embed_code", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[coll_social_source]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="EngArticleStat",
+            fields=[
+                ("eng_article_stat_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_pub_article_id", models.BigIntegerField()),
+                ("view_count", models.IntegerField()),
+                ("share_count", models.IntegerField()),
+                ("updated_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "[newshub].[eng_article_stat]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="EngComment",
+            fields=[
+                ("eng_comment_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_pub_article_id", models.BigIntegerField()),
+                ("link_user_id", models.IntegerField()),
+                ("parent_comment_id", models.BigIntegerField(blank=True, null=True)),
+                ("eng_comment_text_bn", models.TextField()),
+                ("is_approved", models.BooleanField()),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[eng_comment]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="PubArticle",
+            fields=[
+                ("pub_article_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_news_entry_id", models.BigIntegerField()),
+                ("pub_article_slug", models.CharField(max_length=500)),
+                ("pub_article_headline_bn", models.CharField(max_length=1000)),
+                ("pub_article_content_bn", models.TextField()),
+                ("is_published", models.BooleanField()),
+                ("is_premium", models.BooleanField()),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[pub_article]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="RefAdPlacement",
+            fields=[
+                ("ad_placement_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("placement_name", models.CharField(max_length=100)),
+                ("placement_code", models.CharField(max_length=50)),
+                ("is_active", models.BooleanField()),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[ref_ad_placement]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="RefContributorType",
+            fields=[
+                ("contributor_type_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("contributor_group_code", models.CharField(blank=True, max_length=50, null=True)),
+                ("contributor_type_label_bn", models.CharField(max_length=200)),
+                (
+                    "contributor_type_label_en",
+                    models.CharField(blank=True, max_length=200, null=True),
+                ),
+                ("sort_order", models.IntegerField(blank=True, null=True)),
+                ("is_active", models.BooleanField()),
+                ("created_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "[newshub].[ref_contributor_type]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="RefNewsCategory",
+            fields=[
+                ("news_category_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("news_group_code", models.CharField(blank=True, max_length=50, null=True)),
+                ("news_category_name_bn", models.CharField(max_length=100)),
+                ("news_category_name_en", models.CharField(max_length=100)),
+                (
+                    "news_category_description_bn",
+                    models.CharField(blank=True, max_length=200, null=True),
+                ),
+                ("news_category_slug", models.CharField(blank=True, max_length=100, null=True)),
+                (
+                    "news_category_search_aliases",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                ("sort_order", models.IntegerField(blank=True, null=True)),
+                ("is_active", models.BooleanField()),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[ref_news_category]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="RefNewsCategoryTag",
+            fields=[
+                ("news_category_tag_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("link_news_category_id", models.IntegerField(blank=True, null=True)),
+                ("news_tag_group_code", models.CharField(blank=True, max_length=50, null=True)),
+                ("news_tag_name_bn", models.CharField(max_length=255)),
+                ("news_tag_name_en", models.CharField(max_length=255)),
+                ("news_tag_slug", models.CharField(blank=True, max_length=100, null=True)),
+                (
+                    "news_tag_search_aliases",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                ("sort_order", models.IntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[ref_news_category_tag]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="RefPlatformType",
+            fields=[
+                ("platform_type_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("platform_name", models.CharField(max_length=100)),
+                ("platform_base_url", models.CharField(blank=True, max_length=500, null=True)),
+                ("platform_icon_url", models.CharField(blank=True, max_length=1000, null=True)),
+                ("is_active", models.BooleanField()),
+                ("sort_order", models.IntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "[newshub].[ref_platform_type]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="VlogEditorialChange",
+            fields=[
+                (
+                    "vlog_editorial_change_id",
+                    models.BigAutoField(primary_key=True, serialize=False),
+                ),
+                ("link_news_entry_id", models.BigIntegerField()),
+                ("vlog_editorial_change_edited_by_user_id", models.IntegerField()),
+                (
+                    "vlog_editorial_change_prev_headline_bn",
+                    models.CharField(blank=True, max_length=1000, null=True),
+                ),
+                ("vlog_editorial_change_prev_content_bn", models.TextField(blank=True, null=True)),
+                ("changed_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[vlog_editorial_change]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="VlogVerification",
+            fields=[
+                ("vlog_verification_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("link_news_entry_id", models.BigIntegerField()),
+                ("vlog_verification_verified_by_user_id", models.IntegerField()),
+                ("vlog_verification_action_taken", models.CharField(max_length=50)),
+                ("vlog_verification_notes_bn", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "[newshub].[vlog_verification]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="VwAppNewsCategoryTag",
+            fields=[
+                ("news_category_id", models.IntegerField()),
+                ("news_category_name_bn", models.CharField(max_length=255)),
+                ("news_category_name_en", models.CharField(max_length=255)),
+                ("news_category_tag_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("news_tag_group_code", models.CharField(blank=True, max_length=50, null=True)),
+                ("news_tag_name_bn", models.CharField(max_length=255)),
+                ("news_tag_name_en", models.CharField(max_length=255)),
+                ("sort_order", models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "[newshub].[app_vw_news_category_tags]",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="SubmissionReceipt",
+            fields=[
+                ("client_submission_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("link_coll_news_entry_id", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Submission Receipt",
+                "verbose_name_plural": "Submission Receipts",
+            },
+        ),
+    ]
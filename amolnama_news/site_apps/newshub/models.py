@@ -217,6 +217,25 @@ class CollNewsEntryTag(models.Model):
         return f"CollNewsEntryTag({self.link_coll_news_entry_id}, {self.link_news_category_tag_id})"
 
 
+class SubmissionReceipt(models.Model):
+    """Client-generated UUID of every saved submission (managed by Django).
+
+    The news collection form and the offline sync queue send the same UUID
+    with every attempt at one submission, so a retried or replayed POST maps
+    back to the entry it already created instead of creating another.
+    """
+    client_submission_id = models.UUIDField(primary_key=True)
+    link_coll_news_entry_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Submission Receipt"
+        verbose_name_plural = "Submission Receipts"
+
+    def __str__(self):
+        return f"SubmissionReceipt({self.client_submission_id} -> {self.link_coll_news_entry_id})"
+
+
 # ========== Publishing Tables ==========
 
 class PubArticle(models.Model):
@@ -0,0 +1,125 @@
+"""
+Phonetic search indexes behind the newshub typeahead APIs.
+
+Category, tag, location and organisation names are indexed by phonetic key
+(core.transliterate, core.phonetic_search), so a reporter typing
+"nirbachon", "dhaka" or "সন্ত্রাস" finds নির্বাচন, ঢাকা and সন্ত্রাসী হামলা in
+one in-memory lookup, instead of a SQL Server full-text query that only
+knew the spellings listed in search_aliases. The aliases are still indexed,
+as extra names, for the spellings keys cannot guess (abbreviations,
+English synonyms).
+
+Each index is built once per data version and shared through the tiered
+cache (core.cache):
+
+    categories, tags   "newshub" data version
+    locations          "location" data version
+    organisations      "organisation" data version; organisations are
+                       edited in SQL Server, so run
+                       ``manage.py bump_data_version organisation`` after
+
+Unbumped edits are picked up after PHONETIC_SEARCH_MAX_AGE seconds.
+"""
+import re
+
+from django.conf import settings
+
+from amolnama_news.site_apps.core.phonetic_search import CachedPhoneticIndex
+from amolnama_news.site_apps.locations.models import UnifiedLocationSearch
+from amolnama_news.site_apps.user_account.models import Organisation
+
+from .models import RefNewsCategory, RefNewsCategoryTag
+
+MAX_AGE = getattr(settings, "PHONETIC_SEARCH_MAX_AGE", 60 * 60 * 24)
+
+_ALIAS_SEPARATORS = re.compile(r"[,;|/\n]+")
+
+
+def _aliases(value):
+    return _ALIAS_SEPARATORS.split(value) if value else []
+
+
+def _names(record):
+    return [record['name_bn'], record['name_en'], *record.get('aliases', ())]
+
+
+# ========== Loaders ==========
+
+def _load_categories():
+    return [
+        {
+            'id': c.news_category_id,
+            'name_bn': c.news_category_name_bn,
+            'name_en': c.news_category_name_en,
+            'aliases': _aliases(c.news_category_search_aliases),
+        }
+        for c in RefNewsCategory.objects.filter(is_active=True).order_by('sort_order', 'news_category_name_bn')
+    ]
+
+
+def _load_tags():
+    return [
+        {
+            'id': t.news_category_tag_id,
+            'name_bn': t.news_tag_name_bn,
+            'name_en': t.news_tag_name_en,
+            'aliases': _aliases(t.news_tag_search_aliases),
+        }
+        for t in RefNewsCategoryTag.objects.order_by('sort_order', 'news_tag_name_bn')
+    ]
+
+
+def _load_locations():
+    """Every row of the unified location view, in the order the search API lists them."""
+    return [
+        {
+            'id': loc.unified_location_search_id,
+            'entity_id': loc.link_location_id,
+            'table': loc.link_location_table,
+            'type': loc.location_type or '',
+            'name_bn': loc.unified_location_search_name_bn or '',
+            'name_en': loc.unified_location_search_name_en or '',
+            'title_bn': loc.unified_location_display_title_bn or '',
+            'title_en': loc.unified_location_display_title_en or '',
+        }
+        for loc in UnifiedLocationSearch.objects.order_by(
+            'link_location_type_id', 'unified_location_display_title_bn',
+        )
+    ]
+
+
+def _load_organisations():
+    return [
+        {
+            'id': o.organisation_id,
+            'name_bn': o.organisation_name_bn or '',
+            'name_en': o.organisation_name_en or '',
+            'type_id': o.link_organisation_type_id,
+        }
+        for o in Organisation.objects.filter(is_active=True).order_by('organisation_name_bn', 'organisation_name_en')
+    ]
+
+
+# ========== Indexes ==========
+
+category_index = CachedPhoneticIndex(
+    "newshub_search:categories", _load_categories, _names, "newshub", ttl=MAX_AGE,
+)
+tag_index = CachedPhoneticIndex(
+    "newshub_search:tags", _load_tags, _names, "newshub", ttl=MAX_AGE,
+)
+location_index = CachedPhoneticIndex(
+    "newshub_search:locations", _load_locations, _names, "location", ttl=MAX_AGE,
+)
+# Organisation search matched LIKE %q%; keep that alongside the keys
+organisation_index = CachedPhoneticIndex(
+    "newshub_search:organisations", _load_organisations, _names, "organisation", ttl=MAX_AGE,
+    substring=True,
+)
+
+INDEXES = (category_index, tag_index, location_index, organisation_index)
+
+
+def public(record):
+    """``record`` without its aliases, as the search APIs return it."""
+    return {k: v for k, v in record.items() if k != 'aliases'}
@@ -2,11 +2,13 @@
  * news-auto-tag.js
  *
  * Auto-suggests tags by scanning the content body textarea for tag name matches.
- * Fetches ALL tags from /newshub/api/tags/all/ (ref_news_category_tag table).
+ * The matching itself runs in a Web Worker (workers/news-match-worker.js via
+ * window.newshubMatcher), against a prefix index of ALL tags built from
+ * /newshub/api/match-index/ (vw_app_news_category_tags over ref_news_category_tag).
  * Uses a 20-second debounce while typing, plus scans on blur and initial page load.
  * Relies on window.newshubTags API exposed by news-category-tag-cascade.js.
  *
- * Matching strategy — word-start matching:
+ * Matching strategy — word-start matching (implemented in the worker):
  *   - Split tag name into words (e.g. "সন্ত্রাসী হামলা" → ["সন্ত্রাসী", "হামলা"])
  *   - Split content body into words (by whitespace and punctuation)
  *   - Each tag word must appear at the START of at least one content word
@@ -15,121 +17,33 @@
  *   - English: case-insensitive startsWith
  *   - ALL words in the tag name must match
  *   - Skips tag words shorter than 2 characters
+ *   - Only paragraphs changed since the last scan are re-matched
  *   - Respects manual removals — won't re-add a tag the user explicitly removed
  *
  * DOM dependencies:
  *   #news-content-body-bn — the content body textarea
  *
- * API endpoint:
- *   GET /newshub/api/tags/all/ → { tags: [{ id, name_bn, name_en }, ...] }
- *
- * Requires: news-category-tag-cascade.js (must load first for window.newshubTags)
+ * Requires: news-category-tag-cascade.js (window.newshubTags) and
+ *           news-match-client.js (window.newshubMatcher), both loaded first
  */
 (function () {
   var api = window.newshubTags;
-  if (!api) return;
+  var matcher = window.newshubMatcher;
+  if (!api || !matcher) return;
 
   var AUTO_TAG_DELAY = 20000; // 20 seconds debounce while typing
   var INITIAL_SCAN_DELAY = 2000; // 2s delay for initial scan (wait for form-persist restore)
-  var MIN_WORD_LEN = 2;
   var autoTagTimer = null;
 
-  var allTags = [];      // fetched from API
-  var tagsFetched = false;
-
   var contentBody = document.getElementById('news-content-body-bn');
   if (!contentBody) return;
 
-  /* Regex to split content into words — whitespace + common Bengali/English punctuation */
-  var WORD_SPLIT_RE = /[\s,।.!?;:'"()\[\]{}\-–—\u0964\u0965]+/;
-
-  /* ---- fetchAllTags(callback) — fetch all tags from API, cache result ---- */
-  function fetchAllTags(callback) {
-    if (tagsFetched) {
-      callback(allTags);
-      return;
-    }
-
-    fetch('/newshub/api/tags/all/')
-      .then(function (r) { return r.json(); })
-      .then(function (data) {
-        allTags = data.tags || [];
-        tagsFetched = true;
-        callback(allTags);
-      })
-      .catch(function () {
-        /* Fallback: try embedded JSON if API fails */
-        var el = document.getElementById('all-tags-data');
-        if (el) {
-          try {
-            allTags = JSON.parse(el.textContent);
-            tagsFetched = true;
-          } catch (e) { /* ignore */ }
-        }
-        callback(allTags);
-      });
-  }
-
-  /* ---- splitWords() — split text into words array, filter short ones ---- */
-  function splitWords(text) {
-    return text.split(WORD_SPLIT_RE).filter(function (w) {
-      return w.length >= MIN_WORD_LEN;
-    });
-  }
-
-  /* ---- matchBn() — each tag word must startsWith at least one content word ---- */
-  function matchBn(tagName, contentWords) {
-    if (!tagName || tagName.length < MIN_WORD_LEN) return false;
-
-    var tagWords = tagName.split(/\s+/).filter(function (w) { return w.length >= MIN_WORD_LEN; });
-    if (tagWords.length === 0) return false;
-
-    for (var i = 0; i < tagWords.length; i++) {
-      var tw = tagWords[i];
-      var found = false;
-      for (var j = 0; j < contentWords.length; j++) {
-        if (contentWords[j].indexOf(tw) === 0) { // startsWith
-          found = true;
-          break;
-        }
-      }
-      if (!found) return false;
-    }
-    return true;
-  }
-
-  /* ---- matchEn() — case-insensitive, each tag word must startsWith a content word ---- */
-  function matchEn(tagName, contentWordsLower) {
-    if (!tagName || tagName.length < MIN_WORD_LEN) return false;
-
-    var tagWords = tagName.toLowerCase().split(/\s+/).filter(function (w) { return w.length >= MIN_WORD_LEN; });
-    if (tagWords.length === 0) return false;
-
-    for (var i = 0; i < tagWords.length; i++) {
-      var tw = tagWords[i];
-      var found = false;
-      for (var j = 0; j < contentWordsLower.length; j++) {
-        if (contentWordsLower[j].indexOf(tw) === 0) { // startsWith
-          found = true;
-          break;
-        }
-      }
-      if (!found) return false;
-    }
-    return true;
-  }
-
-  /* ---- scanAndAutoTag() — fetch tags then match against content body words ---- */
+  /* ---- scanAndAutoTag() — match content body in the worker, add new tags ---- */
   function scanAndAutoTag() {
     var text = contentBody.value;
     if (!text || text.length < 5) return;
 
-    fetchAllTags(function (tags) {
-      if (tags.length === 0) return;
-
-      /* Pre-split content into words once (used by all tag comparisons) */
-      var contentWords = splitWords(text);
-      var contentWordsLower = splitWords(text.toLowerCase());
+    matcher.matchTags(text, function (tags) {
       var changed = false;
 
       tags.forEach(function (tag) {
@@ -138,17 +52,7 @@
         /* Skip if already selected or manually removed by user */
         if (api.isSelected(id) || api.isRemovedByUser(id)) return;
 
-        /* Bengali name (news_tag_name_bn) — word-start match */
-        if (tag.name_bn && matchBn(tag.name_bn, contentWords)) {
-          if (api.add(tag)) changed = true;
-          return;
-        }
-
-        /* English name (news_tag_name_en) — case-insensitive word-start match */
-        if (tag.name_en && matchEn(tag.name_en, contentWordsLower)) {
-          if (api.add(tag)) changed = true;
-          return;
-        }
+        if (api.add(tag)) changed = true;
       });
 
       if (changed) {
@@ -15,7 +15,7 @@
  */
 (function () {
   var STORAGE_KEY = 'newshub_draft';
-  var SKIP_NAMES = ['csrfmiddlewaretoken', 'tag_ids'];
+  var SKIP_NAMES = ['csrfmiddlewaretoken', 'tag_ids', 'client_submission_id'];
   var form = document.querySelector('.news-collection-form');
   if (!form) return;
 
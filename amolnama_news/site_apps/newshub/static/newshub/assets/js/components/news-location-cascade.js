@@ -9,6 +9,11 @@
  *
  * Each <option> carries data-type to determine which API to call next.
  * Constituency is a hidden input — auto-matched by upazila name.
+ *
+ * Constituencies, subdistricts and union parishads come from the district's
+ * static gazetteer shard (locations/js/gazetteer.js, loads first); the
+ * /newshub/api/ endpoints are the fallback. Wards and villages always come
+ * from the API.
  */
 (function () {
   var districtSelect = document.getElementById('news-district-id');
@@ -110,6 +115,18 @@
     return parts.join(', ');
   }
 
+  /* ---- fromDistrict() — rows from the district's gazetteer shard, else the API ---- */
+  function fromDistrict(districtId, fromShard, url, fromApi) {
+    var shard = window.gazetteer
+      ? window.gazetteer.district(districtId)
+      : Promise.reject(new Error('gazetteer.js not loaded'));
+    return shard.then(fromShard).catch(function () {
+      return fetch(url)
+        .then(function (r) { return r.json(); })
+        .then(fromApi);
+    });
+  }
+
   function escapeHtml(str) {
     var div = document.createElement('div');
     div.appendChild(document.createTextNode(str));
@@ -211,10 +228,14 @@
 
     /* Fetch constituencies (cache, don't render) */
     if (constituencyInput) {
-      fetch('/newshub/api/constituencies/' + districtId + '/')
-        .then(function (r) { return r.json(); })
-        .then(function (data) {
-          cachedConstituencies = data.constituencies || [];
+      fromDistrict(
+        districtId,
+        function (shard) { return shard.constituencies; },
+        '/newshub/api/constituencies/' + districtId + '/',
+        function (data) { return data.constituencies || []; }
+      )
+        .then(function (items) {
+          cachedConstituencies = items;
           if (subDistrictSelect && subDistrictSelect.value) {
             matchConstituencyByUpazila();
           }
@@ -224,10 +245,13 @@
 
     /* Fetch subdistricts (upazilas + metro thanas) */
     if (subDistrictSelect) {
-      fetch('/newshub/api/subdistricts/' + districtId + '/')
-        .then(function (r) { return r.json(); })
-        .then(function (data) {
-          var items = data.subdistricts || [];
+      fromDistrict(
+        districtId,
+        function (shard) { return shard.subdistricts; },
+        '/newshub/api/subdistricts/' + districtId + '/',
+        function (data) { return data.subdistricts || []; }
+      )
+        .then(function (items) {
           subDistrictSelect.innerHTML = buildTypedOptions(
             items, '-- \u0989\u09AA\u099C\u09C7\u09B2\u09BE/\u09A5\u09BE\u09A8\u09BE/\u09B8\u09BF\u099F\u09BF \u0995\u09B0\u09CD\u09AA\u09CB\u09B0\u09C7\u09B6\u09A8 (\u0990\u099A\u09CD\u099B\u09BF\u0995) --'
           );
@@ -297,10 +321,13 @@
       if (localBodySelect) {
         localBodySelect.innerHTML = '<option value="">-- \u09B2\u09CB\u09A1 \u09B9\u099A\u09CD\u099B\u09C7... --</option>';
 
-        fetch('/newshub/api/local-bodies/?parent_type=' + subDistrictType + '&parent_id=' + subDistrictId)
-          .then(function (r) { return r.json(); })
-          .then(function (data) {
-            var items = data.local_bodies || [];
+        fromDistrict(
+          districtSelect.value,
+          function (shard) { return shard.union_parishads[subDistrictId] || []; },
+          '/newshub/api/local-bodies/?parent_type=' + subDistrictType + '&parent_id=' + subDistrictId,
+          function (data) { return data.local_bodies || []; }
+        )
+          .then(function (items) {
             localBodySelect.innerHTML = buildTypedOptions(
               items, '-- \u0987\u0989\u09A8\u09BF\u09AF\u09BC\u09A8 \u09AA\u09B0\u09BF\u09B7\u09A6 (\u0990\u099A\u09CD\u099B\u09BF\u0995) --'
             );
@@ -0,0 +1,172 @@
+/**
+ * news-match-client.js
+ *
+ * Main-thread side of workers/news-match-worker.js. Starts the worker, has it
+ * fetch and index the tag + location match index, and exposes
+ * window.newshubMatcher for news-auto-location.js and news-auto-tag.js:
+ *
+ *   newshubMatcher.matchTags(text, callback)      → callback([tag, ...])
+ *   newshubMatcher.matchLocation(text, callback)  → callback({ district_id, upazila_id, union_id })
+ *
+ * Requests made before the index is ready are queued. Only the newest
+ * request of each kind gets its callback — a scan overtaken by a later one
+ * is dropped.
+ *
+ * Fallbacks:
+ *   - No Worker support, or the worker fails to start: the worker script is
+ *     loaded as a plain script and matches on the main thread
+ *     (window.NewsMatchEngine).
+ *   - The index request fails: the index is built from what the page already
+ *     has — tags from #all-tags-data, districts from the district <option>s.
+ *
+ * DOM dependencies:
+ *   #news-match-config  — JSON { worker_url, index_url } (news-collection.html)
+ *   #all-tags-data      — fallback tags (sidebar-tags-widget.html)
+ *   #news-district-id   — fallback districts
+ *
+ * API endpoint (fetched by the worker):
+ *   GET /newshub/api/match-index/ →
+ *     { version, tags, districts, upazilas, union_parishads } (columnar lists)
+ */
+(function () {
+  var configEl = document.getElementById('news-match-config');
+  if (!configEl) return;
+
+  var config;
+  try {
+    config = JSON.parse(configEl.textContent);
+  } catch (e) {
+    return;
+  }
+
+  /* ---- State ---- */
+  var send = null;         /* posts a message to the engine (worker or inline) */
+  var state = 'loading';   /* loading | ready | failed */
+  var queue = [];          /* match requests held until the index is ready */
+  var usedFallbackIndex = false;
+  var nextId = 0;
+  var latest = {};         /* kind → id of the newest request */
+  var callbacks = {};      /* id → callback */
+
+  /* ---- onMessage() — replies from the engine ---- */
+  function onMessage(msg) {
+    if (msg.type === 'ready') {
+      state = 'ready';
+      queue.splice(0).forEach(send);
+    } else if (msg.type === 'error') {
+      loadFallbackIndex();
+    } else if (msg.type === 'result') {
+      var callback = callbacks[msg.id];
+      delete callbacks[msg.id];
+      if (!callback || msg.error || latest[msg.kind] !== msg.id) return;
+      callback(msg.kind === 'tags' ? msg.tags : msg.location);
+    }
+  }
+
+  /* ---- startWorker() — false when Web Workers are unavailable ---- */
+  function startWorker() {
+    if (!window.Worker) return false;
+    var worker;
+    try {
+      worker = new Worker(config.worker_url);
+    } catch (e) {
+      return false;
+    }
+    worker.onmessage = function (e) { onMessage(e.data); };
+    worker.onerror = function (e) {
+      /* Script failed to load or crashed — match on the main thread instead */
+      if (e && e.preventDefault) e.preventDefault();
+      worker.terminate();
+      send = null;
+      startInline();
+    };
+    send = function (msg) { worker.postMessage(msg); };
+    return true;
+  }
+
+  /* ---- startInline() — same engine as a plain script, async replies ---- */
+  function startInline() {
+    var script = document.createElement('script');
+    script.src = config.worker_url;
+    script.onload = function () {
+      var engine = window.NewsMatchEngine;
+      if (!engine) {
+        state = 'failed';
+        return;
+      }
+      send = function (msg) {
+        setTimeout(function () { engine.handle(msg, onMessage); }, 0);
+      };
+      send({ type: 'init', url: config.index_url });
+    };
+    script.onerror = function () { state = 'failed'; };
+    document.head.appendChild(script);
+  }
+
+  /* ---- Fallback index from data already on the page ---- */
+  function fallbackTags() {
+    var el = document.getElementById('all-tags-data');
+    if (!el) return [];
+    try {
+      return JSON.parse(el.textContent);
+    } catch (e) {
+      return [];
+    }
+  }
+
+  function fallbackDistricts() {
+    var districts = [];
+    var select = document.getElementById('news-district-id');
+    if (!select) return districts;
+    for (var i = 0; i < select.options.length; i++) {
+      var opt = select.options[i];
+      if (!opt.value) continue;
+      var text = opt.textContent.trim();
+      var name_bn = text;
+      var name_en = '';
+      var parenIdx = text.indexOf('(');
+      if (parenIdx !== -1) {
+        name_bn = text.substring(0, parenIdx).trim();
+        var closeIdx = text.lastIndexOf(')');
+        if (closeIdx > parenIdx) name_en = text.substring(parenIdx + 1, closeIdx).trim();
+      }
+      districts.push({ id: parseInt(opt.value, 10), name_bn: name_bn, name_en: name_en });
+    }
+    return districts;
+  }
+
+  function loadFallbackIndex() {
+    if (usedFallbackIndex) {
+      state = 'failed';
+      return;
+    }
+    usedFallbackIndex = true;
+    send({ type: 'load', index: { tags: fallbackTags(), districts: fallbackDistricts() } });
+  }
+
+  /* ---- request() — queue or send one match request ---- */
+  function request(kind, text, callback) {
+    if (state === 'failed') return;
+    var id = ++nextId;
+    latest[kind] = id;
+    callbacks[id] = callback;
+    var msg = { type: 'match', id: id, kind: kind, text: text };
+    if (state === 'ready' && send) {
+      send(msg);
+    } else {
+      queue.push(msg);
+    }
+  }
+
+  if (startWorker()) {
+    send({ type: 'init', url: config.index_url });
+  } else {
+    startInline();
+  }
+
+  /* ---- Public API ---- */
+  window.newshubMatcher = {
+    matchTags: function (text, callback) { request('tags', text, callback); },
+    matchLocation: function (text, callback) { request('location', text, callback); }
+  };
+})();
@@ -0,0 +1,118 @@
+/**
+ * news-offline-queue.js
+ *
+ * IndexedDB queue of news submissions made without a connection. Shared by
+ * the page (bundled, for the pending count) and the offline service worker
+ * (importScripts), which fills it and syncs it to /newshub/api/submissions/.
+ *
+ * Each entry:
+ *   { id: client_submission_id (UUID), created_at: ms, headline: string,
+ *     fields: [[name, value], ...] }   — values are strings or File/Blob
+ *
+ * An entry the server rejects (400: validation) is not sent again, but it
+ * is not deleted either: it stays with state 'rejected' and the server's
+ * errors, so news-offline-sync.js can show it and restore it into the form.
+ * It leaves the store only when the reporter discards it or resubmits it.
+ *
+ * Exposes self.newshubOfflineQueue (window or service worker global):
+ *   add(entry), get(id), remove(id)
+ *   pending()            — entries still to send, oldest first
+ *   rejected()           — rejected entries, oldest first
+ *   reject(id, errors)   — mark an entry rejected
+ *   count()              — number of pending entries
+ *   all return Promises
+ *   SYNC_TAG — Background Sync tag the service worker listens for
+ */
+(function (global) {
+  if (!global.indexedDB || global.newshubOfflineQueue) return;
+
+  var DB_NAME = 'newshub-offline';
+  var DB_VERSION = 1;
+  var STORE = 'submissions';
+
+  var dbPromise = null;
+
+  /* ---- open() — the database, created on first use ---- */
+  function open() {
+    if (dbPromise) return dbPromise;
+    dbPromise = new Promise(function (resolve, reject) {
+      var req = global.indexedDB.open(DB_NAME, DB_VERSION);
+      req.onupgradeneeded = function () {
+        req.result.createObjectStore(STORE, { keyPath: 'id' });
+      };
+      req.onsuccess = function () { resolve(req.result); };
+      req.onerror = function () {
+        dbPromise = null;
+        reject(req.error);
+      };
+    });
+    return dbPromise;
+  }
+
+  /* ---- run(mode, fn) — one transaction; resolves with fn's request result ---- */
+  function run(mode, fn) {
+    return open().then(function (db) {
+      return new Promise(function (resolve, reject) {
+        var tx = db.transaction(STORE, mode);
+        var req = fn(tx.objectStore(STORE));
+        tx.oncomplete = function () { resolve(req ? req.result : undefined); };
+        tx.onerror = function () { reject(tx.error); };
+        tx.onabort = function () { reject(tx.error); };
+      });
+    });
+  }
+
+  /* ---- all() — every entry, oldest first ---- */
+  function all() {
+    return run('readonly', function (store) { return store.getAll(); }).then(function (entries) {
+      return (entries || []).sort(function (a, b) { return a.created_at - b.created_at; });
+    });
+  }
+
+  global.newshubOfflineQueue = {
+    SYNC_TAG: 'newshub-submissions',
+
+    add: function (entry) {
+      return run('readwrite', function (store) { return store.put(entry); });
+    },
+
+    get: function (id) {
+      return run('readonly', function (store) { return store.get(id); });
+    },
+
+    remove: function (id) {
+      return run('readwrite', function (store) { return store.delete(id); });
+    },
+
+    /* Oldest first, so submissions reach the server in the order they were made */
+    pending: function () {
+      return all().then(function (entries) {
+        return entries.filter(function (entry) { return entry.state !== 'rejected'; });
+      });
+    },
+
+    rejected: function () {
+      return all().then(function (entries) {
+        return entries.filter(function (entry) { return entry.state === 'rejected'; });
+      });
+    },
+
+    reject: function (id, errors) {
+      return run('readwrite', function (store) {
+        var req = store.get(id);
+        req.onsuccess = function () {
+          if (!req.result) return;
+          req.result.state = 'rejected';
+          req.result.errors = errors || [];
+          req.result.rejected_at = Date.now();
+          store.put(req.result);
+        };
+        return req;
+      });
+    },
+
+    count: function () {
+      return global.newshubOfflineQueue.pending().then(function (entries) { return entries.length; });
+    }
+  };
+})(self);
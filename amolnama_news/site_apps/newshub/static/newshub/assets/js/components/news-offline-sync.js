@@ -0,0 +1,258 @@
+/**
+ * news-offline-sync.js
+ *
+ * Offline reporter mode, page side. Registers the news collection service
+ * worker (/newshub/sw.js), which caches the page and its reference data and
+ * queues submissions made without a connection.
+ *
+ *   - Gives the form a client_submission_id (UUID) per page view. Every
+ *     attempt at the same submission — a double click, a browser retry, the
+ *     worker's background replay — carries it, and the server saves it once.
+ *   - After a queued submission (?queued=1) shows the "saved offline"
+ *     message, which also makes news-form-persist.js drop the draft.
+ *   - Shows how many submissions are waiting, and the result of each sync.
+ *   - Asks the worker to send the queue when the browser comes back online
+ *     (browsers without Background Sync only send it then).
+ *   - Lists submissions the server rejected (kept in the queue with its
+ *     errors). "Restore" puts one back into the form: its fields become the
+ *     news-form-persist.js draft, the page reloads, and its attachments and
+ *     client_submission_id are put back once it has. The entry is deleted
+ *     when the reporter discards it, or when the restored form is sent
+ *     (queued again under the same id, or saved).
+ *   - With offline mode switched off (NEWSHUB_OFFLINE_ENABLED), unregisters
+ *     a previously installed worker.
+ *
+ * DOM dependencies:
+ *   #news-offline-config       — JSON { enabled, sw_url, scope, queued_message, tags_url }
+ *   #news-client-submission-id — hidden input in the form
+ *   #news-offline-status       — status line above the form
+ *   #news-offline-rejected     — list of rejected submissions above the form
+ *   #attachment-file-picker    — news-attachment-upload.js file picker
+ *
+ * Requires: news-offline-queue.js (window.newshubOfflineQueue, loads first)
+ * Must load before news-form-persist.js.
+ */
+(function () {
+  var configEl = document.getElementById('news-offline-config');
+  if (!configEl || !('serviceWorker' in navigator)) return;
+
+  var config;
+  try {
+    config = JSON.parse(configEl.textContent);
+  } catch (e) {
+    return;
+  }
+
+  if (!config.enabled) {
+    navigator.serviceWorker.getRegistrations().then(function (registrations) {
+      registrations.forEach(function (registration) {
+        if (registration.scope.indexOf(location.origin + config.scope) === 0) registration.unregister();
+      });
+    });
+    return;
+  }
+
+  var form = document.querySelector('.news-collection-form');
+  var idInput = document.getElementById('news-client-submission-id');
+  var statusEl = document.getElementById('news-offline-status');
+  var rejectedEl = document.getElementById('news-offline-rejected');
+  var queue = window.newshubOfflineQueue;
+
+  var DRAFT_KEY = 'newshub_draft';             /* news-form-persist.js */
+  var DRAFT_TAGS_KEY = 'newshub_draft_tags';   /* news-category-tag-cascade.js */
+  var RESTORE_KEY = 'newshub_offline_restore'; /* sessionStorage: id of the restored entry */
+  var DRAFT_SKIP = ['csrfmiddlewaretoken', 'tag_ids', 'client_submission_id'];
+
+  /* ---- uuid4() — crypto.randomUUID where available ---- */
+  function uuid4() {
+    if (window.crypto && window.crypto.randomUUID) return window.crypto.randomUUID();
+    var bytes = window.crypto.getRandomValues(new Uint8Array(16));
+    bytes[6] = (bytes[6] & 0x0f) | 0x40;
+    bytes[8] = (bytes[8] & 0x3f) | 0x80;
+    var hex = Array.prototype.map.call(bytes, function (b) { return (b + 0x100).toString(16).slice(1); }).join('');
+    return hex.slice(0, 8) + '-' + hex.slice(8, 12) + '-' + hex.slice(12, 16) + '-' + hex.slice(16, 20) + '-' + hex.slice(20);
+  }
+
+  if (idInput && !idInput.value) idInput.value = uuid4();
+
+  /* ---- Queued page: served from cache offline, so add the message here ---- */
+  var isQueuedPage = /[?&]queued=1(&|$)/.test(location.search);
+  if (isQueuedPage && form && !document.querySelector('.form-message-success')) {
+    var msg = document.createElement('div');
+    msg.className = 'form-message form-message-success';
+    msg.textContent = config.queued_message;
+    form.parentNode.insertBefore(msg, form);
+  }
+
+  /* ---- Status line ---- */
+  function showStatus(text, isError) {
+    if (!statusEl) return;
+    statusEl.textContent = text;
+    statusEl.hidden = !text;
+    statusEl.classList.toggle('form-message-error', !!isError);
+  }
+
+  function showPending(pending) {
+    showStatus(pending
+      ? pending + 'টি সংবাদ পাঠানোর অপেক্ষায় (' + pending + ' waiting to be sent)'
+      : '');
+  }
+
+  if (queue) {
+    queue.count().then(showPending).catch(function () {});
+  }
+
+  navigator.serviceWorker.addEventListener('message', function (e) {
+    var data = e.data || {};
+    if (data.type !== 'newshub-offline') return;
+    if (data.event === 'synced') {
+      showStatus('পাঠানো হয়েছে (Sent): ' + data.headline
+        + (data.pending ? ' — ' + data.pending + 'টি বাকি (' + data.pending + ' left)' : ''));
+    } else if (data.event === 'rejected') {
+      showStatus('জমা হয়নি (Not accepted): ' + data.headline + ' — ' + (data.errors || []).join(' | '), true);
+      showRejected();
+    } else {
+      showPending(data.pending);
+    }
+  });
+
+  /* ---- Rejected submissions ---- */
+  function showRejected() {
+    if (!queue || !rejectedEl) return;
+    queue.rejected().then(function (entries) {
+      rejectedEl.innerHTML = '';
+      rejectedEl.hidden = !entries.length;
+      if (!entries.length) return;
+
+      var title = document.createElement('p');
+      title.textContent = 'এই সংবাদগুলো জমা হয়নি; ঠিক করে আবার পাঠান (These submissions were not accepted; fix and send them again):';
+      rejectedEl.appendChild(title);
+
+      entries.forEach(function (entry) {
+        var item = document.createElement('div');
+        item.className = 'offline-rejected-item';
+
+        var headline = document.createElement('strong');
+        headline.textContent = entry.headline || '(শিরোনাম নেই / no headline)';
+        item.appendChild(headline);
+
+        var errors = document.createElement('ul');
+        (entry.errors || []).forEach(function (error) {
+          var li = document.createElement('li');
+          li.textContent = error;
+          errors.appendChild(li);
+        });
+        item.appendChild(errors);
+
+        var restoreBtn = document.createElement('button');
+        restoreBtn.type = 'button';
+        restoreBtn.className = 'btn-offline-restore';
+        restoreBtn.textContent = 'ফর্মে ফিরিয়ে আনুন (Restore into form)';
+        restoreBtn.addEventListener('click', function () { restore(entry); });
+        item.appendChild(restoreBtn);
+
+        var discardBtn = document.createElement('button');
+        discardBtn.type = 'button';
+        discardBtn.className = 'btn-clear-form';
+        discardBtn.textContent = 'বাদ দিন (Discard)';
+        discardBtn.addEventListener('click', function () {
+          if (!window.confirm('এই সংবাদটি মুছে ফেলবেন? (Delete this submission for good?)')) return;
+          queue.remove(entry.id).then(showRejected);
+        });
+        item.appendChild(discardBtn);
+
+        rejectedEl.appendChild(item);
+      });
+    }).catch(function () {});
+  }
+
+  /* tagsFor(ids) — tag objects for the tag cascade's draft (reference API, cached offline) */
+  function tagsFor(ids) {
+    if (!ids.length || !config.tags_url) return Promise.resolve([]);
+    return fetch(config.tags_url)
+      .then(function (r) { return r.ok ? r.json() : { tags: [] }; })
+      .then(function (data) {
+        return (data.tags || []).filter(function (tag) { return ids.indexOf(String(tag.id)) !== -1; });
+      })
+      .catch(function () { return []; });
+  }
+
+  /* restore(entry) — its fields become the saved draft; the reload restores them */
+  function restore(entry) {
+    var draft = {};
+    var tagIds = [];
+    entry.fields.forEach(function (field) {
+      var name = field[0];
+      var value = field[1];
+      if (typeof value !== 'string') return;   /* files are put back after the reload */
+      if (name === 'tag_ids') {
+        tagIds.push(value);
+        return;
+      }
+      if (DRAFT_SKIP.indexOf(name) !== -1) return;
+      var el = form && form.querySelector('[name="' + name + '"]');
+      draft[name] = el && el.type === 'checkbox' ? '1' : value;
+    });
+
+    tagsFor(tagIds).then(function (tags) {
+      localStorage.setItem(DRAFT_KEY, JSON.stringify(draft));
+      localStorage.setItem(DRAFT_TAGS_KEY, JSON.stringify(tags));
+      sessionStorage.setItem(RESTORE_KEY, entry.id);
+      location.href = location.pathname;
+    });
+  }
+
+  /* finishRestore() — after the reload: same submission id, attachments back */
+  function finishRestore() {
+    var id = sessionStorage.getItem(RESTORE_KEY);
+    if (!id || !queue) return;
+
+    if (document.querySelector('.form-message-success')) {
+      /* The restored form was sent: queued again under its id (which
+         replaced the rejected entry), or saved — then it is done with */
+      sessionStorage.removeItem(RESTORE_KEY);
+      if (!isQueuedPage) queue.remove(id).then(showRejected).catch(function () {});
+      return;
+    }
+
+    queue.get(id).then(function (entry) {
+      if (!entry) {
+        sessionStorage.removeItem(RESTORE_KEY);
+        return;
+      }
+      if (idInput) idInput.value = entry.id;
+
+      var picker = document.getElementById('attachment-file-picker');
+      var files = entry.fields.filter(function (field) {
+        return typeof field[1] !== 'string' && field[0] === 'attachment_file';
+      });
+      if (picker && files.length && window.DataTransfer) {
+        var transfer = new DataTransfer();
+        files.forEach(function (field) {
+          var file = field[1];
+          transfer.items.add(file instanceof File ? file : new File([file], file.name || 'attachment', { type: file.type }));
+        });
+        picker.files = transfer.files;
+        picker.dispatchEvent(new Event('change'));
+      }
+      showStatus('ফর্মে ফিরিয়ে আনা হয়েছে; ঠিক করে আবার জমা দিন (Restored into the form; fix it and submit again): '
+        + entry.headline, true);
+    }).catch(function () {});
+  }
+
+  showRejected();
+  finishRestore();
+
+  /* ---- Send the queue ---- */
+  function flush() {
+    var worker = navigator.serviceWorker.controller;
+    if (worker && navigator.onLine) worker.postMessage({ type: 'flush' });
+  }
+
+  window.addEventListener('online', flush);
+
+  navigator.serviceWorker.register(config.sw_url, { scope: config.scope })
+    .then(function () { return navigator.serviceWorker.ready; })
+    .then(flush)
+    .catch(function () { /* offline mode unavailable — the form still posts normally */ });
+})();
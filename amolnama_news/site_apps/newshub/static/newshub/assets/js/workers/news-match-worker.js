@@ -0,0 +1,387 @@
+/**
+ * news-match-worker.js
+ *
+ * Tag and location matching for news-auto-tag.js and news-auto-location.js,
+ * run in a Web Worker so that scanning a long content body never blocks
+ * typing. Loaded by news-match-client.js; it is NOT part of the page bundle.
+ *
+ * Index (built once, from GET /newshub/api/match-index/):
+ *   { version, tags, districts, upazilas, union_parishads }, each list
+ *   columnar ({ cols: [...], rows: [[...], ...] }). Every name word goes into
+ *   a prefix index bucketed by its first KEY_LEN characters, so a content
+ *   word is only compared with the name words that share its first two
+ *   characters instead of with every tag and every location.
+ *
+ * Incremental matching:
+ *   The content body is split into paragraphs (lines). Each paragraph's
+ *   word matches are cached by its text, so a re-scan after an edit only
+ *   re-matches the paragraphs that changed; the per-paragraph results are
+ *   then merged. Matching rules are unchanged from the original scripts:
+ *
+ *   Tags — word-start matching: every word of the tag name must be the
+ *     start of some content word (English case-insensitive).
+ *   Locations — two passes:
+ *     Pass 1 (exact): the full name appears in the text at a word boundary.
+ *     Pass 2 (fuzzy): every Bengali name word equals a content word, with or
+ *       without a case-marker suffix; English name words are word starts.
+ *     Union parishad → upazila → district, then the upazila within the
+ *     detected district and the union within the detected upazila.
+ *
+ * Messages in:
+ *   { type: 'init', url }             fetch and index the match index
+ *   { type: 'load', index }           index a payload the page built itself
+ *   { type: 'match', id, kind, text } kind: 'tags' | 'location'
+ * Messages out:
+ *   { type: 'ready', counts } | { type: 'error', error }
+ *   { type: 'result', id, kind, tags: [{ id, name_bn, name_en, group_code }] }
+ *   { type: 'result', id, kind, location: { district_id, upazila_id, union_id } }
+ *
+ * Without Worker support the same file is loaded as a plain script and
+ * exposes the engine as window.NewsMatchEngine (see news-match-client.js).
+ */
+(function (global) {
+  'use strict';
+
+  var MIN_WORD_LEN = 2;
+  var KEY_LEN = 2;    /* prefix bucket length; never longer than MIN_WORD_LEN */
+  var WORD_SPLIT_RE = /[\s,।.!?;:'"()\[\]{}\-–—\u0964\u0965]+/;
+  var BOUNDARY_RE = /[\s,।.!?;:'"()\[\]{}\-–—\u0964\u0965]/;
+  var PARAGRAPH_RE = /\n+/;
+
+  /* Bengali case-marker suffixes, longest first (see news-auto-location.js) */
+  var BN_SUFFIXES = [
+    '\u09A4\u09C7\u0987',     /* তেই */
+    '\u09A4\u09C7\u0993',     /* তেও */
+    '\u09AF\u09BC\u09C7',     /* য়ে  */
+    '\u09C7\u09B0',           /* ের  */
+    '\u098F\u09B0',           /* এর  */
+    '\u09A4\u09C7',           /* তে  */
+    '\u0995\u09C7',           /* কে  */
+    '\u09AF\u09BC',           /* য়  */
+    '\u09B0',                 /* র   */
+    '\u09C7'                  /* ে   */
+  ];
+
+  /* ---- Text helpers ---- */
+  function splitWords(text) {
+    return text.split(WORD_SPLIT_RE).filter(function (w) {
+      return w.length >= MIN_WORD_LEN;
+    });
+  }
+
+  function nameWords(name) {
+    if (!name || name.length < MIN_WORD_LEN) return [];
+    return name.split(/\s+/).filter(function (w) { return w.length >= MIN_WORD_LEN; });
+  }
+
+  function stripBnSuffix(word) {
+    for (var i = 0; i < BN_SUFFIXES.length; i++) {
+      var sfx = BN_SUFFIXES[i];
+      if (word.length >= sfx.length + MIN_WORD_LEN
+          && word.substring(word.length - sfx.length) === sfx) {
+        return word.substring(0, word.length - sfx.length);
+      }
+    }
+    return word;
+  }
+
+  /* ---- records() — columnar section → array of objects ---- */
+  function records(section) {
+    if (!section) return [];
+    if (Array.isArray(section)) return section;
+    var cols = section.cols || [];
+    return (section.rows || []).map(function (row) {
+      var obj = {};
+      for (var i = 0; i < cols.length; i++) obj[cols[i]] = row[i];
+      return obj;
+    });
+  }
+
+  /* ---- WordIndex — name words with ids, bucketed by prefix ----
+   * exact(word)       → id of an identical name word, or undefined
+   * prefixesOf(word)  → ids of name words that word starts with */
+  function WordIndex() {
+    this.ids = Object.create(null);  /* words like "constructor" are data here */
+    this.words = [];
+    this.buckets = {};
+  }
+
+  WordIndex.prototype.add = function (word) {
+    var id = this.ids[word];
+    if (id !== undefined) return id;
+    id = this.words.length;
+    this.ids[word] = id;
+    this.words.push(word);
+    var key = word.substring(0, KEY_LEN);
+    (this.buckets[key] || (this.buckets[key] = [])).push(id);
+    return id;
+  };
+
+  WordIndex.prototype.exact = function (word) {
+    return this.ids[word];
+  };
+
+  WordIndex.prototype.prefixesOf = function (word, out) {
+    var bucket = this.buckets[word.substring(0, KEY_LEN)];
+    if (!bucket) return;
+    for (var i = 0; i < bucket.length; i++) {
+      if (word.indexOf(this.words[bucket[i]]) === 0) out[bucket[i]] = true;
+    }
+  };
+
+  /* ---- PhraseIndex — full names for the exact pass, bucketed by prefix ----
+   * matchAll(text, out) marks every name that occurs at a word boundary. */
+  function PhraseIndex() {
+    this.buckets = {};
+  }
+
+  PhraseIndex.prototype.add = function (phrase, ref) {
+    if (!phrase || phrase.length < MIN_WORD_LEN) return;
+    var key = phrase.substring(0, KEY_LEN);
+    (this.buckets[key] || (this.buckets[key] = [])).push({ phrase: phrase, ref: ref });
+  };
+
+  PhraseIndex.prototype.matchAll = function (text, out) {
+    for (var pos = 0; pos + KEY_LEN <= text.length; pos++) {
+      if (pos > 0 && !BOUNDARY_RE.test(text.charAt(pos - 1))) continue;
+      var bucket = this.buckets[text.substring(pos, pos + KEY_LEN)];
+      if (!bucket) continue;
+      for (var i = 0; i < bucket.length; i++) {
+        var entry = bucket[i];
+        if (text.substring(pos, pos + entry.phrase.length) === entry.phrase) out[entry.ref] = true;
+      }
+    }
+  };
+
+  /* ---- Engine state ---- */
+  var tags = [];           /* [{ tag, bn: [wordId], en: [wordId] }] */
+  var tagBn = new WordIndex();
+  var tagEn = new WordIndex();
+
+  var places = [];         /* [{ item, kind, bn: [wordId], en: [wordId] }] */
+  var placeBn = new WordIndex();
+  var placeEn = new WordIndex();
+  var placeBnExact = new PhraseIndex();
+  var placeEnExact = new PhraseIndex();
+  var districts = [];      /* place refs, in payload (name) order */
+  var upazilas = [];
+  var unions = [];
+  var upazilasByDistrict = {};
+  var unionsByUpazila = {};
+  var upazilaById = {};
+
+  var paragraphCache = Object.create(null); /* paragraph text → { tags, location } per-paragraph matches */
+  var ready = false;
+
+  function addWords(index, words) {
+    return words.map(function (w) { return index.add(w); });
+  }
+
+  function addPlace(item, kind) {
+    var ref = places.length;
+    places.push({
+      item: item,
+      kind: kind,
+      bn: addWords(placeBn, nameWords(item.name_bn)),
+      en: addWords(placeEn, nameWords((item.name_en || '').toLowerCase()))
+    });
+    placeBnExact.add(item.name_bn, ref);
+    placeEnExact.add((item.name_en || '').toLowerCase(), ref);
+    return ref;
+  }
+
+  /* ---- load(index) — (re)build every index from a match-index payload ---- */
+  function load(index) {
+    tags = []; tagBn = new WordIndex(); tagEn = new WordIndex();
+    places = []; placeBn = new WordIndex(); placeEn = new WordIndex();
+    placeBnExact = new PhraseIndex(); placeEnExact = new PhraseIndex();
+    districts = []; upazilas = []; unions = [];
+    upazilasByDistrict = {}; unionsByUpazila = {}; upazilaById = {};
+    paragraphCache = Object.create(null);
+
+    records(index.tags).forEach(function (tag) {
+      tags.push({
+        tag: tag,
+        bn: addWords(tagBn, nameWords(tag.name_bn)),
+        en: addWords(tagEn, nameWords((tag.name_en || '').toLowerCase()))
+      });
+    });
+
+    records(index.districts).forEach(function (d) {
+      districts.push(addPlace(d, 'district'));
+    });
+    records(index.upazilas).forEach(function (u) {
+      var ref = addPlace(u, 'upazila');
+      upazilas.push(ref);
+      upazilaById[u.id] = u;
+      (upazilasByDistrict[u.district_id] || (upazilasByDistrict[u.district_id] = [])).push(ref);
+    });
+    records(index.union_parishads).forEach(function (up) {
+      var ref = addPlace(up, 'union');
+      unions.push(ref);
+      (unionsByUpazila[up.upazila_id] || (unionsByUpazila[up.upazila_id] = [])).push(ref);
+    });
+
+    ready = true;
+    return { tags: tags.length, districts: districts.length, upazilas: upazilas.length, unions: unions.length };
+  }
+
+  /* ---- Per-paragraph matching (cached by paragraph text) ---- */
+  function matchParagraphTags(text) {
+    var found = { bn: {}, en: {} };
+    splitWords(text).forEach(function (w) { tagBn.prefixesOf(w, found.bn); });
+    splitWords(text.toLowerCase()).forEach(function (w) { tagEn.prefixesOf(w, found.en); });
+    return found;
+  }
+
+  function matchParagraphLocation(text) {
+    var lower = text.toLowerCase();
+    var found = { exact: {}, bn: {}, en: {} };
+    placeBnExact.matchAll(text, found.exact);
+    placeEnExact.matchAll(lower, found.exact);
+    splitWords(text).forEach(function (w) {
+      var id = placeBn.exact(w);
+      if (id !== undefined) found.bn[id] = true;
+      id = placeBn.exact(stripBnSuffix(w));
+      if (id !== undefined) found.bn[id] = true;
+    });
+    splitWords(lower).forEach(function (w) { placeEn.prefixesOf(w, found.en); });
+    return found;
+  }
+
+  function mergeInto(target, source) {
+    for (var key in source) {
+      if (!target[key]) target[key] = {};
+      for (var id in source[key]) target[key][id] = true;
+    }
+    return target;
+  }
+
+  /* ---- collect(text, kind) — merged matches of every paragraph ----
+   * Cached paragraphs are reused; the cache is then trimmed to the paragraphs
+   * of the current text so it cannot grow without bound. */
+  function collect(text, kind) {
+    var matcher = kind === 'tags' ? matchParagraphTags : matchParagraphLocation;
+    var nextCache = Object.create(null);
+    var merged = {};
+    text.split(PARAGRAPH_RE).forEach(function (paragraph) {
+      if (!paragraph) return;
+      var entry = nextCache[paragraph] || paragraphCache[paragraph] || {};
+      if (!entry[kind]) entry[kind] = matcher(paragraph);
+      nextCache[paragraph] = entry;
+      mergeInto(merged, entry[kind]);
+    });
+    paragraphCache = nextCache;
+    return merged;
+  }
+
+  function allPresent(wordIds, present) {
+    if (wordIds.length === 0) return false;
+    for (var i = 0; i < wordIds.length; i++) {
+      if (!present[wordIds[i]]) return false;
+    }
+    return true;
+  }
+
+  /* ---- matchTags(text) — tags whose every Bengali or English word occurs ---- */
+  function matchTags(text) {
+    var found = collect(text, 'tags');
+    var bn = found.bn || {};
+    var en = found.en || {};
+    var matched = [];
+    for (var i = 0; i < tags.length; i++) {
+      if (allPresent(tags[i].bn, bn) || allPresent(tags[i].en, en)) matched.push(tags[i].tag);
+    }
+    return matched;
+  }
+
+  /* ---- matchLocation(text) — most specific district/upazila/union named ---- */
+  function matchLocation(text) {
+    var found = collect(text, 'location');
+    var exact = found.exact || {};
+    var bn = found.bn || {};
+    var en = found.en || {};
+
+    /* Two-pass find over refs in list order: exact first, then fuzzy */
+    function findMatch(refs) {
+      var i;
+      for (i = 0; i < refs.length; i++) {
+        if (exact[refs[i]]) return places[refs[i]].item;
+      }
+      for (i = 0; i < refs.length; i++) {
+        var place = places[refs[i]];
+        if (allPresent(place.bn, bn) || allPresent(place.en, en)) return place.item;
+      }
+      return null;
+    }
+
+    var result = { district_id: null, upazila_id: null, union_id: null };
+
+    var union = findMatch(unions);
+    if (union) {
+      result.union_id = union.id;
+      result.upazila_id = union.upazila_id;
+      var parent = upazilaById[union.upazila_id];
+      if (parent) result.district_id = parent.district_id;
+    }
+
+    if (!result.upazila_id) {
+      var upazila = findMatch(upazilas);
+      if (upazila) {
+        result.upazila_id = upazila.id;
+        result.district_id = upazila.district_id;
+      }
+    }
+
+    if (!result.district_id) {
+      var district = findMatch(districts);
+      if (district) result.district_id = district.id;
+    }
+
+    if (result.district_id && !result.upazila_id) {
+      var inDistrict = findMatch(upazilasByDistrict[result.district_id] || []);
+      if (inDistrict) result.upazila_id = inDistrict.id;
+    }
+
+    if (result.upazila_id && !result.union_id) {
+      var inUpazila = findMatch(unionsByUpazila[result.upazila_id] || []);
+      if (inUpazila) result.union_id = inUpazila.id;
+    }
+
+    return result;
+  }
+
+  /* ---- handle(msg, reply) — the message protocol, shared by both modes ---- */
+  function handle(msg, reply) {
+    if (msg.type === 'init') {
+      fetch(msg.url, { credentials: 'same-origin' })
+        .then(function (r) {
+          if (!r.ok) throw new Error('HTTP ' + r.status);
+          return r.json();
+        })
+        .then(function (index) { reply({ type: 'ready', counts: load(index) }); })
+        .catch(function (e) { reply({ type: 'error', error: String(e && e.message || e) }); });
+    } else if (msg.type === 'load') {
+      reply({ type: 'ready', counts: load(msg.index) });
+    } else if (msg.type === 'match') {
+      if (!ready) {
+        reply({ type: 'result', id: msg.id, kind: msg.kind, error: 'not ready' });
+      } else if (msg.kind === 'tags') {
+        reply({ type: 'result', id: msg.id, kind: msg.kind, tags: matchTags(msg.text || '') });
+      } else {
+        reply({ type: 'result', id: msg.id, kind: msg.kind, location: matchLocation(msg.text || '') });
+      }
+    }
+  }
+
+  var engine = { handle: handle, load: load, matchTags: matchTags, matchLocation: matchLocation };
+
+  if (typeof global.document === 'undefined' && typeof global.postMessage === 'function') {
+    /* Dedicated worker */
+    global.onmessage = function (e) {
+      handle(e.data, function (out) { global.postMessage(out); });
+    };
+  } else {
+    global.NewsMatchEngine = engine;
+  }
+})(this);
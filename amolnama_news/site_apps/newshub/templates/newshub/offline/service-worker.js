@@ -0,0 +1,300 @@
+/**
+ * Offline mode for the news collection page (rendered by newshub.views.service_worker).
+ *
+ * Caches:
+ *   newshub-static-<build>    hashed static files: cache-first, replaced
+ *                             when a deploy changes them (new <build>)
+ *   newshub-pages             the news collection page: network-first, the
+ *                             cached copy is served when offline
+ *   newshub-ref-<version>     reference API responses (tags, gazetteer,
+ *                             location cascades): cache-first. <version> is
+ *                             /newshub/api/reference/version/ (the newshub
+ *                             and location data versions); when it changes
+ *                             the snapshot is re-downloaded and the old
+ *                             cache dropped
+ *
+ * Submissions:
+ *   A form POST that cannot reach the server is stored in the
+ *   news-offline-queue.js IndexedDB queue and answered with a redirect to
+ *   the page with ?queued=1. The queue is sent to the idempotent
+ *   /newshub/api/submissions/ endpoint — keyed by the form's
+ *   client_submission_id, so a replay never creates a second entry — on
+ *   Background Sync, or when a page posts { type: 'flush' } (browsers
+ *   without Background Sync; news-offline-sync.js does this on 'online').
+ *   A submission the server rejects (400) stays in the queue marked
+ *   rejected, with the errors, for the reporter to fix or discard.
+ *   Open pages get { type: 'newshub-offline', event, pending, ... } messages.
+ */
+var CONFIG = {{ config_json|safe }};
+
+importScripts(CONFIG.queue_script);
+
+var queue = self.newshubOfflineQueue;
+var STATIC_CACHE = 'newshub-static-' + CONFIG.build;
+var PAGE_CACHE = 'newshub-pages';
+var REF_PREFIX = 'newshub-ref-';
+var VERSION_CHECK_INTERVAL = 60 * 1000; /* at most once a minute, on page loads */
+
+var lastVersionCheck = 0;
+
+/* ---- Lifecycle ---- */
+self.addEventListener('install', function (event) {
+  event.waitUntil(
+    caches.open(STATIC_CACHE)
+      .then(function (cache) { return cache.addAll(CONFIG.precache_static); })
+      .then(function () { return caches.open(PAGE_CACHE); })
+      .then(function (cache) {
+        /* The page is cached again on every online visit; not worth failing install over */
+        return cache.add(CONFIG.page_url).catch(function () {});
+      })
+      .then(function () { return self.skipWaiting(); })
+  );
+});
+
+self.addEventListener('activate', function (event) {
+  event.waitUntil(
+    caches.keys().then(function (names) {
+      return Promise.all(names.filter(function (name) {
+        return name.indexOf('newshub-static-') === 0 && name !== STATIC_CACHE;
+      }).map(function (name) { return caches.delete(name); }));
+    })
+      .then(function () { return refreshReference(); })
+      .catch(function () { /* offline at activation — keep the old snapshot */ })
+      .then(function () { return self.clients.claim(); })
+  );
+});
+
+/* ---- Reference snapshot ---- */
+function currentRefCache() {
+  return caches.keys().then(function (names) {
+    for (var i = 0; i < names.length; i++) {
+      if (names[i].indexOf(REF_PREFIX) === 0) return names[i];
+    }
+    return null;
+  });
+}
+
+/* refreshReference() — re-download the snapshot if the data version moved */
+function refreshReference() {
+  lastVersionCheck = Date.now();
+  return fetch(CONFIG.version_url, { cache: 'no-store' })
+    .then(function (r) {
+      if (!r.ok) throw new Error('HTTP ' + r.status);
+      return r.json();
+    })
+    .then(function (data) {
+      var wanted = REF_PREFIX + data.version;
+      return currentRefCache().then(function (current) {
+        if (current === wanted) return;
+        return caches.open(wanted)
+          .then(function (cache) { return cache.addAll(CONFIG.precache_reference); })
+          .then(function () { return caches.keys(); })
+          .then(function (names) {
+            return Promise.all(names.filter(function (name) {
+              return name.indexOf(REF_PREFIX) === 0 && name !== wanted;
+            }).map(function (name) { return caches.delete(name); }));
+          });
+      });
+    });
+}
+
+function isReferenceApi(url) {
+  if (url.pathname.indexOf(CONFIG.api_prefix) !== 0) return false;
+  if (url.pathname === CONFIG.version_url || url.pathname === CONFIG.submit_url) return false;
+  /* Search and ancestry lookups are per-query, not reference data */
+  return url.pathname.indexOf('/search/') === -1 && url.pathname.indexOf('/resolve/') === -1;
+}
+
+function referenceFirst(request) {
+  return currentRefCache().then(function (name) {
+    var cacheName = name || REF_PREFIX + 'pending';
+    return caches.open(cacheName).then(function (cache) {
+      return cache.match(request).then(function (hit) {
+        if (hit) return hit;
+        return fetch(request).then(function (response) {
+          if (response.ok) cache.put(request, response.clone());
+          return response;
+        });
+      });
+    });
+  });
+}
+
+/* ---- Fetch routing ---- */
+function staticFirst(request) {
+  return caches.open(STATIC_CACHE).then(function (cache) {
+    return cache.match(request).then(function (hit) {
+      if (hit) return hit;
+      return fetch(request).then(function (response) {
+        if (response.ok) cache.put(request, response.clone());
+        return response;
+      });
+    });
+  });
+}
+
+function pageNetworkFirst(event) {
+  var request = event.request;
+  var url = new URL(request.url);
+  if (Date.now() - lastVersionCheck > VERSION_CHECK_INTERVAL) {
+    event.waitUntil(refreshReference().catch(function () {}));
+  }
+  return fetch(request)
+    .then(function (response) {
+      /* Only the plain page is cached, not ?submitted=1 and friends */
+      if (response.ok && !url.search) {
+        var copy = response.clone();
+        caches.open(PAGE_CACHE).then(function (cache) { cache.put(CONFIG.page_url, copy); });
+      }
+      return response;
+    })
+    .catch(function () {
+      return caches.open(PAGE_CACHE)
+        .then(function (cache) { return cache.match(CONFIG.page_url); })
+        .then(function (hit) {
+          return hit || new Response('Offline', { status: 503, headers: { 'Content-Type': 'text/plain' } });
+        });
+    });
+}
+
+self.addEventListener('fetch', function (event) {
+  var request = event.request;
+  var url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+
+  if (request.method === 'POST' && url.pathname === CONFIG.page_url) {
+    event.respondWith(submitOrQueue(event));
+  } else if (request.method !== 'GET') {
+    return;
+  } else if (request.mode === 'navigate' && url.pathname === CONFIG.page_url) {
+    event.respondWith(pageNetworkFirst(event));
+  } else if (url.pathname.indexOf(CONFIG.static_prefix) === 0) {
+    event.respondWith(staticFirst(request));
+  } else if (isReferenceApi(url)) {
+    event.respondWith(referenceFirst(request));
+  }
+});
+
+/* ---- Submission queue ---- */
+function uuid4() {
+  if (self.crypto && self.crypto.randomUUID) return self.crypto.randomUUID();
+  var bytes = self.crypto.getRandomValues(new Uint8Array(16));
+  bytes[6] = (bytes[6] & 0x0f) | 0x40;
+  bytes[8] = (bytes[8] & 0x3f) | 0x80;
+  var hex = Array.prototype.map.call(bytes, function (b) { return (b + 0x100).toString(16).slice(1); }).join('');
+  return hex.slice(0, 8) + '-' + hex.slice(8, 12) + '-' + hex.slice(12, 16) + '-' + hex.slice(16, 20) + '-' + hex.slice(20);
+}
+
+function notify(message) {
+  return queue.count().then(function (pending) {
+    message.type = 'newshub-offline';
+    message.pending = pending;
+    return self.clients.matchAll({ type: 'window' }).then(function (clients) {
+      clients.forEach(function (client) { client.postMessage(message); });
+    });
+  });
+}
+
+/* enqueue(formData) — store a submission; the form's UUID keys it */
+function enqueue(formData) {
+  var fields = [];
+  formData.forEach(function (value, name) {
+    /* Empty file inputs arrive as nameless zero-byte files */
+    if (typeof value !== 'string' && !value.size && !value.name) return;
+    fields.push([name, value]);
+  });
+  var id = formData.get('client_submission_id') || uuid4();
+  var entry = { id: id, created_at: Date.now(), headline: formData.get('headline_bn') || '', fields: fields };
+  return queue.add(entry)
+    .then(function () {
+      if (self.registration.sync) {
+        return self.registration.sync.register(queue.SYNC_TAG).catch(function () {});
+      }
+    })
+    .then(function () { return notify({ event: 'queued', headline: entry.headline }); });
+}
+
+function submitOrQueue(event) {
+  var copy = event.request.clone();
+  return fetch(event.request).catch(function () {
+    return copy.formData()
+      .then(enqueue)
+      .then(function () { return Response.redirect(CONFIG.page_url + '?queued=1', 303); });
+  });
+}
+
+/* send(entry, token) — one queued submission; resolves when it may leave the queue */
+function send(entry, token) {
+  var body = new FormData();
+  var hasId = false;
+  entry.fields.forEach(function (field) {
+    if (field[0] === 'csrfmiddlewaretoken') return;   /* may be stale; the header carries a fresh one */
+    if (field[0] === 'client_submission_id') hasId = true;
+    if (typeof field[1] !== 'string' && field[1].name) {
+      body.append(field[0], field[1], field[1].name);
+    } else {
+      body.append(field[0], field[1]);
+    }
+  });
+  if (!hasId) body.append('client_submission_id', entry.id);
+
+  return fetch(CONFIG.submit_url, {
+    method: 'POST',
+    body: body,
+    credentials: 'same-origin',
+    headers: { 'X-CSRFToken': token }
+  }).then(function (response) {
+    if (response.ok) {
+      /* created, or a duplicate of an earlier attempt that did reach the server */
+      return queue.remove(entry.id).then(function () {
+        return notify({ event: 'synced', headline: entry.headline });
+      });
+    }
+    if (response.status === 400) {
+      /* Rejected by validation — retrying cannot help, but the reporter's
+         text and files stay until they restore or discard them */
+      return response.json().catch(function () { return {}; }).then(function (data) {
+        return queue.reject(entry.id, data.errors || []).then(function () {
+          return notify({ event: 'rejected', id: entry.id, headline: entry.headline, errors: data.errors || [] });
+        });
+      });
+    }
+    throw new Error('HTTP ' + response.status);
+  });
+}
+
+var flushing = null;
+
+/* flush() — send the pending queue oldest first; rejects (so sync retries) on failure */
+function flush() {
+  if (flushing) return flushing;
+  flushing = queue.pending()
+    .then(function (entries) {
+      if (!entries.length) return;
+      return fetch(CONFIG.submit_url, { credentials: 'same-origin', cache: 'no-store' })
+        .then(function (r) {
+          if (!r.ok) throw new Error('HTTP ' + r.status);
+          return r.json();
+        })
+        .then(function (data) {
+          return entries.reduce(function (chain, entry) {
+            return chain.then(function () { return send(entry, data.csrf_token); });
+          }, Promise.resolve());
+        });
+    })
+    .then(function () { flushing = null; }, function (error) {
+      flushing = null;
+      throw error;
+    });
+  return flushing;
+}
+
+self.addEventListener('sync', function (event) {
+  if (event.tag === queue.SYNC_TAG) event.waitUntil(flush());
+});
+
+self.addEventListener('message', function (event) {
+  if (event.data && event.data.type === 'flush') {
+    event.waitUntil(flush().catch(function () {}));
+  }
+});
@@ -1,3 +1,137 @@
+import json
+import re
+import uuid
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import IntegrityError
 from django.test import TestCase
+from django.urls import reverse
+
+from amolnama_news.site_apps.core import data_versions
+from amolnama_news.site_apps.core.cache import tiered_cache
+
+from . import search, views, views_api
+from .models import SubmissionReceipt
+
+
+class MatchIndexApiTest(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        tiered_cache.l1.clear()
+
+    def test_index_is_columnar_per_section(self):
+        tags = [{'id': 1, 'name_bn': 'হামলা', 'name_en': 'Attack', 'group_code': 'crime'}]
+        locations = {
+            'districts': [{'id': 26, 'name_bn': 'ঢাকা', 'name_en': 'Dhaka'}],
+            'upazilas': [{'id': 300, 'name_bn': 'সাভার', 'name_en': 'Savar', 'district_id': 26}],
+            'union_parishads': [],
+        }
+        with mock.patch.object(views_api, '_unique_category_tags', return_value=tags), \
+                mock.patch.object(views_api, '_all_locations', return_value=locations):
+            data = self.client.get(reverse('newshub:api_match_index')).json()
+
+        self.assertEqual(data['version'], views_api.MATCH_INDEX_VERSION)
+        self.assertEqual(data['tags'], {'cols': ['id', 'name_bn', 'name_en', 'group_code'],
+                                        'rows': [[1, 'হামলা', 'Attack', 'crime']]})
+        self.assertEqual(data['upazilas']['rows'], [[300, 'সাভার', 'Savar', 26]])
+        self.assertEqual(data['union_parishads'], {'cols': [], 'rows': []})
+
+
+class OfflineSubmissionTest(TestCase):
+    client_submission_id = uuid.UUID('6f1c2a8e-3b4d-4c5e-9f60-7a8b9c0d1e2f')
+
+    def test_get_returns_csrf_token(self):
+        response = self.client.get(reverse('newshub:api_news_submission'))
+        self.assertTrue(response.json()['csrf_token'])
+
+    def test_client_submission_id_is_required(self):
+        response = self.client.post(reverse('newshub:api_news_submission'), {'headline_bn': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['status'], 'invalid')
+
+    def test_replay_returns_the_saved_entry(self):
+        SubmissionReceipt.objects.create(client_submission_id=self.client_submission_id, link_coll_news_entry_id=42)
+        with mock.patch.object(views, '_save_submission') as save:
+            response = self.client.post(reverse('newshub:api_news_submission'),
+                                        {'client_submission_id': str(self.client_submission_id)})
+            form_response = self.client.post(reverse('newshub:news_collection'),
+                                             {'client_submission_id': str(self.client_submission_id)})
+        self.assertEqual(response.json(), {'status': 'duplicate', 'entry_id': 42})
+        self.assertRedirects(form_response, reverse('newshub:news_collection') + '?submitted=1',
+                             fetch_redirect_response=False)
+        save.assert_not_called()
+
+    def test_concurrent_replay_that_loses_the_race_is_a_duplicate(self):
+        def save_after_winner(request, sub, client_submission_id):
+            SubmissionReceipt.objects.create(client_submission_id=client_submission_id, link_coll_news_entry_id=7)
+            raise IntegrityError('duplicate key')
+
+        with mock.patch.object(views, '_validate_submission', return_value=[]), \
+                mock.patch.object(views, '_save_submission', side_effect=save_after_winner):
+            response = self.client.post(reverse('newshub:api_news_submission'),
+                                        {'client_submission_id': str(self.client_submission_id)})
+        self.assertEqual(response.json(), {'status': 'duplicate', 'entry_id': 7})
+
+
+class OfflineModeTest(TestCase):
+    def test_service_worker_is_served_under_the_app_scope(self):
+        response = self.client.get(reverse('newshub:service_worker'))
+        self.assertEqual(response['Content-Type'], 'application/javascript')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        config = json.loads(re.search(r'var CONFIG = (\{.*\});', response.content.decode()).group(1))
+        self.assertEqual(config['page_url'], reverse('newshub:news_collection'))
+        self.assertEqual(config['scope'], '/newshub/')
+        self.assertIn(reverse('newshub:api_match_index'), config['precache_reference'])
+
+    def test_rejected_submissions_are_kept_for_the_reporter(self):
+        worker = self.client.get(reverse('newshub:service_worker')).content.decode()
+        start = worker.index('response.status === 400')
+        rejected = worker[start:worker.index("throw new Error('HTTP '", start)]
+        self.assertIn('queue.reject(entry.id', rejected)
+        self.assertNotIn('queue.remove(', rejected)
+        self.assertIn('queue.pending()', worker)  # rejected entries are not sent again
+
+    def test_reference_version_follows_data_versions(self):
+        url = reverse('newshub:api_reference_version')
+        before = self.client.get(url).json()['version']
+        data_versions.bump('location')
+        after = self.client.get(url).json()['version']
+        self.assertNotEqual(before, after)
+        self.assertTrue(after.startswith('newshub.'))
+
+
+class PhoneticSearchApiTest(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        tiered_cache.l1.clear()
+
+    def test_tag_search_matches_transliterations_and_aliases(self):
+        tags = [
+            {'id': 1, 'name_bn': 'সন্ত্রাসী হামলা', 'name_en': 'Terrorist Attack', 'aliases': []},
+            {'id': 2, 'name_bn': 'নির্বাচন', 'name_en': 'Election', 'aliases': ['vote']},
+        ]
+        url = reverse('newshub:api_news_category_tags_search')
+        with mock.patch.object(search.tag_index, 'load', return_value=tags) as load:
+            self.assertEqual(self.client.get(url, {'q': 'sontras'}).json(), {'tags': [
+                {'id': 1, 'name_bn': 'সন্ত্রাসী হামলা', 'name_en': 'Terrorist Attack'},
+            ]})
+            self.assertEqual([t['id'] for t in self.client.get(url, {'q': 'nirbachon'}).json()['tags']], [2])
+            self.assertEqual([t['id'] for t in self.client.get(url, {'q': 'vote'}).json()['tags']], [2])
+            self.assertEqual(self.client.get(url, {'q': 'n'}).json(), {'tags': []})
+        load.assert_called_once()  # one index for every query
 
-# Create your tests here.
+    def test_organisation_search_filters_by_type(self):
+        organisations = [
+            {'id': 1, 'name_bn': 'সোনালী ব্যাংক', 'name_en': 'Sonali Bank', 'type_id': 3},
+            {'id': 2, 'name_bn': 'ঢাকা বিশ্ববিদ্যালয়', 'name_en': 'University of Dhaka', 'type_id': 5},
+            {'id': 3, 'name_bn': 'ঢাকা ব্যাংক', 'name_en': 'Dhaka Bank', 'type_id': 3},
+        ]
+        url = reverse('newshub:api_organisation_search')
+        with mock.patch.object(search.organisation_index, 'load', return_value=organisations):
+            found = self.client.get(url, {'q': 'dhaka'}).json()['organisations']
+            self.assertEqual({o['id'] for o in found}, {2, 3})
+            found = self.client.get(url, {'q': 'ঢাকা', 'type_id': '3'}).json()['organisations']
+            self.assertEqual(found, [organisations[2]])
+            found = self.client.get(url, {'q': 'ersity'}).json()['organisations']
+            self.assertEqual([o['id'] for o in found], [2])
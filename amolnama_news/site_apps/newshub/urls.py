@@ -6,6 +6,7 @@ app_name = 'newshub'
 
 urlpatterns = [
     path('news-collection/', views.news_collection, name='news_collection'),
+    path('sw.js', views.service_worker, name='service_worker'),
 
     # API endpoints — location cascade (original)
     path('api/constituencies/<int:district_id>/', views_api.api_constituencies_by_district, name='api_constituencies_by_district'),
@@ -30,6 +31,13 @@ urlpatterns = [
     path('api/categories/search/', views_api.api_news_category_search, name='api_news_category_search'),
     path('api/tags/search/', views_api.api_news_category_tags_search, name='api_news_category_tags_search'),
 
+    # API endpoint — tag + location index for the content-matching worker
+    path('api/match-index/', views_api.api_match_index, name='api_match_index'),
+
+    # API endpoints — offline mode (service worker)
+    path('api/submissions/', views.api_news_submission, name='api_news_submission'),
+    path('api/reference/version/', views_api.api_reference_version, name='api_reference_version'),
+
     # API endpoints — organisations
     path('api/organisations/search/', views_api.api_organisation_search, name='api_organisation_search'),
     path('api/organisations/<int:type_id>/', views_api.api_organisations_by_type, name='api_organisations_by_type'),
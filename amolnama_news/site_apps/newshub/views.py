@@ -1,13 +1,21 @@
 import hashlib
+import json
+import logging
 import os
 import unicodedata
 import uuid
 
 from django.conf import settings
 from django.db import connection as db_conn, DatabaseError, IntegrityError, transaction
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect, render
+from django.templatetags.static import static
+from django.urls import reverse
 from django.utils import timezone
+from django.views.decorators.http import require_http_methods
 
+from amolnama_news.site_apps.core.json_response import json_response
+from amolnama_news.site_apps.core.query_budget import query_budget
 from amolnama_news.site_apps.locations.models import District
 from amolnama_news.site_apps.multimedia.models import Asset
 from amolnama_news.site_apps.user_account.models import Organisation, OrganisationType, Person, UserProfile
@@ -28,10 +36,28 @@ from .models import (
     RefNewsCategory,
     RefNewsCategoryTag,
     RefPlatformType,
+    SubmissionReceipt,
     VwAppNewsCategoryTag,
 )
 
 
+logger = logging.getLogger(__name__)
+
+# Static files the offline service worker caches on install
+OFFLINE_PRECACHE_STATIC = (
+    'newshub/assets/js/news-collection.bundle.js',
+    'newshub/assets/js/workers/news-match-worker.js',
+    'newshub/assets/css/pages/news-collection.css',
+    'core/assets/css/base.css',
+)
+
+# Shown when the service worker queued a submission made without a connection
+OFFLINE_QUEUED_MESSAGE = (
+    'সংযোগ নেই — সংবাদটি এই ডিভাইসে সংরক্ষিত হয়েছে, সংযোগ ফিরলে স্বয়ংক্রিয়ভাবে পাঠানো হবে। '
+    '(Saved offline; it will be sent automatically when you are back online.)'
+)
+
+
 # ========== Helpers ==========
 
 def _unique_news_category_tags():
@@ -97,6 +123,13 @@ def _build_form_context(contributor_form, news_entry_form, attachment_form, soci
         'selected_longitude': None,
         'selected_tag_ids': [],
         'is_breaking_checked': False,
+        'offline_config': {
+            'enabled': getattr(settings, 'NEWSHUB_OFFLINE_ENABLED', True),
+            'sw_url': reverse('newshub:service_worker'),
+            'scope': reverse('newshub:service_worker').rsplit('/', 1)[0] + '/',
+            'queued_message': OFFLINE_QUEUED_MESSAGE,
+            'tags_url': reverse('newshub:api_news_category_tags_all'),
+        },
     }
     if extra:
         ctx.update(extra)
@@ -105,6 +138,7 @@ def _build_form_context(contributor_form, news_entry_form, attachment_form, soci
 
 # ========== Page Views ==========
 
+@query_budget(40)
 def news_collection(request):
     """News collection form — GET shows blank form, POST validates and saves."""
 
@@ -115,6 +149,8 @@ def news_collection(request):
     extra = {}
     if request.GET.get('submitted') == '1':
         extra['success_message'] = 'সংবাদ সফলভাবে জমা হয়েছে! (News submitted successfully)'
+    elif request.GET.get('queued') == '1':
+        extra['success_message'] = OFFLINE_QUEUED_MESSAGE
 
     extra['self_info'] = _get_user_contributor_info(request.user)
 
@@ -137,81 +173,89 @@ def news_collection(request):
     return render(request, 'newshub/pages/news-collection.html', ctx)
 
 
-def _handle_news_submission(request):
-    """Validate all sub-forms and save to DB."""
-    contributor_form = ContributorInfoForm(request.POST)
-    news_entry_form = NewsEntryForm(request.POST)
-    attachment_form = NewsAttachmentForm(request.POST, request.FILES)
-    social_source_form = NewsSocialSourceForm(request.POST)
-
-    # Sidebar fields (not in Django forms — rendered manually in widgets)
-    category_id = request.POST.get('news_category_id', '')
-    district_id = request.POST.get('district_id', '')
-    constituency_id = request.POST.get('constituency_id', '') or None
-    upazila_id = request.POST.get('upazila_id', '') or None
-    union_parishad_id = request.POST.get('union_parishad_id', '') or None
-    latitude = request.POST.get('latitude', '') or None
-    longitude = request.POST.get('longitude', '') or None
-    formatted_address_bn = request.POST.get('formatted_address_bn', '') or None
-    is_breaking = request.POST.get('is_breaking') == '1'
-    tag_ids = request.POST.getlist('tag_ids')
+def _read_submission(request):
+    """Bind the sub-forms and the sidebar fields of a news submission POST."""
+    sub = {
+        'contributor_form': ContributorInfoForm(request.POST),
+        'news_entry_form': NewsEntryForm(request.POST),
+        'attachment_form': NewsAttachmentForm(request.POST, request.FILES),
+        'social_source_form': NewsSocialSourceForm(request.POST),
+        # Sidebar fields (not in Django forms — rendered manually in widgets)
+        'category_id': request.POST.get('news_category_id', ''),
+        'district_id': request.POST.get('district_id', ''),
+        'constituency_id': request.POST.get('constituency_id', '') or None,
+        'upazila_id': request.POST.get('upazila_id', '') or None,
+        'union_parishad_id': request.POST.get('union_parishad_id', '') or None,
+        'latitude': request.POST.get('latitude', '') or None,
+        'longitude': request.POST.get('longitude', '') or None,
+        'formatted_address_bn': request.POST.get('formatted_address_bn', '') or None,
+        'is_breaking': request.POST.get('is_breaking') == '1',
+        'tag_ids': request.POST.getlist('tag_ids'),
+    }
 
     # If no category selected, derive from the first tag's category
-    if not category_id and tag_ids:
-        first_tag_id = tag_ids[0]
+    if not sub['category_id'] and sub['tag_ids']:
+        first_tag_id = sub['tag_ids'][0]
         if first_tag_id.isdigit():
             try:
                 first_tag = RefNewsCategoryTag.objects.get(news_category_tag_id=int(first_tag_id))
-                category_id = str(first_tag.link_news_category_id)
+                sub['category_id'] = str(first_tag.link_news_category_id)
             except RefNewsCategoryTag.DoesNotExist:
                 pass
+    return sub
+
 
+def _client_submission_id(request):
+    """The client-generated submission UUID, or None when absent or malformed."""
+    raw = request.POST.get('client_submission_id', '').strip()
+    try:
+        return uuid.UUID(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def _receipt_entry_id(client_submission_id):
+    """Entry id already saved under this client UUID, or None."""
+    if client_submission_id is None:
+        return None
+    return (
+        SubmissionReceipt.objects.filter(client_submission_id=client_submission_id)
+        .values_list('link_coll_news_entry_id', flat=True).first()
+    )
+
+
+def _validate_submission(sub):
+    """Return the error messages of an invalid submission (empty when valid).
+    Adds the NFKC-normalized headline and summary to ``sub``."""
     # Basic validation for sidebar required fields
     sidebar_errors = []
-    if not tag_ids:
+    if not sub['tag_ids']:
         sidebar_errors.append('অন্তত একটি ট্যাগ যুক্ত করুন (At least one tag is required)')
-    if not district_id:
+    if not sub['district_id']:
         sidebar_errors.append('জেলা নির্বাচন করুন (District is required)')
 
     all_valid = (
-        contributor_form.is_valid()
-        and news_entry_form.is_valid()
-        and attachment_form.is_valid()
-        and social_source_form.is_valid()
+        sub['contributor_form'].is_valid()
+        and sub['news_entry_form'].is_valid()
+        and sub['attachment_form'].is_valid()
+        and sub['social_source_form'].is_valid()
         and not sidebar_errors
     )
-
     if not all_valid:
-        error_msg = ' | '.join(sidebar_errors) if sidebar_errors else 'ফর্মে ত্রুটি আছে, অনুগ্রহ করে পরীক্ষা করুন।'
-        ctx = _build_form_context(
-            contributor_form, news_entry_form, attachment_form, social_source_form,
-            extra={
-                'error_message': error_msg,
-                'selected_category_id': category_id,
-                'selected_district_id': district_id,
-                'selected_constituency_id': constituency_id,
-                'selected_upazila_id': upazila_id,
-                'selected_union_parishad_id': union_parishad_id,
-                'selected_latitude': latitude,
-                'selected_longitude': longitude,
-                'selected_tag_ids': [int(t) for t in tag_ids if t.isdigit()],
-                'is_breaking_checked': is_breaking,
-            },
-        )
-        return render(request, 'newshub/pages/news-collection.html', ctx)
+        return sidebar_errors or ['ফর্মে ত্রুটি আছে, অনুগ্রহ করে পরীক্ষা করুন।']
 
     # ---- Normalize Bengali text (NFKC) and check for duplicate headline ----
-    now = timezone.now()
-    cd = contributor_form.cleaned_data
-    nd = news_entry_form.cleaned_data
+    nd = sub['news_entry_form'].cleaned_data
 
-    headline_raw = nd['headline_bn']
-    headline_normalized = unicodedata.normalize('NFKC', headline_raw).strip()
+    headline_normalized = unicodedata.normalize('NFKC', nd['headline_bn']).strip()
 
     # Also normalize summary
     summary_raw = nd['summary_bn']
     summary_normalized = unicodedata.normalize('NFKC', summary_raw).strip() if summary_raw else None
 
+    sub['headline_normalized'] = headline_normalized
+    sub['summary_normalized'] = summary_normalized
+
     # Validate length after normalization (NFKC can increase char count beyond form max_length)
     length_errors = []
     if len(headline_normalized) > 100:
@@ -219,45 +263,84 @@ def _handle_news_submission(request):
     if summary_normalized and len(summary_normalized) > 400:
         length_errors.append('সংক্ষেপ সর্বোচ্চ ৪০০ অক্ষর হতে পারে, বর্তমানে %d অক্ষর। (Summary max 400 chars, currently %d)' % (len(summary_normalized), len(summary_normalized)))
     if length_errors:
-        ctx = _build_form_context(
-            contributor_form, news_entry_form, attachment_form, social_source_form,
-            extra={
-                'error_message': ' | '.join(length_errors),
-                'selected_category_id': category_id,
-                'selected_district_id': district_id,
-                'selected_constituency_id': constituency_id,
-                'selected_upazila_id': upazila_id,
-                'selected_union_parishad_id': union_parishad_id,
-                'selected_latitude': latitude,
-                'selected_longitude': longitude,
-                'selected_tag_ids': [int(t) for t in tag_ids if t.isdigit()],
-                'is_breaking_checked': is_breaking,
-            },
-        )
-        return render(request, 'newshub/pages/news-collection.html', ctx)
+        return length_errors
 
     # Duplicate check: same headline (case-insensitive, trimmed) already exists
     duplicate_exists = CollNewsEntry.objects.filter(
         coll_news_entry_headline_bn__iexact=headline_normalized,
     ).exists()
     if duplicate_exists:
-        error_msg = 'এই শিরোনামে একটি সংবাদ ইতিমধ্যে জমা হয়েছে। অনুগ্রহ করে ভিন্ন শিরোনাম ব্যবহার করুন। (A news entry with this headline already exists.)'
-        ctx = _build_form_context(
-            contributor_form, news_entry_form, attachment_form, social_source_form,
-            extra={
-                'error_message': error_msg,
-                'selected_category_id': category_id,
-                'selected_district_id': district_id,
-                'selected_constituency_id': constituency_id,
-                'selected_upazila_id': upazila_id,
-                'selected_union_parishad_id': union_parishad_id,
-                'selected_latitude': latitude,
-                'selected_longitude': longitude,
-                'selected_tag_ids': [int(t) for t in tag_ids if t.isdigit()],
-                'is_breaking_checked': is_breaking,
-            },
+        return ['এই শিরোনামে একটি সংবাদ ইতিমধ্যে জমা হয়েছে। অনুগ্রহ করে ভিন্ন শিরোনাম ব্যবহার করুন। (A news entry with this headline already exists.)']
+    return []
+
+
+def _render_submission_errors(request, sub, error_message):
+    """Re-render the form with the submitted values and an error message."""
+    ctx = _build_form_context(
+        sub['contributor_form'], sub['news_entry_form'], sub['attachment_form'], sub['social_source_form'],
+        extra={
+            'error_message': error_message,
+            'selected_category_id': sub['category_id'],
+            'selected_district_id': sub['district_id'],
+            'selected_constituency_id': sub['constituency_id'],
+            'selected_upazila_id': sub['upazila_id'],
+            'selected_union_parishad_id': sub['union_parishad_id'],
+            'selected_latitude': sub['latitude'],
+            'selected_longitude': sub['longitude'],
+            'selected_tag_ids': [int(t) for t in sub['tag_ids'] if t.isdigit()],
+            'is_breaking_checked': sub['is_breaking'],
+        },
+    )
+    return render(request, 'newshub/pages/news-collection.html', ctx)
+
+
+def _handle_news_submission(request):
+    """Validate all sub-forms and save to DB."""
+    sub = _read_submission(request)
+    client_submission_id = _client_submission_id(request)
+
+    # A retry of a submission that was already saved (double click, flaky network)
+    if _receipt_entry_id(client_submission_id) is not None:
+        return redirect(request.path + '?submitted=1')
+
+    errors = _validate_submission(sub)
+    if errors:
+        return _render_submission_errors(request, sub, ' | '.join(errors))
+
+    try:
+        _save_submission(request, sub, client_submission_id)
+    except (IntegrityError, DatabaseError):
+        # A concurrent retry of the same submission won the race
+        if _receipt_entry_id(client_submission_id) is not None:
+            return redirect(request.path + '?submitted=1')
+        # Safety net: DB-level unique constraint or data truncation
+        return _render_submission_errors(
+            request, sub,
+            'সংবাদ জমা দেওয়া সম্ভব হয়নি। অনুগ্রহ করে আবার চেষ্টা করুন। (Submission failed. Please try again.)',
         )
-        return render(request, 'newshub/pages/news-collection.html', ctx)
+
+    # PRG: redirect to GET so browser refresh won't re-submit the form
+    return redirect(request.path + '?submitted=1')
+
+
+def _save_submission(request, sub, client_submission_id=None):
+    """Save a validated submission and everything linked to it atomically.
+
+    With a client_submission_id the receipt is inserted first, so a concurrent
+    replay of the same submission fails on its primary key before it writes
+    anything. Raises IntegrityError/DatabaseError on failure.
+    """
+    now = timezone.now()
+    cd = sub['contributor_form'].cleaned_data
+    nd = sub['news_entry_form'].cleaned_data
+    attachment_form = sub['attachment_form']
+    social_source_form = sub['social_source_form']
+    headline_normalized = sub['headline_normalized']
+    summary_normalized = sub['summary_normalized']
+    category_id = sub['category_id']
+    constituency_id = sub['constituency_id']
+    union_parishad_id = sub['union_parishad_id']
+    tag_ids = sub['tag_ids']
 
     # ---- Save all records atomically ----
 
@@ -282,158 +365,230 @@ def _handle_news_submission(request):
         else:
             org_name_bn = org_custom
 
-    try:
-        with transaction.atomic():
-            contributor = CollContributor.objects.create(
-                coll_contributor_full_name_bn=cd['contributor_full_name_bn'],
-                coll_contributor_organization_bn=org_name_bn,
-                coll_contributor_contact_email=cd['contributor_contact_email'] or None,
-                coll_contributor_contact_phone=cd['contributor_contact_phone'] or None,
-                link_contributor_type_id=cd['contributor_type_id'],
-                is_verified=False,
-                created_at=now,
+    with transaction.atomic():
+        receipt = None
+        if client_submission_id is not None:
+            receipt = SubmissionReceipt.objects.create(
+                client_submission_id=client_submission_id,
+                link_coll_news_entry_id=0,
             )
 
-            # ---- Save news entry (using NFKC-normalized headline/summary) ----
-            content_body = unicodedata.normalize('NFKC', nd['content_body_bn'])
-
-            entry = CollNewsEntry.objects.create(
-                coll_news_entry_headline_bn=headline_normalized,
-                coll_news_entry_summary_bn=summary_normalized or None,
-                coll_news_entry_content_body_bn=content_body,
-                link_news_category_id=int(category_id) if category_id else 12,
-                link_contributor_id=contributor.coll_contributor_id,
-                link_constituency_id=int(constituency_id) if constituency_id else None,
-                link_union_parishad_id=int(union_parishad_id) if union_parishad_id else None,
-                coll_news_entry_latitude=latitude,
-                coll_news_entry_longitude=longitude,
-                coll_news_entry_formatted_address_bn=formatted_address_bn,
-                coll_news_entry_is_breaking=is_breaking,
-                occurrence_at=nd['occurrence_at'],
-                created_at=now,
-            )
+        contributor = CollContributor.objects.create(
+            coll_contributor_full_name_bn=cd['contributor_full_name_bn'],
+            coll_contributor_organization_bn=org_name_bn,
+            coll_contributor_contact_email=cd['contributor_contact_email'] or None,
+            coll_contributor_contact_phone=cd['contributor_contact_phone'] or None,
+            link_contributor_type_id=cd['contributor_type_id'],
+            is_verified=False,
+            created_at=now,
+        )
 
-            # ---- Save attachments (multiple files supported, max 4) ----
-            # Flow: compute SHA-256 → check for duplicate → save file if new → create coll_news_asset link
-            ad = attachment_form.cleaned_data
-            uploaded_files = request.FILES.getlist('attachment_file')
-            caption = ad.get('attachment_caption_bn') or None
-            featured_idx_raw = request.POST.get('featured_file_index', '')
-            featured_idx = int(featured_idx_raw) if featured_idx_raw.isdigit() else -1
-
-            for i, uploaded_file in enumerate(uploaded_files[:4]):
-                content_type = getattr(uploaded_file, 'content_type', '') or ''
-                if content_type.startswith('image/'):
-                    media_category = 'image'
-                elif content_type.startswith('video/'):
-                    media_category = 'video'
-                elif content_type.startswith('audio/'):
-                    media_category = 'audio'
-                else:
-                    media_category = None  # maps to 'files' folder
-
-                # Compute SHA-256 hash (read in chunks for large files)
-                sha256 = hashlib.sha256()
-                for chunk in uploaded_file.chunks():
-                    sha256.update(chunk)
-                file_hash = sha256.digest()  # raw bytes for BinaryField
-                uploaded_file.seek(0)  # rewind for saving
-
-                # Check if identical file already exists in media.asset
-                existing_asset = Asset.objects.filter(
-                    hash_sha256=file_hash,
+        # ---- Save news entry (using NFKC-normalized headline/summary) ----
+        content_body = unicodedata.normalize('NFKC', nd['content_body_bn'])
+
+        entry = CollNewsEntry.objects.create(
+            coll_news_entry_headline_bn=headline_normalized,
+            coll_news_entry_summary_bn=summary_normalized or None,
+            coll_news_entry_content_body_bn=content_body,
+            link_news_category_id=int(category_id) if category_id else 12,
+            link_contributor_id=contributor.coll_contributor_id,
+            link_constituency_id=int(constituency_id) if constituency_id else None,
+            link_union_parishad_id=int(union_parishad_id) if union_parishad_id else None,
+            coll_news_entry_latitude=sub['latitude'],
+            coll_news_entry_longitude=sub['longitude'],
+            coll_news_entry_formatted_address_bn=sub['formatted_address_bn'],
+            coll_news_entry_is_breaking=sub['is_breaking'],
+            occurrence_at=nd['occurrence_at'],
+            created_at=now,
+        )
+
+        # ---- Save attachments (multiple files supported, max 4) ----
+        # Flow: compute SHA-256 → check for duplicate → save file if new → create coll_news_asset link
+        ad = attachment_form.cleaned_data
+        uploaded_files = request.FILES.getlist('attachment_file')
+        caption = ad.get('attachment_caption_bn') or None
+        featured_idx_raw = request.POST.get('featured_file_index', '')
+        featured_idx = int(featured_idx_raw) if featured_idx_raw.isdigit() else -1
+
+        for i, uploaded_file in enumerate(uploaded_files[:4]):
+            content_type = getattr(uploaded_file, 'content_type', '') or ''
+            if content_type.startswith('image/'):
+                media_category = 'image'
+            elif content_type.startswith('video/'):
+                media_category = 'video'
+            elif content_type.startswith('audio/'):
+                media_category = 'audio'
+            else:
+                media_category = None  # maps to 'files' folder
+
+            # Compute SHA-256 hash (read in chunks for large files)
+            sha256 = hashlib.sha256()
+            for chunk in uploaded_file.chunks():
+                sha256.update(chunk)
+            file_hash = sha256.digest()  # raw bytes for BinaryField
+            uploaded_file.seek(0)  # rewind for saving
+
+            # Check if identical file already exists in media.asset
+            existing_asset = Asset.objects.filter(
+                hash_sha256=file_hash,
+                file_size_bytes=uploaded_file.size,
+                is_active=True,
+            ).first()
+
+            if existing_asset:
+                asset = existing_asset
+            else:
+                file_name = uploaded_file.name
+                file_ext = os.path.splitext(file_name)[1].lower()
+
+                # 1. INSERT asset record first (file_storage_path is a computed column — generated by DB)
+                asset = Asset.objects.create(
+                    asset_guid=str(uuid.uuid4()),
+                    file_original_name=file_name,
+                    file_extension=file_ext,
+                    file_mime_type=content_type,
                     file_size_bytes=uploaded_file.size,
+                    hash_sha256=file_hash,
+                    hash_algorithm_used='SHA-256',
+                    hash_is_verified=True,
+                    hash_last_verify_at=now,
                     is_active=True,
-                ).first()
-
-                if existing_asset:
-                    asset = existing_asset
-                else:
-                    file_name = uploaded_file.name
-                    file_ext = os.path.splitext(file_name)[1].lower()
-
-                    # 1. INSERT asset record first (file_storage_path is a computed column — generated by DB)
-                    asset = Asset.objects.create(
-                        asset_guid=str(uuid.uuid4()),
-                        file_original_name=file_name,
-                        file_extension=file_ext,
-                        file_mime_type=content_type,
-                        file_size_bytes=uploaded_file.size,
-                        hash_sha256=file_hash,
-                        hash_algorithm_used='SHA-256',
-                        hash_is_verified=True,
-                        hash_last_verify_at=now,
-                        is_active=True,
-                        created_at=now,
-                        modified_at=now,
-                    )
-
-                    # 2. Read back the computed file_storage_path from the inserted record
-                    with db_conn.cursor() as cur:
-                        cur.execute(
-                            "SELECT file_storage_path FROM [media].[asset] WHERE asset_id = %s",
-                            [asset.asset_id],
-                        )
-                        storage_path = cur.fetchone()[0]
+                    created_at=now,
+                    modified_at=now,
+                )
 
-                    # 3. Save physical file to MEDIA_ROOT / file_storage_path
-                    full_path = os.path.join(settings.MEDIA_ROOT, storage_path)
-                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                # 2. Read back the computed file_storage_path from the inserted record
+                with db_conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT file_storage_path FROM [media].[asset] WHERE asset_id = %s",
+                        [asset.asset_id],
+                    )
+                    storage_path = cur.fetchone()[0]
+
+                # 3. Save physical file to MEDIA_ROOT / file_storage_path
+                full_path = os.path.join(settings.MEDIA_ROOT, storage_path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+                with open(full_path, 'wb+') as dest:
+                    for chunk in uploaded_file.chunks():
+                        dest.write(chunk)
+
+            # Create junction record linking news entry to asset
+            CollNewsAsset.objects.create(
+                link_coll_news_entry_id=entry.coll_news_entry_id,
+                link_asset_id=asset.asset_id,
+                coll_news_asset_caption_bn=caption if i == 0 else None,
+                is_featured=(i == featured_idx),
+                sort_order=i,
+                created_at=now,
+            )
 
-                    with open(full_path, 'wb+') as dest:
-                        for chunk in uploaded_file.chunks():
-                            dest.write(chunk)
+        # ---- Save social source (if URL provided) ----
+        sd = social_source_form.cleaned_data
+        social_url = sd.get('social_source_url')
+        if social_url:
+            CollSocialSource.objects.create(
+                link_news_entry_id=entry.coll_news_entry_id,
+                link_platform_type_id=sd['platform_type_id'] or 0,
+                coll_social_source_url=social_url,
+                coll_social_source_embed_code=sd.get('social_embed_code') or None,
+                created_at=now,
+            )
 
-                # Create junction record linking news entry to asset
-                CollNewsAsset.objects.create(
+        # ---- Save tags ----
+        for tid in tag_ids:
+            if tid.isdigit():
+                CollNewsEntryTag.objects.create(
                     link_coll_news_entry_id=entry.coll_news_entry_id,
-                    link_asset_id=asset.asset_id,
-                    coll_news_asset_caption_bn=caption if i == 0 else None,
-                    is_featured=(i == featured_idx),
-                    sort_order=i,
+                    link_news_category_tag_id=int(tid),
                     created_at=now,
                 )
 
-            # ---- Save social source (if URL provided) ----
-            sd = social_source_form.cleaned_data
-            social_url = sd.get('social_source_url')
-            if social_url:
-                CollSocialSource.objects.create(
-                    link_news_entry_id=entry.coll_news_entry_id,
-                    link_platform_type_id=sd['platform_type_id'] or 0,
-                    coll_social_source_url=social_url,
-                    coll_social_source_embed_code=sd.get('social_embed_code') or None,
-                    created_at=now,
-                )
+        if receipt is not None:
+            receipt.link_coll_news_entry_id = entry.coll_news_entry_id
+            receipt.save(update_fields=['link_coll_news_entry_id'])
+    return entry
 
-            # ---- Save tags ----
-            for tid in tag_ids:
-                if tid.isdigit():
-                    CollNewsEntryTag.objects.create(
-                        link_coll_news_entry_id=entry.coll_news_entry_id,
-                        link_news_category_tag_id=int(tid),
-                        created_at=now,
-                    )
 
-    except (IntegrityError, DatabaseError) as exc:
-        # Safety net: DB-level unique constraint or data truncation
-        error_msg = 'সংবাদ জমা দেওয়া সম্ভব হয়নি। অনুগ্রহ করে আবার চেষ্টা করুন। (Submission failed. Please try again.)'
-        ctx = _build_form_context(
-            contributor_form, news_entry_form, attachment_form, social_source_form,
-            extra={
-                'error_message': error_msg,
-                'selected_category_id': category_id,
-                'selected_district_id': district_id,
-                'selected_constituency_id': constituency_id,
-                'selected_upazila_id': upazila_id,
-                'selected_union_parishad_id': union_parishad_id,
-                'selected_latitude': latitude,
-                'selected_longitude': longitude,
-                'selected_tag_ids': [int(t) for t in tag_ids if t.isdigit()],
-                'is_breaking_checked': is_breaking,
-            },
-        )
-        return render(request, 'newshub/pages/news-collection.html', ctx)
+# ========== Offline Sync ==========
+
+@require_http_methods(["GET", "POST"])
+@query_budget(40)
+def api_news_submission(request):
+    """Idempotent JSON submission endpoint, used by the offline sync queue.
+
+    GET returns a CSRF token for the service worker, which cannot read
+    cookies. POST takes the same fields as the form plus a required
+    ``client_submission_id`` (UUID); replaying a saved submission returns
+    the entry it created:
+
+        201 {"status": "created", "entry_id": ...}
+        200 {"status": "duplicate", "entry_id": ...}
+        400 {"status": "invalid", "errors": [...]}   — do not retry
+        503 {"status": "error", "errors": [...]}     — retry later
+    """
+    if request.method == 'GET':
+        return json_response(request, {'csrf_token': get_token(request)})
+
+    client_submission_id = _client_submission_id(request)
+    if client_submission_id is None:
+        return json_response(request, {
+            'status': 'invalid',
+            'errors': ['client_submission_id (UUID) is required'],
+        }, status=400)
+
+    entry_id = _receipt_entry_id(client_submission_id)
+    if entry_id is not None:
+        return json_response(request, {'status': 'duplicate', 'entry_id': entry_id})
+
+    sub = _read_submission(request)
+    errors = _validate_submission(sub)
+    if errors:
+        return json_response(request, {'status': 'invalid', 'errors': errors}, status=400)
+
+    try:
+        entry = _save_submission(request, sub, client_submission_id)
+    except (IntegrityError, DatabaseError):
+        entry_id = _receipt_entry_id(client_submission_id)
+        if entry_id is not None:
+            return json_response(request, {'status': 'duplicate', 'entry_id': entry_id})
+        logger.warning("Offline submission %s failed", client_submission_id, exc_info=True)
+        return json_response(request, {
+            'status': 'error',
+            'errors': ['সংবাদ জমা দেওয়া সম্ভব হয়নি। (Submission failed.)'],
+        }, status=503)
+
+    return json_response(request, {'status': 'created', 'entry_id': entry.coll_news_entry_id}, status=201)
+
+
+def service_worker(request):
+    """The offline-mode service worker, served under /newshub/ so its scope
+    covers the news collection page. Precache URLs carry the static files'
+    content hashes, so a deploy that changes them changes this script, and
+    browsers install the new worker."""
+    static_urls = [static(path) for path in OFFLINE_PRECACHE_STATIC]
+    scope = request.path.rsplit('/', 1)[0] + '/'
+    config = {
+        'build': hashlib.sha1('\n'.join(static_urls).encode()).hexdigest()[:12],
+        'page_url': reverse('newshub:news_collection'),
+        'submit_url': reverse('newshub:api_news_submission'),
+        'version_url': reverse('newshub:api_reference_version'),
+        'scope': scope,
+        'api_prefix': scope + 'api/',
+        'static_prefix': settings.STATIC_URL,
+        'precache_static': static_urls,
+        'precache_reference': [
+            reverse('newshub:api_match_index'),
+            reverse('newshub:api_news_category_tags_all'),
+            reverse('newshub:api_locations_all'),
+        ],
+        'queue_script': static('newshub/assets/js/components/news-offline-queue.js'),
+    }
+    response = render(
+        request, 'newshub/offline/service-worker.js',
+        {'config_json': json.dumps(config)},
+        content_type='application/javascript',
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
 
-    # PRG: redirect to GET so browser refresh won't re-submit the form
-    return redirect(request.path + '?submitted=1')
@@ -1,44 +1,33 @@
-from django.db.models import Q
-from django.http import JsonResponse
-
+from amolnama_news.site_apps.core import data_versions
+from amolnama_news.site_apps.core.async_views import asgi_view
+from amolnama_news.site_apps.core.cache import REFERENCE_TTL, cache_json_view
+from amolnama_news.site_apps.core.json_response import columnar, json_response
+from amolnama_news.site_apps.locations import gazetteer
 from amolnama_news.site_apps.locations.models import (
-    Constituency, District, UnionParishad, Upazila,
+    District, UnionParishad, Upazila,
     MetropolitanThana, MetropolitanThanaWard,
     CityCorporation, CityCorporationWard,
     Municipality, MunicipalityWard,
     UnionParishadWard, UnionParishadVillage,
-    UnifiedLocationSearch,
 )
 from amolnama_news.site_apps.user_account.models import Organisation
 
-from .models import (
-    RefNewsCategory,
-    RefNewsCategoryTag,
-    VwAppNewsCategoryTag,
-)
+from . import search
+from .models import VwAppNewsCategoryTag
 
 
 # ========== Location API Views ==========
 
+@asgi_view
+@cache_json_view('newshub:constituencies', REFERENCE_TTL, tags=('location',))
 def api_constituencies_by_district(request, district_id):
     """Return constituencies for a given district as JSON."""
-    qs = Constituency.objects.filter(
-        link_district_id=district_id,
-        is_active=True,
-    ).order_by('constituency_name_bn')
-
-    data = []
-    for c in qs:
-        data.append({
-            'id': c.constituency_id,
-            'name_bn': c.constituency_name_bn or '',
-            'name_en': c.constituency_name_en or '',
-            'area_bn': c.constituency_area_list_bn or '',
-        })
-
-    return JsonResponse({'constituencies': data})
+    data = gazetteer.constituencies_by_district([district_id]).get(district_id, [])
+    return json_response(request, {'constituencies': data})
 
 
+@asgi_view
+@cache_json_view('newshub:upazilas', REFERENCE_TTL, tags=('location',))
 def api_upazilas_by_district(request, district_id):
     """Return upazilas for a given district as JSON."""
     qs = Upazila.objects.filter(
@@ -54,9 +43,11 @@ def api_upazilas_by_district(request, district_id):
             'name_en': u.upazila_name_en or '',
         })
 
-    return JsonResponse({'upazilas': data})
+    return json_response(request, {'upazilas': data})
 
 
+@asgi_view
+@cache_json_view('newshub:union_parishads', REFERENCE_TTL, tags=('location',))
 def api_union_parishads_by_upazila(request, upazila_id):
     """Return union parishads for a given upazila as JSON."""
     qs = UnionParishad.objects.filter(
@@ -72,12 +63,11 @@ def api_union_parishads_by_upazila(request, upazila_id):
             'name_en': up.union_parishad_name_en or '',
         })
 
-    return JsonResponse({'union_parishads': data})
+    return json_response(request, {'union_parishads': data})
 
 
-def api_locations_all(request):
-    """Return all active districts, upazilas, and union parishads with hierarchy links.
-    Used by news-auto-location.js to detect locations from content body text."""
+def _all_locations():
+    """Active districts, upazilas and union parishads with their parent links."""
     districts = []
     for d in District.objects.filter(is_active=True).order_by('district_name_bn'):
         districts.append({
@@ -104,72 +94,35 @@ def api_locations_all(request):
             'upazila_id': up.link_upazila_id,
         })
 
-    return JsonResponse({
+    return {
         'districts': districts,
         'upazilas': upazilas,
         'union_parishads': unions,
-    })
+    }
+
+
+@asgi_view
+@cache_json_view('newshub:locations_all', REFERENCE_TTL, tags=('location',))
+def api_locations_all(request):
+    """Return all active districts, upazilas, and union parishads with hierarchy links."""
+    return json_response(request, _all_locations())
 
 
 # ========== Combined Cascade Location API Views ==========
 
+@asgi_view
+@cache_json_view('newshub:subdistricts', REFERENCE_TTL, tags=('location',))
 def api_subdistricts_by_district(request, district_id):
     """Return upazilas + metropolitan thanas + city corporations + municipalities
     for a district, each tagged with type.
-    Used by the combined উপজেলা/থানা/সিটি কর্পোরেশন/পৌরসভা dropdown."""
-    data = []
-
-    for u in Upazila.objects.filter(
-        link_district_id=district_id, is_active=True,
-    ).order_by('upazila_name_bn'):
-        data.append({
-            'id': u.upazila_id,
-            'name_bn': u.upazila_name_bn or '',
-            'name_en': u.upazila_name_en or '',
-            'type': 'upazila',
-            'lat': float(u.upazila_latitude) if u.upazila_latitude else None,
-            'lng': float(u.upazila_longitude) if u.upazila_longitude else None,
-        })
-
-    for t in MetropolitanThana.objects.filter(
-        link_district_id=district_id, is_active=True,
-    ).order_by('metropolitan_thana_name_bn'):
-        data.append({
-            'id': t.metropolitan_thana_id,
-            'name_bn': t.metropolitan_thana_name_bn or '',
-            'name_en': t.metropolitan_thana_name_en or '',
-            'type': 'metropolitan_thana',
-            'lat': float(t.metropolitan_thana_latitude) if t.metropolitan_thana_latitude else None,
-            'lng': float(t.metropolitan_thana_longitude) if t.metropolitan_thana_longitude else None,
-        })
-
-    for cc in CityCorporation.objects.filter(
-        link_district_id=district_id, is_active=True,
-    ).order_by('city_corporation_name_bn'):
-        data.append({
-            'id': cc.city_corporation_id,
-            'name_bn': cc.city_corporation_name_bn or '',
-            'name_en': cc.city_corporation_name_en or '',
-            'type': 'city_corporation',
-            'lat': float(cc.city_corporation_geo_latitude) if cc.city_corporation_geo_latitude else None,
-            'lng': float(cc.city_corporation_geo_longitude) if cc.city_corporation_geo_longitude else None,
-        })
-
-    for m in Municipality.objects.filter(
-        link_district_id=district_id, is_active=True,
-    ).order_by('municipality_name_bn'):
-        data.append({
-            'id': m.municipality_id,
-            'name_bn': m.municipality_name_bn or '',
-            'name_en': m.municipality_name_en or '',
-            'type': 'municipality',
-            'lat': float(m.municipality_geo_latitude) if m.municipality_geo_latitude else None,
-            'lng': float(m.municipality_geo_longitude) if m.municipality_geo_longitude else None,
-        })
-
-    return JsonResponse({'subdistricts': data})
+    Used by the combined উপজেলা/থানা/সিটি কর্পোরেশন/পৌরসভা dropdown.
+    Same rows as the district's static gazetteer shard."""
+    data = gazetteer.subdistricts_by_district([district_id]).get(district_id, [])
+    return json_response(request, {'subdistricts': data})
 
 
+@asgi_view
+@cache_json_view('newshub:local_bodies', REFERENCE_TTL, tags=('location',))
 def api_local_bodies_by_parent(request):
     """Return union parishads for an upazila.
     City corporations and municipalities are now at the subdistrict level.
@@ -178,27 +131,19 @@ def api_local_bodies_by_parent(request):
     parent_id = request.GET.get('parent_id', '')
 
     if not parent_id or not parent_id.isdigit():
-        return JsonResponse({'local_bodies': []})
+        return json_response(request, {'local_bodies': []})
 
     parent_id = int(parent_id)
     data = []
 
     if parent_type == 'upazila':
-        for up in UnionParishad.objects.filter(
-            link_upazila_id=parent_id, is_active=True,
-        ).order_by('union_parishad_name_bn'):
-            data.append({
-                'id': up.union_parishad_id,
-                'name_bn': up.union_parishad_name_bn or '',
-                'name_en': up.union_parishad_name_en or '',
-                'type': 'union_parishad',
-                'lat': float(up.union_parishad_latitude) if up.union_parishad_latitude else None,
-                'lng': float(up.union_parishad_longitude) if up.union_parishad_longitude else None,
-            })
+        data = gazetteer.union_parishads_by_upazila([parent_id]).get(parent_id, [])
 
-    return JsonResponse({'local_bodies': data})
+    return json_response(request, {'local_bodies': data})
 
 
+@asgi_view
+@cache_json_view('newshub:up_wards', REFERENCE_TTL, tags=('location',))
 def api_union_parishad_wards_by_union_parishad(request, union_parishad_id):
     """Return wards for a given union parishad."""
     qs = UnionParishadWard.objects.filter(
@@ -218,9 +163,11 @@ def api_union_parishad_wards_by_union_parishad(request, union_parishad_id):
             'lng': float(w.union_parishad_ward_geo_longitude) if w.union_parishad_ward_geo_longitude else None,
         })
 
-    return JsonResponse({'wards': data})
+    return json_response(request, {'wards': data})
 
 
+@asgi_view
+@cache_json_view('newshub:municipality_wards', REFERENCE_TTL, tags=('location',))
 def api_municipality_wards_by_municipality(request, municipality_id):
     """Return wards for a given municipality."""
     qs = MunicipalityWard.objects.filter(
@@ -240,9 +187,11 @@ def api_municipality_wards_by_municipality(request, municipality_id):
             'lng': float(w.municipality_ward_geo_longitude) if w.municipality_ward_geo_longitude else None,
         })
 
-    return JsonResponse({'wards': data})
+    return json_response(request, {'wards': data})
 
 
+@asgi_view
+@cache_json_view('newshub:cc_wards', REFERENCE_TTL, tags=('location',))
 def api_city_corporation_wards_by_city_corporation(request, city_corporation_id):
     """Return wards for a given city corporation."""
     qs = CityCorporationWard.objects.filter(
@@ -262,9 +211,11 @@ def api_city_corporation_wards_by_city_corporation(request, city_corporation_id)
             'lng': float(w.city_corporation_ward_geo_longitude) if w.city_corporation_ward_geo_longitude else None,
         })
 
-    return JsonResponse({'wards': data})
+    return json_response(request, {'wards': data})
 
 
+@asgi_view
+@cache_json_view('newshub:thana_wards', REFERENCE_TTL, tags=('location',))
 def api_city_corporation_wards_by_metropolitan_thana(request, metropolitan_thana_id):
     """Return city corporation wards linked to a metropolitan thana via junction table."""
     ward_ids = MetropolitanThanaWard.objects.filter(
@@ -288,9 +239,11 @@ def api_city_corporation_wards_by_metropolitan_thana(request, metropolitan_thana
             'lng': float(w.city_corporation_ward_geo_longitude) if w.city_corporation_ward_geo_longitude else None,
         })
 
-    return JsonResponse({'wards': data})
+    return json_response(request, {'wards': data})
 
 
+@asgi_view
+@cache_json_view('newshub:up_villages', REFERENCE_TTL, tags=('location',))
 def api_union_parishad_villages_by_union_parishad(request, union_parishad_id):
     """Return villages for a given union parishad."""
     qs = UnionParishadVillage.objects.filter(
@@ -308,38 +261,23 @@ def api_union_parishad_villages_by_union_parishad(request, union_parishad_id):
             'lng': float(v.union_parishad_village_geo_longitude) if v.union_parishad_village_geo_longitude else None,
         })
 
-    return JsonResponse({'villages': data})
+    return json_response(request, {'villages': data})
 
 
+@asgi_view
 def api_unified_location_search(request):
     """Search the unified location view for Tom Select.
-    Matches location names with startswith for typeahead UX.
+    Matches location names by phonetic key (newshub.search), so Bengali and any
+    Latin spelling find the same places; names starting with q as typed rank first.
     Returns locations with display titles showing full hierarchy path."""
     q = request.GET.get('q', '').strip()
     if len(q) < 1:
-        return JsonResponse({'locations': []})
+        return json_response(request, {'locations': []})
 
-    qs = UnifiedLocationSearch.objects.filter(
-        Q(unified_location_search_name_bn__istartswith=q)
-        | Q(unified_location_search_name_en__istartswith=q)
-    ).order_by('link_location_type_id', 'unified_location_display_title_bn')[:30]
-
-    data = []
-    for loc in qs:
-        data.append({
-            'id': loc.unified_location_search_id,
-            'entity_id': loc.link_location_id,
-            'table': loc.link_location_table,
-            'type': loc.location_type or '',
-            'name_bn': loc.unified_location_search_name_bn or '',
-            'name_en': loc.unified_location_search_name_en or '',
-            'title_bn': loc.unified_location_display_title_bn or '',
-            'title_en': loc.unified_location_display_title_en or '',
-        })
-
-    return JsonResponse({'locations': data})
+    return json_response(request, {'locations': search.location_index.search(q, limit=30)})
 
 
+@asgi_view
 def api_location_resolve_ancestry(request):
     """Resolve parent chain for a single location entity.
     Used by unified search to auto-fill cascade after selection.
@@ -348,7 +286,7 @@ def api_location_resolve_ancestry(request):
     entity_id = request.GET.get('id', '').strip()
 
     if not entity_id or not entity_id.isdigit():
-        return JsonResponse({'parent_ids': {}})
+        return json_response(request, {'parent_ids': {}})
 
     # Normalize bracketed table name: [location].[upazila] → upazila
     if '[' in table:
@@ -478,11 +416,13 @@ def api_location_resolve_ancestry(request):
                 if gp:
                     ids['district_id'] = gp['link_district_id']
 
-    return JsonResponse({'parent_ids': ids})
+    return json_response(request, {'parent_ids': ids})
 
 
 # ========== News Category Tag API Views ==========
 
+@asgi_view
+@cache_json_view('newshub:category_tags', REFERENCE_TTL, tags=('newshub',))
 def api_news_category_tags_by_category(request, category_id):
     """Return tags linked to a category via vw_app_news_category_tags view."""
     qs = VwAppNewsCategoryTag.objects.filter(
@@ -498,12 +438,12 @@ def api_news_category_tags_by_category(request, category_id):
             'group_code': tag.news_tag_group_code or '',
         })
 
-    return JsonResponse({'tags': data})
+    return json_response(request, {'tags': data})
 
 
-def api_news_category_tags_all(request):
-    """Return unique tags from vw_app_news_category_tags view. Used by news-auto-tag.js for content body matching.
-    Deduplicated by tag name — the same tag linked to multiple categories appears only once."""
+def _unique_category_tags():
+    """Tags from vw_app_news_category_tags, deduplicated by name — the same tag
+    linked to multiple categories appears only once."""
     qs = VwAppNewsCategoryTag.objects.all().order_by('news_category_id', 'news_tag_group_code', 'sort_order')
 
     seen = set()
@@ -519,77 +459,83 @@ def api_news_category_tags_all(request):
             'name_en': tag.news_tag_name_en,
             'group_code': tag.news_tag_group_code or '',
         })
+    return data
+
+
+@asgi_view
+@cache_json_view('newshub:category_tags_all', REFERENCE_TTL, tags=('newshub',))
+def api_news_category_tags_all(request):
+    """Return unique tags from vw_app_news_category_tags view."""
+    return json_response(request, {'tags': _unique_category_tags()})
+
+
+# ========== Content Matching Index ==========
+
+# Bump when the payload layout changes, so news-match-worker.js can tell
+MATCH_INDEX_VERSION = 1
+
+
+@asgi_view
+@cache_json_view('newshub:match_index', REFERENCE_TTL, tags=('newshub', 'location'))
+def api_match_index(request):
+    """Return every tag and district/upazila/union parishad name in one columnar payload.
+    news-match-worker.js builds its prefix index from it to auto-tag and auto-locate
+    the content body off the main thread."""
+    locations = _all_locations()
+    return json_response(request, {
+        'version': MATCH_INDEX_VERSION,
+        'tags': columnar(_unique_category_tags()),
+        'districts': columnar(locations['districts']),
+        'upazilas': columnar(locations['upazilas']),
+        'union_parishads': columnar(locations['union_parishads']),
+    })
+
+
+# ========== Offline Reference Version ==========
 
-    return JsonResponse({'tags': data})
+# Data-version domains (core.data_versions) behind the responses the offline
+# service worker caches: tags and categories, and the gazetteer
+OFFLINE_REFERENCE_DOMAINS = ('newshub', 'location')
 
 
-# ========== Full-Text Search API Views ==========
+@asgi_view
+def api_reference_version(request):
+    """Return one version string for the offline reference snapshot.
+    The service worker keeps cached reference responses until it changes."""
+    versions = data_versions.current()
+    version = '-'.join(f"{domain}.{versions.get(domain, 0)}" for domain in OFFLINE_REFERENCE_DOMAINS)
+    return json_response(request, {'version': version}, headers={'Cache-Control': 'no-cache'})
 
+
+# ========== Phonetic Search API Views ==========
+
+@asgi_view
 def api_news_category_search(request):
-    """Full-Text Search on ref_news_category (name_bn, name_en, search_aliases).
-    Supports transliterated queries like 'nirbachon' matching 'নির্বাচন (Election)'.
-    Uses SQL Server FTS index with CONTAINS and LANGUAGE 1033."""
+    """Search active categories by name and search_aliases (newshub.search).
+    Transliterated queries like 'nirbachon' match 'নির্বাচন (Election)' by phonetic key."""
     q = request.GET.get('q', '').strip()
     if len(q) < 2:
-        return JsonResponse({'categories': []})
-
-    # Build FTS search term with prefix matching
-    words = q.split()
-    if len(words) > 1:
-        search_term = ' AND '.join(f'"{w}*"' for w in words)
-    else:
-        search_term = f'"{q}*"'
-
-    sql = """
-        SELECT * FROM [newshub].[ref_news_category]
-        WHERE is_active = 1
-          AND CONTAINS(
-            ([news_category_name_bn], [news_category_name_en], [news_category_search_aliases]),
-            %s,
-            LANGUAGE 1033
-          )
-        ORDER BY sort_order, news_category_name_bn
-    """
-    results = RefNewsCategory.objects.raw(sql, [search_term])
-
-    data = [{'id': c.news_category_id, 'name_bn': c.news_category_name_bn,
-             'name_en': c.news_category_name_en} for c in results]
-    return JsonResponse({'categories': data})
+        return json_response(request, {'categories': []})
 
+    data = [search.public(c) for c in search.category_index.search(q, limit=50)]
+    return json_response(request, {'categories': data})
 
+
+@asgi_view
 def api_news_category_tags_search(request):
-    """Full-Text Search on ref_news_category_tag (name_bn, name_en, search_aliases).
-    Supports transliterated queries like 'sontras' matching 'সন্ত্রাসী হামলা (Terrorist Attack)'.
-    Uses SQL Server FTS index with CONTAINS and LANGUAGE 1033."""
+    """Search tags by name and search_aliases (newshub.search).
+    Transliterated queries like 'sontras' match 'সন্ত্রাসী হামলা (Terrorist Attack)' by phonetic key."""
     q = request.GET.get('q', '').strip()
     if len(q) < 2:
-        return JsonResponse({'tags': []})
-
-    # Build FTS search term with prefix matching
-    words = q.split()
-    if len(words) > 1:
-        search_term = ' AND '.join(f'"{w}*"' for w in words)
-    else:
-        search_term = f'"{q}*"'
-
-    sql = """
-        SELECT * FROM [newshub].[ref_news_category_tag]
-        WHERE CONTAINS(
-            ([news_tag_name_bn], [news_tag_name_en], [news_tag_search_aliases]),
-            %s,
-            LANGUAGE 1033
-          )
-        ORDER BY sort_order, news_tag_name_bn
-    """
-    results = RefNewsCategoryTag.objects.raw(sql, [search_term])
-
-    data = [{'id': t.news_category_tag_id, 'name_bn': t.news_tag_name_bn,
-             'name_en': t.news_tag_name_en} for t in results]
-    return JsonResponse({'tags': data})
+        return json_response(request, {'tags': []})
+
+    data = [search.public(t) for t in search.tag_index.search(q, limit=50)]
+    return json_response(request, {'tags': data})
 
 
 # ========== Organisation API Views ==========
 
+@asgi_view
 def api_organisations_by_type(request, type_id):
     """Return organisations for a given organisation type as JSON."""
     qs = Organisation.objects.filter(
@@ -605,33 +551,22 @@ def api_organisations_by_type(request, type_id):
             'name_en': o.organisation_name_en or '',
         })
 
-    return JsonResponse({'organisations': data})
+    return json_response(request, {'organisations': data})
 
 
+@asgi_view
 def api_organisation_search(request):
-    """Search organisations by name (EN or BN) with LIKE %q%."""
+    """Search active organisations by name (EN or BN): phonetic key or substring (newshub.search)."""
     q = request.GET.get('q', '').strip()
     type_id = request.GET.get('type_id', '')
 
     if len(q) < 2:
-        return JsonResponse({'organisations': []})
+        return json_response(request, {'organisations': []})
 
-    qs = Organisation.objects.filter(
-        Q(organisation_name_en__icontains=q) | Q(organisation_name_bn__icontains=q),
-        is_active=True,
-    )
+    of_type = None
     if type_id and type_id.isdigit():
-        qs = qs.filter(link_organisation_type_id=int(type_id))
-
-    qs = qs.order_by('organisation_name_bn', 'organisation_name_en')[:15]
-
-    data = []
-    for o in qs:
-        data.append({
-            'id': o.organisation_id,
-            'name_bn': o.organisation_name_bn or '',
-            'name_en': o.organisation_name_en or '',
-            'type_id': o.link_organisation_type_id,
-        })
+        def of_type(o, type_id=int(type_id)):
+            return o['type_id'] == type_id
 
-    return JsonResponse({'organisations': data})
+    data = search.organisation_index.search(q, limit=15, where=of_type)
+    return json_response(request, {'organisations': data})
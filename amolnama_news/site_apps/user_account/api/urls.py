@@ -1,7 +1,11 @@
 from django.urls import path
-from .views import RegisterView, LoginView
 
+from amolnama_news.site_apps.core.lazy_views import lazy_view
+
+# DRF and simplejwt are imported on the first API call, not at startup
 urlpatterns = [
-    path("register/", RegisterView.as_view(), name="api-register"),
-    path("login/", LoginView.as_view(), name="api-login"),
+    path("register/", lazy_view("amolnama_news.site_apps.user_account.api.views.RegisterView", csrf_exempt=True),
+         name="api-register"),
+    path("login/", lazy_view("amolnama_news.site_apps.user_account.api.views.LoginView", csrf_exempt=True),
+         name="api-login"),
 ]
@@ -2,11 +2,14 @@ from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
-from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 
+from amolnama_news.site_apps.core.async_views import asgi_view
+from amolnama_news.site_apps.core.json_response import json_response
+from amolnama_news.site_apps.core.query_budget import query_budget
+
 from .forms import (
     ChangePasswordForm,
     ContactInfoForm,
@@ -543,6 +546,7 @@ def profile_redirect_view(request):
 
 @login_required
 @require_http_methods(["GET", "POST"])
+@query_budget(15)
 def profile_personal_view(request):
     """Edit personal details: names, DOB, gender, religion, NID, notes."""
     profile, person = _load_person_and_profile(request.user)
@@ -610,6 +614,7 @@ def profile_personal_view(request):
 
 @login_required
 @require_http_methods(["GET", "POST"])
+@query_budget(15)
 def profile_contact_view(request):
     """Edit contact info: mobile number + email."""
     profile, person = _load_person_and_profile(request.user)
@@ -698,6 +703,7 @@ def profile_contact_view(request):
 
 @login_required
 @require_http_methods(["GET", "POST"])
+@query_budget(15)
 def profile_address_view(request):
     """Edit home address with cascading location dropdowns."""
     from amolnama_news.site_apps.locations.models import Address, Upazila
@@ -829,6 +835,7 @@ def profile_address_view(request):
 
 @login_required
 @require_http_methods(["GET", "POST"])
+@query_budget(15)
 def profile_settings_view(request):
     """Account settings — change password."""
     if request.method == "POST":
@@ -851,6 +858,7 @@ def profile_settings_view(request):
 # ── Location JSON APIs (for cascading dropdowns) ─────────────────
 
 
+@asgi_view
 @require_http_methods(["GET"])
 def api_upazilas(request):
     """Return upazilas for a given district_id as JSON."""
@@ -858,7 +866,7 @@ def api_upazilas(request):
 
     district_id = request.GET.get("district_id")
     if not district_id:
-        return JsonResponse([], safe=False)
+        return json_response(request, [])
 
     upazilas = (
         Upazila.objects
@@ -866,9 +874,10 @@ def api_upazilas(request):
         .order_by("upazila_name_en")
         .values("upazila_id", "upazila_name_en")
     )
-    return JsonResponse(list(upazilas), safe=False)
+    return json_response(request, list(upazilas))
 
 
+@asgi_view
 @require_http_methods(["GET"])
 def api_union_parishads(request):
     """Return union parishads for a given upazila_id as JSON."""
@@ -876,7 +885,7 @@ def api_union_parishads(request):
 
     upazila_id = request.GET.get("upazila_id")
     if not upazila_id:
-        return JsonResponse([], safe=False)
+        return json_response(request, [])
 
     unions = (
         UnionParishad.objects
@@ -884,4 +893,4 @@ def api_union_parishads(request):
         .order_by("union_parishad_name_en")
         .values("union_parishad_id", "union_parishad_name_en")
     )
-    return JsonResponse(list(unions), safe=False)
+    return json_response(request, list(unions))